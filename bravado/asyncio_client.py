@@ -0,0 +1,761 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP client based on :mod:`asyncio` streams.
+
+Service calls made from within a running event loop return an
+:class:`AsyncHttpFuture`, whose ``response()`` and ``result()`` methods need to be awaited:
+
+.. code-block:: python
+
+    client = SwaggerClient.from_url(spec_url, http_client=AsyncHttpClient())
+
+    async def get_pet(pet_id):
+        return (await client.pet.getPetById(petId=pet_id).response()).result
+
+Requests that are not made from a running event loop, as well as the requests
+used to load Swagger specs and remote refs, are executed on a private event loop
+running in a background thread and return a regular :class:`bravado.http_future.HttpFuture`.
+"""
+import asyncio
+import collections
+import logging
+import socket
+import ssl
+import sys
+import threading
+import typing
+import weakref
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import requests
+import requests.structures
+import simplejson
+import six
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+from six.moves.urllib import parse as urlparse
+from urllib3._collections import HTTPHeaderDict
+
+from bravado._equality_util import are_objects_equal as _are_objects_equal
+from bravado.compression import ACCEPT_ENCODING
+from bravado.compression import get_decoder
+from bravado.config import RequestConfig
+from bravado.deadline import bound_timeout
+from bravado.http_client import HttpClient
+from bravado.http_future import _SENTINEL
+from bravado.http_future import FALLBACK_EXCEPTIONS
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+from bravado.http_future import SENTINEL
+from bravado.response import BravadoResponse
+from bravado.retry import IDEMPOTENT_METHODS
+
+
+log = logging.getLogger(__name__)
+T = typing.TypeVar('T')
+
+ConnectionKey = typing.Tuple[str, str, int]
+Connection = typing.Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 30
+
+
+class AsyncioResponse(object):
+    """Fully received HTTP response.
+
+    :param headers: response headers; the values of headers sent several
+        times, like Set-Cookie, are available with ``headers.getlist(name)``
+    :type headers: :class:`urllib3._collections.HTTPHeaderDict`
+    """
+
+    def __init__(
+        self,
+        status_code,  # type: int
+        reason,  # type: typing.Text
+        headers,  # type: HTTPHeaderDict
+        body,  # type: bytes
+    ):
+        # type: (...) -> None
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+class AsyncioResponseAdapter(IncomingResponse):
+    """Wraps a :class:`AsyncioResponse` object to provide a uniform interface
+    to the response innards.
+    """
+
+    def __init__(self, asyncio_response):
+        # type: (AsyncioResponse) -> None
+        self._delegate = asyncio_response
+
+    @property
+    def status_code(self):
+        # type: () -> int
+        return self._delegate.status_code
+
+    @property
+    def text(self):
+        # type: () -> typing.Text
+        return self._delegate.body.decode('utf-8')
+
+    @property
+    def raw_bytes(self):
+        # type: () -> bytes
+        return self._delegate.body
+
+    @property
+    def reason(self):
+        # type: () -> typing.Text
+        return self._delegate.reason
+
+    @property
+    def headers(self):
+        # type: () -> typing.Mapping[typing.Text, typing.Text]
+        return self._delegate.headers
+
+    def json(self, **kwargs):
+        # type: (typing.Any) -> typing.Mapping[typing.Text, typing.Any]
+        return simplejson.loads(self.text, **kwargs)
+
+
+class AsyncioFutureAdapter(FutureAdapter[T]):
+    """Wraps either an :class:`asyncio.Future` scheduled on the caller's event loop,
+    or a :class:`concurrent.futures.Future` for requests executed on the background
+    event loop of :class:`AsyncHttpClient`.
+    """
+
+    timeout_errors = tuple(set((asyncio.TimeoutError, FutureTimeoutError)))  # type: typing.Tuple[typing.Type[BaseException], ...]  # noqa: E501
+    connection_errors = (
+        ConnectionAbortedError,
+        ConnectionRefusedError,
+        ConnectionResetError,
+        BrokenPipeError,
+        socket.gaierror,
+        asyncio.IncompleteReadError,
+    )  # type: typing.Tuple[typing.Type[BaseException], ...]
+
+    def __init__(self, future):
+        # type: (typing.Union[asyncio.Future, Future]) -> None
+        self._future = future
+        self._timed_out = False
+
+    async def wait(self, timeout=None):
+        # type: (typing.Optional[float]) -> None
+        """Wait for the request to complete without blocking the event loop.
+        Errors are not raised here, they're raised by :meth:`result`.
+
+        :param timeout: maximum time to wait for the response. Defaults to
+            None which means waiting indefinitely.
+        """
+        future = self._future
+        if isinstance(future, Future):
+            future = asyncio.wrap_future(future)
+
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+        if not done:
+            self._timed_out = True
+            self.cancel()
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> T
+        if self._timed_out:
+            raise asyncio.TimeoutError('Timed out waiting for the server to send the response')
+
+        if isinstance(self._future, Future):
+            try:
+                return self._future.result(timeout=timeout)
+            except FutureTimeoutError:
+                self.cancel()
+                six.reraise(
+                    asyncio.TimeoutError,
+                    asyncio.TimeoutError(
+                        'Timed out after waiting timeout={timeout} seconds for the server '
+                        'to send the response'.format(timeout=timeout),
+                    ),
+                    sys.exc_info()[2],
+                )
+
+        if not self._future.done():
+            raise RuntimeError(
+                'The request has not completed yet; await AsyncHttpFuture.response() or '
+                'AsyncHttpFuture.result() instead of blocking on the event loop.',
+            )
+        return self._future.result()
+
+    def cancel(self):
+        # type: () -> None
+        self._future.cancel()
+
+    def add_done_callback(self, callback):
+        # type: (typing.Callable[[typing.Any], None]) -> None
+        """Call callback with the wrapped future once the request has completed,
+        failed or been cancelled.
+        """
+        self._future.add_done_callback(callback)
+
+    @property
+    def concurrent_future(self):
+        # type: () -> typing.Optional[Future]
+        """Future of requests executed on the background event loop, None for
+        requests scheduled on the caller's event loop.
+        """
+        return self._future if isinstance(self._future, Future) else None
+
+    @property
+    def timed_out(self):
+        # type: () -> bool
+        """Whether the request was cancelled because waiting for it timed out."""
+        return self._timed_out
+
+    @property
+    def response_size(self):
+        # type: () -> int
+        """Size of the received body, or 0 if the request did not complete successfully."""
+        future = self._future
+        if not future.done() or future.cancelled() or future.exception() is not None:
+            return 0
+        return len(future.result().body)
+
+
+class AsyncHttpFuture(HttpFuture[T]):
+    """Awaitable counterpart of :class:`bravado.http_future.HttpFuture`.
+
+    :meth:`response` and :meth:`result` are coroutines and accept the same arguments
+    as the :class:`bravado.http_future.HttpFuture` methods with the same name.
+
+    :param unmarshal_executor: executor used to unmarshal large response bodies. Defaults
+        to None, which uses the default executor of the event loop.
+    :param unmarshal_executor_threshold: response bodies of at least this many bytes are
+        unmarshalled in ``unmarshal_executor`` instead of on the event loop. Defaults to None,
+        which always unmarshals on the event loop.
+    """
+
+    def __init__(
+        self,
+        future,  # type: AsyncioFutureAdapter
+        response_adapter,  # type: typing.Callable[[typing.Any], IncomingResponse]
+        operation=None,  # type: typing.Optional[Operation]
+        request_config=None,  # type: typing.Optional[RequestConfig]
+        unmarshal_executor=None,  # type: typing.Optional[Executor]
+        unmarshal_executor_threshold=None,  # type: typing.Optional[int]
+    ):
+        # type: (...) -> None
+        super(AsyncHttpFuture, self).__init__(future, response_adapter, operation, request_config)
+        self.future = future  # type: AsyncioFutureAdapter
+        self.unmarshal_executor = unmarshal_executor
+        self.unmarshal_executor_threshold = unmarshal_executor_threshold
+
+    async def response(  # type: ignore
+        self,
+        timeout=None,  # type: typing.Optional[float]
+        fallback_result=SENTINEL,  # type: typing.Union[_SENTINEL, T, typing.Callable[[BaseException], T]]  # noqa
+        exceptions_to_catch=FALLBACK_EXCEPTIONS,  # type: typing.Tuple[typing.Type[BaseException], ...]
+    ):
+        # type: (...) -> BravadoResponse[T]
+        await self.future.wait(bound_timeout(timeout, self.request_config.deadline_at))
+        return await self._run_unmarshalling(
+            super(AsyncHttpFuture, self).response,
+            fallback_result=fallback_result,
+            exceptions_to_catch=exceptions_to_catch,
+        )
+
+    async def result(  # type: ignore
+        self,
+        timeout=None,  # type: typing.Optional[float]
+    ):
+        # type: (...) -> typing.Union[T, IncomingResponse, typing.Tuple[T, IncomingResponse]]
+        await self.future.wait(bound_timeout(timeout, self.request_config.deadline_at))
+        return await self._run_unmarshalling(super(AsyncHttpFuture, self).result)
+
+    async def _run_unmarshalling(self, func, **kwargs):
+        # type: (typing.Callable[..., typing.Any], typing.Any) -> typing.Any
+        # The request has completed at this point, so func doesn't block on network I/O.
+        if (
+            self.operation is None or
+            self.unmarshal_executor_threshold is None or
+            self.future.response_size < self.unmarshal_executor_threshold
+        ):
+            return func(**kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.unmarshal_executor, lambda: func(**kwargs))
+
+
+class ConnectionPool(object):
+    """Keeps idle keep-alive connections, per scheme, host and port."""
+
+    def __init__(self, max_idle_connections_per_host):
+        # type: (int) -> None
+        self.max_idle_connections_per_host = max_idle_connections_per_host
+        self._idle = collections.defaultdict(list)  # type: typing.DefaultDict[ConnectionKey, typing.List[Connection]]
+
+    def acquire(self, key):
+        # type: (ConnectionKey) -> typing.Optional[Connection]
+        idle = self._idle[key]
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return None
+
+    def release(self, key, connection):
+        # type: (ConnectionKey, Connection) -> None
+        idle = self._idle[key]
+        if len(idle) < self.max_idle_connections_per_host:
+            idle.append(connection)
+        else:
+            connection[1].close()
+
+    def close(self):
+        # type: () -> None
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+class _StaleConnectionError(Exception):
+    """A pooled connection was closed by the server before it sent any response data."""
+
+
+class AsyncHttpClient(HttpClient):
+    """Asynchronous HTTP client implementation based on :mod:`asyncio` streams.
+    """
+
+    def __init__(
+        self,
+        ssl_verify=True,  # type: typing.Union[bool, str]
+        ssl_cert=None,  # type: typing.Any
+        max_idle_connections_per_host=10,  # type: int
+        unmarshal_executor=None,  # type: typing.Optional[Executor]
+        unmarshal_executor_threshold=None,  # type: typing.Optional[int]
+        future_adapter_class=AsyncioFutureAdapter,  # type: typing.Type[AsyncioFutureAdapter]
+        response_adapter_class=AsyncioResponseAdapter,  # type: typing.Type[AsyncioResponseAdapter]
+    ):
+        # type: (...) -> None
+        """
+        :param ssl_verify: Set to False to disable SSL certificate validation. Provide the path to a
+            CA bundle if you need to use a custom one.
+        :param ssl_cert: Provide a client-side certificate to use. Either a sequence of strings pointing
+            to the certificate (1) and the private key (2), or a string pointing to the combined certificate
+            and key.
+        :param max_idle_connections_per_host: number of keep-alive connections kept open per host
+            and event loop.
+        :param unmarshal_executor: executor used to unmarshal large response bodies, see
+            ``unmarshal_executor_threshold``. Defaults to the default executor of the event loop.
+        :param unmarshal_executor_threshold: response bodies of at least this many bytes are
+            unmarshalled in ``unmarshal_executor`` so that they don't stall the event loop.
+            Defaults to None, which always unmarshals on the event loop.
+        :param future_adapter_class: Custom future adapter class,
+            should be a subclass of :class:`AsyncioFutureAdapter`
+        :param response_adapter_class: Custom response adapter class,
+            should be a subclass of :class:`AsyncioResponseAdapter`
+        """
+        self.ssl_verify = ssl_verify
+        self.ssl_cert = ssl_cert
+        self.max_idle_connections_per_host = max_idle_connections_per_host
+        self.unmarshal_executor = unmarshal_executor
+        self.unmarshal_executor_threshold = unmarshal_executor_threshold
+        self.future_adapter_class = future_adapter_class
+        self.response_adapter_class = response_adapter_class
+
+        # Streams are bound to the event loop they were created on, so are the connection pools
+        self._pools = weakref.WeakKeyDictionary()  # type: typing.MutableMapping[asyncio.AbstractEventLoop, ConnectionPool]  # noqa: E501
+        self._ssl_context = None  # type: typing.Optional[ssl.SSLContext]
+        self._background_loop = None  # type: typing.Optional[asyncio.AbstractEventLoop]
+        self._lock = threading.Lock()
+
+    def __hash__(self):
+        # type: () -> int
+        return hash((
+            self.ssl_verify,
+            self.ssl_cert,
+            self.max_idle_connections_per_host,
+            self.unmarshal_executor_threshold,
+            self.future_adapter_class,
+            self.response_adapter_class,
+        ))
+
+    def __ne__(self, other):
+        # type: (typing.Any) -> bool
+        return not (self == other)
+
+    def __eq__(self, other):
+        # type: (typing.Any) -> bool
+        return _are_objects_equal(
+            self, other,
+            # runtime state which does not define equality methods
+            attributes_to_ignore={'_pools', '_ssl_context', '_background_loop', '_lock'},
+        )
+
+    def request(
+        self,
+        request_params,  # type: typing.MutableMapping[str, typing.Any]
+        operation=None,  # type: typing.Optional[Operation]
+        request_config=None,  # type: typing.Optional[RequestConfig]
+    ):
+        # type: (...) -> HttpFuture[T]
+        """
+        :param request_params: complete request data.
+        :type request_params: dict
+        :param operation: operation that this http request is for. Defaults
+            to None - in which case, we're obviously just retrieving a Swagger
+            Spec.
+        :type operation: :class:`bravado_core.operation.Operation`
+        :param RequestConfig request_config: per-request configuration
+
+        :returns: :class:`AsyncHttpFuture` if called from a running event loop,
+            :class:`bravado.http_future.HttpFuture` otherwise.
+        """
+        loop = _running_loop()
+        coroutine = self.send(dict(request_params))
+        # Specs and remote refs are loaded by code that blocks on the result
+        # (see bravado.swagger_model.Loader), so they can't run on the caller's loop.
+        if loop is None or operation is None:
+            concurrent_future = asyncio.run_coroutine_threadsafe(coroutine, self._get_background_loop())
+            return HttpFuture(
+                self.future_adapter_class(concurrent_future),
+                self.response_adapter_class,
+                operation,
+                request_config,
+            )
+
+        return self.awaitable_future(coroutine, operation, request_config)
+
+    def failed_future(
+        self,
+        error,  # type: BaseException
+        operation,  # type: Operation
+        request_config=None,  # type: typing.Optional[RequestConfig]
+    ):
+        # type: (...) -> AsyncHttpFuture
+        """:class:`AsyncHttpFuture` of a request that isn't sent, e.g. because
+        of a client-side limit, whose response raises the given error.
+        """
+        return self.awaitable_future(_raise(error), operation, request_config)
+
+    def awaitable_future(
+        self,
+        coroutine,  # type: typing.Coroutine[typing.Any, typing.Any, AsyncioResponse]
+        operation,  # type: Operation
+        request_config=None,  # type: typing.Optional[RequestConfig]
+    ):
+        # type: (...) -> AsyncHttpFuture
+        """Schedule a coroutine returning the response of a request (e.g. one
+        that waits before calling :meth:`send`) on the running event loop.
+
+        :return: :class:`AsyncHttpFuture` of the response
+        """
+        return AsyncHttpFuture(
+            self.future_adapter_class(asyncio.get_running_loop().create_task(coroutine)),
+            self.response_adapter_class,
+            operation,
+            request_config,
+            unmarshal_executor=self.unmarshal_executor,
+            unmarshal_executor_threshold=self.unmarshal_executor_threshold,
+        )
+
+    async def close(self):
+        # type: () -> None
+        """Close the idle connections kept for the running event loop."""
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            pool.close()
+
+    def _get_background_loop(self):
+        # type: () -> asyncio.AbstractEventLoop
+        with self._lock:
+            if self._background_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='bravado-asyncio', daemon=True)
+                thread.start()
+                self._background_loop = loop
+            return self._background_loop
+
+    def _get_pool(self):
+        # type: () -> ConnectionPool
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = ConnectionPool(self.max_idle_connections_per_host)
+        return pool
+
+    def _get_ssl_context(self):
+        # type: () -> ssl.SSLContext
+        if self._ssl_context is None:
+            if isinstance(self.ssl_verify, str):
+                context = ssl.create_default_context(cafile=self.ssl_verify)
+            else:
+                context = ssl.create_default_context()
+                if not self.ssl_verify:
+                    context.check_hostname = False
+                    context.verify_mode = ssl.CERT_NONE
+            if self.ssl_cert is not None:
+                if isinstance(self.ssl_cert, str):
+                    context.load_cert_chain(self.ssl_cert)
+                else:
+                    context.load_cert_chain(*self.ssl_cert)
+            self._ssl_context = context
+        return self._ssl_context
+
+    async def send(self, request_params):
+        # type: (typing.MutableMapping[str, typing.Any]) -> AsyncioResponse
+        """Send the request and receive the full response, following redirects
+        if the ``follow_redirects`` option is set.
+
+        :param request_params: complete request data.
+        :rtype: :class:`AsyncioResponse`
+        """
+        follow_redirects = request_params.pop('follow_redirects', False)
+        response = await self._send_once(request_params)
+
+        redirects = 0
+        while (
+            follow_redirects and
+            response.status_code in REDIRECT_STATUS_CODES and
+            'location' in response.headers and
+            redirects < MAX_REDIRECTS
+        ):
+            redirects += 1
+            request_params['url'] = urlparse.urljoin(request_params['url'], response.headers['location'])
+            request_params['params'] = {}
+            if response.status_code == 303 or (
+                response.status_code in (301, 302) and request_params.get('method', 'GET').upper() == 'POST'
+            ):
+                request_params['method'] = 'GET'
+                for body_param in ('data', 'files', 'json'):
+                    request_params.pop(body_param, None)
+            response = await self._send_once(request_params)
+
+        return response
+
+    async def _send_once(self, request_params):
+        # type: (typing.Mapping[str, typing.Any]) -> AsyncioResponse
+        method, url, headers, body = self.prepare_request(request_params)
+        split_url = urlparse.urlsplit(url)
+        scheme = split_url.scheme.lower()
+        host = split_url.hostname or ''
+        port = split_url.port
+        if port is None:
+            port = DEFAULT_PORTS.get(scheme, 80)
+        key = (scheme, host, port)  # type: ConnectionKey
+
+        target = split_url.path or '/'
+        if split_url.query:
+            target += '?' + split_url.query
+        if 'Host' not in headers:
+            headers['Host'] = split_url.netloc
+        if 'Accept-Encoding' not in headers:
+            headers['Accept-Encoding'] = ACCEPT_ENCODING
+        request_bytes = self._serialize_request(method, target, headers, body)
+
+        # The timeout bounds the whole request, from connecting to receiving the end of the body
+        timeout = request_params.get('timeout')
+        deadline = asyncio.get_running_loop().time() + timeout if timeout is not None else None
+
+        pool = self._get_pool()
+        connection = pool.acquire(key)
+        if connection is not None:
+            try:
+                return await self._exchange(pool, key, connection, method, request_bytes, deadline)
+            except _StaleConnectionError:
+                # The server may have processed the request before closing the connection
+                if method.upper() not in IDEMPOTENT_METHODS:
+                    raise ConnectionResetError('Pooled connection closed by the server before sending a response')
+                log.debug('Pooled connection to %s:%s was closed by the server, reconnecting', host, port)
+
+        connection = await asyncio.wait_for(
+            asyncio.open_connection(
+                host, port,
+                ssl=self._get_ssl_context() if scheme == 'https' else None,
+            ),
+            timeout=_min_timeout(request_params.get('connect_timeout'), deadline),
+        )
+        try:
+            return await self._exchange(pool, key, connection, method, request_bytes, deadline)
+        except _StaleConnectionError:
+            raise ConnectionResetError('Connection closed by the server before sending a response')
+
+    async def _exchange(self, pool, key, connection, method, request_bytes, deadline):
+        # type: (ConnectionPool, ConnectionKey, Connection, str, bytes, typing.Optional[float]) -> AsyncioResponse
+        keep_alive = False
+        try:
+            response, keep_alive = await asyncio.wait_for(
+                self._write_and_read(connection, method, request_bytes),
+                timeout=_min_timeout(None, deadline),
+            )
+            return response
+        finally:
+            if keep_alive:
+                pool.release(key, connection)
+            else:
+                connection[1].close()
+
+    @classmethod
+    async def _write_and_read(cls, connection, method, request_bytes):
+        # type: (Connection, str, bytes) -> typing.Tuple[AsyncioResponse, bool]
+        reader, writer = connection
+        try:
+            writer.write(request_bytes)
+            await writer.drain()
+            status_line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise _StaleConnectionError()
+        if not status_line:
+            raise _StaleConnectionError()
+        return await cls._read_response(reader, status_line, method)
+
+    @staticmethod
+    def prepare_request(request_params):
+        # type: (typing.Mapping[str, typing.Any]) -> typing.Tuple[str, str, requests.structures.CaseInsensitiveDict, typing.Optional[bytes]]  # noqa: E501
+        """
+        Uses the python package 'requests' to compute the url, headers and body
+        (query parameters, form data, multipart files, etc.) of the request.
+
+        :return: tuple(method, url, headers, body)
+        """
+        # Ensure that all the headers are converted to strings.
+        # This is need to workaround https://github.com/requests/requests/issues/3491
+        headers = {
+            k: v if isinstance(v, six.binary_type) else str(v)
+            for k, v in six.iteritems(request_params.get('headers') or {})
+        }
+
+        prepared_request = requests.PreparedRequest()
+        prepared_request.prepare(
+            headers=headers,
+            data=request_params.get('data'),
+            params=request_params.get('params'),
+            files=request_params.get('files'),
+            json=request_params.get('json'),
+            url=request_params.get('url'),
+            method=request_params.get('method'),
+        )
+
+        body = _body_bytes(prepared_request.body)
+        if body is not None and 'transfer-encoding' in prepared_request.headers:
+            # Bodies of unknown length, e.g. generators, were joined: they're sent
+            # whole rather than in chunks
+            del prepared_request.headers['transfer-encoding']
+            prepared_request.headers['Content-Length'] = str(len(body))
+
+        return (
+            str(prepared_request.method or 'GET'),
+            str(prepared_request.url),
+            prepared_request.headers,
+            body,
+        )
+
+    @staticmethod
+    def _serialize_request(method, target, headers, body):
+        # type: (str, str, typing.Mapping[typing.Any, typing.Any], typing.Optional[bytes]) -> bytes
+        lines = ['{0} {1} HTTP/1.1'.format(method, target).encode('latin1')]
+        for name, value in six.iteritems(headers):
+            if not isinstance(name, six.binary_type):
+                name = name.encode('latin1')
+            if not isinstance(value, six.binary_type):
+                value = value.encode('latin1')
+            lines.append(name + b': ' + value)
+        return b'\r\n'.join(lines) + b'\r\n\r\n' + (body or b'')
+
+    @staticmethod
+    async def _read_response(reader, status_line, method):
+        # type: (asyncio.StreamReader, bytes, str) -> typing.Tuple[AsyncioResponse, bool]
+        version, status_code, reason = (status_line.decode('latin1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+
+        # Keeps all the values of repeated headers, like Set-Cookie
+        headers = HTTPHeaderDict()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin1').partition(':')
+            headers.add(name.strip(), value.strip())
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        status = int(status_code)
+        decoder = get_decoder(headers.get('content-encoding'))
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+            decoder = None
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    # skip trailers
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunk = await reader.readexactly(size)
+                # Decompress chunks as they arrive, so the compressed body is never held as a whole
+                chunks.append(decoder.decompress(chunk) if decoder is not None else chunk)
+                await reader.readexactly(2)
+            if decoder is not None:
+                chunks.append(decoder.flush())
+                decoder = None
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            # The end of the body is signalled by the server closing the connection
+            body = await reader.read()
+            keep_alive = False
+
+        if decoder is not None:
+            body = decoder.decompress(body) + decoder.flush()
+
+        return AsyncioResponse(status, reason, headers, body), keep_alive
+
+
+def returns_awaitable_futures(http_client, operation):
+    # type: (typing.Any, typing.Optional[Operation]) -> bool
+    """Whether requests of the operation sent now with the given http client
+    return an :class:`AsyncHttpFuture`, see :meth:`AsyncHttpClient.request`.
+    """
+    return isinstance(http_client, AsyncHttpClient) and operation is not None and _running_loop() is not None
+
+
+async def _raise(error):
+    # type: (BaseException) -> AsyncioResponse
+    raise error
+
+
+def _running_loop():
+    # type: () -> typing.Optional[asyncio.AbstractEventLoop]
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _min_timeout(timeout, deadline):
+    # type: (typing.Optional[float], typing.Optional[float]) -> typing.Optional[float]
+    """Timeout shortened to the time left until the deadline, in event loop time."""
+    if deadline is None:
+        return timeout
+    remaining = deadline - asyncio.get_running_loop().time()
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _body_bytes(body):
+    # type: (typing.Any) -> typing.Optional[bytes]
+    """Request body prepared by requests, which can also be a file object
+    or an iterable of chunks, as bytes.
+    """
+    if body is None or isinstance(body, six.binary_type):
+        return body
+    if isinstance(body, six.text_type):
+        return body.encode('utf-8')
+    if hasattr(body, 'read'):
+        return _body_bytes(body.read())
+    return b''.join(_body_bytes(chunk) or b'' for chunk in body)
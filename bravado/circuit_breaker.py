@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breakers that stop sending requests to failing operations, configured
+with the ``circuit_breaker`` config:
+
+.. code-block:: python
+
+    config = {
+        'circuit_breaker': {
+            'failure_threshold': 5,
+            'reset_timeout': 30,
+        },
+    }
+
+Each operation of each host has its own breaker. Timeouts, connection errors
+and 5XX responses, i.e. the errors handled by fallback results by default,
+count as failures. A breaker opens after ``failure_threshold`` consecutive
+failures, or once ``error_rate_threshold`` of the last ``window_size`` calls
+(and at least ``min_calls`` of them) failed.
+
+While a breaker is open, calls are not sent: waiting for their response raises
+:class:`bravado.exception.BravadoCircuitOpenError` right away, which is handled
+by fallback results. After ``reset_timeout`` seconds the breaker is half-open:
+one call is sent to probe the operation, and closes the breaker if it
+succeeds or opens it again if it fails.
+
+The outcome of calls made with :class:`bravado.asyncio_client.AsyncHttpClient`
+from a running event loop is recorded when their request completes.
+"""
+import asyncio
+import collections
+import threading
+import typing
+
+import monotonic
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+from six.moves.urllib.parse import urlparse
+
+from bravado.asyncio_client import AsyncHttpClient
+from bravado.asyncio_client import AsyncioFutureAdapter
+from bravado.asyncio_client import returns_awaitable_futures
+from bravado.config import get_spec_state
+from bravado.config import RequestConfig
+from bravado.exception import BravadoCircuitOpenError
+from bravado.exception import BravadoConnectionError
+from bravado.exception import BravadoRateLimitError
+from bravado.exception import BravadoTimeoutError
+from bravado.http_future import FailedFutureAdapter
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker(object):
+    """Circuit breaker of an operation. Thread-safe.
+
+    :param failure_threshold: consecutive failures that open the breaker
+    :param error_rate_threshold: ratio of failed calls that opens the breaker
+    :param window_size: number of recent calls the error rate is computed over
+    :param min_calls: min number of recent calls for the error rate to open the breaker
+    :param reset_timeout: seconds the breaker stays open before probing the operation
+    """
+
+    def __init__(
+        self,
+        failure_threshold=5,  # type: int
+        error_rate_threshold=0.5,  # type: float
+        window_size=100,  # type: int
+        min_calls=20,  # type: int
+        reset_timeout=30.0,  # type: float
+    ):
+        # type: (...) -> None
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        # Outcomes of the recent calls, True for failures
+        self._outcomes = collections.deque(maxlen=window_size)  # type: typing.Deque[bool]
+        self._opened_at = 0.0
+        self._probe_sent_at = None  # type: typing.Optional[float]
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        # type: () -> str
+        with self._lock:
+            if self._state == OPEN and monotonic.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self):
+        # type: () -> str
+        """Check whether a call can be sent.
+
+        :return: state of the breaker when the call is allowed
+        :raises: BravadoCircuitOpenError if the call must not be sent
+        """
+        with self._lock:
+            now = monotonic.monotonic()
+            if self._state == OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    raise BravadoCircuitOpenError(self.reset_timeout - (now - self._opened_at))
+                self._state = HALF_OPEN
+                self._probe_sent_at = None
+
+            if self._state == HALF_OPEN:
+                # Probes whose response is never waited for don't block the breaker forever
+                if self._probe_sent_at is not None and now - self._probe_sent_at < self.reset_timeout:
+                    raise BravadoCircuitOpenError(self.reset_timeout - (now - self._probe_sent_at))
+                self._probe_sent_at = now
+
+            return self._state
+
+    def record_success(self):
+        # type: () -> None
+        with self._lock:
+            self._consecutive_failures = 0
+            self._outcomes.append(False)
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+
+    def record_failure(self):
+        # type: () -> None
+        with self._lock:
+            self._consecutive_failures += 1
+            self._outcomes.append(True)
+            if self._state == HALF_OPEN or self._should_open():
+                self._state = OPEN
+                self._opened_at = monotonic.monotonic()
+                self._consecutive_failures = 0
+                self._outcomes.clear()
+
+    def _should_open(self):
+        # type: () -> bool
+        if self._consecutive_failures >= self.failure_threshold:
+            return True
+        return (
+            len(self._outcomes) >= self.min_calls and
+            sum(self._outcomes) >= self.error_rate_threshold * len(self._outcomes)
+        )
+
+
+class CircuitBreakers(object):
+    """Circuit breakers of a client, by host and operationId.
+
+    :param breaker_kwargs: keyword arguments of the :class:`CircuitBreaker` objects
+    """
+
+    def __init__(self, **breaker_kwargs):
+        # type: (typing.Any) -> None
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers = {}  # type: typing.Dict[typing.Tuple[typing.Text, typing.Text], CircuitBreaker]
+        self._lock = threading.Lock()
+
+    def get(self, host, operation_id):
+        # type: (typing.Text, typing.Text) -> CircuitBreaker
+        with self._lock:
+            breaker = self._breakers.get((host, operation_id))
+            if breaker is None:
+                breaker = self._breakers[(host, operation_id)] = CircuitBreaker(**self._breaker_kwargs)
+            return breaker
+
+
+def get_circuit_breakers(swagger_spec):
+    # type: (typing.Any) -> typing.Optional[CircuitBreakers]
+    """Return the circuit breakers of the client of the given spec, creating
+    them on first use, or None if the client doesn't use circuit breakers.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    bravado_config = swagger_spec.config.get('bravado')
+    if bravado_config is None or bravado_config.circuit_breaker is None:
+        return None
+    return get_spec_state(
+        swagger_spec,
+        'circuit_breakers',
+        lambda: CircuitBreakers(**bravado_config.circuit_breaker),
+    )
+
+
+class CircuitBreakerFutureAdapter(FutureAdapter):
+    """Future of a request whose outcome is recorded by a circuit breaker."""
+
+    def __init__(self, http_future, breaker):
+        # type: (HttpFuture, CircuitBreaker) -> None
+        self._http_future = http_future
+        self._breaker = breaker
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        try:
+            # Errors of the HTTP client are converted by HttpFuture
+            incoming_response = self._http_future._get_incoming_response(timeout)
+        except BravadoRateLimitError:
+            # The request wasn't sent, it says nothing about the operation
+            raise
+        except (BravadoTimeoutError, BravadoConnectionError):
+            self._breaker.record_failure()
+            raise
+        if incoming_response.status_code >= 500:
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        return incoming_response
+
+    def cancel(self):
+        # type: () -> None
+        self._http_future.cancel()
+
+    @property
+    def attempts(self):
+        # type: () -> int
+        return getattr(self._http_future.future, 'attempts', 1)
+
+    @property
+    def backoff_time(self):
+        # type: () -> float
+        return getattr(self._http_future.future, 'backoff_time', 0.0)
+
+
+def _record_outcome(breaker, future_adapter, future):
+    # type: (CircuitBreaker, AsyncioFutureAdapter, typing.Any) -> None
+    """Record the outcome of the request of an awaitable future, like
+    :class:`CircuitBreakerFutureAdapter` does.
+    """
+    if future.cancelled():
+        if future_adapter.timed_out:
+            breaker.record_failure()
+        return
+    error = future.exception()
+    if error is None:
+        if future.result().status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+    elif isinstance(error, future_adapter.timeout_errors + future_adapter.connection_errors):
+        breaker.record_failure()
+
+
+def circuit_breaker_request(
+    circuit_breakers,  # type: CircuitBreakers
+    send_request,  # type: typing.Callable[[], HttpFuture]
+    request_params,  # type: typing.Mapping[str, typing.Any]
+    operation,  # type: Operation
+    request_config,  # type: RequestConfig
+):
+    # type: (...) -> HttpFuture
+    """Send a request unless the circuit breaker of its operation is open.
+
+    :param send_request: sends the request and returns its :class:`bravado.http_future.HttpFuture`
+    :return: future of the request, whose ``circuit_breaker_state`` is the
+        state of the breaker when the request was made
+    """
+    breaker = circuit_breakers.get(urlparse(request_params['url']).netloc, operation.operation_id)
+    try:
+        state = breaker.allow_request()
+    except BravadoCircuitOpenError as e:
+        http_client = operation.swagger_spec.http_client
+        if returns_awaitable_futures(http_client, operation):
+            http_future = typing.cast(AsyncHttpClient, http_client).failed_future(
+                e, operation, request_config,
+            )  # type: HttpFuture
+        else:
+            http_future = HttpFuture(
+                FailedFutureAdapter(e),
+                lambda incoming_response: incoming_response,
+                operation,
+                request_config,
+            )
+        http_future.circuit_breaker_state = OPEN
+        return http_future
+
+    inner_http_future = send_request()
+    if asyncio.iscoroutinefunction(inner_http_future.response):
+        # Awaitable futures can't be waited for by blocking on them
+        future_adapter = typing.cast(AsyncioFutureAdapter, inner_http_future.future)
+        future_adapter.add_done_callback(lambda future: _record_outcome(breaker, future_adapter, future))
+        inner_http_future.circuit_breaker_state = state
+        return inner_http_future
+
+    http_future = HttpFuture(
+        CircuitBreakerFutureAdapter(inner_http_future, breaker),
+        lambda incoming_response: incoming_response,
+        operation,
+        request_config,
+    )
+    http_future.rate_limit_wait_time = inner_http_future.rate_limit_wait_time
+    http_future.circuit_breaker_state = state
+    return http_future
@@ -43,23 +43,54 @@ To get a client
 
     client = bravado.client.SwaggerClient.from_url(swagger_spec_url)
 """
+import functools
 import logging
 import typing
+import weakref
 from copy import deepcopy
 
+import six
+from bravado_core.content_type import APP_JSON
+from bravado_core.content_type import APP_MSGPACK
 from bravado_core.docstring import create_operation_docstring
 from bravado_core.exception import SwaggerMappingError
 from bravado_core.formatter import SwaggerFormat  # noqa
+from bravado_core.marshal import marshal_schema_object
+from bravado_core.param import get_param_type_spec
 from bravado_core.param import marshal_param
+from bravado_core.spec import build_http_handlers
 from bravado_core.spec import Spec
+from bravado_core.validate import validate_schema_object
 from six import iteritems
-from six import itervalues
 
+from bravado.circuit_breaker import circuit_breaker_request
+from bravado.circuit_breaker import get_circuit_breakers
+from bravado.compression import compress
+from bravado.compression import MIN_COMPRESSED_SIZE
 from bravado.config import bravado_config_from_config_dict
+from bravado.config import get_json_codec
+from bravado.config import resolve_json_codec
 from bravado.config import RequestConfig
+from bravado.deadline import deadline_header_value
 from bravado.docstring_property import docstring_property
+from bravado.hedging import get_request_hedger
+from bravado.hedging import hedge_request
+from bravado.lazy_spec import LazySpec
+from bravado.load_balancer import get_load_balancer
+from bravado.load_balancer import load_balance_request
+from bravado.rate_limit import get_rate_limiter
+from bravado.rate_limit import rate_limit_request
 from bravado.requests_client import RequestsClient
+from bravado.result_cache import cached_result_future
+from bravado.result_cache import get_result_cache
+from bravado.result_cache import result_cache_key
+from bravado.retry import get_retry_budget
+from bravado.retry import retry_request
+from bravado.retry import RetryPolicy
+from bravado.singleflight import get_single_flight
+from bravado.spec_subset import subset_spec
 from bravado.swagger_model import Loader
+from bravado.swagger_model import SpecCache
 from bravado.warning import warn_for_deprecated_op
 
 log = logging.getLogger(__name__)
@@ -73,6 +104,7 @@ class SwaggerClient(object):
 
     def __init__(self, swagger_spec, also_return_response=False):
         self.__also_return_response = also_return_response
+        self.__resource_decorators = {}  # type: typing.Dict[typing.Text, ResourceDecorator]
         self.swagger_spec = swagger_spec
 
     @classmethod
@@ -94,7 +126,17 @@ class SwaggerClient(object):
         """
         log.debug(u"Loading from %s", spec_url)
         http_client = http_client or RequestsClient()
-        loader = Loader(http_client, request_headers=request_headers)
+        bravado_config = bravado_config_from_config_dict(config)
+        spec_cache = None
+        if bravado_config.spec_cache_dir is not None:
+            spec_cache = SpecCache(bravado_config.spec_cache_dir, bravado_config.spec_cache_max_age)
+        loader = Loader(
+            http_client,
+            request_headers=request_headers,
+            spec_cache=spec_cache,
+            prefetch_workers=bravado_config.ref_prefetch_workers,
+            json_codec=resolve_json_codec(bravado_config.json_codec),
+        )
         spec_dict = loader.load_spec(spec_url)
 
         # RefResolver may have to download additional json files (remote refs)
@@ -106,11 +148,11 @@ class SwaggerClient(object):
             http_client.request = inject_headers_for_remote_refs(
                 http_client.request, request_headers)
 
-        return cls.from_spec(spec_dict, spec_url, http_client, config)
+        return cls.from_spec(spec_dict, spec_url, http_client, config, prefetched_refs=loader.prefetched_refs)
 
     @classmethod
     def from_spec(cls, spec_dict, origin_url=None, http_client=None,
-                  config=None):
+                  config=None, prefetched_refs=None):
         """
         Build a :class:`SwaggerClient` from a Swagger spec in dict form.
 
@@ -118,6 +160,9 @@ class SwaggerClient(object):
         :param origin_url: the url used to retrieve the spec_dict
         :type  origin_url: str
         :param config: Configuration dict - see spec.CONFIG_DEFAULTS
+        :param prefetched_refs: dict of url to remote document referenced by
+            the spec, which isn't downloaded again, see
+            :meth:`bravado.swagger_model.Loader.prefetch_remote_refs`
 
         :rtype: :class:`SwaggerClient`
         """
@@ -132,8 +177,22 @@ class SwaggerClient(object):
         # set bravado config object
         config['bravado'] = bravado_config
 
-        swagger_spec = Spec.from_dict(
-            spec_dict, origin_url, http_client, config,
+        if bravado_config.include_resources is not None or bravado_config.include_operation_ids is not None:
+            spec_dict = subset_spec(
+                spec_dict,
+                resources=bravado_config.include_resources,
+                operation_ids=bravado_config.include_operation_ids,
+            )
+
+        spec_class = LazySpec if bravado_config.lazy_build else Spec
+        swagger_spec = build_spec(
+            spec_class,
+            spec_dict,
+            origin_url,
+            http_client,
+            config,
+            prefetched_refs,
+            json_codec=resolve_json_codec(bravado_config.json_codec),
         )
         return cls(swagger_spec, also_return_response=bravado_config.also_return_response)
 
@@ -145,6 +204,10 @@ class SwaggerClient(object):
         :param item: name of the resource to return
         :return: :class:`Resource`
         """
+        resource_decorator = self.__resource_decorators.get(item)
+        if resource_decorator is not None:
+            return resource_decorator
+
         resource = self.swagger_spec.resources.get(item)
         if not resource:
             raise AttributeError(
@@ -153,7 +216,9 @@ class SwaggerClient(object):
 
         # Wrap bravado-core's Resource and Operation objects in order to
         # execute a service call via the http_client.
-        return ResourceDecorator(resource, self.__also_return_response)
+        resource_decorator = ResourceDecorator(resource, self.__also_return_response)
+        self.__resource_decorators[item] = resource_decorator
+        return resource_decorator
 
     def __deepcopy__(self, memo=None):
         if memo is None:
@@ -209,6 +274,54 @@ def inject_headers_for_remote_refs(request_callable, request_headers):
     return request_wrapper
 
 
+def build_spec(spec_class, spec_dict, origin_url, http_client, config, prefetched_refs=None, json_codec=None):
+    """Build a spec like :meth:`bravado_core.spec.Spec.from_dict`, resolving
+    the remote refs in prefetched_refs without downloading them again.
+
+    :param spec_class: :class:`bravado_core.spec.Spec` or a subclass of it
+    :param prefetched_refs: dict of url to remote document
+    :param json_codec: optional codec to parse downloaded JSON documents with,
+        see the ``json_codec`` config
+    """
+    if not prefetched_refs and json_codec is None:
+        return spec_class.from_dict(spec_dict, origin_url, http_client, config)
+
+    swagger_spec = spec_class(spec_dict, origin_url, http_client, config)
+    # Overridden on the spec only while it's built, so that neither the http
+    # client nor pickled specs are affected
+    swagger_spec.get_ref_handlers = functools.partial(
+        build_ref_handlers, http_client, prefetched_refs or {}, json_codec,
+    )
+    try:
+        swagger_spec.build()
+        # Refs resolved after the spec is built, e.g. by lazy specs, go through this resolver
+        swagger_spec.resolver
+    finally:
+        del swagger_spec.get_ref_handlers
+    return swagger_spec
+
+
+def build_ref_handlers(http_client, documents, json_codec=None):
+    """Build the handlers downloading the remote refs of a spec, see
+    :func:`bravado_core.spec.build_http_handlers`, which serve the given
+    documents instead of downloading them.
+
+    :param documents: dict of url to remote document
+    :param json_codec: optional codec to parse downloaded JSON documents with
+    """
+    handlers = build_http_handlers(http_client)
+    download = handlers['http']
+    if json_codec is not None:
+        download = Loader(http_client, json_codec=json_codec).load_spec
+
+    def download_ref(uri):
+        document = documents.get(uri)
+        return document if document is not None else download(uri)
+
+    handlers.update(http=download_ref, https=download_ref)
+    return handlers
+
+
 class ResourceDecorator(object):
     """
     Wraps :class:`bravado_core.resource.Resource` so that accesses to contained
@@ -226,7 +339,10 @@ class ResourceDecorator(object):
         """
         :rtype: :class:`CallableOperation`
         """
-        return CallableOperation(getattr(self.resource, name), self.also_return_response)
+        callable_operation = CallableOperation(getattr(self.resource, name), self.also_return_response)
+        # Cache the wrapper; further lookups won't go through __getattr__ anymore
+        setattr(self, name, callable_operation)
+        return callable_operation
 
     def __dir__(self):
         """
@@ -277,11 +393,12 @@ class CallableOperation(object):
 
         :rtype: :class:`bravado.http_future.HTTPFuture`
         """
-        log.debug(
-            u'%s(%s)',
-            self.operation.operation_id,
-            self._sanitize_kwargs_for_logging(op_kwargs),
-        )
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                u'%s(%s)',
+                self.operation.operation_id,
+                self._sanitize_kwargs_for_logging(op_kwargs),
+            )
         warn_for_deprecated_op(self.operation)
 
         # Get per-request config
@@ -291,13 +408,187 @@ class CallableOperation(object):
         request_params = construct_request(
             self.operation, request_options, **op_kwargs)
 
+        call_plan = get_call_plan(self.operation)
+        key = None
+        # Streamed results can only be consumed once, so they're neither cached nor shared
+        if (
+            (call_plan.result_cache_ttl or call_plan.coalesce_requests) and
+            not request_config.stream_result and
+            request_config.download_to is None
+        ):
+            key = result_cache_key(request_params)
+
+        if key is not None and call_plan.result_cache_ttl and not request_config.bypass_result_cache:
+            result_cache = get_result_cache(self.operation.swagger_spec)
+            entry = result_cache.get(key)
+            if entry is not None:
+                return cached_result_future(
+                    entry,
+                    self.operation.swagger_spec.http_client,
+                    self.operation,
+                    request_config,
+                )
+            request_config.response_callbacks = list(request_config.response_callbacks) + [
+                result_cache.store_callback(key, call_plan.result_cache_ttl),
+            ]
+
         http_client = self.operation.swagger_spec.http_client
+        bravado_config = self.operation.swagger_spec.config.get('bravado')
+
+        deadline_header = bravado_config.deadline_header if bravado_config is not None else None
+        load_balancer = get_load_balancer(self.operation.swagger_spec)
+
+        def send_request():
+            params = request_params
+            if deadline_header and request_config.deadline_at is not None:
+                # Sent with each attempt, with the time left at that point
+                params = dict(
+                    request_params,
+                    headers=dict(
+                        request_params.get('headers') or {},
+                        **{deadline_header: deadline_header_value(request_config.deadline_at)}
+                    ),
+                )
+            if load_balancer is not None:
+                return load_balance_request(load_balancer, http_client, params, self.operation, request_config)
+            return http_client.request(
+                params,
+                operation=self.operation,
+                request_config=request_config,
+            )
+
+        rate_limiter = get_rate_limiter(self.operation.swagger_spec)
+        if rate_limiter is not None:
+            send_request = functools.partial(
+                rate_limit_request,
+                rate_limiter,
+                send_request,
+                request_params,
+                self.operation,
+                request_config,
+                request_config.rate_limit_mode or bravado_config.rate_limit_mode,
+            )
+
+        request_hedger = get_request_hedger(self.operation.swagger_spec)
+        if request_hedger is not None:
+            send_request = functools.partial(
+                hedge_request,
+                request_hedger,
+                send_request,
+                request_params,
+                self.operation,
+                request_config,
+            )
+
+        retry_policy = RetryPolicy.from_options(
+            bravado_config.retry_policy if bravado_config is not None else None,
+            request_config.retry_policy,
+        )
+        if retry_policy is not None:
+            send_request = functools.partial(
+                retry_request,
+                retry_policy,
+                get_retry_budget(self.operation.swagger_spec),
+                send_request,
+                request_params,
+                self.operation,
+                request_config,
+            )
+
+        circuit_breakers = get_circuit_breakers(self.operation.swagger_spec)
+        if circuit_breakers is not None:
+            send_request = functools.partial(
+                circuit_breaker_request,
+                circuit_breakers,
+                send_request,
+                request_params,
+                self.operation,
+                request_config,
+            )
+
+        if key is not None and call_plan.coalesce_requests:
+            return get_single_flight(self.operation.swagger_spec).request(
+                key,
+                send_request,
+                self.operation,
+                request_config,
+            )
+
+        return send_request()
+
+
+class CallPlan(object):
+    """Everything needed to turn an invocation of an operation into a request
+    dict that does not depend on the invocation itself. Call plans are built
+    once per operation, see :func:`get_call_plan`.
+
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
 
-        return http_client.request(
-            request_params,
-            operation=self.operation,
-            request_config=request_config,
+    def __init__(self, operation):
+        self.method = str(operation.http_method.upper())
+        self.path_name = operation.path_name
+        # (key, value) = (param name, Param)
+        self.params = operation.params
+        self.required_params = frozenset(
+            name for name, param in iteritems(operation.params) if param.required
+        )
+        # Params that need to be processed even if they're not passed in:
+        # required ones, header params that might be set through the request
+        # options and params with a default value.
+        # (name, param, is_header, is_required, has_default) tuples, in the
+        # same order as operation.params
+        self.implicit_params = tuple(
+            (name, param, param.location == 'header', name in self.required_params, param.has_default())
+            for name, param in iteritems(operation.params)
+            if param.location == 'header' or name in self.required_params or param.has_default()
+        )
+        self.json_codec = get_json_codec(operation.swagger_spec)
+        # Content-Encoding request bodies are compressed with by default
+        self.compress_request = operation.op_spec.get('x-bravado-compress-request')
+        # Seconds unmarshalled results are cached for, see :mod:`bravado.result_cache`
+        bravado_config = operation.swagger_spec.config.get('bravado')
+        result_cache_ttls = (bravado_config.result_cache_ttls if bravado_config is not None else None) or {}
+        self.result_cache_ttl = result_cache_ttls.get(
+            operation.operation_id, operation.op_spec.get('x-bravado-cache-ttl'),
         )
+        # Whether identical concurrent calls share one request, see :mod:`bravado.singleflight`
+        self.coalesce_requests = self.method in ('GET', 'HEAD') and bool(
+            operation.op_spec.get(
+                'x-bravado-coalesce-requests',
+                bravado_config.coalesce_requests if bravado_config is not None else False,
+            ),
+        )
+        self._url = (None, None)  # type: typing.Tuple[typing.Optional[typing.Text], typing.Optional[typing.Text]]
+
+    def get_url(self, api_url):
+        """
+        :param api_url: API url of the spec; it might be changed after the
+            client has been built, so it is not part of the plan itself.
+        :return: url of the operation
+        """
+        cached_api_url, url = self._url
+        if api_url != cached_api_url:
+            url = api_url.rstrip('/') + self.path_name
+            self._url = (api_url, url)
+        return url
+
+
+# (key, value) = (operation, CallPlan)
+_call_plans = weakref.WeakKeyDictionary()  # type: typing.MutableMapping[typing.Any, CallPlan]
+
+
+def get_call_plan(operation):
+    """Return the :class:`CallPlan` for the given operation, building it on
+    first use. Operations are not expected to change once the client is built.
+
+    :type operation: :class:`bravado_core.operation.Operation`
+    :rtype: :class:`CallPlan`
+    """
+    call_plan = _call_plans.get(operation)
+    if call_plan is None:
+        call_plan = _call_plans[operation] = CallPlan(operation)
+    return call_plan
 
 
 def construct_request(operation, request_options, **op_kwargs):
@@ -311,10 +602,10 @@ def construct_request(operation, request_options, **op_kwargs):
 
     :return: request in dict form
     """
-    url = operation.swagger_spec.api_url.rstrip('/') + operation.path_name
+    call_plan = get_call_plan(operation)
     request = {
-        'method': str(operation.http_method.upper()),
-        'url': url,
+        'method': call_plan.method,
+        'url': call_plan.get_url(operation.swagger_spec.api_url),
         'params': {},  # filled in downstream
         # Create shallow copy to avoid modifying input
         'headers': (request_options['headers'].copy()
@@ -331,6 +622,10 @@ def construct_request(operation, request_options, **op_kwargs):
 
     construct_params(operation, request, op_kwargs)
 
+    compress_request = request_options.get('compress_request', call_plan.compress_request)
+    if compress_request:
+        compress_request_body(request, compress_request)
+
     return request
 
 
@@ -345,22 +640,73 @@ def construct_params(operation, request, op_kwargs):
     :raises: SwaggerMappingError on extra parameters or when a required
         parameter is not supplied.
     """
-    current_params = operation.params.copy()
+    call_plan = get_call_plan(operation)
+    params = call_plan.params
     for param_name, param_value in iteritems(op_kwargs):
-        param = current_params.pop(param_name, None)
+        param = params.get(param_name)
         if param is None:
             raise SwaggerMappingError(
                 "{0} does not have parameter {1}"
                 .format(operation.operation_id, param_name))
-        marshal_param(param, param_value, request)
+        if call_plan.json_codec is not None and param.location == 'body':
+            marshal_body_param(param, param_value, request, call_plan.json_codec)
+        else:
+            marshal_param(param, param_value, request)
 
     # Check required params and non-required params with a 'default' value
-    for remaining_param in itervalues(current_params):
-        if remaining_param.location == 'header' and remaining_param.name in request['headers']:
-            marshal_param(remaining_param, request['headers'][remaining_param.name], request)
-        else:
-            if remaining_param.required:
-                raise SwaggerMappingError(
-                    '{0} is a required parameter'.format(remaining_param.name))
-            if not remaining_param.required and remaining_param.has_default():
-                marshal_param(remaining_param, None, request)
+    for param_name, param, is_header, is_required, has_default in call_plan.implicit_params:
+        if param_name in op_kwargs:
+            continue
+        if is_header and param.name in request['headers']:
+            marshal_param(param, request['headers'][param.name], request)
+        elif is_required:
+            raise SwaggerMappingError(
+                '{0} is a required parameter'.format(param.name))
+        elif has_default:
+            marshal_param(param, None, request)
+
+
+def marshal_body_param(param, value, request, json_codec):
+    """Same as :func:`bravado_core.param.marshal_param` for body params, except
+    that JSON bodies are encoded with the given codec.
+
+    :type param: :class:`bravado_core.param.Param`
+    :param value: The value to assign to the parameter
+    :type request: dict
+    :param json_codec: codec used to encode JSON bodies
+    """
+    if request['headers'].get('Content-Type', '').lower() == APP_MSGPACK:
+        marshal_param(param, value, request)
+        return
+
+    # Rely on unmarshalling behavior on the other side of the pipe to use
+    # the default value if one is available.
+    if value is None and not param.required:
+        return
+
+    swagger_spec = param.swagger_spec
+    param_spec = swagger_spec.deref(get_param_type_spec(param))
+    value = marshal_schema_object(swagger_spec, param_spec, value)
+    if swagger_spec.config['validate_requests']:
+        validate_schema_object(swagger_spec, param_spec, value)
+
+    request['headers']['Content-Type'] = APP_JSON
+    request['data'] = json_codec.dumps(value)
+
+
+def compress_request_body(request, content_encoding):
+    """Compress the body of the request with the given content encoding.
+    Form data, files and bodies smaller than
+    :data:`bravado.compression.MIN_COMPRESSED_SIZE` are sent as-is.
+
+    :type request: dict
+    :param content_encoding: e.g. gzip, see :func:`bravado.compression.compress`
+    """
+    body = request.get('data')
+    if isinstance(body, six.text_type):
+        body = body.encode('utf-8')
+    if not isinstance(body, six.binary_type) or len(body) < MIN_COMPRESSED_SIZE:
+        return
+
+    request['data'] = compress(body, content_encoding)
+    request['headers']['Content-Encoding'] = content_encoding
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Content-Encoding support shared by the HTTP clients: decompression of
+response bodies and compression of request bodies. brotli and zstd are
+supported if the ``brotli`` (or ``brotlicffi``) and ``zstandard`` packages
+are installed.
+"""
+import gzip
+import typing
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# Request bodies smaller than this are not worth compressing
+MIN_COMPRESSED_SIZE = 1024
+
+
+class _DeflateDecoder(object):
+    # Servers send both zlib wrapped and raw deflate streams as "deflate"
+    def __init__(self):
+        # type: () -> None
+        self._first_data = True
+        self._data = b''
+        self._decoder = zlib.decompressobj()
+
+    def decompress(self, data):
+        # type: (bytes) -> bytes
+        if not self._first_data:
+            return self._decoder.decompress(data)
+
+        self._data += data
+        try:
+            decompressed = self._decoder.decompress(data)
+        except zlib.error:
+            self._first_data = False
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(self._data)
+        if decompressed:
+            self._first_data = False
+            self._data = b''
+        return decompressed
+
+    def flush(self):
+        # type: () -> bytes
+        return self._decoder.flush()
+
+
+class _BrotliDecoder(object):
+    def __init__(self):
+        # type: () -> None
+        self._decoder = brotli.Decompressor()
+
+    def decompress(self, data):
+        # type: (bytes) -> bytes
+        # brotli calls it process(), brotlicffi decompress()
+        process = getattr(self._decoder, 'process', None) or self._decoder.decompress
+        return process(data)
+
+    def flush(self):
+        # type: () -> bytes
+        return b''
+
+
+class _ZstdDecoder(object):
+    def __init__(self):
+        # type: () -> None
+        self._decoder = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        # type: (bytes) -> bytes
+        return self._decoder.decompress(data)
+
+    def flush(self):
+        # type: () -> bytes
+        return b''
+
+
+class _MultiDecoder(object):
+    # Content encodings are listed in the order they were applied in
+    def __init__(self, decoders):
+        # type: (typing.List[typing.Any]) -> None
+        self._decoders = list(reversed(decoders))
+
+    def decompress(self, data):
+        # type: (bytes) -> bytes
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self):
+        # type: () -> bytes
+        data = b''
+        for decoder in self._decoders:
+            if data:
+                data = decoder.decompress(data)
+            data += decoder.flush()
+        return data
+
+
+_DECODERS = {
+    'gzip': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    'x-gzip': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    'deflate': _DeflateDecoder,
+}  # type: typing.Dict[str, typing.Callable[[], typing.Any]]
+
+_ENCODERS = {
+    'gzip': gzip.compress,
+    'deflate': zlib.compress,
+}  # type: typing.Dict[str, typing.Callable[[bytes], bytes]]
+
+if brotli is not None:
+    _DECODERS['br'] = _BrotliDecoder
+    _ENCODERS['br'] = brotli.compress
+if zstandard is not None:
+    _DECODERS['zstd'] = _ZstdDecoder
+    _ENCODERS['zstd'] = lambda data: zstandard.ZstdCompressor().compress(data)
+
+# Value of the Accept-Encoding header sent by the HTTP clients
+ACCEPT_ENCODING = ', '.join(encoding for encoding in ('gzip', 'deflate', 'br', 'zstd') if encoding in _DECODERS)
+
+
+def get_decoder(content_encoding):
+    # type: (typing.Optional[typing.Text]) -> typing.Any
+    """Get an incremental decoder for a Content-Encoding header value.
+
+    :return: object with ``decompress(data)`` and ``flush()`` methods, or None
+        if the content is not encoded or uses an unsupported encoding
+    """
+    encodings = [
+        encoding.strip().lower()
+        for encoding in (content_encoding or '').split(',')
+        if encoding.strip() and encoding.strip().lower() != 'identity'
+    ]
+    if not encodings or any(encoding not in _DECODERS for encoding in encodings):
+        return None
+    if len(encodings) == 1:
+        return _DECODERS[encodings[0]]()
+    return _MultiDecoder([_DECODERS[encoding]() for encoding in encodings])
+
+
+def decompress(body, content_encoding):
+    # type: (bytes, typing.Optional[typing.Text]) -> bytes
+    """Decompress a whole body according to its Content-Encoding header value.
+    Bodies with unsupported encodings are returned as-is.
+    """
+    decoder = get_decoder(content_encoding)
+    if decoder is None:
+        return body
+    return decoder.decompress(body) + decoder.flush()
+
+
+def compress(body, content_encoding):
+    # type: (bytes, typing.Text) -> bytes
+    """Compress a request body.
+
+    :raises: ValueError if the encoding is not supported
+    """
+    encoder = _ENCODERS.get(content_encoding.lower())
+    if encoder is None:
+        raise ValueError(
+            'Unsupported content encoding {0!r}, expected one of: {1}'.format(
+                content_encoding, ', '.join(sorted(_ENCODERS)),
+            ),
+        )
+    return encoder(body)
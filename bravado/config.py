@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 import logging
+import threading
 import typing
+import weakref
 from importlib import import_module
 
 from bravado_core.operation import Operation
 from bravado_core.response import IncomingResponse
 
+from bravado.deadline import get_call_deadline
 from bravado.response import BravadoResponseMetadata
 
 try:
@@ -17,6 +20,8 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+T = typing.TypeVar('T')
+
 
 CONFIG_DEFAULTS = {
     # See the constructor of :class:`bravado.http_future.HttpFuture` for an
@@ -27,6 +32,54 @@ CONFIG_DEFAULTS = {
     'response_metadata_class': 'bravado.response.BravadoResponseMetadata',
     # Headers excluded from debug logs
     'sensitive_headers': ['Authorization'],
+    # Directory used by SwaggerClient.from_url to cache specs on disk, see
+    # :class:`bravado.swagger_model.SpecCache`. Caching is disabled if None.
+    'spec_cache_dir': None,
+    # Max age in seconds of a cached spec used when the spec server is unreachable
+    'spec_cache_max_age': None,
+    # Build resources and models of the spec on first access, see
+    # :class:`bravado.lazy_spec.LazySpec`
+    'lazy_build': False,
+    # Only build the client for these resources and operations, see
+    # :func:`bravado.spec_subset.subset_spec`. The whole spec is used if both are None.
+    'include_resources': None,
+    'include_operation_ids': None,
+    # Number of remote $ref documents SwaggerClient.from_url fetches concurrently
+    # before building the spec. Prefetching is disabled if None.
+    'ref_prefetch_workers': None,
+    # Codec used for JSON request and response bodies and specs: the import path
+    # of an object (e.g. 'orjson') with loads() and dumps() functions, or the object
+    # itself. Uses the JSON support of the http client and simplejson if None.
+    'json_codec': None,
+    # Seconds the unmarshalled results of operations are cached for, by operationId;
+    # overrides the x-bravado-cache-ttl extension of the operations. See
+    # :mod:`bravado.result_cache`.
+    'result_cache_ttls': None,
+    # Max number of results cached per client
+    'result_cache_max_entries': 1024,
+    # Share the request in flight between identical concurrent calls of GET and HEAD
+    # operations, see :mod:`bravado.singleflight`
+    'coalesce_requests': False,
+    # Token bucket rate limits of the requests, globally, per host and per
+    # operationId, see :mod:`bravado.rate_limit`. Requests are not rate limited if None.
+    'rate_limits': None,
+    # What to do with requests over the rate limit: 'block', 'non_blocking' or 'fail_fast'
+    'rate_limit_mode': 'block',
+    # Keyword arguments of the :class:`bravado.retry.RetryPolicy` of failed requests,
+    # see :mod:`bravado.retry`. Requests are not retried if None.
+    'retry_policy': None,
+    # Keyword arguments of the :class:`bravado.circuit_breaker.CircuitBreaker` of each
+    # operation, see :mod:`bravado.circuit_breaker`. Circuit breakers are disabled if None.
+    'circuit_breaker': None,
+    # Keyword arguments of the :class:`bravado.hedging.HedgingPolicy` of read requests,
+    # see :mod:`bravado.hedging`. Requests are not hedged if None.
+    'hedging': None,
+    # Header the milliseconds left until the deadline of calls are sent in, if any,
+    # see :mod:`bravado.deadline`
+    'deadline_header': None,
+    # Keyword arguments of the :class:`bravado.load_balancer.LoadBalancer` spreading requests
+    # across endpoints, see :mod:`bravado.load_balancer`. Requests go to the API url if None.
+    'load_balancing': None,
 }
 
 
@@ -37,6 +90,23 @@ BravadoConfig = typing.NamedTuple(
         ('disable_fallback_results', bool),
         ('response_metadata_class', Type[BravadoResponseMetadata]),
         ('sensitive_headers', list),
+        ('spec_cache_dir', typing.Optional[str]),
+        ('spec_cache_max_age', typing.Optional[float]),
+        ('lazy_build', bool),
+        ('include_resources', typing.Optional[typing.List[typing.Text]]),
+        ('include_operation_ids', typing.Optional[typing.List[typing.Text]]),
+        ('ref_prefetch_workers', typing.Optional[int]),
+        ('json_codec', typing.Any),
+        ('result_cache_ttls', typing.Optional[typing.Mapping[typing.Text, float]]),
+        ('result_cache_max_entries', int),
+        ('coalesce_requests', bool),
+        ('rate_limits', typing.Optional[typing.Mapping[str, typing.Any]]),
+        ('rate_limit_mode', str),
+        ('retry_policy', typing.Optional[typing.Mapping[str, typing.Any]]),
+        ('circuit_breaker', typing.Optional[typing.Mapping[str, typing.Any]]),
+        ('hedging', typing.Optional[typing.Mapping[str, typing.Any]]),
+        ('deadline_header', typing.Optional[str]),
+        ('load_balancing', typing.Optional[typing.Mapping[str, typing.Any]]),
     ),
 )
 
@@ -76,19 +146,58 @@ class RequestConfig(object):
     use_msgpack = False  # type: bool
     timeout = None  # type: typing.Optional[float]
 
+    # Content encoding (e.g. gzip) request bodies are compressed with; overrides
+    # the x-bravado-compress-request extension of the operation
+    compress_request = None  # type: typing.Optional[str]
+
+    # Return an iterator over the items of top-level array responses, which are
+    # read, validated and unmarshalled one item at a time
+    stream_result = False  # type: bool
+
+    # Path or binary file object successful non-JSON responses (e.g. images or
+    # application/octet-stream) are written to in chunks instead of being read in memory
+    download_to = None  # type: typing.Optional[typing.Union[typing.Text, typing.BinaryIO]]
+
+    # Number of byte ranges big downloads are split in and downloaded concurrently,
+    # if the server accepts range requests
+    download_ranges = None  # type: typing.Optional[int]
+
+    # Overrides the rate_limit_mode config, see :mod:`bravado.rate_limit`
+    rate_limit_mode = None  # type: typing.Optional[str]
+
+    # Overrides keys of the retry_policy config, see :mod:`bravado.retry`
+    retry_policy = None  # type: typing.Optional[typing.Mapping[str, typing.Any]]
+
+    # Don't serve the result from, nor store it in, the result cache of the operation
+    bypass_result_cache = False  # type: bool
+
+    # Seconds the whole call may take, retries and unmarshalling included; see :mod:`bravado.deadline`
+    deadline = None  # type: typing.Optional[float]
+
+    # Monotonic time the call must be done by, from the deadline option and
+    # the ambient deadline when the request config was created
+    deadline_at = None  # type: typing.Optional[float]
+
     # Extra options passed in that we don't know about
     additional_properties = {}  # type: typing.Mapping[str, typing.Any]
 
     def __init__(self, request_options, also_return_response_default):
         # type: (typing.Dict[str, typing.Any], bool) -> None
-        request_options = request_options.copy()  # don't modify the original object
         self.also_return_response = also_return_response_default
+        if not request_options:
+            # Most calls don't pass any request options
+            self.additional_properties = {}
+            self.deadline_at = get_call_deadline()
+            return
+
+        request_options = request_options.copy()  # don't modify the original object
 
         for key in list(request_options.keys()):
             if hasattr(self, key):
                 setattr(self, key, request_options.pop(key))
 
         self.additional_properties = request_options
+        self.deadline_at = get_call_deadline(self.deadline)
 
 
 def _get_response_metadata_class(fully_qualified_class_str):
@@ -109,6 +218,67 @@ def _get_response_metadata_class(fully_qualified_class_str):
     return BravadoResponseMetadata
 
 
+def resolve_json_codec(json_codec):
+    # type: (typing.Any) -> typing.Any
+    """Import the codec of the ``json_codec`` config if it's an import path.
+
+    :return: the codec, None if the default one should be used
+    """
+    if isinstance(json_codec, str):
+        try:
+            # Modules like orjson or json are codecs themselves
+            json_codec = import_module(json_codec)
+        except ImportError:
+            json_codec = _import_class(json_codec)
+
+    if json_codec is None:
+        return None
+
+    if not (callable(getattr(json_codec, 'loads', None)) and callable(getattr(json_codec, 'dumps', None))):
+        log.warning(
+            'bravado configuration error: the JSON codec %r does not have loads() and dumps() '
+            'functions. Using default codec instead.',
+            json_codec,
+        )
+        return None
+    return json_codec
+
+
+def get_json_codec(swagger_spec):
+    # type: (typing.Any) -> typing.Any
+    """
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :return: the JSON codec configured for the spec, None if the default one should be used
+    """
+    bravado_config = swagger_spec.config.get('bravado')
+    if bravado_config is None or bravado_config.json_codec is None:
+        return None
+    # The config keeps the import path, which unlike modules can be pickled in snapshots
+    return get_spec_state(swagger_spec, 'json_codec', lambda: resolve_json_codec(bravado_config.json_codec))
+
+
+# (key, value) = (swagger spec, {name: state of the client of the spec})
+_spec_states = weakref.WeakKeyDictionary()  # type: typing.MutableMapping[typing.Any, typing.Dict[str, typing.Any]]
+_spec_states_lock = threading.Lock()
+
+
+def get_spec_state(swagger_spec, name, factory):
+    # type: (typing.Any, str, typing.Callable[[], T]) -> T
+    """Return the state stored under name for the client of the given spec
+    (e.g. its rate limiter), creating it with factory on first use. The state
+    is shared by all the threads using the client, and lives as long as the spec.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    with _spec_states_lock:
+        states = _spec_states.get(swagger_spec)
+        if states is None:
+            states = _spec_states[swagger_spec] = {}
+        if name not in states:
+            states[name] = factory()
+        return states[name]
+
+
 def _import_class(fully_qualified_class_str):
     # type: (str) -> typing.Optional[typing.Type]
     try:
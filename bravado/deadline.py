@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Deadlines bounding the total time of operation calls: sending the request,
+including retries, receiving the whole response body and unmarshalling it.
+
+A call's deadline is the earlier of the ``deadline`` request option, in
+seconds from calling the operation, and the ambient deadline of the calling
+thread or asyncio task:
+
+.. code-block:: python
+
+    from bravado.deadline import ambient_deadline
+
+    with ambient_deadline(2.0):
+        pet = client.pet.getPetById(petId=42).response().result
+        client.pet.updatePet(body=pet, _request_options={'deadline': 0.5}).response()
+
+Once the deadline is exceeded, waiting for the response raises
+:class:`bravado.exception.BravadoTimeoutError`, which is handled by fallback
+results. Reading the body of a streamed response, e.g. with the
+``stream_result`` request option, raises :class:`requests.exceptions.ReadTimeout`
+with :class:`bravado.requests_client.RequestsClient`. The remaining time can be
+forwarded to the server, in milliseconds, in the header set by the
+``deadline_header`` config.
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import typing
+
+import monotonic
+
+from bravado.exception import BravadoTimeoutError
+
+
+log = logging.getLogger(__name__)
+
+# Smallest timeout derived from a deadline, in seconds
+MIN_TIMEOUT = 0.001
+
+# Monotonic time the calls made in the current context must be done by
+_ambient_deadline = contextvars.ContextVar(
+    'bravado_ambient_deadline', default=None,
+)  # type: contextvars.ContextVar[typing.Optional[float]]
+
+
+@contextlib.contextmanager
+def ambient_deadline(seconds):
+    # type: (float) -> typing.Iterator[float]
+    """Context manager bounding the calls made in its block to the given
+    number of seconds. Nested ambient deadlines can only shorten it.
+
+    :return: the deadline, as a :func:`monotonic.monotonic` time
+    """
+    deadline = monotonic.monotonic() + seconds
+    current_deadline = _ambient_deadline.get()
+    if current_deadline is not None:
+        deadline = min(deadline, current_deadline)
+    token = _ambient_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _ambient_deadline.reset(token)
+
+
+def get_ambient_deadline():
+    # type: () -> typing.Optional[float]
+    """:return: the ambient deadline of the current context, if any"""
+    return _ambient_deadline.get()
+
+
+def get_call_deadline(seconds=None):
+    # type: (typing.Optional[float]) -> typing.Optional[float]
+    """Deadline of a call made now in the current context.
+
+    :param seconds: ``deadline`` request option of the call
+    :return: the earlier of the ambient deadline and the request option, if any
+    """
+    deadline = _ambient_deadline.get()
+    if seconds is not None:
+        call_deadline = monotonic.monotonic() + seconds
+        deadline = call_deadline if deadline is None else min(deadline, call_deadline)
+    return deadline
+
+
+def remaining_time(deadline):
+    # type: (typing.Optional[float]) -> typing.Optional[float]
+    """:return: seconds left until the deadline, None if there is no deadline"""
+    return deadline - monotonic.monotonic() if deadline is not None else None
+
+
+def check_deadline(deadline):
+    # type: (typing.Optional[float]) -> None
+    """:raises: BravadoTimeoutError if the deadline is exceeded"""
+    if deadline is not None and monotonic.monotonic() >= deadline:
+        raise BravadoTimeoutError('Deadline exceeded')
+
+
+def bound_timeout(timeout, deadline):
+    # type: (typing.Optional[float], typing.Optional[float]) -> typing.Optional[float]
+    """:return: the timeout, shortened to the time left until the deadline if needed"""
+    remaining = remaining_time(deadline)
+    if remaining is None:
+        return timeout
+    # HTTP libraries reject timeouts that aren't positive
+    remaining = max(MIN_TIMEOUT, remaining)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def deadline_header_value(deadline):
+    # type: (float) -> str
+    """Value of the ``deadline_header``: milliseconds left until the deadline."""
+    return str(max(0, int(remaining_time(deadline) * 1000)))  # type: ignore
+
+
+class DeadlineWatchdog(object):
+    """Single daemon thread calling callbacks once their deadline is exceeded,
+    e.g. to abort the download of a response body.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        # (deadline, sequence number, callback) heap
+        self._scheduled = []  # type: typing.List[typing.Tuple[float, int, typing.Callable[[], None]]]
+        self._cancelled = set()  # type: typing.Set[int]
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None  # type: typing.Optional[threading.Thread]
+
+    def schedule(self, deadline, callback):
+        # type: (float, typing.Callable[[], None]) -> typing.Callable[[], None]
+        """Call callback once the deadline is exceeded.
+
+        :return: function cancelling the call
+        """
+        with self._condition:
+            sequence_number = next(self._counter)
+            heapq.heappush(self._scheduled, (deadline, sequence_number, callback))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='bravado-deadline-watchdog')
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+        def cancel():
+            # type: () -> None
+            with self._condition:
+                self._cancelled.add(sequence_number)
+                # Cancelled calls are skipped when due; don't keep too many of them around
+                if len(self._cancelled) > 64 and 2 * len(self._cancelled) > len(self._scheduled):
+                    self._scheduled = [entry for entry in self._scheduled if entry[1] not in self._cancelled]
+                    heapq.heapify(self._scheduled)
+                    self._cancelled.clear()
+
+        return cancel
+
+    def _run(self):
+        # type: () -> None
+        while True:
+            with self._condition:
+                while True:
+                    while self._scheduled and self._scheduled[0][1] in self._cancelled:
+                        self._cancelled.discard(heapq.heappop(self._scheduled)[1])
+                    if not self._scheduled:
+                        self._condition.wait()
+                        continue
+                    wait_time = self._scheduled[0][0] - monotonic.monotonic()
+                    if wait_time <= 0:
+                        _, _, callback = heapq.heappop(self._scheduled)
+                        break
+                    self._condition.wait(wait_time)
+            try:
+                callback()
+            except Exception:
+                log.exception('Error in deadline watchdog callback %r', callback)
+
+
+_watchdog = None  # type: typing.Optional[DeadlineWatchdog]
+_watchdog_lock = threading.Lock()
+
+
+def get_watchdog():
+    # type: () -> DeadlineWatchdog
+    """Return the watchdog shared by all clients, creating it on first use."""
+    global _watchdog
+    with _watchdog_lock:
+        if _watchdog is None:
+            _watchdog = DeadlineWatchdog()
+        return _watchdog
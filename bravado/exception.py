@@ -373,3 +373,33 @@ class BravadoConnectionError(ConnectionError):
 class ForcedFallbackResultError(Exception):
     """This exception will be handled if the option to force returning a fallback result
      is used."""
+
+
+class BravadoRateLimitError(BravadoConnectionError):
+    """Raised instead of sending a request when the client-side rate limit is
+    exceeded and the rate limit mode is ``fail_fast``, see :mod:`bravado.rate_limit`.
+
+    :ivar float retry_after: seconds until a request would be allowed
+    """
+
+    def __init__(self, retry_after):
+        # type: (float) -> None
+        super(BravadoRateLimitError, self).__init__(
+            'Client-side rate limit exceeded, retry after {0:.3f} seconds'.format(retry_after),
+        )
+        self.retry_after = retry_after
+
+
+class BravadoCircuitOpenError(BravadoConnectionError):
+    """Raised instead of sending a request when the circuit breaker of its
+    operation is open, see :mod:`bravado.circuit_breaker`.
+
+    :ivar float retry_after: seconds until the breaker lets a request through
+    """
+
+    def __init__(self, retry_after):
+        # type: (float) -> None
+        super(BravadoCircuitOpenError, self).__init__(
+            'Circuit breaker open, retry after {0:.3f} seconds'.format(retry_after),
+        )
+        self.retry_after = retry_after
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import json
 import logging
 import sys
 import typing
@@ -14,10 +15,14 @@ from twisted.web._newclient import RequestNotSent
 from yelp_bytes import to_bytes
 
 from bravado._equality_util import are_objects_equal as _are_objects_equal
+from bravado.compression import ACCEPT_ENCODING
+from bravado.compression import decompress
 from bravado.config import RequestConfig
 from bravado.http_client import HttpClient
 from bravado.http_future import FutureAdapter
 from bravado.http_future import HttpFuture
+from bravado.multipart import encode_multipart
+from bravado.multipart import MultipartEncoder
 
 if getattr(typing, 'TYPE_CHECKING', False):
     class _FidoStub(typing.Protocol):
@@ -46,6 +51,7 @@ class FidoResponseAdapter(IncomingResponse):
         # type: (_FidoStub) -> None
         self._delegate = fido_response
         self._headers = None  # type: typing.Optional[typing.MutableMapping[typing.Text, typing.Text]]
+        self._body = None  # type: typing.Optional[bytes]
 
     @property
     def status_code(self):
@@ -55,12 +61,15 @@ class FidoResponseAdapter(IncomingResponse):
     @property
     def text(self):
         # type: () -> typing.Text
-        return self._delegate.body.decode('utf-8')  # this is what _delegate.json() does as well
+        return self.raw_bytes.decode('utf-8')  # this is what _delegate.json() does as well
 
     @property
     def raw_bytes(self):
         # type: () -> bytes
-        return self._delegate.body
+        # Twisted doesn't decompress response bodies
+        if self._body is None:
+            self._body = decompress(self._delegate.body, self.headers.get('content-encoding'))
+        return self._body
 
     @property
     def reason(self):
@@ -89,6 +98,8 @@ class FidoResponseAdapter(IncomingResponse):
 
     def json(self, **_):
         # type: (typing.Any) -> typing.Mapping[typing.Text, typing.Any]
+        if 'content-encoding' in self.headers:
+            return json.loads(self.text)
         return self._delegate.json()
 
 
@@ -200,6 +211,7 @@ class FidoClient(HttpClient):
         """
 
         request_for_twisted = self.prepare_request_for_twisted(request_params)
+        request_for_twisted['headers'].setdefault('Accept-Encoding', ACCEPT_ENCODING)
 
         future_adapter = self.future_adapter_class(fido.fetch(**request_for_twisted))  # type: FidoFutureAdapter[T]
 
@@ -238,6 +250,12 @@ class FidoClient(HttpClient):
             for k, v in six.iteritems(request_params.get('headers', {}))
         }
 
+        # fido only accepts bodies as bytes, so multipart bodies are rendered
+        # once by the encoder rather than by requests and then copied again
+        request_params = encode_multipart(request_params)
+        if isinstance(request_params.get('data'), MultipartEncoder):
+            request_params['data'] = request_params['data'].read()
+
         prepared_request.prepare(
             headers=request_params.get('headers'),
             data=request_params.get('data'),
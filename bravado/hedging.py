@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Hedging of read requests to cut tail latency, configured with the ``hedging``
+config:
+
+.. code-block:: python
+
+    config = {
+        'hedging': {
+            # Hedge after 50ms; by default, after the observed p95 latency of the operation
+            'delay': 0.05,
+            'budget_ratio': 0.1,
+        },
+    }
+
+If the response to a GET, HEAD or OPTIONS request hasn't arrived after the
+hedging delay, the same request is sent a second time. Whichever response
+arrives first is returned, and the other request is cancelled with
+:meth:`bravado.http_future.FutureAdapter.cancel`; its response is closed if it
+arrives anyway. Errors of one of the requests are only raised if the other one
+fails too.
+
+Unless ``delay`` is set, the delay is the ``percentile`` latency of the last
+``window_size`` responses of the operation, and requests are not hedged
+until ``min_samples`` responses were received. To keep hedging from doubling
+the load when the server slows down, there can be at most
+``budget_min_hedges`` plus ``budget_ratio`` hedged requests per request sent
+over the last ten seconds.
+"""
+import asyncio
+import collections
+import sys
+import threading
+import typing
+
+import monotonic
+import six
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+from six.moves import queue
+
+from bravado.config import get_spec_state
+from bravado.config import RequestConfig
+from bravado.exception import BravadoTimeoutError
+from bravado.http_future import FutureAdapter
+from bravado.http_future import get_concurrent_future
+from bravado.http_future import HttpFuture
+from bravado.retry import RetryBudget
+
+
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+
+class HedgingPolicy(object):
+    """When to hedge requests.
+
+    :param delay: seconds to wait for a response before hedging the request;
+        if None, the observed ``percentile`` latency of the operation
+    :param percentile: percentile of the latencies of the operation used as delay
+    :param min_samples: min number of responses of an operation before its
+        requests are hedged based on their latency
+    :param window_size: number of recent latencies the percentile is computed over
+    :param methods: HTTP methods whose requests are hedged
+    :param budget_ratio: ratio of hedged requests to requests allowed by the hedging budget
+    :param budget_min_hedges: hedged requests allowed by the hedging budget regardless of budget_ratio
+    """
+
+    def __init__(
+        self,
+        delay=None,  # type: typing.Optional[float]
+        percentile=95,  # type: float
+        min_samples=20,  # type: int
+        window_size=1000,  # type: int
+        methods=READ_METHODS,  # type: typing.Iterable[typing.Text]
+        budget_ratio=0.1,  # type: float
+        budget_min_hedges=10,  # type: int
+    ):
+        # type: (...) -> None
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self.methods = frozenset(method.upper() for method in methods)
+        self.budget_ratio = budget_ratio
+        self.budget_min_hedges = budget_min_hedges
+
+
+class LatencyTracker(object):
+    """Latencies of the recent responses of an operation. Thread-safe.
+
+    :param window_size: number of latencies kept
+    """
+
+    def __init__(self, window_size=1000):
+        # type: (int) -> None
+        self._latencies = collections.deque(maxlen=window_size)  # type: typing.Deque[float]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._latencies)
+
+    def record(self, latency):
+        # type: (float) -> None
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, percentile):
+        # type: (float) -> typing.Optional[float]
+        """:return: the given percentile of the latencies, or None if there are none"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile / 100.0))]
+
+
+class RequestHedger(object):
+    """Hedging policy, budget and latencies of the operations of a client.
+
+    :param policy_kwargs: keyword arguments of the :class:`HedgingPolicy`
+    """
+
+    def __init__(self, **policy_kwargs):
+        # type: (typing.Any) -> None
+        self.policy = HedgingPolicy(**policy_kwargs)
+        self.budget = RetryBudget()
+        self._latency_trackers = {}  # type: typing.Dict[typing.Text, LatencyTracker]
+        self._lock = threading.Lock()
+
+    def latency_tracker(self, operation_id):
+        # type: (typing.Text) -> LatencyTracker
+        with self._lock:
+            tracker = self._latency_trackers.get(operation_id)
+            if tracker is None:
+                tracker = self._latency_trackers[operation_id] = LatencyTracker(self.policy.window_size)
+            return tracker
+
+    def delay(self, operation_id):
+        # type: (typing.Text) -> typing.Optional[float]
+        """Seconds to wait before hedging a request of the operation, or None
+        if its requests can't be hedged yet.
+        """
+        if self.policy.delay is not None:
+            return self.policy.delay
+        tracker = self.latency_tracker(operation_id)
+        if len(tracker) < self.policy.min_samples:
+            return None
+        return tracker.percentile(self.policy.percentile)
+
+    def try_hedge(self):
+        # type: () -> bool
+        """Record a hedged request if the budget allows it."""
+        return self.budget.try_acquire(self.policy.budget_ratio, self.policy.budget_min_hedges)
+
+
+def get_request_hedger(swagger_spec):
+    # type: (typing.Any) -> typing.Optional[RequestHedger]
+    """Return the request hedger of the client of the given spec, creating it
+    on first use, or None if the client doesn't hedge requests.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    bravado_config = swagger_spec.config.get('bravado')
+    if bravado_config is None or bravado_config.hedging is None:
+        return None
+    return get_spec_state(swagger_spec, 'request_hedger', lambda: RequestHedger(**bravado_config.hedging))
+
+
+class HedgedFutureAdapter(FutureAdapter):
+    """Future of a request that is sent a second time if its response takes
+    longer than the hedging delay, counted from when the request was sent.
+
+    Requests already in flight in the background (see
+    :func:`bravado.http_future.get_concurrent_future`) are waited for in the
+    caller's thread; requests only sent once waited for are sent and waited for
+    in a thread, so that they can be hedged. The hedged request is sent and
+    waited for in a thread of its own.
+
+    The timeout passed to :meth:`result` bounds both requests together.
+
+    :param send_request: sends the request and returns its :class:`bravado.http_future.HttpFuture`
+    :param request_hedger: hedger of the client, whose budget hedged requests are counted against
+    :param delay: seconds to wait before hedging the request; it's not hedged if None
+    :param latency_tracker: records the latencies of the responses
+    :ivar bool hedged: whether the request was sent a second time
+    """
+
+    def __init__(
+        self,
+        send_request,  # type: typing.Callable[[], HttpFuture]
+        request_hedger,  # type: RequestHedger
+        delay,  # type: typing.Optional[float]
+        latency_tracker,  # type: LatencyTracker
+    ):
+        # type: (...) -> None
+        self._send_request = send_request
+        self._request_hedger = request_hedger
+        self._delay = delay
+        self._latency_tracker = latency_tracker
+        self.hedged = False
+        # (http future, incoming response, sys.exc_info()) of the requests, in completion order
+        self._outcomes = queue.Queue()  # type: queue.Queue
+        self._http_futures = []  # type: typing.List[HttpFuture]
+        # Whether a response was returned or given up on; later responses are closed
+        self._done = False
+        self._lock = threading.Lock()
+        # Monotonic time the request is hedged at, once it's sent
+        self._hedge_at = None  # type: typing.Optional[float]
+        request_hedger.budget.record_request()
+        self.first_http_future = first_http_future = send_request()
+        first_sent_at = monotonic.monotonic()
+        concurrent_future = get_concurrent_future(first_http_future)
+        self._in_background = concurrent_future is not None
+        if concurrent_future is not None:
+            # The request is in flight already: its outcome is queued once it completes
+            self._http_futures.append(first_http_future)
+            self._hedge_at = first_sent_at + delay if delay is not None else None
+            concurrent_future.add_done_callback(
+                lambda _: self._wait_for_response(first_http_future, first_sent_at, None),
+            )
+
+    def _wait_for_response(self, http_future, sent_at, timeout):
+        # type: (HttpFuture, float, typing.Optional[float]) -> None
+        try:
+            # Errors of the HTTP client are converted by HttpFuture
+            incoming_response = http_future._get_incoming_response(timeout)
+        except Exception:
+            self._outcomes.put((http_future, None, sys.exc_info()))
+            return
+
+        self._latency_tracker.record(monotonic.monotonic() - sent_at)
+        with self._lock:
+            lost = self._done
+            self._done = True
+        if lost:
+            _close(incoming_response)
+        else:
+            self._outcomes.put((http_future, incoming_response, None))
+
+    def _send_and_wait(self, send_request, timeout):
+        # type: (typing.Callable[[], HttpFuture], typing.Optional[float]) -> None
+        sent_at = monotonic.monotonic()
+        try:
+            http_future = send_request()
+        except Exception:
+            self._outcomes.put((None, None, sys.exc_info()))
+            return
+        with self._lock:
+            self._http_futures.append(http_future)
+            given_up = self._done
+        if given_up:
+            http_future.cancel()
+        else:
+            self._wait_for_response(http_future, sent_at, timeout)
+
+    def _start(self, send_request, timeout):
+        # type: (typing.Callable[[], HttpFuture], typing.Optional[float]) -> None
+        thread = threading.Thread(target=self._send_and_wait, args=(send_request, timeout))
+        thread.daemon = True
+        thread.start()
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        deadline = monotonic.monotonic() + timeout if timeout is not None else None
+        if not self._in_background:
+            # The request is sent now
+            sent_at = monotonic.monotonic()
+            if self._delay is None:
+                incoming_response = self.first_http_future._get_incoming_response(timeout)
+                self._latency_tracker.record(monotonic.monotonic() - sent_at)
+                return incoming_response
+            self._hedge_at = sent_at + self._delay
+            first_http_future = self.first_http_future
+            self._start(lambda: first_http_future, timeout)
+
+        pending = 1
+        outcome = None
+        if self._hedge_at is not None:
+            try:
+                outcome = self._outcomes.get(timeout=_min_timeout(self._hedge_at - monotonic.monotonic(), deadline))
+            except queue.Empty:
+                if self._request_hedger.try_hedge():
+                    self.hedged = True
+                    self._start(self._send_request, _remaining(deadline))
+                    pending += 1
+
+        while True:
+            if outcome is None:
+                try:
+                    outcome = self._outcomes.get(timeout=_remaining(deadline))
+                except queue.Empty:
+                    with self._lock:
+                        self._done = True
+                    self.cancel()
+                    raise BravadoTimeoutError('Timed out waiting for the response of a hedged request')
+            http_future, incoming_response, exc_info = outcome
+            pending -= 1
+            if exc_info is None:
+                with self._lock:
+                    other_http_futures = [
+                        other_http_future for other_http_future in self._http_futures
+                        if other_http_future is not http_future
+                    ]
+                for other_http_future in other_http_futures:
+                    other_http_future.cancel()
+                return incoming_response
+            if pending == 0:
+                six.reraise(*exc_info)
+            outcome = None
+
+    def cancel(self):
+        # type: () -> None
+        with self._lock:
+            http_futures = list(self._http_futures) or [self.first_http_future]
+        for http_future in http_futures:
+            http_future.cancel()
+
+
+def _remaining(deadline):
+    # type: (typing.Optional[float]) -> typing.Optional[float]
+    return max(0.0, deadline - monotonic.monotonic()) if deadline is not None else None
+
+
+def _min_timeout(delay, deadline):
+    # type: (float, typing.Optional[float]) -> float
+    delay = max(0.0, delay)
+    remaining = _remaining(deadline)
+    return min(delay, remaining) if remaining is not None else delay
+
+
+def _close(incoming_response):
+    # type: (IncomingResponse) -> None
+    close = getattr(incoming_response, 'close', None)
+    if close is not None:
+        close()
+
+
+def hedge_request(
+    request_hedger,  # type: RequestHedger
+    send_request,  # type: typing.Callable[[], HttpFuture]
+    request_params,  # type: typing.Mapping[str, typing.Any]
+    operation,  # type: Operation
+    request_config,  # type: RequestConfig
+):
+    # type: (...) -> HttpFuture
+    """Send a request that is hedged if its response is slow.
+
+    :param send_request: sends the request and returns its :class:`bravado.http_future.HttpFuture`
+    """
+    if request_params['method'].upper() not in request_hedger.policy.methods:
+        return send_request()
+
+    future_adapter = HedgedFutureAdapter(
+        send_request,
+        request_hedger,
+        request_hedger.delay(operation.operation_id),
+        request_hedger.latency_tracker(operation.operation_id),
+    )
+    if asyncio.iscoroutinefunction(future_adapter.first_http_future.response):
+        # Awaitable futures can't be waited for in threads
+        return future_adapter.first_http_future
+
+    http_future = HttpFuture(
+        future_adapter,
+        lambda incoming_response: incoming_response,
+        operation,
+        request_config,
+    )  # type: HttpFuture
+    http_future.rate_limit_wait_time = future_adapter.first_http_future.rate_limit_wait_time
+    return http_future
@@ -0,0 +1,718 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP caching of GET responses as specified by RFC 7234, for clients that
+repeatedly fetch the same resources.
+
+.. code-block:: python
+
+    from bravado.http_cache import CachingHttpClient
+    from bravado.http_cache import LRUCache
+
+    http_client = CachingHttpClient(RequestsClient(), LRUCache(max_size=64 * 1024 * 1024))
+    client = SwaggerClient.from_url(spec_url, http_client=http_client)
+
+The cache is a private cache: responses are stored if they're cacheable
+according to their Cache-Control, Expires and Last-Modified headers, served
+while they're fresh, and revalidated with conditional requests (ETag and
+Last-Modified) once they're stale. Responses to requests with different
+credentials in their Authorization header are cached separately, so that
+clients sending the requests of several users never serve the response of one
+user to another.
+"""
+import calendar
+import collections
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import typing
+from email.utils import parsedate
+
+import simplejson
+import six
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+from six.moves.urllib.parse import urlencode
+
+from bravado.config import RequestConfig
+from bravado.http_client import HttpClient
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+
+
+if getattr(typing, 'TYPE_CHECKING', False):
+    T = typing.TypeVar('T')
+
+
+# Status codes that are cacheable by default, see RFC 7231 section 6.1
+CACHEABLE_STATUS_CODES = frozenset((200, 203, 204, 300, 301, 404, 405, 410, 414, 501))
+
+# Fraction of the time since the Last-Modified date responses without explicit
+# expiration time are considered fresh for, see RFC 7234 section 4.2.2
+HEURISTIC_FRESHNESS_FRACTION = 0.1
+
+# Values of BravadoResponseMetadata.cache_status
+CACHE_HIT = 'hit'
+CACHE_REVALIDATED = 'revalidated'
+
+# Request headers with the credentials of the user making the request
+CREDENTIALS_HEADERS = ('authorization',)
+
+# Flat estimate of the size of an entry besides its body and headers, in bytes
+_ENTRY_OVERHEAD = 200
+
+
+class CacheEntry(object):
+    """Cached HTTP response.
+
+    :ivar int status_code: HTTP status code of the response
+    :ivar reason: HTTP reason phrase of the response
+    :ivar headers: headers of the response
+    :ivar bytes body: body of the response
+    :ivar float response_time: timestamp at which the response was received
+    :ivar vary: values of the request headers listed in the Vary header of the response
+    """
+
+    def __init__(
+        self,
+        status_code,  # type: int
+        reason,  # type: typing.Text
+        headers,  # type: typing.Mapping[typing.Text, typing.Text]
+        body,  # type: bytes
+        response_time,  # type: float
+        vary,  # type: typing.Mapping[typing.Text, typing.Optional[typing.Text]]
+    ):
+        # type: (...) -> None
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = _lowercase_keys(headers)
+        self.body = body
+        self.response_time = response_time
+        self.vary = vary
+
+    @property
+    def size(self):
+        # type: () -> int
+        """Estimated size of the entry: the length of its body, headers and Vary
+        values plus a flat overhead. It's not the memory used by the entry object.
+        """
+        return (
+            len(self.body) +
+            sum(len(name) + len(value) for name, value in six.iteritems(self.headers)) +
+            sum(len(name) + len(value or '') for name, value in six.iteritems(self.vary)) +
+            _ENTRY_OVERHEAD
+        )
+
+    @property
+    def cache_control(self):
+        # type: () -> typing.Mapping[typing.Text, typing.Optional[typing.Text]]
+        return parse_cache_control(self.headers.get('cache-control'))
+
+    def freshness_lifetime(self):
+        # type: () -> float
+        """How long the response is fresh for after being generated, in seconds."""
+        cache_control = self.cache_control
+        if 'max-age' in cache_control:
+            return _parse_seconds(cache_control['max-age'])
+
+        date = _parse_http_date(self.headers.get('date')) or self.response_time
+        if 'expires' in self.headers:
+            expires = _parse_http_date(self.headers['expires'])
+            return max(0.0, expires - date) if expires is not None else 0.0
+
+        last_modified = _parse_http_date(self.headers.get('last-modified'))
+        if last_modified is not None and self.status_code in CACHEABLE_STATUS_CODES:
+            return max(0.0, date - last_modified) * HEURISTIC_FRESHNESS_FRACTION
+        return 0.0
+
+    def current_age(self, now):
+        # type: (float) -> float
+        """Age of the response, see RFC 7234 section 4.2.3."""
+        date = _parse_http_date(self.headers.get('date')) or self.response_time
+        apparent_age = max(0.0, self.response_time - date)
+        age = _parse_seconds(self.headers.get('age'))
+        return max(apparent_age, age) + (now - self.response_time)
+
+    def is_fresh(self, now):
+        # type: (float) -> bool
+        cache_control = self.cache_control
+        if 'no-cache' in cache_control:
+            return False
+        return self.current_age(now) < self.freshness_lifetime()
+
+    def is_stale(self, now):
+        # type: (float) -> bool
+        return not self.is_fresh(now)
+
+    def revalidation_headers(self):
+        # type: () -> typing.Dict[typing.Text, typing.Text]
+        """Headers of the conditional request that revalidates the entry."""
+        headers = {}
+        if 'etag' in self.headers:
+            headers['If-None-Match'] = self.headers['etag']
+        if 'last-modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['last-modified']
+        return headers
+
+    def updated(self, response, response_time):
+        # type: (IncomingResponse, float) -> CacheEntry
+        """Entry updated with the headers of the 304 response that revalidated it."""
+        headers = dict(self.headers)
+        headers.update(_lowercase_keys(response.headers))
+        return CacheEntry(
+            status_code=self.status_code,
+            reason=self.reason,
+            headers=headers,
+            body=self.body,
+            response_time=response_time,
+            vary=self.vary,
+        )
+
+
+class LRUCache(object):
+    """Thread-safe in-memory store of :class:`CacheEntry` objects, which evicts
+    the least recently used entries once their size takes more than max_size.
+    Entries bigger than max_size are not stored.
+
+    Sizes are estimates (see :attr:`CacheEntry.size`), so the memory actually
+    used by the process for the entries can be higher than max_size.
+
+    Other stores, like :class:`SQLiteCache`, need to implement the same
+    ``get``, ``set`` and ``delete`` methods.
+
+    :param max_size: max estimated size of the entries and their keys, in bytes
+    """
+
+    def __init__(self, max_size=64 * 1024 * 1024):
+        # type: (int) -> None
+        self.max_size = max_size
+        self.size = 0
+        self._entries = collections.OrderedDict()  # type: typing.MutableMapping[typing.Text, CacheEntry]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._entries)
+
+    def get(self, key):
+        # type: (typing.Text) -> typing.Optional[CacheEntry]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)  # type: ignore
+            return entry
+
+    def set(self, key, entry):
+        # type: (typing.Text, CacheEntry) -> None
+        entry_size = len(key) + entry.size
+        with self._lock:
+            self._delete(key)
+            if entry_size > self.max_size:
+                return
+            self._entries[key] = entry
+            self.size += entry_size
+            while self.size > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._delete(oldest_key)
+
+    def delete(self, key):
+        # type: (typing.Text) -> None
+        with self._lock:
+            self._delete(key)
+
+    def clear(self):
+        # type: () -> None
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _delete(self, key):
+        # type: (typing.Text) -> None
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(key) + entry.size
+
+
+class SQLiteCache(object):
+    """Store of :class:`CacheEntry` objects in an SQLite database, shared by
+    all the processes using the same file, e.g. the workers of a prefork
+    server. Entries are written atomically, and the least recently used ones
+    are evicted once the estimated size of the entries (see
+    :attr:`CacheEntry.size`) takes more than max_size bytes.
+
+    Has the same ``get``, ``set`` and ``delete`` methods as :class:`LRUCache`.
+
+    :param path: path of the database file, created if it doesn't exist
+    :param max_size: max estimated size of the entries and their keys, in bytes
+    :param timeout: seconds to wait for other processes to release the database lock
+    """
+
+    def __init__(self, path, max_size=256 * 1024 * 1024, timeout=5.0):
+        # type: (typing.Text, int, float) -> None
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, status_code INTEGER, reason TEXT, headers TEXT, body BLOB, '
+                'response_time REAL, vary TEXT, size INTEGER, accessed_at REAL)',
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+            connection.execute('CREATE TABLE IF NOT EXISTS total_size (size INTEGER)')
+            if connection.execute('SELECT size FROM total_size').fetchone() is None:
+                connection.execute('INSERT INTO total_size VALUES (0)')
+
+    def _connection(self):
+        # type: () -> sqlite3.Connection
+        # Connections can't be shared by threads, nor survive a fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _transaction(self):
+        # type: () -> typing.Any
+        return _Transaction(self._connection())
+
+    def __len__(self):
+        # type: () -> int
+        return self._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    @property
+    def size(self):
+        # type: () -> int
+        return self._connection().execute('SELECT size FROM total_size').fetchone()[0]
+
+    def get(self, key):
+        # type: (typing.Text) -> typing.Optional[CacheEntry]
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT status_code, reason, headers, body, response_time, vary FROM entries WHERE key = ?',
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            connection.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        except sqlite3.OperationalError:
+            # The database is locked by a writer; the entry is just less likely to be kept
+            pass
+        status_code, reason, headers, body, response_time, vary = row
+        return CacheEntry(
+            status_code=status_code,
+            reason=reason,
+            headers=simplejson.loads(headers),
+            body=bytes(body),
+            response_time=response_time,
+            vary=simplejson.loads(vary),
+        )
+
+    def set(self, key, entry):
+        # type: (typing.Text, CacheEntry) -> None
+        entry_size = len(key) + entry.size
+        with self._transaction() as connection:
+            self._delete(connection, key)
+            if entry_size > self.max_size:
+                return
+            connection.execute(
+                'INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key, entry.status_code, entry.reason, simplejson.dumps(entry.headers),
+                    sqlite3.Binary(entry.body), entry.response_time, simplejson.dumps(entry.vary),
+                    entry_size, time.time(),
+                ),
+            )
+            connection.execute('UPDATE total_size SET size = size + ?', (entry_size,))
+
+            total_size = connection.execute('SELECT size FROM total_size').fetchone()[0]
+            if total_size > self.max_size:
+                evicted_size = 0
+                for evicted_key, size in connection.execute(
+                    'SELECT key, size FROM entries ORDER BY accessed_at',
+                ).fetchall():
+                    if total_size - evicted_size <= self.max_size:
+                        break
+                    connection.execute('DELETE FROM entries WHERE key = ?', (evicted_key,))
+                    evicted_size += size
+                connection.execute('UPDATE total_size SET size = size - ?', (evicted_size,))
+
+    def delete(self, key):
+        # type: (typing.Text) -> None
+        with self._transaction() as connection:
+            self._delete(connection, key)
+
+    def clear(self):
+        # type: () -> None
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM entries')
+            connection.execute('UPDATE total_size SET size = 0')
+
+    @staticmethod
+    def _delete(connection, key):
+        # type: (sqlite3.Connection, typing.Text) -> None
+        row = connection.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+            connection.execute('UPDATE total_size SET size = size - ?', (row[0],))
+
+
+class _Transaction(object):
+    # BEGIN IMMEDIATE takes the write lock upfront, so that concurrent
+    # writers wait for each other instead of failing to upgrade their lock
+    def __init__(self, connection):
+        # type: (sqlite3.Connection) -> None
+        self._connection = connection
+
+    def __enter__(self):
+        # type: () -> sqlite3.Connection
+        self._connection.execute('BEGIN IMMEDIATE')
+        return self._connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (typing.Any, typing.Any, typing.Any) -> None
+        self._connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+
+
+class CachedResponse(IncomingResponse):
+    """Response served from a :class:`CacheEntry`.
+
+    :ivar cache_status: :data:`CACHE_HIT` if the entry was fresh, or
+        :data:`CACHE_REVALIDATED` if the server confirmed a stale entry is
+        still valid
+    """
+
+    def __init__(self, entry, cache_status):
+        # type: (CacheEntry, str) -> None
+        self._entry = entry
+        self.cache_status = cache_status
+
+    @property
+    def status_code(self):
+        # type: () -> int
+        return self._entry.status_code
+
+    @property
+    def reason(self):
+        # type: () -> typing.Text
+        return self._entry.reason
+
+    @property
+    def headers(self):
+        # type: () -> typing.Mapping[typing.Text, typing.Text]
+        return self._entry.headers
+
+    @property
+    def raw_bytes(self):
+        # type: () -> bytes
+        return self._entry.body
+
+    @property
+    def text(self):
+        # type: () -> typing.Text
+        return self._entry.body.decode('utf-8')
+
+    def json(self, **kwargs):
+        # type: (typing.Any) -> typing.Any
+        return simplejson.loads(self.text, **kwargs)
+
+
+class CachedFutureAdapter(FutureAdapter):
+    """Future of a response served from the cache, without a request."""
+
+    def __init__(self, response):
+        # type: (CachedResponse) -> None
+        self._response = response
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> CachedResponse
+        return self._response
+
+    def cancel(self):
+        # type: () -> None
+        pass
+
+
+class CachingFutureAdapter(FutureAdapter):
+    """Future of a response fetched by the wrapped HTTP client, which stores it
+    in the cache or, if it's a 304 response, serves the revalidated entry.
+    """
+
+    def __init__(
+        self,
+        caching_http_client,  # type: CachingHttpClient
+        http_future,  # type: HttpFuture
+        key,  # type: typing.Text
+        request_headers,  # type: typing.Mapping[typing.Text, typing.Any]
+        stale_entry,  # type: typing.Optional[CacheEntry]
+    ):
+        # type: (...) -> None
+        self._caching_http_client = caching_http_client
+        self._http_future = http_future
+        self._key = key
+        self._request_headers = request_headers
+        self._stale_entry = stale_entry
+        # Errors of the wrapped client are raised by result()
+        self.timeout_errors = http_future.future.timeout_errors
+        self.connection_errors = http_future.future.connection_errors
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        response = self._http_future.response_adapter(self._http_future.future.result(timeout=timeout))
+        return self._caching_http_client.handle_response(
+            self._key, self._request_headers, self._stale_entry, response,
+        )
+
+    def cancel(self):
+        # type: () -> None
+        self._http_future.cancel()
+
+
+class CachingHttpClient(HttpClient):
+    """HTTP client that caches the GET responses of the HTTP client it wraps.
+
+    Responses that are streamed to the caller (``stream_result`` and
+    ``download_to`` request options) are not cached. Requests with a
+    ``Cache-Control: no-store`` header bypass the cache, and requests with
+    ``Cache-Control: no-cache`` revalidate cached responses even if they're fresh.
+
+    :param http_client: HTTP client sending the requests that can't be served from the cache
+    :type http_client: :class:`bravado.http_client.HttpClient`
+    :param cache: store of the cached responses, e.g. :class:`LRUCache` or
+        :class:`SQLiteCache`. Defaults to a 64 MiB :class:`LRUCache`.
+
+    Other attributes, like ``set_basic_auth`` or ``authenticator`` of a
+    :class:`bravado.requests_client.RequestsClient`, are the ones of the
+    wrapped HTTP client.
+    """
+
+    def __init__(
+        self,
+        http_client,  # type: HttpClient
+        cache=None,  # type: typing.Optional[typing.Any]
+    ):
+        # type: (...) -> None
+        self.http_client = http_client
+        self.cache = cache if cache is not None else LRUCache()
+
+    def __repr__(self):
+        # type: () -> str
+        return '{0}({1!r})'.format(self.__class__.__name__, self.http_client)
+
+    def __getattr__(self, name):
+        # type: (str) -> typing.Any
+        # http_client isn't set yet when unpickling
+        if name == 'http_client':
+            raise AttributeError(name)
+        return getattr(self.http_client, name)
+
+    def request(
+        self,
+        request_params,  # type: typing.MutableMapping[str, typing.Any]
+        operation=None,  # type: typing.Optional[Operation]
+        request_config=None,  # type: typing.Optional[RequestConfig]
+    ):
+        # type: (...) -> HttpFuture[T]
+        """
+        :param request_params: complete request data.
+        :type request_params: dict
+        :param operation: operation that this http request is for. Defaults
+            to None - in which case, we're obviously just retrieving a Swagger
+            Spec.
+        :type operation: :class:`bravado_core.operation.Operation`
+        :param RequestConfig request_config: per-request configuration
+
+        :returns: HTTP Future object
+        :rtype: :class: `bravado_core.http_future.HttpFuture`
+        """
+        method = request_params.get('method', 'GET').upper()
+        key = cache_key(request_params)
+        request_headers = _lowercase_keys(request_params.get('headers') or {})
+        request_cache_control = parse_cache_control(request_headers.get('cache-control'))
+        if (
+            method != 'GET' or
+            'no-store' in request_cache_control or
+            (request_config is not None and (request_config.stream_result or request_config.download_to is not None))
+        ):
+            if method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+                # Unsafe requests invalidate cached responses, see RFC 7234 section 4.4
+                self.cache.delete(key)
+            return self.http_client.request(request_params, operation=operation, request_config=request_config)
+
+        entry = self.cache.get(key)
+        if entry is not None and not _vary_matches(entry, request_headers):
+            entry = None
+
+        if entry is not None:
+            if entry.is_fresh(time.time()) and 'no-cache' not in request_cache_control:
+                return HttpFuture(
+                    CachedFutureAdapter(CachedResponse(entry, CACHE_HIT)),
+                    _identity,
+                    operation,
+                    request_config,
+                )
+
+            revalidation_headers = entry.revalidation_headers()
+            if revalidation_headers:
+                request_params = dict(request_params)
+                request_params['headers'] = dict(request_params.get('headers') or {}, **revalidation_headers)
+            else:
+                entry = None
+
+        http_future = self.http_client.request(request_params, operation=operation, request_config=request_config)
+        return HttpFuture(
+            CachingFutureAdapter(self, http_future, key, request_headers, entry),
+            _identity,
+            operation,
+            request_config,
+        )
+
+    def handle_response(
+        self,
+        key,  # type: typing.Text
+        request_headers,  # type: typing.Mapping[typing.Text, typing.Any]
+        stale_entry,  # type: typing.Optional[CacheEntry]
+        response,  # type: IncomingResponse
+    ):
+        # type: (...) -> IncomingResponse
+        """Store a response in the cache if it's cacheable.
+
+        :param stale_entry: entry the request revalidated, if any
+        :return: the response, or the revalidated entry if the server
+            confirmed it's still valid
+        """
+        response_time = time.time()
+        if stale_entry is not None and response.status_code == 304:
+            entry = stale_entry.updated(response, response_time)
+            self.cache.set(key, entry)
+            return CachedResponse(entry, CACHE_REVALIDATED)
+
+        if not is_cacheable(request_headers, response):
+            return response
+
+        response_headers = _lowercase_keys(response.headers)
+        vary = [
+            header.strip().lower()
+            for header in response_headers.get('vary', '').split(',')
+            if header.strip()
+        ]
+        self.cache.set(
+            key,
+            CacheEntry(
+                status_code=response.status_code,
+                reason=response.reason,
+                headers=response_headers,
+                body=response.raw_bytes,
+                response_time=response_time,
+                vary={header: _header_value(request_headers.get(header)) for header in vary},
+            ),
+        )
+        return response
+
+
+def is_cacheable(request_headers, response):
+    # type: (typing.Mapping[typing.Text, typing.Any], IncomingResponse) -> bool
+    """Whether a response to a GET request can be stored, see RFC 7234 section 3."""
+    request_cache_control = parse_cache_control(_header_value(request_headers.get('cache-control')))
+    response_headers = _lowercase_keys(response.headers)
+    cache_control = parse_cache_control(response_headers.get('cache-control'))
+    if 'no-store' in request_cache_control or 'no-store' in cache_control:
+        return False
+    if response_headers.get('vary', '').strip() == '*':
+        return False
+    if response.status_code not in CACHEABLE_STATUS_CODES:
+        return False
+    # Responses without any of these could never be served nor revalidated
+    return (
+        'max-age' in cache_control or
+        'expires' in response_headers or
+        'etag' in response_headers or
+        'last-modified' in response_headers
+    )
+
+
+def cache_key(request_params):
+    # type: (typing.Mapping[str, typing.Any]) -> typing.Text
+    """Key of the responses to a request: its url and query parameters, and
+    a digest of its credentials, if any.
+    """
+    key = request_params['url']
+    params = request_params.get('params')
+    if params:
+        query = urlencode(sorted(six.iteritems(params)), doseq=True)
+        key += ('&' if '?' in key else '?') + query
+
+    request_headers = _lowercase_keys(request_params.get('headers') or {})
+    credentials = [request_headers.get(header) for header in CREDENTIALS_HEADERS]
+    if any(credentials):
+        # Credentials are hashed to keep them out of the cache, which might be stored on disk
+        digest = hashlib.sha256(simplejson.dumps(credentials).encode('utf-8')).hexdigest()
+        key += ' ' + digest
+    return key
+
+
+def parse_cache_control(value):
+    # type: (typing.Optional[typing.Text]) -> typing.Dict[typing.Text, typing.Optional[typing.Text]]
+    """Parse the directives of a Cache-Control header value.
+
+    :return: dict of directive name to argument, or None for directives without argument
+    """
+    directives = {}  # type: typing.Dict[typing.Text, typing.Optional[typing.Text]]
+    for directive in (value or '').split(','):
+        name, has_argument, argument = directive.partition('=')
+        name = name.strip().lower()
+        if name:
+            directives[name] = argument.strip().strip('"') if has_argument else None
+    return directives
+
+
+def _vary_matches(entry, request_headers):
+    # type: (CacheEntry, typing.Mapping[typing.Text, typing.Any]) -> bool
+    return all(
+        _header_value(request_headers.get(header)) == value
+        for header, value in six.iteritems(entry.vary)
+    )
+
+
+def _identity(response):
+    # type: (IncomingResponse) -> IncomingResponse
+    return response
+
+
+def _lowercase_keys(headers):
+    # type: (typing.Mapping[typing.Any, typing.Any]) -> typing.Dict[typing.Text, typing.Any]
+    return {
+        (name.decode('latin1') if isinstance(name, bytes) else name).lower(): _header_value(value)
+        for name, value in six.iteritems(headers)
+    }
+
+
+def _header_value(value):
+    # type: (typing.Any) -> typing.Optional[typing.Text]
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return value.decode('latin1')
+    return str(value)
+
+
+def _parse_http_date(value):
+    # type: (typing.Optional[typing.Text]) -> typing.Optional[float]
+    parsed = parsedate(value) if value else None
+    if parsed is None:
+        return None
+    return float(calendar.timegm(parsed))
+
+
+def _parse_seconds(value):
+    # type: (typing.Optional[typing.Text]) -> float
+    try:
+        return max(0.0, float(int(value or 0)))
+    except ValueError:
+        return 0.0
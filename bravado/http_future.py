@@ -3,6 +3,7 @@ import logging
 import sys
 import traceback
 import typing
+from concurrent.futures import Future
 from functools import wraps
 from itertools import chain
 
@@ -21,13 +22,24 @@ from msgpack import unpackb
 from bravado.config import bravado_config_from_config_dict
 from bravado.config import BravadoConfig
 from bravado.config import CONFIG_DEFAULTS
+from bravado.config import get_json_codec
 from bravado.config import RequestConfig
+from bravado.deadline import bound_timeout
+from bravado.deadline import check_deadline
 from bravado.exception import BravadoConnectionError
 from bravado.exception import BravadoTimeoutError
 from bravado.exception import ForcedFallbackResultError
 from bravado.exception import HTTPServerError
 from bravado.exception import make_http_exception
 from bravado.response import BravadoResponse
+from bravado.streaming import can_download_ranges
+from bravado.streaming import close_response
+from bravado.streaming import download_ranges_to_file
+from bravado.streaming import download_to_file
+from bravado.streaming import iter_json_array
+from bravado.streaming import iter_msgpack_array
+from bravado.streaming import iter_response_content
+from bravado.streaming import unpack_msgpack
 
 
 FuncType = typing.Callable[..., typing.Any]
@@ -117,6 +129,24 @@ class FutureAdapter(typing.Generic[T]):
         log.warning('The FutureAdapter class of the HTTP client does not implement cancel(), ignoring the call.')
 
 
+class FailedFutureAdapter(FutureAdapter):
+    """Future of a request that was not sent, e.g. because of the client-side
+    rate limit, whose result raises the given error.
+    """
+
+    def __init__(self, error):
+        # type: (BaseException) -> None
+        self._error = error
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> typing.NoReturn
+        raise self._error
+
+    def cancel(self):
+        # type: () -> None
+        pass
+
+
 def reraise_errors(func):
     # type: (F) -> F
 
@@ -165,6 +195,10 @@ class HttpFuture(typing.Generic[T]):
             {},
             also_return_response_default=False,
         )
+        # Seconds the request waited for the client-side rate limit, see :mod:`bravado.rate_limit`
+        self.rate_limit_wait_time = 0.0
+        # State of the circuit breaker of the operation, see :mod:`bravado.circuit_breaker`
+        self.circuit_breaker_state = None  # type: typing.Optional[str]
 
     @property
     def _bravado_config(self):
@@ -199,11 +233,14 @@ class HttpFuture(typing.Generic[T]):
         if self.request_config.force_fallback_result:
             exceptions_to_catch = tuple(chain(exceptions_to_catch, (ForcedFallbackResultError,)))
 
+        deadline = self.request_config.deadline_at
         try:
-            incoming_response = self._get_incoming_response(timeout)
+            check_deadline(deadline)
+            incoming_response = self._get_incoming_response(bound_timeout(timeout, deadline))
             request_end_time = monotonic.monotonic()
 
             swagger_result = self._get_swagger_result(incoming_response)
+            check_deadline(deadline)
 
             if self.operation is None and incoming_response.status_code >= 300:
                 raise make_http_exception(response=incoming_response)
@@ -253,6 +290,11 @@ class HttpFuture(typing.Generic[T]):
             handled_exception_info=exc_info,
             request_config=self.request_config,
         )
+        response_metadata.rate_limit_wait_time = self.rate_limit_wait_time
+        response_metadata.circuit_breaker_state = self.circuit_breaker_state
+        # Set by bravado.retry.RetryingFutureAdapter
+        response_metadata.attempts = getattr(self.future, 'attempts', 1)
+        response_metadata.retry_backoff_time = getattr(self.future, 'backoff_time', 0.0)
         return BravadoResponse(
             result=swagger_result,
             metadata=response_metadata,
@@ -273,8 +315,11 @@ class HttpFuture(typing.Generic[T]):
         :return: Depends on the value of also_return_response sent in
             to the constructor.
         """
-        incoming_response = self._get_incoming_response(timeout)
+        deadline = self.request_config.deadline_at
+        check_deadline(deadline)
+        incoming_response = self._get_incoming_response(bound_timeout(timeout, deadline))
         swagger_result = self._get_swagger_result(incoming_response)
+        check_deadline(deadline)
 
         if self.operation is not None:
             swagger_result = typing.cast(T, swagger_result)
@@ -307,16 +352,30 @@ class HttpFuture(typing.Generic[T]):
                 incoming_response,
                 self.operation,
                 self.request_config.response_callbacks,
+                self.request_config,
             )
             swagger_result = typing.cast(T, incoming_response.swagger_result)
 
         return swagger_result
 
 
+def get_concurrent_future(http_future):
+    # type: (HttpFuture) -> typing.Optional[Future]
+    """Future of a request already in flight in the background, e.g. on the
+    executor of :class:`bravado.requests_client.RequestsClient` or the background
+    event loop of :class:`bravado.asyncio_client.AsyncHttpClient`, which can be
+    waited for without giving up on the request; None if the request is only
+    sent once waited for.
+    """
+    concurrent_future = getattr(http_future.future, 'concurrent_future', None)
+    return concurrent_future if isinstance(concurrent_future, Future) else None
+
+
 def unmarshal_response(
     incoming_response,  # type: IncomingResponse
     operation,  # type: Operation
     response_callbacks=None,  # type: typing.Optional[typing.List[typing.Callable[[typing.Any, typing.Any], None]]]
+    request_config=None,  # type: typing.Optional[RequestConfig]
 ):
     # type: (...) -> None
     """So the http_client is finished with its part of processing the response.
@@ -327,6 +386,7 @@ def unmarshal_response(
     :type operation: :class:`bravado_core.operation.Operation`
     :type response_callbacks: list of callable. See
         bravado_core.client.REQUEST_OPTIONS_DEFAULTS.
+    :type request_config: :class:`bravado.config.RequestConfig`
     :raises: HTTPError
         - On 5XX status code, the HTTPError has minimal information.
         - On non-2XX status code with no matching response, the HTTPError
@@ -341,6 +401,7 @@ def unmarshal_response(
         incoming_response.swagger_result = unmarshal_response_inner(  # type: ignore
             response=incoming_response,
             op=operation,
+            request_config=request_config,
         )
     except MatchingResponseNotFound as e:
         exception = make_http_exception(
@@ -362,6 +423,7 @@ def unmarshal_response(
 def unmarshal_response_inner(
     response,  # type: IncomingResponse
     op,  # type: Operation
+    request_config=None,  # type: typing.Optional[RequestConfig]
 ):
     # type: (...) -> typing.Optional[T]
     """
@@ -369,8 +431,15 @@ def unmarshal_response_inner(
     response specification.
     :type response: :class:`bravado_core.response.IncomingResponse`
     :type op: :class:`bravado_core.operation.Operation`
+    :type request_config: :class:`bravado.config.RequestConfig`
     :returns: value where type(value) matches response_spec['schema']['type']
-        if it exists, None otherwise.
+        if it exists, None otherwise. Successful array responses are returned as
+        an iterator over their items if the stream_result request option is set,
+        and other msgpack responses of such requests are unpacked while their
+        body is read; msgpack responses that were not streamed are unpacked
+        from their already buffered body.
+        Successful non-JSON responses are written to a file and returned as a
+        :class:`bravado.streaming.DownloadedFile` if the download_to request option is set.
     """
     deref = op.swagger_spec.deref
     response_spec = get_response_spec(status_code=response.status_code, op=op)
@@ -382,8 +451,34 @@ def unmarshal_response_inner(
 
     if content_type.startswith(APP_JSON) or content_type.startswith(APP_MSGPACK):
         content_spec = deref(response_spec['schema'])
+        stream_result = (
+            request_config is not None and
+            request_config.stream_result and
+            200 <= response.status_code < 300
+        )
+        if stream_result and content_spec.get('type') == 'array':
+            if content_type.startswith(APP_JSON):
+                items = iter_json_array(iter_response_content(response))
+            else:
+                items = iter_msgpack_array(iter_response_content(response))
+            return iter_unmarshalled_items(  # type: ignore
+                response,
+                op,
+                deref(content_spec.get('items', {})),
+                items,
+            )
+
         if content_type.startswith(APP_JSON):
-            content_value = response.json()
+            json_codec = get_json_codec(op.swagger_spec)
+            if json_codec is not None:
+                content_value = json_codec.loads(response.raw_bytes)
+            else:
+                content_value = response.json()
+        elif stream_result:
+            try:
+                content_value = unpack_msgpack(iter_response_content(response))
+            finally:
+                close_response(response)
         else:
             content_value = unpackb(response.raw_bytes)
 
@@ -396,6 +491,25 @@ def unmarshal_response_inner(
             value=content_value,
         )
 
+    if (
+        request_config is not None and
+        request_config.download_to is not None and
+        200 <= response.status_code < 300
+    ):
+        try:
+            if request_config.download_ranges and can_download_ranges(response):
+                return download_ranges_to_file(  # type: ignore
+                    response,
+                    request_config.download_to,
+                    request_config.download_ranges,
+                )
+            return download_to_file(  # type: ignore
+                iter_response_content(response),
+                request_config.download_to,
+            )
+        finally:
+            close_response(response)
+
     if content_type.startswith('application'):
         return response.raw_bytes
 
@@ -403,6 +517,36 @@ def unmarshal_response_inner(
     return response.text
 
 
+def iter_unmarshalled_items(
+    response,  # type: IncomingResponse
+    op,  # type: Operation
+    items_spec,  # type: typing.Dict[typing.Text, typing.Any]
+    items,  # type: typing.Iterable[typing.Any]
+):
+    # type: (...) -> typing.Iterator[typing.Any]
+    """Validate and unmarshal the items of an array response one at a time.
+    Constraints on the array itself, like maxItems, are not validated.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :type op: :class:`bravado_core.operation.Operation`
+    :param items_spec: schema of the items of the array
+    :param items: the items of the response, as they are parsed
+    """
+    swagger_spec = op.swagger_spec
+    validate_responses = swagger_spec.config.get('validate_responses', False)
+    try:
+        for item in items:
+            if validate_responses:
+                validate_schema_object(swagger_spec, items_spec, item)
+            yield unmarshal_schema_object(
+                swagger_spec=swagger_spec,
+                schema_object_spec=items_spec,
+                value=item,
+            )
+    finally:
+        close_response(response)
+
+
 def raise_on_unexpected(http_response):
     # type: (IncomingResponse) -> None
     """Raise an HTTPError if the response is 5XX.
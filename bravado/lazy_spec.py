@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Lazily built specs.
+
+Building a :class:`bravado_core.spec.Spec` builds every resource, operation,
+param and model of the spec upfront. For huge specs of which clients only use
+a handful of operations most of that work is wasted. :class:`LazySpec` builds
+the operations of a resource the first time the resource is accessed, and
+discovers models the first time they are needed.
+
+Use it by setting the ``lazy_build`` config key:
+
+.. code-block:: python
+
+    client = SwaggerClient.from_url(spec_url, config={'lazy_build': True})
+"""
+import logging
+import threading
+import typing
+from collections import OrderedDict
+
+from bravado_core.model import model_discovery
+from bravado_core.operation import Operation
+from bravado_core.resource import convert_path_to_resource
+from bravado_core.resource import Resource
+from bravado_core.spec import build_api_serving_url
+from bravado_core.spec import Spec
+from bravado_core.util import AliasKeyDict
+from bravado_core.util import sanitize_name
+from six import iteritems
+
+log = logging.getLogger(__name__)
+
+# Model discovery walks and tags the whole spec, it must not run concurrently
+_model_discovery_lock = threading.RLock()
+
+# (path name, http method, operation spec) of the operations of a resource
+OperationSpecs = typing.List[typing.Tuple[typing.Text, typing.Text, typing.Any]]
+
+
+def _alias_key_dict(items, alias_to_key):
+    # type: (typing.Dict[typing.Text, typing.Any], typing.Dict[typing.Text, typing.Text]) -> AliasKeyDict
+    alias_key_dict = AliasKeyDict(items)
+    alias_key_dict.alias_to_key = dict(alias_to_key)
+    return alias_key_dict
+
+
+class LazySpec(Spec):
+    """A :class:`bravado_core.spec.Spec` whose resources and models are built
+    on first access.
+
+    The spec is still validated upfront. Resources are built one at a time,
+    models are discovered all at once when the first resource is built or the
+    first model is looked up: bravado-core needs all the schemas of the spec
+    to be tagged before anything can be (un)marshalled.
+
+    Lazy building isn't possible with the ``internally_dereference_refs``
+    config, specs using it are built eagerly.
+    """
+
+    def build(self):
+        # type: () -> None
+        if self.config['internally_dereference_refs']:
+            super(LazySpec, self).build()
+            self._models_discovered = True
+            return
+
+        self._validate_spec()
+
+        for user_defined_format in self.config['formats']:
+            self.register_format(user_defined_format)
+
+        self._models_discovered = False
+        self.definitions = LazyDefinitions(self)
+        self.resources = LazyResources(self)
+
+        self.api_url = build_api_serving_url(
+            spec_dict=self.spec_dict,
+            origin_url=self.origin_url,
+            use_spec_url_for_base_path=self.config['use_spec_url_for_base_path'],
+        )
+
+    def discover_models(self):
+        # type: () -> None
+        """Discover the models of the spec, unless that already happened."""
+        if self._models_discovered:
+            return
+        with _model_discovery_lock:
+            if self._models_discovered:
+                return
+            log.debug(u'Discovering models of %s', self.origin_url)
+            # Set upfront: model discovery looks up models while it runs
+            self._models_discovered = True
+            try:
+                model_discovery(self)
+            except BaseException:
+                self._models_discovered = False
+                raise
+
+    def build_all(self):
+        # type: () -> None
+        """Build everything that has not been built yet."""
+        self.discover_models()
+        if isinstance(self.resources, LazyResources):
+            self.resources.build_all()
+
+    # Copies and pickles are fully built; build before copying so that the
+    # attributes of the spec don't change while they're being copied.
+    def __deepcopy__(self, memo=None):
+        # type: (typing.Optional[typing.Dict[int, typing.Any]]) -> 'LazySpec'
+        self.build_all()
+        return super(LazySpec, self).__deepcopy__(memo)
+
+    def __getstate__(self):
+        # type: () -> typing.Dict[str, typing.Any]
+        self.build_all()
+        return super(LazySpec, self).__getstate__()
+
+
+class LazyDefinitions(dict):
+    """Models of a :class:`LazySpec`, discovered on first access.
+
+    :type swagger_spec: :class:`LazySpec`
+    """
+
+    def __init__(self, swagger_spec):
+        # type: (LazySpec) -> None
+        super(LazyDefinitions, self).__init__()
+        self._swagger_spec = swagger_spec
+
+    def __getitem__(self, key):
+        # type: (typing.Text) -> typing.Any
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).__getitem__(key)
+
+    def __contains__(self, key):
+        # type: (typing.Any) -> bool
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).__contains__(key)
+
+    def __iter__(self):
+        # type: () -> typing.Iterator[typing.Text]
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).__iter__()
+
+    def __len__(self):
+        # type: () -> int
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).__len__()
+
+    def get(self, key, default=None):
+        # type: (typing.Text, typing.Any) -> typing.Any
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).get(key, default)
+
+    def keys(self):
+        # type: () -> typing.Any
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).keys()
+
+    def values(self):
+        # type: () -> typing.Any
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).values()
+
+    def items(self):
+        # type: () -> typing.Any
+        self._swagger_spec.discover_models()
+        return super(LazyDefinitions, self).items()
+
+    def copy(self):
+        # type: () -> typing.Dict[typing.Text, typing.Any]
+        return dict(self.items())
+
+    def __reduce__(self):
+        # type: () -> typing.Any
+        # Copies don't need to be lazy anymore
+        return dict, (dict(self.items()),)
+
+
+class LazyResources(AliasKeyDict):
+    """Resources of a :class:`LazySpec`, built on first access.
+
+    Creating the mapping only scans the paths of the spec for the tags of their
+    operations; :class:`bravado_core.operation.Operation` objects are created
+    when a resource is accessed for the first time. Operations with several
+    tags are shared by their resources, like in specs built eagerly.
+
+    :type swagger_spec: :class:`LazySpec`
+    """
+
+    def __init__(self, swagger_spec):
+        # type: (LazySpec) -> None
+        super(LazyResources, self).__init__()
+        self._swagger_spec = swagger_spec
+        # (key, value) = (resource name, operations specs) of resources not built yet
+        self._pending = OrderedDict()  # type: typing.Dict[typing.Text, OperationSpecs]
+        # (key, value) = ((path name, http method), Operation)
+        self._operations = {}  # type: typing.Dict[typing.Tuple[typing.Text, typing.Text], Operation]
+        self._lock = threading.Lock()
+        self._names = []  # type: typing.List[typing.Text]
+
+        # Same mapping of operations to resources as bravado_core.resource.build_resources
+        tag_to_ops = OrderedDict()  # type: typing.Dict[typing.Text, OperationSpecs]
+        deref = swagger_spec.deref
+        spec_dict = deref(swagger_spec._internal_spec_dict)
+        paths_spec = deref(spec_dict.get('paths', {}))
+        for path_name, path_spec in iteritems(paths_spec):
+            path_spec = deref(path_spec)
+            for http_method, op_spec in iteritems(path_spec):
+                if http_method.startswith('x-') or http_method == 'parameters':
+                    continue
+                op_spec = deref(op_spec)
+                tags = deref(op_spec.get('tags', [])) or [convert_path_to_resource(path_name)]
+                for tag in tags:
+                    tag_to_ops.setdefault(deref(tag), []).append((path_name, http_method, op_spec))
+
+        for tag, ops in iteritems(tag_to_ops):
+            sanitized_tag = sanitize_name(tag)
+            if sanitized_tag not in self._pending:
+                self._names.append(sanitized_tag)
+            self._pending[sanitized_tag] = ops
+            self.add_alias(tag, sanitized_tag)
+
+    def _build(self, key):
+        # type: (typing.Text) -> None
+        self._swagger_spec.discover_models()
+        with self._lock:
+            ops_specs = self._pending.get(key)
+            if ops_specs is None:
+                # Built by another thread in the meantime
+                return
+            ops = {}
+            for path_name, http_method, op_spec in ops_specs:
+                op = self._operations.get((path_name, http_method))
+                if op is None:
+                    op = self._operations[(path_name, http_method)] = Operation.from_spec(
+                        self._swagger_spec, path_name, http_method, op_spec,
+                    )
+                ops[op.operation_id] = op
+            dict.__setitem__(self, key, Resource(key, ops))
+            del self._pending[key]
+
+    def build_all(self):
+        # type: () -> None
+        for key in list(self._pending):
+            self._build(key)
+
+    def get(self, key, default=None):
+        # type: (typing.Text, typing.Any) -> typing.Any
+        key = self.determine_key(key)
+        if key in self._pending:
+            self._build(key)
+        return dict.get(self, key, default)
+
+    def __getitem__(self, key):
+        # type: (typing.Text) -> typing.Any
+        key = self.determine_key(key)
+        if key in self._pending:
+            self._build(key)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        # type: (typing.Any) -> bool
+        key = self.determine_key(key)
+        return key in self._pending or dict.__contains__(self, key)
+
+    def __iter__(self):
+        # type: () -> typing.Iterator[typing.Text]
+        return iter(self._names)
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._names)
+
+    def keys(self):
+        # type: () -> typing.Any
+        return list(self._names)
+
+    def values(self):
+        # type: () -> typing.Any
+        self.build_all()
+        return [dict.__getitem__(self, key) for key in self._names]
+
+    def items(self):
+        # type: () -> typing.Any
+        self.build_all()
+        return [(key, dict.__getitem__(self, key)) for key in self._names]
+
+    def pop(self, key, default=None):
+        # type: (typing.Text, typing.Any) -> typing.Any
+        key = self.determine_key(key)
+        if key in self._pending:
+            self._build(key)
+        if key in self._names:
+            self._names.remove(key)
+        return dict.pop(self, key, default)
+
+    def __delitem__(self, key):
+        # type: (typing.Text) -> None
+        if key not in self:
+            raise KeyError(key)
+        self.pop(key)
+
+    def copy(self):
+        # type: () -> AliasKeyDict
+        return _alias_key_dict(dict(self.items()), self.alias_to_key)
+
+    def __reduce__(self):
+        # type: () -> typing.Any
+        # Copies don't need to be lazy anymore
+        return _alias_key_dict, (dict(self.items()), self.alias_to_key)
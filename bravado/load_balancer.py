@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""
+Client-side load balancing of requests across several endpoints serving the
+same API, configured with the ``load_balancing`` config:
+
+.. code-block:: python
+
+    config = {
+        'load_balancing': {
+            'endpoints': ['http://10.0.0.1:8080', 'http://10.0.0.2:8080'],
+            # or a callable returning the endpoints, called every resolve_interval seconds
+            # 'resolver': lambda: discover('petstore'),
+            'strategy': 'p2c',
+        },
+    }
+
+Endpoints are scheme and host pairs, which replace the ones of the API url of
+the spec; its base path is kept. Authentication set up for the host of the API
+url (see :meth:`bravado.requests_client.RequestsClient.set_basic_auth`) still
+applies to the requests sent to the endpoints, see :func:`get_api_url`. Each request, including each retried or
+hedged attempt, goes to the endpoint picked by the strategy:
+
+* ``p2c`` (power of two choices): the endpoint with the fewer outstanding
+  requests out of two picked at random.
+* ``least_outstanding``: the endpoint with the fewest outstanding requests.
+
+Endpoints whose recent requests (at least ``min_requests`` of the last
+``window_size``) failed at ``error_rate_threshold`` or more, or whose latency
+is ``latency_factor`` times the median latency of the endpoints, are ejected
+for ``ejection_time`` seconds, longer if they are ejected again right after
+coming back. At most ``max_ejection_ratio`` of the endpoints are ejected at
+once. Endpoints coming back are readmitted gradually: they're picked less
+often at first, up to their full share of requests after ``ramp_up_time``
+seconds.
+
+Outstanding requests of the asyncio client can't be tracked, so its
+requests go to random endpoints, without outlier ejection.
+"""
+import asyncio
+import collections
+import contextvars
+import logging
+import random
+import threading
+import typing
+import weakref
+
+import monotonic
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+from six.moves.urllib.parse import urlsplit
+from six.moves.urllib.parse import urlunsplit
+
+from bravado.config import get_spec_state
+from bravado.config import RequestConfig
+from bravado.exception import BravadoConnectionError
+from bravado.exception import BravadoTimeoutError
+from bravado.http_client import HttpClient
+from bravado.http_future import FutureAdapter
+from bravado.http_future import get_concurrent_future
+from bravado.http_future import HttpFuture
+
+
+log = logging.getLogger(__name__)
+
+POWER_OF_TWO_CHOICES = 'p2c'
+LEAST_OUTSTANDING = 'least_outstanding'
+STRATEGIES = (POWER_OF_TWO_CHOICES, LEAST_OUTSTANDING)
+
+# Weight of the latest latency in the moving average of the latency of an endpoint
+LATENCY_EWMA_WEIGHT = 0.1
+
+# Share of requests of an endpoint that was just readmitted, relative to the other endpoints
+MIN_RAMP_UP_WEIGHT = 0.1
+
+# Url of the request being sent to an endpoint, before its scheme and host were replaced
+_api_url = contextvars.ContextVar(
+    'bravado_api_url', default=None,
+)  # type: contextvars.ContextVar[typing.Optional[str]]
+
+
+class Endpoint(object):
+    """Load and health of an endpoint. Not thread-safe, see :class:`LoadBalancer`.
+
+    :param url: scheme and host of the endpoint, e.g. ``http://10.0.0.1:8080``
+    :param window_size: number of recent outcomes the error rate is computed over
+    """
+
+    def __init__(self, url, window_size):
+        # type: (typing.Text, int) -> None
+        self.url = url
+        split_url = urlsplit(url)
+        self.scheme = split_url.scheme
+        self.netloc = split_url.netloc
+        self.outstanding = 0
+        # Outcomes of the recent requests, True for failures
+        self.outcomes = collections.deque(maxlen=window_size)  # type: typing.Deque[bool]
+        # Moving average of the latency, in seconds
+        self.latency = None  # type: typing.Optional[float]
+        self.ejected_until = None  # type: typing.Optional[float]
+        self.ejection_count = 0
+        self.readmitted_at = None  # type: typing.Optional[float]
+
+    def __repr__(self):
+        # type: () -> str
+        return '{0}({1!r})'.format(self.__class__.__name__, self.url)
+
+    def is_ejected(self, now):
+        # type: (float) -> bool
+        return self.ejected_until is not None and now < self.ejected_until
+
+    def weight(self, now, ramp_up_time):
+        # type: (float, float) -> float
+        """Share of requests of the endpoint, which grows from
+        :data:`MIN_RAMP_UP_WEIGHT` to 1 after it's readmitted.
+        """
+        if self.readmitted_at is None or ramp_up_time <= 0 or now - self.readmitted_at >= ramp_up_time:
+            return 1.0
+        return max(MIN_RAMP_UP_WEIGHT, (now - self.readmitted_at) / ramp_up_time)
+
+    def eject(self, now, ejection_time, max_ejection_time, ramp_up_time):
+        # type: (float, float, float, float) -> None
+        if self.weight(now, ramp_up_time) < 1:
+            # Ejected again while coming back
+            self.ejection_count += 1
+        else:
+            self.ejection_count = 1
+        self.ejected_until = now + min(max_ejection_time, ejection_time * self.ejection_count)
+        self.readmitted_at = self.ejected_until
+        self.outcomes.clear()
+        self.latency = None
+
+
+class LoadBalancer(object):
+    """Picks the endpoints of the requests of a client. Thread-safe.
+
+    :param endpoints: scheme and host of each endpoint
+    :param resolver: callable returning the endpoints, instead of endpoints
+    :param resolve_interval: seconds between calls of the resolver
+    :param strategy: one of :data:`STRATEGIES`
+    :param window_size: number of recent requests of each endpoint the error rate is computed over
+    :param min_requests: min number of recent requests of an endpoint before it can be ejected
+    :param error_rate_threshold: ratio of failed recent requests that ejects an endpoint
+    :param latency_factor: an endpoint is ejected if its latency is this many times the
+        median latency of the endpoints; None disables latency-based ejection
+    :param ejection_time: seconds an endpoint is ejected for, multiplied by the number of
+        times it was ejected in a row
+    :param max_ejection_time: max seconds an endpoint is ejected for
+    :param max_ejection_ratio: max ratio of endpoints ejected at once
+    :param ramp_up_time: seconds it takes readmitted endpoints to get their full share of requests
+    :raises: ValueError if the strategy is unknown or neither endpoints nor resolver are set
+    """
+
+    def __init__(
+        self,
+        endpoints=None,  # type: typing.Optional[typing.Iterable[typing.Text]]
+        resolver=None,  # type: typing.Optional[typing.Callable[[], typing.Iterable[typing.Text]]]
+        resolve_interval=30.0,  # type: float
+        strategy=POWER_OF_TWO_CHOICES,  # type: str
+        window_size=20,  # type: int
+        min_requests=10,  # type: int
+        error_rate_threshold=0.5,  # type: float
+        latency_factor=3.0,  # type: typing.Optional[float]
+        ejection_time=30.0,  # type: float
+        max_ejection_time=300.0,  # type: float
+        max_ejection_ratio=0.5,  # type: float
+        ramp_up_time=30.0,  # type: float
+    ):
+        # type: (...) -> None
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                'Unknown load balancing strategy {0!r}, expected one of: {1}'.format(strategy, ', '.join(STRATEGIES)),
+            )
+        if endpoints is None and resolver is None:
+            raise ValueError('Load balancing requires either endpoints or a resolver')
+        self.resolver = resolver
+        self.resolve_interval = resolve_interval
+        self.strategy = strategy
+        self.window_size = window_size
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_factor = latency_factor
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.max_ejection_ratio = max_ejection_ratio
+        self.ramp_up_time = ramp_up_time
+        self._endpoints = []  # type: typing.List[Endpoint]
+        self._resolved_at = None  # type: typing.Optional[float]
+        self._lock = threading.Lock()
+        if endpoints is not None:
+            self._set_endpoints(endpoints)
+
+    @property
+    def endpoints(self):
+        # type: () -> typing.List[Endpoint]
+        with self._lock:
+            self._maybe_resolve(monotonic.monotonic())
+            return list(self._endpoints)
+
+    def _set_endpoints(self, urls):
+        # type: (typing.Iterable[typing.Text]) -> None
+        # Endpoints that are still there keep their state
+        current_endpoints = {endpoint.url: endpoint for endpoint in self._endpoints}
+        self._endpoints = [
+            current_endpoints.get(url) or Endpoint(url, self.window_size)
+            for url in collections.OrderedDict.fromkeys(url.rstrip('/') for url in urls)
+        ]
+
+    def _maybe_resolve(self, now):
+        # type: (float) -> None
+        if self.resolver is None or (
+            self._resolved_at is not None and now - self._resolved_at < self.resolve_interval
+        ):
+            return
+        self._resolved_at = now
+        try:
+            self._set_endpoints(self.resolver())
+        except Exception:
+            log.exception('Resolving the endpoints failed, keeping the previous ones')
+
+    def pick(self):
+        # type: () -> typing.Optional[Endpoint]
+        """Pick the endpoint of a request, which counts as outstanding until
+        :meth:`release` is called.
+
+        :return: the endpoint, or None if there are none
+        """
+        with self._lock:
+            now = monotonic.monotonic()
+            self._maybe_resolve(now)
+            candidates = [endpoint for endpoint in self._endpoints if not endpoint.is_ejected(now)]
+            if not candidates:
+                # Only possible with max_ejection_ratio >= 1
+                candidates = self._endpoints
+            if not candidates:
+                return None
+
+            weights = [endpoint.weight(now, self.ramp_up_time) for endpoint in candidates]
+            if len(candidates) == 1:
+                endpoint = candidates[0]
+            elif self.strategy == POWER_OF_TWO_CHOICES:
+                # Two distinct candidates, readmitted endpoints being less likely to be picked
+                first_index = random.choices(range(len(candidates)), weights)[0]
+                weights[first_index] = 0
+                first = candidates[first_index]
+                second = random.choices(candidates, weights)[0]
+                endpoint = first if first.outstanding <= second.outstanding else second
+            else:
+                scores = [
+                    (endpoint.outstanding + 1) / weight + random.random() * 1e-6
+                    for endpoint, weight in zip(candidates, weights)
+                ]
+                endpoint = candidates[scores.index(min(scores))]
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint, failed=None, latency=None):
+        # type: (Endpoint, typing.Optional[bool], typing.Optional[float]) -> None
+        """Record the outcome of a request sent to the endpoint.
+
+        :param failed: whether the request failed, None if it's unknown, e.g.
+            because the request was cancelled
+        :param latency: seconds it took to receive the response, if known
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            now = monotonic.monotonic()
+            if failed is None or endpoint.is_ejected(now):
+                return
+            endpoint.outcomes.append(failed)
+            if latency is not None and not failed:
+                endpoint.latency = latency if endpoint.latency is None else (
+                    endpoint.latency + LATENCY_EWMA_WEIGHT * (latency - endpoint.latency)
+                )
+            if self._is_outlier(endpoint) and self._can_eject(now):
+                endpoint.eject(now, self.ejection_time, self.max_ejection_time, self.ramp_up_time)
+                log.warning('Ejected endpoint %s until %s', endpoint.url, endpoint.ejected_until)
+
+    def _is_outlier(self, endpoint):
+        # type: (Endpoint) -> bool
+        if len(endpoint.outcomes) < self.min_requests:
+            return False
+        if sum(endpoint.outcomes) >= self.error_rate_threshold * len(endpoint.outcomes):
+            return True
+        if self.latency_factor is None or endpoint.latency is None:
+            return False
+        latencies = sorted(
+            other.latency for other in self._endpoints
+            if other.latency is not None and len(other.outcomes) >= self.min_requests
+        )
+        if len(latencies) < 3:
+            # The median of fewer endpoints doesn't tell which one is the outlier
+            return False
+        return endpoint.latency > self.latency_factor * latencies[len(latencies) // 2]
+
+    def _can_eject(self, now):
+        # type: (float) -> bool
+        ejected = sum(1 for endpoint in self._endpoints if endpoint.is_ejected(now))
+        return ejected + 1 <= self.max_ejection_ratio * len(self._endpoints)
+
+
+def get_load_balancer(swagger_spec):
+    # type: (typing.Any) -> typing.Optional[LoadBalancer]
+    """Return the load balancer of the client of the given spec, creating it
+    on first use, or None if the client doesn't balance its requests.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    bravado_config = swagger_spec.config.get('bravado')
+    if bravado_config is None or bravado_config.load_balancing is None:
+        return None
+    return get_spec_state(swagger_spec, 'load_balancer', lambda: LoadBalancer(**bravado_config.load_balancing))
+
+
+class _Lease(object):
+    """Outstanding request to an endpoint, released once."""
+
+    def __init__(self, load_balancer, endpoint):
+        # type: (LoadBalancer, Endpoint) -> None
+        self._load_balancer = load_balancer
+        self._endpoint = endpoint
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self, failed=None, latency=None):
+        # type: (typing.Optional[bool], typing.Optional[float]) -> None
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._load_balancer.release(self._endpoint, failed, latency)
+
+
+class LoadBalancedFutureAdapter(FutureAdapter):
+    """Future of a request sent to an endpoint picked by a :class:`LoadBalancer`,
+    which records the outcome of the request.
+
+    :param sent_at: when the request was sent, if it's in flight in the
+        background already; requests only sent once waited for are timed from
+        the call of :meth:`result`
+    """
+
+    def __init__(self, http_future, lease, sent_at=None):
+        # type: (HttpFuture, _Lease, typing.Optional[float]) -> None
+        self._http_future = http_future
+        self._lease = lease
+        self._sent_at = sent_at
+        # The endpoint would count the request as outstanding forever if its response isn't waited for
+        weakref.finalize(self, lease.release)
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        sent_at = self._sent_at if self._sent_at is not None else monotonic.monotonic()
+        try:
+            # Errors of the HTTP client are converted by HttpFuture
+            incoming_response = self._http_future._get_incoming_response(timeout)
+        except (BravadoTimeoutError, BravadoConnectionError):
+            self._lease.release(failed=True)
+            raise
+        except Exception:
+            self._lease.release()
+            raise
+        self._lease.release(
+            failed=incoming_response.status_code >= 500,
+            latency=monotonic.monotonic() - sent_at,
+        )
+        return incoming_response
+
+    def cancel(self):
+        # type: () -> None
+        self._lease.release()
+        self._http_future.cancel()
+
+
+def get_api_url():
+    # type: () -> typing.Optional[str]
+    """:return: the url of the request being sent to an endpoint by the
+        current context, before its scheme and host were replaced with the
+        ones of the endpoint; None if the request isn't load balanced
+    """
+    return _api_url.get()
+
+
+def endpoint_url(url, endpoint):
+    # type: (typing.Text, Endpoint) -> typing.Text
+    """Replace the scheme and host of the url with the ones of the endpoint."""
+    return urlunsplit(urlsplit(url)._replace(scheme=endpoint.scheme, netloc=endpoint.netloc))
+
+
+def load_balance_request(
+    load_balancer,  # type: LoadBalancer
+    http_client,  # type: HttpClient
+    request_params,  # type: typing.Mapping[str, typing.Any]
+    operation,  # type: Operation
+    request_config,  # type: RequestConfig
+):
+    # type: (...) -> HttpFuture
+    """Send a request to the endpoint picked by the load balancer."""
+    endpoint = load_balancer.pick()
+    if endpoint is None:
+        return http_client.request(dict(request_params), operation=operation, request_config=request_config)
+
+    lease = _Lease(load_balancer, endpoint)
+    sent_at = monotonic.monotonic()
+    token = _api_url.set(request_params['url'])
+    try:
+        http_future = http_client.request(
+            dict(request_params, url=endpoint_url(request_params['url'], endpoint)),
+            operation=operation,
+            request_config=request_config,
+        )
+    except Exception:
+        lease.release()
+        raise
+    finally:
+        _api_url.reset(token)
+    if asyncio.iscoroutinefunction(http_future.response):
+        # Awaitable futures can't be wrapped, the outcome of their request is unknown
+        lease.release()
+        return http_future
+
+    return HttpFuture(
+        LoadBalancedFutureAdapter(
+            http_future,
+            lease,
+            sent_at if get_concurrent_future(http_future) is not None else None,
+        ),
+        lambda incoming_response: incoming_response,
+        operation,
+        request_config,
+    )
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming encoding of multipart/form-data request bodies, so that uploaded
+files are read while the request is sent instead of being held in memory.
+"""
+import binascii
+import io
+import mmap
+import os
+import typing
+
+import six
+from requests.utils import guess_filename
+from requests.utils import to_key_val_list
+from urllib3.fields import RequestField
+
+from bravado.streaming import CHUNK_SIZE
+
+
+# File contents that are sent straight from memory
+_BUFFER_TYPES = (bytearray, memoryview, mmap.mmap)
+
+
+class MultipartEncoder(object):
+    """File-like multipart/form-data body, rendered while it's read.
+
+    Accepts the ``data`` and ``files`` request params in the format of
+    :class:`requests.Request`. File contents can be bytes, strings, file
+    objects, mmaps or iterables of bytes; file objects are read in chunks of
+    :data:`bravado.streaming.CHUNK_SIZE` bytes when the body is sent.
+
+    :ivar len: size of the body in bytes, or None if a file is an iterable of
+        unknown size. The name of the attribute is the one :mod:`requests`
+        looks for to set the Content-Length header.
+    :ivar str content_type: value of the Content-Type header of the body
+    """
+
+    def __init__(
+        self,
+        data,  # type: typing.Any
+        files,  # type: typing.Any
+        boundary=None,  # type: typing.Optional[str]
+    ):
+        # type: (...) -> None
+        self.boundary = boundary or binascii.hexlify(os.urandom(16)).decode('ascii')
+        self.content_type = 'multipart/form-data; boundary={0}'.format(self.boundary)
+        self._parts = list(self._iter_parts(data, files))
+        self._closing_boundary = '--{0}--\r\n'.format(self.boundary).encode('latin1')
+
+        self.len = len(self._closing_boundary)  # type: typing.Optional[int]
+        for headers, content in self._parts:
+            content_size = _content_size(content)
+            if content_size is None:
+                self.len = None
+                break
+            self.len += len(headers) + content_size + 2
+
+        self._chunks = self._iter_chunks()
+        self._buffer = b''
+
+    def _iter_parts(self, data, files):
+        # type: (typing.Any, typing.Any) -> typing.Iterator[typing.Tuple[bytes, typing.Any]]
+        # Same parts, in the same order, as requests.models.RequestEncodingMixin._encode_files
+        for field, values in to_key_val_list(data or {}):
+            if isinstance(values, (six.string_types, six.binary_type)) or not hasattr(values, '__iter__'):
+                values = [values]
+            for value in values:
+                if value is None:
+                    continue
+                if not isinstance(value, six.binary_type):
+                    value = str(value)
+                request_field = RequestField(name=field, data=value)
+                request_field.make_multipart()
+                yield self._render_headers(request_field), value
+
+        for field, value in to_key_val_list(files or {}):
+            content_type = None
+            headers = None
+            if isinstance(value, (tuple, list)):
+                if len(value) == 2:
+                    filename, content = value
+                elif len(value) == 3:
+                    filename, content, content_type = value
+                else:
+                    filename, content, content_type, headers = value
+            else:
+                filename = guess_filename(value) or field
+                content = value
+            if content is None:
+                continue
+
+            request_field = RequestField(name=field, data=b'', filename=filename, headers=headers)
+            request_field.make_multipart(content_type=content_type)
+            yield self._render_headers(request_field), content
+
+    def _render_headers(self, request_field):
+        # type: (RequestField) -> bytes
+        return '--{0}\r\n{1}'.format(self.boundary, request_field.render_headers()).encode('utf-8')
+
+    def _iter_chunks(self):
+        # type: () -> typing.Iterator[bytes]
+        for headers, content in self._parts:
+            yield headers
+            for chunk in _iter_content(content):
+                yield chunk
+            yield b'\r\n'
+        yield self._closing_boundary
+
+    def __iter__(self):
+        # type: () -> typing.Iterator[bytes]
+        if self._buffer:
+            yield self._buffer
+            self._buffer = b''
+        for chunk in self._chunks:
+            yield chunk
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        """Read up to size bytes of the body, or the rest of it if size is negative."""
+        if size is None or size < 0:
+            return b''.join(self)
+
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while length < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            length += len(chunk)
+        data = b''.join(chunks)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def _content_size(content):
+    # type: (typing.Any) -> typing.Optional[int]
+    if isinstance(content, six.text_type):
+        return len(content.encode('utf-8'))
+    if isinstance(content, six.binary_type):
+        return len(content)
+    if isinstance(content, _BUFFER_TYPES):
+        return memoryview(content).nbytes
+    if hasattr(content, 'fileno'):
+        try:
+            return os.fstat(content.fileno()).st_size - content.tell()
+        except (io.UnsupportedOperation, OSError, AttributeError):
+            pass
+    if hasattr(content, 'seek') and hasattr(content, 'tell'):
+        try:
+            position = content.tell()
+            end = content.seek(0, os.SEEK_END)
+            content.seek(position)
+            return end - position
+        except (io.UnsupportedOperation, OSError):
+            pass
+    return None
+
+
+def _iter_content(content):
+    # type: (typing.Any) -> typing.Iterator[bytes]
+    if isinstance(content, six.text_type):
+        yield content.encode('utf-8')
+    elif isinstance(content, six.binary_type):
+        yield content
+    elif isinstance(content, _BUFFER_TYPES):
+        # Sliced to avoid copying them whole
+        view = memoryview(content)
+        for offset in range(0, len(view), CHUNK_SIZE):
+            yield view[offset:offset + CHUNK_SIZE].tobytes()
+    elif hasattr(content, 'read'):
+        while True:
+            chunk = content.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk.encode('utf-8') if isinstance(chunk, six.text_type) else chunk
+    else:
+        for chunk in content:
+            yield chunk
+
+
+def encode_multipart(request_params):
+    # type: (typing.Mapping[str, typing.Any]) -> typing.Dict[str, typing.Any]
+    """Replace the ``data`` and ``files`` of a request with a
+    :class:`MultipartEncoder` streaming them, if the request uploads files.
+
+    :param request_params: complete request data. Treated as a read-only dict.
+    :return: copy of the request data
+    """
+    request_params = dict(request_params)
+    if request_params.get('files'):
+        encoder = MultipartEncoder(request_params.get('data'), request_params['files'])
+        request_params['data'] = encoder
+        request_params['files'] = None
+        request_params['headers'] = dict(request_params.get('headers') or {}, **{'Content-Type': encoder.content_type})
+    return request_params
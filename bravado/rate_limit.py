@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Client-side rate limiting of requests with token buckets, configured with the
+``rate_limits`` config:
+
+.. code-block:: python
+
+    config = {
+        'rate_limits': {
+            # (requests per second, burst size)
+            'global': (100, 100),
+            'hosts': {'petstore.swagger.io': (20, 40)},
+            'operations': {'findPetsByStatus': (2, 1)},
+        },
+        'rate_limit_mode': 'block',
+    }
+
+A request takes a token from each bucket that applies to it. If one of them is
+empty, ``rate_limit_mode`` (which the request option of the same name
+overrides) decides what happens:
+
+* ``block``: the operation call waits until the request is allowed.
+* ``non_blocking``: the operation call returns right away, and the request is
+  sent once it's allowed, when waiting for the response.
+* ``fail_fast``: the request is not sent, and waiting for the response raises
+  :class:`bravado.exception.BravadoRateLimitError`, which is handled by
+  fallback results.
+
+Requests the rate limit would only allow after the deadline of their call (see
+:mod:`bravado.deadline`) are not sent: waiting for their response raises
+:class:`bravado.exception.BravadoTimeoutError` right away.
+
+Calls made with :class:`bravado.asyncio_client.AsyncHttpClient` from a running
+event loop never block it: in both the ``block`` and ``non_blocking`` modes, the
+awaitable future they return waits until the request is allowed.
+"""
+import asyncio
+import functools
+import threading
+import time
+import typing
+
+import monotonic
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+from six.moves.urllib.parse import urlparse
+
+from bravado.asyncio_client import AsyncHttpClient
+from bravado.asyncio_client import AsyncioFutureAdapter
+from bravado.asyncio_client import AsyncioResponse
+from bravado.asyncio_client import returns_awaitable_futures
+from bravado.config import get_spec_state
+from bravado.config import RequestConfig
+from bravado.deadline import remaining_time
+from bravado.exception import BravadoRateLimitError
+from bravado.exception import BravadoTimeoutError
+from bravado.http_future import FailedFutureAdapter
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+
+
+BLOCK = 'block'
+NON_BLOCKING = 'non_blocking'
+FAIL_FAST = 'fail_fast'
+RATE_LIMIT_MODES = (BLOCK, NON_BLOCKING, FAIL_FAST)
+
+# (requests per second, burst size)
+RateLimit = typing.Tuple[float, int]
+
+
+class TokenBucket(object):
+    """Token bucket refilled with rate tokens per second, up to burst tokens.
+    Not thread-safe, see :class:`RateLimiter`.
+
+    Tokens can be reserved ahead of time, in which case the bucket goes below
+    zero tokens and later requests wait for the reserved tokens to be refilled.
+
+    :raises: ValueError if the rate isn't positive or the burst is less than 1
+    """
+
+    def __init__(self, rate, burst):
+        # type: (float, int) -> None
+        if not rate > 0 or burst < 1:
+            raise ValueError(
+                'Invalid rate limit ({0!r}, {1!r}): the rate must be positive and the burst at least 1'.format(
+                    rate, burst,
+                ),
+            )
+        self.rate = float(rate)
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated_at = monotonic.monotonic()
+
+    def _refill(self, now):
+        # type: (float) -> None
+        self.tokens = min(float(self.burst), self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def wait_time(self, now):
+        # type: (float) -> float
+        """Seconds until a token is available."""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self, now):
+        # type: (float) -> None
+        self._refill(now)
+        self.tokens -= 1
+
+    def give_back(self, now):
+        # type: (float) -> None
+        """Return a token taken for a request that wasn't sent."""
+        self._refill(now)
+        self.tokens = min(float(self.burst), self.tokens + 1)
+
+
+class RateLimiter(object):
+    """Token buckets of a client.
+
+    :param global_limit: rate limit of all the requests
+    :param hosts: rate limits of the requests to each host
+    :param operations: rate limits of the requests of each operation, by operationId
+    :raises: ValueError if one of the rate limits is invalid, see :class:`TokenBucket`
+    """
+
+    def __init__(
+        self,
+        global_limit=None,  # type: typing.Optional[RateLimit]
+        hosts=None,  # type: typing.Optional[typing.Mapping[typing.Text, RateLimit]]
+        operations=None,  # type: typing.Optional[typing.Mapping[typing.Text, RateLimit]]
+    ):
+        # type: (...) -> None
+        self._global_bucket = TokenBucket(*global_limit) if global_limit else None
+        self._host_buckets = {host: TokenBucket(*limit) for host, limit in (hosts or {}).items()}
+        self._operation_buckets = {
+            operation_id: TokenBucket(*limit) for operation_id, limit in (operations or {}).items()
+        }
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, rate_limits):
+        # type: (typing.Mapping[str, typing.Any]) -> RateLimiter
+        """:param rate_limits: ``rate_limits`` config, see :mod:`bravado.rate_limit`"""
+        return cls(
+            global_limit=rate_limits.get('global'),
+            hosts=rate_limits.get('hosts'),
+            operations=rate_limits.get('operations'),
+        )
+
+    def _buckets(self, host, operation_id):
+        # type: (typing.Text, typing.Optional[typing.Text]) -> typing.List[TokenBucket]
+        buckets = [
+            self._global_bucket,
+            self._host_buckets.get(host),
+            self._operation_buckets.get(operation_id) if operation_id is not None else None,
+        ]
+        return [bucket for bucket in buckets if bucket is not None]
+
+    def reserve(self, host, operation_id=None, fail_fast=False):
+        # type: (typing.Text, typing.Optional[typing.Text], bool) -> float
+        """Reserve a token of each bucket that applies to a request.
+
+        :return: seconds to wait before sending the request
+        :raises: BravadoRateLimitError if fail_fast is set and the request
+            would have to wait; no tokens are taken then
+        """
+        with self._lock:
+            now = monotonic.monotonic()
+            buckets = self._buckets(host, operation_id)
+            wait_time = max([bucket.wait_time(now) for bucket in buckets] or [0.0])
+            if fail_fast and wait_time > 0:
+                raise BravadoRateLimitError(wait_time)
+            for bucket in buckets:
+                bucket.take(now)
+            return wait_time
+
+    def release(self, host, operation_id=None):
+        # type: (typing.Text, typing.Optional[typing.Text]) -> None
+        """Return the tokens reserved for a request that won't be sent, e.g.
+        because waiting for the rate limit timed out.
+        """
+        with self._lock:
+            now = monotonic.monotonic()
+            for bucket in self._buckets(host, operation_id):
+                bucket.give_back(now)
+
+
+def get_rate_limiter(swagger_spec):
+    # type: (typing.Any) -> typing.Optional[RateLimiter]
+    """Return the rate limiter of the client of the given spec, creating it on
+    first use, or None if the client isn't rate limited.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    bravado_config = swagger_spec.config.get('bravado')
+    if bravado_config is None or not bravado_config.rate_limits:
+        return None
+    return get_spec_state(swagger_spec, 'rate_limiter', lambda: RateLimiter.from_config(bravado_config.rate_limits))
+
+
+class RateLimitedFutureAdapter(FutureAdapter):
+    """Future of a request that is sent once the rate limit allows it, when
+    waiting for its response.
+
+    :param send_request: sends the request and returns its :class:`bravado.http_future.HttpFuture`
+    :param send_at: monotonic timestamp at which the request can be sent
+    :param release: returns the tokens reserved for the request, if it's not sent
+    """
+
+    def __init__(
+        self,
+        send_request,  # type: typing.Callable[[], HttpFuture]
+        send_at,  # type: float
+        release,  # type: typing.Callable[[], None]
+    ):
+        # type: (...) -> None
+        self._send_request = send_request
+        self._send_at = send_at
+        self._release = release
+        self._http_future = None  # type: typing.Optional[HttpFuture]
+        self._given_up = False
+        self._lock = threading.Lock()
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        deadline = monotonic.monotonic() + timeout if timeout is not None else None
+        while True:
+            # Sleeps without the lock, so that cancel() doesn't wait for the rate limit
+            with self._lock:
+                if self._given_up:
+                    raise BravadoTimeoutError('Timed out waiting for the rate limit to allow the request')
+                now = monotonic.monotonic()
+                if self._http_future is None and now >= self._send_at:
+                    self._http_future = self._send_request()
+                if self._http_future is not None:
+                    http_future = self._http_future
+                    break
+                if deadline is not None and now >= deadline:
+                    self._give_up()
+                    raise BravadoTimeoutError('Timed out waiting for the rate limit to allow the request')
+                wake_up_at = min(self._send_at, deadline) if deadline is not None else self._send_at
+            time.sleep(wake_up_at - now)
+        # Errors of the HTTP client are converted by HttpFuture
+        return http_future._get_incoming_response(
+            max(0.0, deadline - monotonic.monotonic()) if deadline is not None else None,
+        )
+
+    def cancel(self):
+        # type: () -> None
+        with self._lock:
+            if self._http_future is None:
+                self._give_up()
+                return
+        self._http_future.cancel()
+
+    def _give_up(self):
+        # type: () -> None
+        if not self._given_up:
+            self._given_up = True
+            self._release()
+
+
+async def _send_later(send_request, wait_time, release):
+    # type: (typing.Callable[[], HttpFuture], float, typing.Callable[[], None]) -> AsyncioResponse
+    """Send a request of :class:`bravado.asyncio_client.AsyncHttpClient` from
+    the running event loop once the rate limit allows it.
+    """
+    try:
+        await asyncio.sleep(wait_time)
+    except asyncio.CancelledError:
+        release()
+        raise
+
+    http_future = send_request()
+    future = typing.cast(AsyncioFutureAdapter, http_future.future)
+    try:
+        await future.wait()
+    except asyncio.CancelledError:
+        http_future.cancel()
+        raise
+    return future.result()
+
+
+def rate_limit_request(
+    rate_limiter,  # type: RateLimiter
+    send_request,  # type: typing.Callable[[], HttpFuture]
+    request_params,  # type: typing.Mapping[str, typing.Any]
+    operation,  # type: Operation
+    request_config,  # type: RequestConfig
+    mode,  # type: str
+):
+    # type: (...) -> HttpFuture
+    """Send a request once the rate limiter allows it.
+
+    :param send_request: sends the request and returns its :class:`bravado.http_future.HttpFuture`
+    :param mode: one of :data:`RATE_LIMIT_MODES`
+    :return: future of the request, whose ``rate_limit_wait_time`` is the
+        number of seconds the request waited for (or will wait for, in
+        ``non_blocking`` mode and with awaitable futures)
+    :raises: ValueError if the mode is unknown
+    """
+    if mode not in RATE_LIMIT_MODES:
+        raise ValueError(
+            'Unknown rate limit mode {0!r}, expected one of: {1}'.format(mode, ', '.join(RATE_LIMIT_MODES)),
+        )
+
+    host = urlparse(request_params['url']).netloc
+    http_client = operation.swagger_spec.http_client
+    is_awaitable = returns_awaitable_futures(http_client, operation)
+
+    def failed_future(error):
+        # type: (Exception) -> HttpFuture
+        if is_awaitable:
+            return typing.cast(AsyncHttpClient, http_client).failed_future(error, operation, request_config)
+        return HttpFuture(
+            FailedFutureAdapter(error),
+            lambda incoming_response: incoming_response,
+            operation,
+            request_config,
+        )
+
+    try:
+        wait_time = rate_limiter.reserve(host, operation.operation_id, fail_fast=mode == FAIL_FAST)
+    except BravadoRateLimitError as e:
+        return failed_future(e)
+
+    release = functools.partial(rate_limiter.release, host, operation.operation_id)
+    remaining = remaining_time(request_config.deadline_at)
+    if wait_time > 0 and remaining is not None and wait_time >= remaining:
+        # The request would only be allowed after the deadline of the call
+        release()
+        return failed_future(BravadoTimeoutError('Deadline exceeded waiting for the rate limit to allow the request'))
+
+    if wait_time > 0 and is_awaitable:
+        # Sleeping would block the event loop, the awaitable future waits instead
+        http_future = typing.cast(AsyncHttpClient, http_client).awaitable_future(
+            _send_later(send_request, wait_time, release),
+            operation,
+            request_config,
+        )  # type: HttpFuture
+    elif wait_time > 0 and mode == NON_BLOCKING:
+        http_future = HttpFuture(
+            RateLimitedFutureAdapter(send_request, monotonic.monotonic() + wait_time, release),
+            lambda incoming_response: incoming_response,
+            operation,
+            request_config,
+        )
+    else:
+        if wait_time > 0:
+            time.sleep(wait_time)
+        http_future = send_request()
+    http_future.rate_limit_wait_time = wait_time
+    return http_future
@@ -1,8 +1,17 @@
 # -*- coding: utf-8 -*-
 import copy
+import functools
 import logging
+import socket
+import threading
 import typing
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
+import monotonic
+import requests.adapters
 import requests.auth
 import requests.exceptions
 import six
@@ -13,9 +22,14 @@ from six.moves.urllib import parse as urlparse
 
 from bravado._equality_util import are_objects_equal as _are_objects_equal
 from bravado.config import RequestConfig
+from bravado.deadline import bound_timeout
+from bravado.deadline import get_watchdog
 from bravado.http_client import HttpClient
 from bravado.http_future import FutureAdapter
 from bravado.http_future import HttpFuture
+from bravado.load_balancer import get_api_url
+from bravado.multipart import encode_multipart
+from bravado.streaming import RangeMismatchError
 
 
 if getattr(typing, 'TYPE_CHECKING', False):
@@ -123,11 +137,15 @@ class RequestsResponseAdapter(IncomingResponse):
     to the response innards.
 
     :type requests_lib_response: :class:`requests.models.Response`
+    :param range_sender: future adapter that sent the request, which lets
+        :meth:`iter_range` request parts of the body again
+    :type range_sender: :class:`RequestsFutureAdapter`
     """
 
-    def __init__(self, requests_lib_response):
-        # type: (requests.Response) -> None
+    def __init__(self, requests_lib_response, range_sender=None):
+        # type: (requests.Response, typing.Optional[RequestsFutureAdapter]) -> None
         self._delegate = requests_lib_response
+        self._range_sender = range_sender
 
     @property
     def status_code(self):
@@ -137,11 +155,13 @@ class RequestsResponseAdapter(IncomingResponse):
     @property
     def text(self):
         # type: () -> typing.Text
+        _read_body(self._delegate)
         return self._delegate.text
 
     @property
     def raw_bytes(self):
         # type: () -> bytes
+        _read_body(self._delegate)
         return self._delegate.content
 
     @property
@@ -157,8 +177,99 @@ class RequestsResponseAdapter(IncomingResponse):
 
     def json(self, **kwargs):
         # type: (typing.Any) -> typing.Mapping[typing.Text, typing.Any]
+        _read_body(self._delegate)
         return self._delegate.json(**kwargs)
 
+    def iter_content(self, chunk_size):
+        # type: (int) -> typing.Iterator[bytes]
+        """Iterate over the body of the response in chunks; the body is read
+        from the connection while iterating if the request was streamed.
+        """
+        return _iter_body(self._delegate, chunk_size)
+
+    def close(self):
+        # type: () -> None
+        """Release the connection of a streamed response."""
+        self._delegate.close()
+
+    @property
+    def accepts_ranges(self):
+        # type: () -> bool
+        """Whether parts of the body can be requested with :meth:`iter_range`.
+        The body must have a strong ETag or a Last-Modified date, so that parts
+        of another version of the body are never mixed with it.
+        """
+        return (
+            self._range_sender is not None and
+            self._delegate.headers.get('accept-ranges', '').lower() == 'bytes' and
+            'content-encoding' not in self._delegate.headers and
+            self._range_validator is not None
+        )
+
+    @property
+    def _range_validator(self):
+        # type: () -> typing.Optional[str]
+        """Value of the If-Range header of range requests; weak ETags can't be used."""
+        etag = self._delegate.headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return self._delegate.headers.get('last-modified')
+
+    def iter_range(self, start, end, chunk_size):
+        # type: (int, int, int) -> typing.Iterator[bytes]
+        """Request bytes start to end (exclusive) of the body again, and
+        iterate over them in chunks while they're read from the connection.
+
+        :raises: :class:`bravado.streaming.RangeMismatchError` if the server
+            answers with the whole body, e.g. because it changed, or with
+            another range or version of the body
+        """
+        assert self._range_sender is not None
+        response = self._range_sender.send_range(start, end, self._range_validator)
+        try:
+            self._check_range_response(response, start, end)
+            for chunk in _iter_body(response, chunk_size):
+                yield chunk
+        finally:
+            response.close()
+
+    def iter_full_body(self, chunk_size):
+        # type: (int) -> typing.Iterator[bytes]
+        """Send the request again, and iterate over the whole body of the
+        new response in chunks while they're read from the connection.
+        """
+        assert self._range_sender is not None
+        response = self._range_sender.send_range(None, None)
+        try:
+            if response.status_code != 200:
+                raise IOError('Expected a 200 response to the request, got {0}'.format(response.status_code))
+            for chunk in _iter_body(response, chunk_size):
+                yield chunk
+        finally:
+            response.close()
+
+    def _check_range_response(self, response, start, end):
+        # type: (requests.Response, int, int) -> None
+        if response.status_code == 200:
+            raise RangeMismatchError('The server sent the whole body instead of the range {0}-{1}'.format(
+                start, end - 1,
+            ))
+        if response.status_code != 206:
+            raise IOError('Expected a 206 response to the range request, got {0}'.format(response.status_code))
+
+        expected_content_range = 'bytes {0}-{1}/{2}'.format(
+            start, end - 1, self._delegate.headers.get('content-length'),
+        )
+        if response.headers.get('content-range') != expected_content_range:
+            raise RangeMismatchError('Expected the range {0}, got {1}'.format(
+                expected_content_range, response.headers.get('content-range'),
+            ))
+        etag = response.headers.get('etag')
+        if etag is not None and etag != self._delegate.headers.get('etag'):
+            raise RangeMismatchError('The range {0}-{1} comes from another version of the body'.format(
+                start, end - 1,
+            ))
+
 
 class RequestsFutureAdapter(FutureAdapter):
     """Mimics a :class:`concurrent.futures.Future` for the purposes of making
@@ -173,6 +284,7 @@ class RequestsFutureAdapter(FutureAdapter):
         session,  # type: requests.Session
         request,  # type: requests.Request
         misc_options,  # type: typing.Mapping[str, typing.Any]
+        executor=None,  # type: typing.Optional[Executor]
     ):
         # type: (...) -> None
         """Kicks API call for Requests client
@@ -182,10 +294,27 @@ class RequestsFutureAdapter(FutureAdapter):
         :param misc_options: misc options to apply when sending a HTTP request.
             e.g. timeout, connect_timeout, etc
         :type misc_options: dict
+        :param executor: if provided, the request is submitted to this executor
+            right away instead of being sent when :meth:`result` is called.
+        :type executor: :class:`concurrent.futures.Executor`
         """
         self.session = session
         self.request = request
         self.misc_options = misc_options
+        self._future = None  # type: typing.Optional[Future]
+        self._timeout_error = None  # type: typing.Optional[requests.exceptions.ReadTimeout]
+        if executor is not None:
+            # The request is already running by the time result() is called,
+            # so only the service call timeout applies to the request itself.
+            self._future = executor.submit(self.send, None)
+
+    @property
+    def concurrent_future(self):
+        # type: () -> typing.Optional[Future]
+        """Future of the request submitted to the executor, None if the
+        request is only sent when :meth:`result` is called.
+        """
+        return self._future
 
     def build_timeout(
         self,
@@ -195,7 +324,8 @@ class RequestsFutureAdapter(FutureAdapter):
         """
         Build the appropriate timeout object to pass to `session.send(...)`
         based on connect_timeout, the timeout passed to the service call, and
-        the timeout passed to the result call.
+        the timeout passed to the result call. Both timeouts are shortened to
+        the time left until the deadline of the call, if any.
 
         :param result_timeout: timeout that was passed into `future.result(..)`
         :return: timeout
@@ -230,10 +360,13 @@ class RequestsFutureAdapter(FutureAdapter):
                     service_timeout, result_timeout, timeout,
                 )
 
+        deadline = self.misc_options.get('deadline')
+        timeout = bound_timeout(timeout, deadline)
+
         # Requests is weird in that if you want to specify a connect_timeout
         # and idle timeout, then the timeout is passed as a tuple
         if 'connect_timeout' in self.misc_options:
-            return self.misc_options['connect_timeout'], timeout
+            return bound_timeout(self.misc_options['connect_timeout'], deadline), timeout
         return timeout
 
     def result(self, timeout=None):
@@ -246,8 +379,55 @@ class RequestsFutureAdapter(FutureAdapter):
         :return: raw response from the server
         :rtype: dict
         """
-        request = self.request
+        if self._future is None:
+            return self.send(timeout)
+        if self._timeout_error is not None:
+            # The response is closed as soon as it arrives, don't return it
+            raise self._timeout_error
+
+        try:
+            return self._future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # The request is still in flight; make sure its connection is
+            # released once it completes and report the same error that a
+            # read timeout would have raised.
+            self.cancel()
+            self._timeout_error = requests.exceptions.ReadTimeout(
+                'Gave up after waiting timeout={timeout} seconds for the '
+                'server to send the response'.format(timeout=timeout),
+            )
+            raise self._timeout_error
+
+    def send(self, timeout=None):
+        # type: (typing.Optional[float]) -> requests.Response
+        """Send the request and block until the response has been received.
+
+        :param timeout: timeout that was passed into `future.result(..)`, if any
+        :return: raw response from the server
+        """
+        return self._send_request(self.request, self.misc_options.get('stream'), timeout)
 
+    def send_range(self, start, end, if_range=None):
+        # type: (typing.Optional[int], typing.Optional[int], typing.Optional[str]) -> requests.Response
+        """Send the request again for bytes start to end (exclusive) of the
+        response body only, or for the whole body if they're None. The
+        response is streamed.
+
+        :param if_range: ETag or Last-Modified date of the body; the server
+            sends the whole body instead of the range if it doesn't match
+        :return: raw response from the server
+        """
+        request = copy.copy(self.request)
+        headers = {'Accept-Encoding': 'identity'}
+        if start is not None and end is not None:
+            headers['Range'] = 'bytes={0}-{1}'.format(start, end - 1)
+            if if_range is not None:
+                headers['If-Range'] = if_range
+        request.headers = dict(request.headers, **headers)
+        return self._send_request(request, True, None)
+
+    def _send_request(self, request, stream, timeout):
+        # type: (requests.Request, typing.Optional[bool], typing.Optional[float]) -> requests.Response
         # Ensure that all the headers are converted to strings.
         # This is need to workaround https://github.com/requests/requests/issues/3491
         request.headers = {
@@ -255,11 +435,17 @@ class RequestsFutureAdapter(FutureAdapter):
             for k, v in iteritems(request.headers)
         }
 
+        deadline = self.misc_options.get('deadline')
+        if deadline is not None and monotonic.monotonic() >= deadline:
+            # e.g. the request waited for a worker of the executor for too long
+            raise requests.exceptions.ReadTimeout('Deadline exceeded before sending the request')
+
         prepared_request = self.session.prepare_request(request)
         settings = self.session.merge_environment_settings(
             prepared_request.url,
             proxies={},
-            stream=None,
+            # With a deadline, the body is read below so that its download can be aborted
+            stream=stream or deadline is not None,
             verify=self.misc_options['ssl_verify'],
             cert=self.misc_options['ssl_cert'],
         )
@@ -269,11 +455,142 @@ class RequestsFutureAdapter(FutureAdapter):
             allow_redirects=self.misc_options['follow_redirects'],
             **settings
         )
+        if deadline is not None:
+            aborter = _BodyDownloadAborter(response, deadline)
+            if stream:
+                # Read later, see _read_body and _iter_body
+                response._bravado_body_aborter = aborter  # type: ignore
+            else:
+                aborter.read_body()
         return response
 
     def cancel(self):
         # type: () -> None
-        pass
+        if self._future is not None and not self._future.cancel():
+            # Requests can't abort a request that is already being sent;
+            # close the response as soon as it arrives instead.
+            self._future.add_done_callback(_close_response)
+
+
+class _BodyDownloadAborter(object):
+    """Aborts the download of the body of a response at the deadline, unless
+    it's done. The read timeout only bounds each read, so a slow-drip response
+    could otherwise keep the call alive long past the deadline.
+    """
+
+    def __init__(self, response, deadline):
+        # type: (requests.Response, float) -> None
+        self.response = response
+        self.aborted = False
+        self._done = False
+        self._lock = threading.Lock()
+        self._cancel = get_watchdog().schedule(deadline, self)
+
+    def __call__(self):
+        # type: () -> None
+        with self._lock:
+            if self._done:
+                return
+            self.aborted = True
+            # Makes the blocked read of the body return
+            try:
+                _shutdown_body_socket(self.response.raw)
+            except (OSError, ValueError, RuntimeError):
+                # The connection was already released to the pool or closed
+                pass
+
+    def done(self):
+        # type: () -> None
+        with self._lock:
+            self._done = True
+        self._cancel()
+
+    def read_body(self):
+        # type: () -> None
+        """Read the whole body.
+
+        :raises: requests.exceptions.ReadTimeout if the deadline is exceeded
+        """
+        try:
+            self.response.content
+        except Exception:
+            if not self.aborted:
+                raise
+        finally:
+            self.done()
+        self._raise_if_aborted()
+
+    def iter_content(self, chunk_size):
+        # type: (int) -> typing.Iterator[bytes]
+        """Iterate over the body in chunks while it's read from the connection.
+
+        :raises: requests.exceptions.ReadTimeout if the deadline is exceeded
+        """
+        try:
+            for chunk in self.response.iter_content(chunk_size):
+                yield chunk
+        except Exception:
+            if not self.aborted:
+                raise
+        finally:
+            self.done()
+        self._raise_if_aborted()
+
+    def _raise_if_aborted(self):
+        # type: () -> None
+        if self.aborted:
+            self.response.close()
+            raise requests.exceptions.ReadTimeout('Deadline exceeded while reading the response body')
+
+
+def _shutdown_body_socket(raw):
+    # type: (typing.Any) -> None
+    """Shut down the socket the body of a response is read from.
+
+    :type raw: :class:`urllib3.response.HTTPResponse`
+    """
+    shutdown = getattr(raw, 'shutdown', None)
+    if shutdown is not None:
+        # urllib3 >= 2.3
+        shutdown()
+        return
+
+    # Older urllib3 versions don't expose the socket: get it from the file
+    # object of the http.client response they wrap
+    socket_io = getattr(getattr(getattr(raw, '_fp', None), 'fp', None), 'raw', None)
+    sock = getattr(socket_io, '_sock', None)
+    if sock is not None:
+        sock.shutdown(socket.SHUT_RD)
+
+
+def _body_aborter(response):
+    # type: (requests.Response) -> typing.Optional[_BodyDownloadAborter]
+    """:return: the aborter of the body of a streamed response of a call with a deadline"""
+    aborter = getattr(response, '_bravado_body_aborter', None)
+    return aborter if isinstance(aborter, _BodyDownloadAborter) else None
+
+
+def _read_body(response):
+    # type: (requests.Response) -> None
+    """Read the whole body of a response, bounded by the deadline of the call if it was streamed."""
+    aborter = _body_aborter(response)
+    if aborter is not None:
+        aborter.read_body()
+
+
+def _iter_body(response, chunk_size):
+    # type: (requests.Response, int) -> typing.Iterator[bytes]
+    """Iterate over the body of a response in chunks, bounded by the deadline of the call if it was streamed."""
+    aborter = _body_aborter(response)
+    if aborter is not None:
+        return aborter.iter_content(chunk_size)
+    return response.iter_content(chunk_size)
+
+
+def _close_response(future):
+    # type: (Future) -> None
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
 
 
 class RequestsClient(HttpClient):
@@ -286,6 +603,7 @@ class RequestsClient(HttpClient):
         ssl_cert=None,  # type:  typing.Any
         future_adapter_class=RequestsFutureAdapter,  # type: typing.Type[RequestsFutureAdapter]
         response_adapter_class=RequestsResponseAdapter,  # type: typing.Type[RequestsResponseAdapter]
+        max_workers=None,  # type: typing.Optional[int]
     ):
         # type: (...) -> None
         """
@@ -298,6 +616,10 @@ class RequestsClient(HttpClient):
             should be a subclass of :class:`RequestsFutureAdapter`
         :param response_adapter_class: Custom response adapter class,
             should be a subclass of :class:`RequestsResponseAdapter`
+        :param max_workers: If set, requests are sent concurrently by a thread pool of this size
+            as soon as they're created, instead of when the result is requested. Defaults to None,
+            which sends requests synchronously. Call :meth:`close`, or use the client as a context
+            manager, to shut down the thread pool.
         """
         self.session = requests.Session()
         self.authenticator = None  # type: typing.Optional[Authenticator]
@@ -305,6 +627,35 @@ class RequestsClient(HttpClient):
         self.ssl_cert = ssl_cert
         self.future_adapter_class = future_adapter_class
         self.response_adapter_class = response_adapter_class
+        self.max_workers = max_workers
+        self.executor = None  # type: typing.Optional[ThreadPoolExecutor]
+        if max_workers is not None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='bravado-requests',
+            )
+            # Make sure every worker can keep its connection alive
+            if max_workers > requests.adapters.DEFAULT_POOLSIZE:
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+                self.session.mount('http://', adapter)
+                self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        # type: () -> RequestsClient
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (typing.Any, typing.Any, typing.Any) -> None
+        self.close()
+
+    def close(self):
+        # type: () -> None
+        """Shut down the thread pool of the client, if any, once the requests
+        already submitted to it are sent, and close the session.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+        self.session.close()
 
     def __hash__(self):
         # type: () -> int
@@ -315,6 +666,7 @@ class RequestsClient(HttpClient):
             self.ssl_cert,
             self.future_adapter_class,
             self.response_adapter_class,
+            self.max_workers,
         ))
 
     def __ne__(self, other):
@@ -326,8 +678,8 @@ class RequestsClient(HttpClient):
         return (
             _are_objects_equal(
                 self, other,
-                # requests.Session does not define equality methods
-                attributes_to_ignore={'session'},
+                # requests.Session and ThreadPoolExecutor do not define equality methods
+                attributes_to_ignore={'session', 'executor'},
             ) and
             # We're checking for requests.Session to be mostly the same as custom
             # configurations (ie. max_redirects, proxies, SSL verification, etc.)
@@ -345,7 +697,7 @@ class RequestsClient(HttpClient):
         self,
         request_params,  # type: typing.MutableMapping[str, typing.Any]
     ):
-        # type: (...) -> typing.Tuple[typing.Mapping[str, typing.Any], typing.Mapping[str, typing.Any]]
+        # type: (...) -> typing.Tuple[typing.MutableMapping[str, typing.Any], typing.MutableMapping[str, typing.Any]]  # noqa: E501
         """Splits the passed in dict of request_params into two buckets.
 
         - sanitized_params are valid kwargs for constructing a
@@ -393,16 +745,44 @@ class RequestsClient(HttpClient):
         :rtype: :class: `bravado_core.http_future.HttpFuture`
         """
         sanitized_params, misc_options = self.separate_params(request_params)
+        if request_config is not None and request_config.deadline_at is not None:
+            misc_options['deadline'] = request_config.deadline_at
+        if request_config is not None and (request_config.stream_result or request_config.download_to is not None):
+            misc_options['stream'] = True
+            if request_config.download_to is not None and request_config.download_ranges:
+                misc_options['download_ranges'] = request_config.download_ranges
+
+        # Custom future adapters written before max_workers existed might not accept an executor,
+        # so we only pass it along if it's actually being used.
+        adapter_kwargs = {}  # type: typing.Dict[str, typing.Any]
+        if self.executor is not None:
+            adapter_kwargs['executor'] = self.executor
+
+        sanitized_params = encode_multipart(sanitized_params)
+        api_url = get_api_url()
+        if api_url is None:
+            request = self.authenticated_request(sanitized_params)
+        else:
+            # Authenticators are set up for the host of the API, not for the
+            # ones of the endpoints the load balancer sends requests to
+            request = self.authenticated_request(dict(sanitized_params, url=api_url))
+            request.url = sanitized_params['url']
 
         requests_future = self.future_adapter_class(
             self.session,
-            self.authenticated_request(sanitized_params),
+            request,
             misc_options,
+            **adapter_kwargs
         )
 
+        response_adapter = self.response_adapter_class  # type: typing.Callable[[requests.Response], IncomingResponse]
+        if misc_options.get('download_ranges'):
+            # Lets the response adapter request the other parts of the body
+            response_adapter = functools.partial(self.response_adapter_class, range_sender=requests_future)
+
         return HttpFuture(
             requests_future,
-            self.response_adapter_class,
+            response_adapter,
             operation,
             request_config,
         )
@@ -46,8 +46,20 @@ class BravadoResponseMetadata(typing.Generic[T]):
     :ivar float processing_end_time: monotonic timestamp at which processing the response ended
     :ivar tuple handled_exception_info: 3-tuple of exception class, exception instance and string
         representation of the traceback in case an exception was caught during request processing.
+    :ivar float rate_limit_wait_time: seconds the request waited for the client-side rate limit,
+        see :mod:`bravado.rate_limit`
+    :ivar int attempts: number of times the request was sent, see :mod:`bravado.retry`
+    :ivar float retry_backoff_time: seconds spent waiting between attempts
+    :ivar str circuit_breaker_state: state of the circuit breaker of the operation when the
+        request was made (``closed``, ``open`` or ``half_open``), None if the client doesn't use
+        circuit breakers; see :mod:`bravado.circuit_breaker`
     """
 
+    rate_limit_wait_time = 0.0  # type: float
+    attempts = 1  # type: int
+    retry_backoff_time = 0.0  # type: float
+    circuit_breaker_state = None  # type: typing.Optional[str]
+
     def __init__(
         self,
         incoming_response,  # type: typing.Optional[IncomingResponse]
@@ -100,6 +112,13 @@ class BravadoResponseMetadata(typing.Generic[T]):
         # type: () -> typing.Mapping[typing.Text, typing.Text]
         return self.incoming_response.headers
 
+    @property
+    def cache_status(self):
+        # type: () -> typing.Optional[str]
+        """'hit' or 'revalidated' if the response was served by
+        :class:`bravado.http_cache.CachingHttpClient`, None otherwise."""
+        return getattr(self._incoming_response, 'cache_status', None)
+
     @property
     def is_fallback_result(self):
         # type: () -> bool
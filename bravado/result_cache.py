@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Memoization of unmarshalled results of operations, so that repeated calls with
+the same parameters skip both the request and unmarshalling.
+
+Results are cached for operations with a TTL, set through the
+``result_cache_ttls`` config or the ``x-bravado-cache-ttl`` extension of the
+operation, and shared by all the callers: don't modify cached results.
+"""
+import collections
+import threading
+import typing
+from concurrent.futures import Future
+
+import monotonic
+import six
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+
+from bravado.asyncio_client import AsyncHttpFuture
+from bravado.asyncio_client import AsyncioFutureAdapter
+from bravado.asyncio_client import returns_awaitable_futures
+from bravado.config import get_spec_state
+from bravado.config import RequestConfig
+from bravado.http_client import HttpClient
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+
+
+# Key of a request: (method, url, params, headers, body)
+ResultCacheKey = typing.Tuple[typing.Any, ...]
+
+ResultCacheEntry = typing.NamedTuple(
+    'ResultCacheEntry',
+    (
+        ('incoming_response', IncomingResponse),
+        ('swagger_result', typing.Any),
+        ('expires_at', float),
+    ),
+)
+
+
+class ResultCache(object):
+    """Thread-safe store of unmarshalled results, which evicts expired results
+    and the least recently used ones once it holds max_entries results.
+
+    :param max_entries: max number of results in the cache
+    """
+
+    def __init__(self, max_entries=1024):
+        # type: (int) -> None
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()  # type: typing.MutableMapping[ResultCacheKey, ResultCacheEntry]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._entries)
+
+    def get(self, key):
+        # type: (ResultCacheKey) -> typing.Optional[ResultCacheEntry]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= monotonic.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)  # type: ignore
+            return entry
+
+    def set(self, key, incoming_response, swagger_result, ttl):
+        # type: (ResultCacheKey, IncomingResponse, typing.Any, float) -> None
+        entry = ResultCacheEntry(incoming_response, swagger_result, monotonic.monotonic() + ttl)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)  # type: ignore
+
+    def delete(self, key):
+        # type: (ResultCacheKey) -> None
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        # type: () -> None
+        with self._lock:
+            self._entries.clear()
+
+    def store_callback(self, key, ttl):
+        # type: (ResultCacheKey, float) -> typing.Callable[[IncomingResponse, Operation], None]
+        """Response callback storing the result of successful responses."""
+        def store_result(incoming_response, operation):
+            # type: (IncomingResponse, Operation) -> None
+            if 200 <= incoming_response.status_code < 300 and hasattr(incoming_response, 'swagger_result'):
+                self.set(key, incoming_response, incoming_response.swagger_result, ttl)
+
+        return store_result
+
+
+def get_result_cache(swagger_spec):
+    # type: (typing.Any) -> ResultCache
+    """Return the result cache of the client of the given spec, creating it on first use.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    bravado_config = swagger_spec.config.get('bravado')
+    max_entries = bravado_config.result_cache_max_entries if bravado_config is not None else 1024
+    return get_spec_state(swagger_spec, 'result_cache', lambda: ResultCache(max_entries))
+
+
+def result_cache_key(request_params):
+    # type: (typing.Mapping[str, typing.Any]) -> typing.Optional[ResultCacheKey]
+    """Key of the results of a marshalled request.
+
+    :return: the key, or None if the results of the request can't be cached,
+        e.g. because it uploads files
+    """
+    data = request_params.get('data')
+    if request_params.get('files') or not (data is None or isinstance(data, (six.binary_type, six.text_type))):
+        return None
+    return (
+        request_params['method'],
+        request_params['url'],
+        _freeze(request_params.get('params')),
+        _freeze(request_params.get('headers')),
+        data,
+    )
+
+
+def _freeze(mapping):
+    # type: (typing.Optional[typing.Mapping[typing.Any, typing.Any]]) -> typing.Tuple[typing.Any, ...]
+    return tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in six.iteritems(mapping or {})
+    ))
+
+
+class CachedResultFutureAdapter(FutureAdapter):
+    """Future of a response whose result is cached, without a request."""
+
+    def __init__(self, incoming_response):
+        # type: (IncomingResponse) -> None
+        self._incoming_response = incoming_response
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        return self._incoming_response
+
+    def cancel(self):
+        # type: () -> None
+        pass
+
+
+class CachedResultHttpFuture(HttpFuture):
+    """:class:`bravado.http_future.HttpFuture` of a cached result, which is
+    returned without unmarshalling the response again.
+    """
+
+    def __init__(
+        self,
+        entry,  # type: ResultCacheEntry
+        operation,  # type: Operation
+        request_config,  # type: RequestConfig
+    ):
+        # type: (...) -> None
+        super(CachedResultHttpFuture, self).__init__(
+            CachedResultFutureAdapter(entry.incoming_response),
+            lambda incoming_response: incoming_response,
+            operation,
+            request_config,
+        )
+        self._swagger_result = entry.swagger_result
+
+    def _get_swagger_result(self, incoming_response):
+        # type: (IncomingResponse) -> typing.Any
+        return self._swagger_result
+
+
+class AsyncCachedResultHttpFuture(AsyncHttpFuture):
+    """:class:`bravado.asyncio_client.AsyncHttpFuture` of a cached result, so that
+    calls of clients using :class:`bravado.asyncio_client.AsyncHttpClient` can
+    be awaited whether their result is cached or not.
+    """
+
+    def __init__(
+        self,
+        entry,  # type: ResultCacheEntry
+        operation,  # type: Operation
+        request_config,  # type: RequestConfig
+    ):
+        # type: (...) -> None
+        future = Future()  # type: Future
+        future.set_result(entry.incoming_response)
+        super(AsyncCachedResultHttpFuture, self).__init__(
+            AsyncioFutureAdapter(future),
+            lambda incoming_response: incoming_response,
+            operation,
+            request_config,
+        )
+        self._swagger_result = entry.swagger_result
+
+    def _get_swagger_result(self, incoming_response):
+        # type: (IncomingResponse) -> typing.Any
+        return self._swagger_result
+
+
+def cached_result_future(
+    entry,  # type: ResultCacheEntry
+    http_client,  # type: HttpClient
+    operation,  # type: Operation
+    request_config,  # type: RequestConfig
+):
+    # type: (...) -> HttpFuture
+    """Future of a cached result, of the same kind as the futures the http
+    client returns for requests.
+    """
+    if returns_awaitable_futures(http_client, operation):
+        return AsyncCachedResultHttpFuture(entry, operation, request_config)
+    return CachedResultHttpFuture(entry, operation, request_config)
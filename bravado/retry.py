@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Retries of failed requests, configured with the ``retry_policy`` config and
+the request option of the same name, whose keys override the ones of the
+config:
+
+.. code-block:: python
+
+    config = {
+        'retry_policy': {
+            'max_attempts': 3,
+            'backoff_base': 0.1,
+            'backoff_max': 10,
+        },
+    }
+    client.pet.getPetById(petId=42, _request_options={'retry_policy': {'max_attempts': 5}})
+
+Connection errors, timeouts and responses with a status code in
+``retry_status_codes`` are retried, for idempotent methods only by default.
+Requests uploading files or streaming their body aren't retried, since their
+body is consumed by the first attempt. Attempts are spaced by exponential
+backoff with full jitter, unless the server sends a ``Retry-After`` header;
+the thread waiting for the response sleeps during the backoff, which is
+bounded by its timeout and the deadline of the call. Requests whose pooled
+connection turns out to have been closed by the server are retried right
+away, without counting as an attempt.
+
+Requests sent from a running event loop with
+:class:`bravado.asyncio_client.AsyncHttpClient` aren't retried.
+
+To prevent retry storms, retries are limited by a retry budget shared by all
+the operations of a client: there can be at most ``budget_min_retries`` plus
+``budget_ratio`` retries per request sent over the last ten seconds.
+"""
+import asyncio
+import calendar
+import collections
+import random
+import threading
+import time
+import typing
+from collections.abc import Mapping
+from email.utils import parsedate
+from http.client import RemoteDisconnected
+
+import monotonic
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+
+from bravado.config import get_spec_state
+from bravado.config import RequestConfig
+from bravado.exception import BravadoConnectionError
+from bravado.exception import BravadoRateLimitError
+from bravado.exception import BravadoTimeoutError
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'))
+
+# Errors of connections closed by the server while they were idle in the pool
+_STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError, RemoteDisconnected)
+
+# Length in seconds of the window retries and requests are counted over by RetryBudget
+RETRY_BUDGET_WINDOW = 10.0
+
+
+class RetryPolicy(object):
+    """When and how often to retry requests.
+
+    :param max_attempts: max number of times a request is sent; 1 disables retries
+    :param backoff_base: backoff in seconds before the first retry; it doubles
+        with each attempt, and the actual backoff is a random duration up to it
+    :param backoff_max: max backoff in seconds
+    :param retry_methods: HTTP methods whose requests are retried
+    :param retry_status_codes: status codes of the responses that are retried
+    :param max_retry_after: responses with a longer ``Retry-After`` are not retried
+    :param budget_ratio: ratio of retries to requests allowed by the retry budget
+    :param budget_min_retries: retries allowed by the retry budget regardless of budget_ratio
+    """
+
+    def __init__(
+        self,
+        max_attempts=3,  # type: int
+        backoff_base=0.1,  # type: float
+        backoff_max=10.0,  # type: float
+        retry_methods=IDEMPOTENT_METHODS,  # type: typing.Iterable[typing.Text]
+        retry_status_codes=(429, 502, 503, 504),  # type: typing.Iterable[int]
+        max_retry_after=60.0,  # type: float
+        budget_ratio=0.2,  # type: float
+        budget_min_retries=10,  # type: int
+    ):
+        # type: (...) -> None
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self.max_retry_after = max_retry_after
+        self.budget_ratio = budget_ratio
+        self.budget_min_retries = budget_min_retries
+
+    @classmethod
+    def from_options(cls, *options):
+        # type: (typing.Optional[typing.Mapping[str, typing.Any]]) -> typing.Optional[RetryPolicy]
+        """Build the policy from ``retry_policy`` dicts, later ones overriding earlier ones.
+
+        :return: the policy, or None if none of the dicts is set
+        """
+        if all(option is None for option in options):
+            return None
+        kwargs = {}  # type: typing.Dict[str, typing.Any]
+        for option in options:
+            kwargs.update(option or {})
+        return cls(**kwargs)
+
+    def backoff(self, attempt):
+        # type: (int) -> float
+        """Seconds to wait before sending the given attempt (2 being the first retry)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 2)))
+
+
+class RetryBudget(object):
+    """Limits retries to a ratio of the requests sent over the last
+    :data:`RETRY_BUDGET_WINDOW` seconds. Thread-safe.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        # (window start, requests, retries) of the current and previous windows
+        self._windows = collections.deque(maxlen=2)  # type: typing.Deque[typing.List[float]]
+        self._lock = threading.Lock()
+
+    def _current_window(self):
+        # type: () -> typing.List[float]
+        now = monotonic.monotonic()
+        window_start = now - now % RETRY_BUDGET_WINDOW
+        if not self._windows or self._windows[-1][0] != window_start:
+            self._windows.append([window_start, 0, 0])
+        return self._windows[-1]
+
+    def record_request(self):
+        # type: () -> None
+        with self._lock:
+            self._current_window()[1] += 1
+
+    def try_retry(self, policy):
+        # type: (RetryPolicy) -> bool
+        """Record a retry if the budget allows it.
+
+        :return: whether the request can be retried
+        """
+        return self.try_acquire(policy.budget_ratio, policy.budget_min_retries)
+
+    def try_acquire(self, ratio, min_retries):
+        # type: (float, int) -> bool
+        """Record a retry, or any other extra request, if there were less than
+        min_retries plus ratio extra requests per request over the window.
+
+        :return: whether the extra request can be sent
+        """
+        with self._lock:
+            current_window = self._current_window()
+            windows = [
+                window for window in self._windows
+                if window[0] >= current_window[0] - RETRY_BUDGET_WINDOW
+            ]
+            requests = sum(window[1] for window in windows)
+            retries = sum(window[2] for window in windows)
+            if retries >= min_retries + ratio * requests:
+                return False
+            current_window[2] += 1
+            return True
+
+
+def get_retry_budget(swagger_spec):
+    # type: (typing.Any) -> RetryBudget
+    """Return the retry budget of the client of the given spec, creating it on first use.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    return get_spec_state(swagger_spec, 'retry_budget', RetryBudget)
+
+
+def can_resend(request_params):
+    # type: (typing.Mapping[str, typing.Any]) -> bool
+    """Whether a request can be sent again: uploaded files and streamed bodies
+    (file objects, iterators or multipart encoders) are consumed when it's sent.
+    """
+    data = request_params.get('data')
+    return not request_params.get('files') and (data is None or isinstance(data, (bytes, str, Mapping)))
+
+
+def is_stale_connection_error(exception):
+    # type: (BaseException) -> bool
+    """Whether a connection error was caused by the server closing an idle
+    pooled connection, in which case the request didn't reach the server.
+    """
+    seen = set()  # type: typing.Set[int]
+    exceptions = [exception]
+    while exceptions:
+        exception = exceptions.pop()
+        if id(exception) in seen:
+            continue
+        seen.add(id(exception))
+        if isinstance(exception, _STALE_CONNECTION_ERRORS):
+            return True
+        # requests and urllib3 wrap the original error in their own ones
+        causes = [exception.__cause__, exception.__context__, getattr(exception, 'reason', None)]
+        causes.extend(exception.args)
+        exceptions.extend(cause for cause in causes if isinstance(cause, BaseException))
+    return False
+
+
+def parse_retry_after(value):
+    # type: (typing.Optional[typing.Text]) -> typing.Optional[float]
+    """Seconds to wait according to a Retry-After header value, which is
+    either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = parsedate(value)
+    if parsed is None:
+        return None
+    return max(0.0, calendar.timegm(parsed) - time.time())
+
+
+class RetryingFutureAdapter(FutureAdapter):
+    """Future of a request that is sent again, according to a
+    :class:`RetryPolicy`, if it fails.
+
+    The timeout passed to :meth:`result` bounds all the attempts together.
+
+    :ivar int attempts: number of times the request was sent
+    :ivar float backoff_time: seconds spent waiting between attempts
+    """
+
+    def __init__(
+        self,
+        send_request,  # type: typing.Callable[[], HttpFuture]
+        policy,  # type: RetryPolicy
+        retry_budget,  # type: RetryBudget
+    ):
+        # type: (...) -> None
+        self._send_request = send_request
+        self._policy = policy
+        self._retry_budget = retry_budget
+        self.attempts = 1
+        self.backoff_time = 0.0
+        self._retry_budget.record_request()
+        self._http_future = self.first_http_future = send_request()
+
+    def result(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        deadline = monotonic.monotonic() + timeout if timeout is not None else None
+        resent_stale_request = False
+        while True:
+            remaining = deadline - monotonic.monotonic() if deadline is not None else None
+            try:
+                # Errors of the HTTP client are converted by HttpFuture
+                incoming_response = self._http_future._get_incoming_response(remaining)
+            except BravadoRateLimitError:
+                raise
+            except BravadoConnectionError as e:
+                if is_stale_connection_error(e) and not resent_stale_request:
+                    resent_stale_request = True
+                    self._http_future = self._send_request()
+                    continue
+                self._retry_or_raise(deadline)
+            except BravadoTimeoutError:
+                self._retry_or_raise(deadline)
+            else:
+                if incoming_response.status_code not in self._policy.retry_status_codes:
+                    return incoming_response
+                retry_after = parse_retry_after(incoming_response.headers.get('Retry-After'))
+                if retry_after is not None and retry_after > self._policy.max_retry_after:
+                    return incoming_response
+                backoff = retry_after if retry_after is not None else self._policy.backoff(self.attempts + 1)
+                if not self._can_retry(backoff, deadline):
+                    return incoming_response
+                close = getattr(incoming_response, 'close', None)
+                if close is not None:
+                    close()
+                self._retry(backoff)
+            resent_stale_request = False
+
+    def _can_retry(self, backoff, deadline):
+        # type: (float, typing.Optional[float]) -> bool
+        if self.attempts >= self._policy.max_attempts:
+            return False
+        # Don't sleep past the timeout, there would be no time left for the retry
+        if deadline is not None and monotonic.monotonic() + backoff >= deadline:
+            return False
+        return self._retry_budget.try_retry(self._policy)
+
+    def _retry_or_raise(self, deadline):
+        # type: (typing.Optional[float]) -> None
+        # Called while handling the error of the attempt, which is re-raised
+        backoff = self._policy.backoff(self.attempts + 1)
+        if not self._can_retry(backoff, deadline):
+            raise
+        self._retry(backoff)
+
+    def _retry(self, backoff):
+        # type: (float) -> None
+        # Sleeps in the thread waiting for the response, see _can_retry for the bound
+        self.attempts += 1
+        if backoff > 0:
+            time.sleep(backoff)
+            self.backoff_time += backoff
+        self._retry_budget.record_request()
+        self._http_future = self._send_request()
+
+    def cancel(self):
+        # type: () -> None
+        self._http_future.cancel()
+
+
+def retry_request(
+    policy,  # type: RetryPolicy
+    retry_budget,  # type: RetryBudget
+    send_request,  # type: typing.Callable[[], HttpFuture]
+    request_params,  # type: typing.Mapping[str, typing.Any]
+    operation,  # type: Operation
+    request_config,  # type: RequestConfig
+):
+    # type: (...) -> HttpFuture
+    """Send a request that is retried according to the policy.
+
+    :param send_request: sends the request and returns its :class:`bravado.http_future.HttpFuture`
+    """
+    if (
+        policy.max_attempts <= 1 or
+        request_params['method'].upper() not in policy.retry_methods or
+        not can_resend(request_params)
+    ):
+        return send_request()
+
+    future_adapter = RetryingFutureAdapter(send_request, policy, retry_budget)
+    if asyncio.iscoroutinefunction(future_adapter.first_http_future.response):
+        # Awaitable futures can't be waited for by blocking on them
+        return future_adapter.first_http_future
+
+    http_future = HttpFuture(
+        future_adapter,
+        lambda incoming_response: incoming_response,
+        operation,
+        request_config,
+    )  # type: HttpFuture
+    http_future.rate_limit_wait_time = future_adapter.first_http_future.rate_limit_wait_time
+    return http_future
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescing of identical concurrent calls: while a request is in flight, calls
+of the same operation with the same parameters, headers and body don't send
+another request but share its response and unmarshalled result.
+
+Only GET and HEAD operations are coalesced, if the ``coalesce_requests``
+config or the ``x-bravado-coalesce-requests`` extension of the operation is
+set. Since the result is shared by all the callers, it must not be modified.
+"""
+import asyncio
+import sys
+import threading
+import typing
+
+import six
+from bravado_core.operation import Operation
+from bravado_core.response import IncomingResponse
+
+from bravado.config import get_spec_state
+from bravado.config import RequestConfig
+from bravado.exception import BravadoTimeoutError
+from bravado.http_future import HttpFuture
+from bravado.result_cache import ResultCacheKey
+
+
+class CoalescedCall(object):
+    """Request shared by coalesced calls. The first caller waiting for the
+    response receives and unmarshals it, the others wait for that caller.
+
+    The call is registered before its request is sent, see :meth:`set_http_future`.
+
+    :param on_done: called once the response has been unmarshalled, or has failed
+    """
+
+    def __init__(self, on_done):
+        # type: (typing.Callable[[], None]) -> None
+        self.http_future = None  # type: typing.Optional[HttpFuture]
+        self._on_done = on_done
+        self._sent = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self._done = threading.Event()
+        self._incoming_response = None  # type: typing.Optional[IncomingResponse]
+        self._swagger_result = None  # type: typing.Any
+        # sys.exc_info() of the error raised while getting the response or unmarshalling it
+        self._response_exc_info = None  # type: typing.Any
+        self._result_exc_info = None  # type: typing.Any
+
+    def set_http_future(self, http_future):
+        # type: (typing.Optional[HttpFuture]) -> None
+        """Share the sent request with the other callers, or None if it
+        couldn't be sent or can't be shared.
+        """
+        self.http_future = http_future
+        self._sent.set()
+
+    def wait_sent(self):
+        # type: () -> typing.Optional[HttpFuture]
+        """Wait until the request is sent and return its future, None if it can't be shared."""
+        self._sent.wait()
+        return self.http_future
+
+    def _wait(self, timeout):
+        # type: (typing.Optional[float]) -> None
+        with self._lock:
+            is_first_caller = not self._started
+            self._started = True
+
+        if not is_first_caller:
+            if not self._done.wait(timeout):
+                raise BravadoTimeoutError('Timed out waiting for the response of a coalesced request')
+            return
+
+        http_future = typing.cast(HttpFuture, self.http_future)
+        try:
+            self._incoming_response = http_future._get_incoming_response(timeout)
+        except Exception:
+            self._response_exc_info = sys.exc_info()
+        else:
+            try:
+                self._swagger_result = http_future._get_swagger_result(self._incoming_response)
+            except Exception:
+                self._result_exc_info = sys.exc_info()
+        finally:
+            self._on_done()
+            self._done.set()
+
+    def get_incoming_response(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        self._wait(timeout)
+        if self._response_exc_info is not None:
+            six.reraise(*self._response_exc_info)
+        return typing.cast(IncomingResponse, self._incoming_response)
+
+    def get_swagger_result(self):
+        # type: () -> typing.Any
+        if self._result_exc_info is not None:
+            six.reraise(*self._result_exc_info)
+        return self._swagger_result
+
+
+class CoalescedHttpFuture(HttpFuture):
+    """:class:`bravado.http_future.HttpFuture` of one of the callers of a
+    :class:`CoalescedCall`.
+    """
+
+    def __init__(
+        self,
+        coalesced_call,  # type: CoalescedCall
+        operation,  # type: Operation
+        request_config,  # type: RequestConfig
+    ):
+        # type: (...) -> None
+        http_future = typing.cast(HttpFuture, coalesced_call.http_future)
+        super(CoalescedHttpFuture, self).__init__(
+            http_future.future,
+            http_future.response_adapter,
+            operation,
+            request_config,
+        )
+        self.coalesced_call = coalesced_call
+        # The callers share the request, and so how it was rate limited and let through
+        self.rate_limit_wait_time = http_future.rate_limit_wait_time
+        self.circuit_breaker_state = http_future.circuit_breaker_state
+
+    def cancel(self):
+        # type: () -> None
+        # The request is shared with other callers, it can't be cancelled for one of them
+        pass
+
+    def _get_incoming_response(self, timeout=None):
+        # type: (typing.Optional[float]) -> IncomingResponse
+        return self.coalesced_call.get_incoming_response(timeout)
+
+    def _get_swagger_result(self, incoming_response):
+        # type: (IncomingResponse) -> typing.Any
+        return self.coalesced_call.get_swagger_result()
+
+
+class SingleFlight(object):
+    """Registry of the coalesced requests in flight, by request key."""
+
+    def __init__(self):
+        # type: () -> None
+        self._calls = {}  # type: typing.Dict[ResultCacheKey, CoalescedCall]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._calls)
+
+    def request(
+        self,
+        key,  # type: ResultCacheKey
+        send_request,  # type: typing.Callable[[], HttpFuture]
+        operation,  # type: Operation
+        request_config,  # type: RequestConfig
+    ):
+        # type: (...) -> HttpFuture
+        """Join the request in flight with the given key, or send it with
+        send_request if there is none.
+        """
+        with self._lock:
+            coalesced_call = self._calls.get(key)
+            is_first_call = coalesced_call is None
+            if coalesced_call is None:
+                coalesced_call = self._calls[key] = CoalescedCall(lambda: self._remove(key, coalesced_call))
+
+        if not is_first_call:
+            if coalesced_call.wait_sent() is None:
+                # The request of the first call failed to be sent, or can't be shared
+                return send_request()
+            return CoalescedHttpFuture(coalesced_call, operation, request_config)
+
+        # The request is sent without holding the lock, so that calls with
+        # other keys aren't held up by it
+        try:
+            http_future = send_request()
+        except Exception:
+            self._remove(key, coalesced_call)
+            coalesced_call.set_http_future(None)
+            raise
+        if asyncio.iscoroutinefunction(http_future.response):
+            # Awaitable futures can't be shared by blocking on them
+            self._remove(key, coalesced_call)
+            coalesced_call.set_http_future(None)
+            return http_future
+
+        coalesced_call.set_http_future(http_future)
+        return CoalescedHttpFuture(coalesced_call, operation, request_config)
+
+    def _remove(self, key, coalesced_call):
+        # type: (ResultCacheKey, typing.Optional[CoalescedCall]) -> None
+        with self._lock:
+            if self._calls.get(key) is coalesced_call:
+                del self._calls[key]
+
+
+def get_single_flight(swagger_spec):
+    # type: (typing.Any) -> SingleFlight
+    """Return the registry of coalesced requests of the client of the given
+    spec, creating it on first use.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    return get_spec_state(swagger_spec, 'single_flight', SingleFlight)
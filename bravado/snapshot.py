@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshots of fully built clients.
+
+Building a :class:`bravado.client.SwaggerClient` validates the spec and builds
+all of its resources, operations, params and models, which takes a while for
+big specs. A snapshot stores the result so that it can be loaded without doing
+any of that work again, e.g. in every worker process of a service:
+
+.. code-block:: bash
+
+    python -m bravado.snapshot http://petstore.swagger.io/v2/swagger.json petstore.snapshot
+
+.. code-block:: python
+
+    client = bravado.snapshot.load_snapshot('petstore.snapshot', http_client=RequestsClient())
+
+Snapshots use :mod:`pickle`, so only load snapshots you created yourself. They are
+tied to the bravado and bravado-core versions used to create them; rebuild them
+whenever you upgrade.
+"""
+import argparse
+import io
+import json
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+import typing
+import warnings
+
+import bravado
+from bravado.client import SwaggerClient
+from bravado.http_client import HttpClient
+from bravado.requests_client import RequestsClient
+
+# Increment whenever the structure of snapshots changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Persistent id standing in for the http client in snapshots
+_HTTP_CLIENT_ID = 'http_client'
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickles everything but the http client, which is not part of snapshots."""
+
+    def __init__(self, file, http_client):
+        # type: (typing.BinaryIO, typing.Any) -> None
+        super(_SnapshotPickler, self).__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.http_client = http_client
+
+    def persistent_id(self, obj):
+        # type: (typing.Any) -> typing.Optional[str]
+        if obj is self.http_client:
+            return _HTTP_CLIENT_ID
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, http_client):
+        # type: (typing.Any, HttpClient) -> None
+        super(_SnapshotUnpickler, self).__init__(file)
+        self.http_client = http_client
+
+    def persistent_load(self, pid):
+        # type: (typing.Any) -> typing.Any
+        if pid == _HTTP_CLIENT_ID:
+            return self.http_client
+        raise pickle.UnpicklingError('Unsupported persistent id: {0!r}'.format(pid))
+
+
+def save_snapshot(swagger_client, path):
+    # type: (SwaggerClient, str) -> None
+    """Save a snapshot of a client to a file. The file is replaced atomically,
+    so processes loading the snapshot never see a partially written file.
+
+    The http client of the spec is not part of the snapshot, it needs to be
+    provided when loading the snapshot.
+
+    :param swagger_client: the client to save
+    :param path: path of the snapshot file
+    :raises: ValueError if the spec can't be serialized, e.g. because of
+        user-defined formats that are not defined at module level.
+    """
+    swagger_spec = swagger_client.swagger_spec
+    snapshot = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'bravado_version': bravado.version,
+        'swagger_spec': swagger_spec,
+    }
+    buffer = io.BytesIO()
+    try:
+        _SnapshotPickler(buffer, swagger_spec.http_client).dump(snapshot)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise ValueError('Unable to create a snapshot of {0!r}: {1}'.format(swagger_client, e))
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(buffer.getbuffer())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path, http_client=None):
+    # type: (str, typing.Optional[HttpClient]) -> SwaggerClient
+    """Load a client from a snapshot created by :func:`save_snapshot`, without
+    validating the spec or building its resources and models again.
+
+    The file is memory-mapped rather than read into a buffer first, so the page
+    cache is shared by all the processes loading it. Load the snapshot before
+    forking worker processes to share the loaded objects as well.
+
+    :param path: path of the snapshot file
+    :param http_client: an HTTP client used to perform requests, defaults to
+        a :class:`bravado.requests_client.RequestsClient`
+    :raises: ValueError if the file is not a snapshot with a supported format
+    """
+    http_client = http_client or RequestsClient()
+    with open(path, 'rb') as fp:
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            snapshot = _SnapshotUnpickler(data, http_client).load()
+
+    if not isinstance(snapshot, dict) or snapshot.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError('{0} is not a snapshot supported by this version of bravado'.format(path))
+    if snapshot['bravado_version'] != bravado.version:
+        warnings.warn(
+            'Loading a snapshot created by bravado {0} with bravado {1}. Please recreate the snapshot '
+            'if the client misbehaves.'.format(snapshot['bravado_version'], bravado.version),
+            category=UserWarning,
+        )
+
+    swagger_spec = snapshot['swagger_spec']
+    return SwaggerClient(
+        swagger_spec,
+        also_return_response=swagger_spec.config['bravado'].also_return_response,
+    )
+
+
+def main(argv=None):
+    # type: (typing.Optional[typing.List[str]]) -> int
+    parser = argparse.ArgumentParser(
+        prog='python -m bravado.snapshot',
+        description='Build a client from a Swagger spec and save a snapshot of it.',
+    )
+    parser.add_argument('spec_url', help='URL of the Swagger spec; use file:// URLs for local files')
+    parser.add_argument('output', help='path of the snapshot file to write')
+    parser.add_argument(
+        '--config',
+        default='{}',
+        help='bravado and bravado-core config, as a JSON object',
+    )
+    args = parser.parse_args(argv)
+
+    swagger_client = SwaggerClient.from_url(args.spec_url, config=json.loads(args.config))
+    save_snapshot(swagger_client, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
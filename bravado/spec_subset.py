@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Subsets of specs.
+
+Clients of big, shared specs often only use a few of their resources or
+operations. Building a client for a subset of the spec avoids validating,
+building and keeping in memory the rest of it:
+
+.. code-block:: python
+
+    client = SwaggerClient.from_url(spec_url, config={'include_resources': ['pet']})
+
+Subsets contain the selected operations and everything they (transitively)
+reference within the spec, see :func:`subset_spec`.
+"""
+import typing
+
+from bravado_core.operation import _sanitize_operation_id
+from bravado_core.resource import convert_path_to_resource
+from bravado_core.util import sanitize_name
+from six import iteritems
+from six.moves.urllib.parse import unquote
+
+# Sections of the spec that only keep what the selected operations reference
+_PRUNED_SECTIONS = ('definitions', 'parameters', 'responses')
+
+
+def _is_operation(http_method):
+    # type: (typing.Text) -> bool
+    # vendor extensions and parameters shared by all operations of a path are
+    # defined next to the operations
+    return not http_method.startswith(('x-', '$')) and http_method != 'parameters'
+
+
+def _unescape(token):
+    # type: (typing.Text) -> typing.Text
+    return unquote(token).replace('~1', '/').replace('~0', '~')
+
+
+def _split_local_ref(ref):
+    # type: (typing.Any) -> typing.Optional[typing.Tuple[typing.Text, typing.Text]]
+    """:return: (section, name) of a reference to ``#/section/name[/...]``,
+        None for remote references and references to anything else.
+    """
+    if not isinstance(ref, str) or not ref.startswith('#/'):
+        return None
+    tokens = ref[2:].split('/')
+    if len(tokens) < 2:
+        return None
+    return _unescape(tokens[0]), _unescape(tokens[1])
+
+
+def _iter_refs(spec_fragment):
+    # type: (typing.Any) -> typing.Iterator[typing.Any]
+    stack = [spec_fragment]
+    while stack:
+        fragment = stack.pop()
+        if isinstance(fragment, dict):
+            for key, value in iteritems(fragment):
+                if key == '$ref':
+                    yield value
+                else:
+                    stack.append(value)
+        elif isinstance(fragment, list):
+            stack.extend(fragment)
+
+
+def subset_spec(
+    spec_dict,  # type: typing.Mapping[typing.Text, typing.Any]
+    resources=None,  # type: typing.Optional[typing.Iterable[typing.Text]]
+    operation_ids=None,  # type: typing.Optional[typing.Iterable[typing.Text]]
+):
+    # type: (...) -> typing.Dict[typing.Text, typing.Any]
+    """Return a subset of a spec that only contains the operations of the given
+    resources and the given operations.
+
+    Definitions, parameters and responses that are not (transitively)
+    referenced by the selected operations are removed, except subtypes of
+    polymorphic models as responses may contain them. References to other
+    files are kept as they are; the documents they point to are only fetched if
+    they are referenced by the subset.
+
+    The subset shares the objects it contains with ``spec_dict``, which is
+    not modified.
+
+    :param spec_dict: Swagger spec in dict form
+    :param resources: names of the resources to keep, i.e. the tags of their
+        operations. Sanitized names, as used by the client, work as well.
+    :param operation_ids: operation ids to keep. Sanitized ids, as used by the
+        client, work as well.
+    :raises: ValueError if some of the given resources or operations are not
+        part of the spec.
+    """
+    resources = set(resources or ())
+    operation_ids = set(operation_ids or ())
+    unknown_resources = set(resources)
+    unknown_operation_ids = set(operation_ids)
+
+    paths = {}  # type: typing.Dict[typing.Text, typing.Any]
+    used_tags = set()  # type: typing.Set[typing.Text]
+    for path_name, path_spec in iteritems(spec_dict.get('paths', {})):
+        kept_operations = []
+        for http_method, op_spec in iteritems(path_spec):
+            if not _is_operation(http_method):
+                continue
+            tags = op_spec.get('tags') or [convert_path_to_resource(path_name)]
+            tag_names = set(tags) | {sanitize_name(tag) for tag in tags}
+            op_id = op_spec.get('operationId')
+            op_ids = {op_id, _sanitize_operation_id(op_id, http_method, path_name)}
+
+            matching_resources = tag_names & resources
+            matching_operation_ids = op_ids & operation_ids
+            if matching_resources or matching_operation_ids:
+                unknown_resources -= matching_resources
+                unknown_operation_ids -= matching_operation_ids
+                kept_operations.append(http_method)
+                used_tags.update(tags)
+
+        if kept_operations:
+            paths[path_name] = {
+                key: value
+                for key, value in iteritems(path_spec)
+                if not _is_operation(key) or key in kept_operations
+            }
+
+    if unknown_resources or unknown_operation_ids:
+        raise ValueError(
+            'Unable to subset the spec, it has no resources {0} and no operations {1}'.format(
+                sorted(unknown_resources), sorted(unknown_operation_ids),
+            ),
+        )
+
+    subset = {
+        key: value
+        for key, value in iteritems(spec_dict)
+        if key not in _PRUNED_SECTIONS and key != 'paths'
+    }
+    subset['paths'] = paths
+    if 'tags' in spec_dict:
+        subset['tags'] = [tag for tag in spec_dict['tags'] if tag.get('name') in used_tags]
+
+    # (key, value) = (section, names of the kept objects)
+    kept = {section: set() for section in _PRUNED_SECTIONS}  # type: typing.Dict[typing.Text, typing.Set[typing.Text]]
+    sections = {section: spec_dict.get(section, {}) for section in _PRUNED_SECTIONS}
+
+    def keep_referenced(spec_fragment):
+        # type: (typing.Any) -> None
+        pending = [spec_fragment]
+        while pending:
+            for ref in _iter_refs(pending.pop()):
+                split_ref = _split_local_ref(ref)
+                if split_ref is None:
+                    continue
+                section, name = split_ref
+                if section in kept and name not in kept[section] and name in sections[section]:
+                    kept[section].add(name)
+                    pending.append(sections[section][name])
+                elif section == 'paths' and name not in paths and name in spec_dict['paths']:
+                    paths[name] = spec_dict['paths'][name]
+                    pending.append(paths[name])
+
+    keep_referenced(paths)
+
+    # Responses of polymorphic models may contain any of their subtypes
+    definitions = sections['definitions']
+    # ('definitions', name) of the kept polymorphic models and their subtypes
+    polymorphic = set()  # type: typing.Set[typing.Tuple[typing.Text, typing.Text]]
+    while True:
+        polymorphic.update(
+            ('definitions', name) for name in kept['definitions'] if 'discriminator' in definitions[name]
+        )
+        subtypes = [
+            name for name, definition in iteritems(definitions)
+            if name not in kept['definitions'] and any(
+                _split_local_ref(ref) in polymorphic
+                for ref in _iter_refs(definition.get('allOf', []))
+            )
+        ]
+        if not subtypes:
+            break
+        for name in subtypes:
+            kept['definitions'].add(name)
+            polymorphic.add(('definitions', name))
+            keep_referenced(definitions[name])
+
+    for section, names in iteritems(kept):
+        if section in spec_dict:
+            subset[section] = {
+                name: value
+                for name, value in iteritems(spec_dict[section])
+                if name in names
+            }
+
+    return subset
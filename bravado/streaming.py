@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental processing of response bodies, so that big responses don't need
+to be held in memory as a whole.
+"""
+import codecs
+import hashlib
+import logging
+import re
+import threading
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import msgpack
+import simplejson
+
+
+log = logging.getLogger(__name__)
+
+# Size of the chunks response bodies are read in
+CHUNK_SIZE = 64 * 1024
+
+# Bodies smaller than this are downloaded in one piece even if ranged downloads are enabled
+MIN_RANGED_DOWNLOAD_SIZE = 8 * 1024 * 1024
+
+# Number of times the download of a byte range is resumed after being interrupted
+RANGE_RETRIES = 3
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# File objects or paths binary responses can be downloaded to
+DownloadTarget = typing.Union[typing.Text, typing.BinaryIO]
+
+# States of iter_json_array
+_START = 0
+_FIRST_ITEM = 1
+_ITEM = 2
+_SEPARATOR = 3
+
+
+class RangeMismatchError(IOError):
+    """The server answered a range request with something else than the
+    requested part of the body being downloaded, e.g. because the body changed.
+    """
+
+
+def iter_response_content(response, chunk_size=CHUNK_SIZE):
+    # type: (typing.Any, int) -> typing.Iterator[bytes]
+    """Iterate over the body of a response in chunks.
+
+    Bodies are read from the connection as they're iterated over if the
+    response adapter has an ``iter_content`` method and the request was sent
+    in streaming mode; the whole body is returned as a single chunk otherwise.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :param chunk_size: max size of the chunks
+    """
+    iter_content = getattr(response, 'iter_content', None)
+    if iter_content is not None:
+        for chunk in iter_content(chunk_size):
+            yield chunk
+    else:
+        yield response.raw_bytes
+
+
+def close_response(response):
+    # type: (typing.Any) -> None
+    """Release the connection of a streamed response, if the response adapter supports it.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    """
+    close = getattr(response, 'close', None)
+    if close is not None:
+        close()
+
+
+class DownloadedFile(object):
+    """Binary response body written to a file by the download_to request option.
+
+    :ivar file: file object the body was written to. Files opened from a path
+        are positioned at their start and must be closed by the caller.
+    :ivar path: path of the file if the body was downloaded to a path, None otherwise
+    :ivar int size: size of the body in bytes
+    :ivar str sha256: hex digest of the SHA-256 checksum of the body
+    """
+
+    def __init__(
+        self,
+        file,  # type: typing.BinaryIO
+        path,  # type: typing.Optional[typing.Text]
+        size,  # type: int
+        sha256,  # type: str
+    ):
+        # type: (...) -> None
+        self.file = file
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def __repr__(self):
+        # type: () -> str
+        return '{0}(path={1!r}, size={2}, sha256={3!r})'.format(
+            self.__class__.__name__, self.path, self.size, self.sha256,
+        )
+
+
+def download_to_file(chunks, target):
+    # type: (typing.Iterable[bytes], DownloadTarget) -> DownloadedFile
+    """Write the chunks of a response body to a file, one at a time.
+
+    :param chunks: iterable of chunks of the body
+    :param target: path of the file to write, or a writable binary file object
+    """
+    file, path = _open_target(target)
+
+    size = 0
+    checksum = hashlib.sha256()
+    try:
+        for chunk in chunks:
+            file.write(chunk)
+            size += len(chunk)
+            checksum.update(chunk)
+        file.flush()
+        if path is not None:
+            file.seek(0)
+    except BaseException:
+        if path is not None:
+            file.close()
+        raise
+
+    return DownloadedFile(file=file, path=path, size=size, sha256=checksum.hexdigest())
+
+
+def _open_target(target):
+    # type: (DownloadTarget) -> typing.Tuple[typing.BinaryIO, typing.Optional[typing.Text]]
+    """File object to write a download to, and its path if it was opened from a path."""
+    if isinstance(target, str):
+        return open(target, 'w+b'), target
+    return target, None
+
+
+def can_download_ranges(response):
+    # type: (typing.Any) -> bool
+    """Whether the body of a response is big enough to be downloaded in
+    concurrent byte ranges, and both the server and the response adapter
+    support it.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    """
+    try:
+        size = int(response.headers.get('content-length', ''))
+    except ValueError:
+        return False
+    return size >= MIN_RANGED_DOWNLOAD_SIZE and getattr(response, 'accepts_ranges', False)
+
+
+def download_ranges_to_file(response, target, ranges, chunk_size=CHUNK_SIZE):
+    # type: (typing.Any, DownloadTarget, int, int) -> DownloadedFile
+    """Download the body of a response in concurrent byte ranges, and write
+    them at their offset in a file preallocated to the size of the body.
+
+    The first range is read from the response itself, the others are requested
+    with the ``iter_range`` method of the response adapter. The download of a
+    range that gets interrupted is resumed from the last byte written, up to
+    :data:`RANGE_RETRIES` times. If a range comes from another version of the
+    body, the whole body is downloaded again in a single request with the
+    ``iter_full_body`` method of the response adapter.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :param target: path of the file to write, or a seekable binary file object
+    :param ranges: number of ranges to split the body in
+    :param chunk_size: max size of the chunks ranges are read in
+    :raises: IOError if a range couldn't be downloaded
+    """
+    size = int(response.headers['content-length'])
+    file, path = _open_target(target)
+
+    range_size = -(-size // ranges)
+    offsets = [(start, min(start + range_size, size)) for start in range(0, size, range_size)]
+    lock = threading.Lock()
+    mismatch = threading.Event()
+
+    def write(offset, chunk):
+        # type: (int, bytes) -> None
+        if mismatch.is_set():
+            raise RangeMismatchError('Another range of the body did not match')
+        with lock:
+            file.seek(offset)
+            file.write(chunk)
+
+    def download_range(start, end, chunks):
+        # type: (int, int, typing.Optional[typing.Iterable[bytes]]) -> None
+        try:
+            _download_range(response.iter_range, start, end, write, chunk_size, chunks)
+        except RangeMismatchError:
+            mismatch.set()
+            raise
+
+    try:
+        file.truncate(size)
+        try:
+            with ThreadPoolExecutor(max_workers=len(offsets) - 1 or 1) as executor:
+                futures = [executor.submit(download_range, start, end, None) for start, end in offsets[1:]]
+                start, end = offsets[0]
+                download_range(start, end, iter_response_content(response, chunk_size))
+                close_response(response)
+                for future in futures:
+                    future.result()
+        except RangeMismatchError as e:
+            log.warning('Downloading the body again in a single request: %s', e)
+            close_response(response)
+            file.seek(0)
+            file.truncate(0)
+            downloaded_file = download_to_file(response.iter_full_body(chunk_size), file)
+            file.seek(0)
+            return DownloadedFile(file=file, path=path, size=downloaded_file.size, sha256=downloaded_file.sha256)
+
+        file.flush()
+        file.seek(0)
+        checksum = hashlib.sha256()
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            checksum.update(chunk)
+        file.seek(0)
+    except BaseException:
+        if path is not None:
+            file.close()
+        raise
+
+    return DownloadedFile(file=file, path=path, size=size, sha256=checksum.hexdigest())
+
+
+def _download_range(
+    iter_range,  # type: typing.Callable[[int, int, int], typing.Iterable[bytes]]
+    start,  # type: int
+    end,  # type: int
+    write,  # type: typing.Callable[[int, bytes], None]
+    chunk_size,  # type: int
+    chunks,  # type: typing.Optional[typing.Iterable[bytes]]
+):
+    # type: (...) -> None
+    offset = start
+    retries = RANGE_RETRIES
+    while True:
+        try:
+            if chunks is None:
+                chunks = iter_range(offset, end, chunk_size)
+            for chunk in chunks:
+                chunk = chunk[:end - offset]
+                write(offset, chunk)
+                offset += len(chunk)
+                if offset == end:
+                    return
+            raise IOError('Unexpected end of the byte range {0}-{1}'.format(offset, end - 1))
+        except RangeMismatchError:
+            raise
+        except (IOError, OSError):
+            if retries == 0:
+                raise
+            retries -= 1
+            chunks = None
+
+
+def iter_json_array(chunks):
+    # type: (typing.Iterable[bytes]) -> typing.Iterator[typing.Any]
+    """Parse the items of a JSON array incrementally.
+
+    Items are yielded as soon as the chunks read so far contain them, so only
+    the item being parsed needs to be held in memory rather than the whole
+    document.
+
+    Items are decoded with simplejson, not with the ``json_codec`` config:
+    codecs only parse whole documents.
+
+    :param chunks: iterable of UTF-8 encoded chunks of the JSON document
+    :raises: ValueError if the document is not a JSON array
+    """
+    raw_decode = simplejson.JSONDecoder().raw_decode
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+
+    buffer = u''
+    pos = 0
+    eof = False
+    # What's expected next: the opening bracket, the first item or the closing
+    # bracket, an item, or a separator
+    expected = _START
+    # Decoding an item is only retried once the buffer doubled in size, to
+    # keep big items from being re-parsed on every chunk
+    min_remaining = 0
+
+    while True:
+        whitespace = _WHITESPACE.match(buffer, pos)
+        if whitespace is not None:
+            pos = whitespace.end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expected == _START:
+                if char != u'[':
+                    raise ValueError('Expected a JSON array, got {0!r}'.format(char))
+                expected = _FIRST_ITEM
+                pos += 1
+                continue
+            if char == u']' and expected in (_FIRST_ITEM, _SEPARATOR):
+                return
+            if expected == _SEPARATOR:
+                if char != u',':
+                    raise ValueError('Expected "," or "]" in JSON array, got {0!r}'.format(char))
+                expected = _ITEM
+                pos += 1
+                continue
+
+            if eof or len(buffer) - pos >= min_remaining:
+                try:
+                    item, end = raw_decode(buffer, pos)
+                except ValueError:
+                    if eof:
+                        raise
+                else:
+                    # Numbers at the end of the buffer might continue in the next chunk
+                    if end < len(buffer) or eof:
+                        yield item
+                        pos = end
+                        expected = _SEPARATOR
+                        min_remaining = 0
+                        continue
+                min_remaining = 2 * (len(buffer) - pos)
+
+        if eof:
+            raise ValueError('Unexpected end of JSON array')
+        chunk = next(chunks, None)
+        buffer = buffer[pos:]
+        pos = 0
+        if chunk is None:
+            eof = True
+            buffer += text_decoder.decode(b'', final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+
+def iter_msgpack_array(chunks):
+    # type: (typing.Iterable[bytes]) -> typing.Iterator[typing.Any]
+    """Unpack the items of a msgpack array incrementally.
+
+    Chunks are fed to a :class:`msgpack.Unpacker` only when the data read so
+    far doesn't contain the next item, so only the item being unpacked needs to
+    be held in memory rather than the whole document.
+
+    :param chunks: iterable of chunks of the msgpack document
+    :raises: ValueError if the document is not a msgpack array
+    """
+    unpacker = msgpack.Unpacker(raw=False, max_buffer_size=0)
+    chunks = iter(chunks)
+    length = _read_msgpack(unpacker, chunks, unpacker.read_array_header)
+    for _ in range(length):
+        yield _read_msgpack(unpacker, chunks, unpacker.unpack)
+
+
+def unpack_msgpack(chunks):
+    # type: (typing.Iterable[bytes]) -> typing.Any
+    """Unpack a msgpack document read in chunks.
+
+    The chunks are fed to a :class:`msgpack.Unpacker` as they're read instead
+    of being joined first, so the body is never held in memory twice. A
+    document made of a single chunk is unpacked directly from that chunk.
+
+    :param chunks: iterable of chunks of the msgpack document
+    :raises: ValueError if the document is not valid msgpack
+    """
+    chunks = iter(chunks)
+    first_chunk = next(chunks, b'')
+    second_chunk = next(chunks, None)
+    if second_chunk is None:
+        return msgpack.unpackb(first_chunk, raw=False)
+
+    unpacker = msgpack.Unpacker(raw=False, max_buffer_size=0)
+    unpacker.feed(first_chunk)
+    unpacker.feed(second_chunk)
+    del first_chunk, second_chunk
+    return _read_msgpack(unpacker, chunks, unpacker.unpack)
+
+
+def _read_msgpack(unpacker, chunks, read):
+    # type: (msgpack.Unpacker, typing.Iterator[bytes], typing.Callable[[], typing.Any]) -> typing.Any
+    while True:
+        try:
+            return read()
+        except msgpack.OutOfData:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError('Unexpected end of msgpack document')
+            unpacker.feed(chunk)
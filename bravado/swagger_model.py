@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
+import concurrent.futures
 import contextlib
+import hashlib
 import logging
 import os.path
+import tempfile
+import time
 import typing
 
+import msgpack
 import yaml
 try:
     from yaml import CSafeLoader as SafeLoader
@@ -16,6 +21,8 @@ from six.moves import urllib
 from six.moves.urllib import parse as urlparse
 
 import simplejson
+from bravado.exception import HTTPNotModified
+from bravado.http_future import FALLBACK_EXCEPTIONS
 from bravado.requests_client import RequestsClient
 
 log = logging.getLogger(__name__)
@@ -34,6 +41,7 @@ class FileEventual(object):
 
         def __init__(self, data):
             self.text = data
+            self.raw_bytes = data
             self.headers = {}  # type: typing.Mapping[str, str]
 
         def json(self):
@@ -60,6 +68,46 @@ class FileEventual(object):
         pass
 
 
+class ResponseEventual(object):
+    """Adaptor which supports the :class:`crochet.EventualResult`
+    interface for responses that have been received already.
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+    def wait(self, **kwargs):
+        return self.response
+
+    def result(self, *args, **kwargs):
+        return self.wait(*args, **kwargs)
+
+    def cancel(self):
+        pass
+
+
+def iter_remote_refs(spec_url, spec_dict):
+    """Find the documents referenced by a spec.
+
+    :param spec_url: URL of the spec, relative references are relative to it
+    :param spec_dict: the spec in dict form
+    :return: generator of the absolute URLs, without fragments, of the
+        documents referenced with ``$ref``. URLs can be repeated.
+    """
+    stack = [spec_dict]
+    while stack:
+        fragment = stack.pop()
+        if isinstance(fragment, dict):
+            for key, value in iteritems(fragment):
+                if key == '$ref':
+                    if isinstance(value, str) and not value.startswith('#'):
+                        yield urlparse.urldefrag(urlparse.urljoin(spec_url, value))[0]
+                else:
+                    stack.append(value)
+        elif isinstance(fragment, list):
+            stack.extend(fragment)
+
+
 def request(http_client, url, headers):
     """Download and parse JSON from a URL.
 
@@ -79,17 +127,119 @@ def request(http_client, url, headers):
     return http_client.request(request_params)
 
 
+class SpecCache(object):
+    """On-disk cache of parsed Swagger specs, keyed by URL. Entries are stored
+    in msgpack format together with the ETag and Last-Modified headers of the
+    response, so that they can be revalidated with a conditional request. The
+    modification time of an entry's file is the last time it was validated.
+
+    :param cache_dir: directory to store cached specs in; created if needed.
+    :param max_age: maximum time in seconds since a cached spec was last
+        validated for it to be used when the spec server can't be reached.
+        Defaults to None, which means no limit.
+    """
+
+    def __init__(self, cache_dir, max_age=None):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+
+    def _path(self, url):
+        return os.path.join(
+            self.cache_dir,
+            hashlib.sha256(url.encode('utf-8')).hexdigest() + '.msgpack',
+        )
+
+    def get(self, url):
+        """
+        :param url: URL of the spec
+        :return: dict with the keys spec, etag, last_modified and validated_at,
+            or None if the spec is not cached.
+        """
+        try:
+            with open(self._path(url), 'rb') as fp:
+                entry = msgpack.unpackb(fp.read(), raw=False, strict_map_key=False)
+                validated_at = os.fstat(fp.fileno()).st_mtime
+        except (IOError, OSError):
+            return None
+        except Exception as e:
+            log.warning('Ignoring unreadable cached spec for %s: %s', url, e)
+            return None
+
+        if entry.get('url') != url:
+            return None
+        entry['validated_at'] = validated_at
+        return entry
+
+    def set(self, url, spec_dict, etag=None, last_modified=None):
+        """Store a spec, replacing the previous entry atomically.
+
+        :param url: URL of the spec
+        :param spec_dict: the parsed spec
+        :param etag: value of the ETag response header, if any
+        :param last_modified: value of the Last-Modified response header, if any
+        """
+        entry = {
+            'url': url,
+            'spec': spec_dict,
+            'etag': etag,
+            'last_modified': last_modified,
+        }
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as fp:
+                    fp.write(msgpack.packb(entry, use_bin_type=True))
+                os.replace(tmp_path, self._path(url))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (IOError, OSError, TypeError, ValueError) as e:
+            # Not being able to cache the spec must not prevent the client from working
+            log.warning('Unable to cache spec for %s: %s', url, e)
+
+    def touch(self, url):
+        """Mark the cached spec as validated now, without rewriting it.
+
+        :param url: URL of the spec
+        """
+        try:
+            os.utime(self._path(url), None)
+        except (IOError, OSError) as e:
+            log.warning('Unable to refresh cached spec for %s: %s', url, e)
+
+    def is_usable(self, entry):
+        """
+        :param entry: cache entry as returned by :meth:`get`
+        :return: whether the entry may be used while the spec server is unreachable
+        """
+        return self.max_age is None or time.time() - entry['validated_at'] <= self.max_age
+
+
 class Loader(object):
     """Abstraction for loading Swagger API's.
 
     :param http_client: HTTP client interface.
     :type  http_client: http_client.HttpClient
     :param request_headers: dict of request headers
+    :param spec_cache: optional on-disk cache for specs loaded over http(s)
+    :type  spec_cache: :class:`SpecCache`
+    :param prefetch_workers: if set, remote documents referenced by loaded
+        specs are fetched right away by this many concurrent workers, see
+        :meth:`prefetch_remote_refs`.
+    :param json_codec: optional codec to parse JSON specs with, see the
+        ``json_codec`` config
     """
 
-    def __init__(self, http_client, request_headers=None):
+    def __init__(self, http_client, request_headers=None, spec_cache=None, prefetch_workers=None, json_codec=None):
         self.http_client = http_client
         self.request_headers = request_headers or {}
+        self.spec_cache = spec_cache
+        self.prefetch_workers = prefetch_workers
+        self.json_codec = json_codec
+        # (key, value) = (url, document) of the prefetched remote documents
+        self.prefetched_refs = {}  # type: typing.Dict[typing.Text, typing.Any]
 
     def load_spec(self, spec_url, base_url=None):
         """Load a Swagger Spec from the given URL
@@ -98,18 +248,116 @@ class Loader(object):
         :param base_url: TODO: need this?
         :returns: json spec in dict form
         """
-        response = request(
-            self.http_client,
-            spec_url,
-            self.request_headers,
-        ).result()
-
+        if self.spec_cache is not None and not is_file_scheme_uri(spec_url):
+            spec_dict = self._load_spec_with_cache(spec_url)
+        else:
+            response = request(
+                self.http_client,
+                spec_url,
+                self.request_headers,
+            ).result()
+            spec_dict = self._parse_spec(spec_url, response)
+
+        if self.prefetch_workers:
+            self.prefetch_remote_refs(spec_url, spec_dict)
+        return spec_dict
+
+    def prefetch_remote_refs(self, spec_url, spec_dict):
+        """Fetch the remote documents referenced by a spec, and the ones
+        referenced by those, concurrently. Documents are fetched at most once,
+        even if several documents reference them; the parsed documents are
+        stored in :attr:`prefetched_refs`.
+
+        Resolving the references of the spec one by one would fetch them
+        sequentially. Documents that can't be fetched are skipped, so the
+        error surfaces when the reference is resolved.
+
+        :param spec_url: URL of the spec
+        :param spec_dict: the spec in dict form
+        """
+        def fetch(url):
+            response = request(self.http_client, url, self.request_headers).result()
+            return self._parse_spec(url, response)
+
+        def is_new(url):
+            return (
+                urlparse.urlparse(url).scheme in ('http', 'https') and
+                url != spec_url and
+                url not in self.prefetched_refs and
+                url not in seen_urls
+            )
+
+        # (key, value) = (future, url)
+        pending = {}  # type: typing.Dict[concurrent.futures.Future, typing.Text]
+        seen_urls = set()  # type: typing.Set[typing.Text]
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.prefetch_workers,
+            thread_name_prefix='bravado-prefetch',
+        ) as executor:
+
+            def submit_new(document_url, document):
+                for url in iter_remote_refs(document_url, document):
+                    if is_new(url):
+                        log.debug(u'Prefetching %s', url)
+                        seen_urls.add(url)
+                        pending[executor.submit(fetch, url)] = url
+
+            submit_new(spec_url, spec_dict)
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        document = future.result()
+                    except Exception as e:
+                        log.warning(u'Unable to prefetch %s: %r', url, e)
+                        continue
+                    self.prefetched_refs[url] = document
+                    submit_new(url, document)
+
+    def _parse_spec(self, spec_url, response):
         content_type = response.headers.get('content-type', '').lower()
         if is_yaml(spec_url, content_type):
             return self.load_yaml(response.text)
+        elif self.json_codec is not None:
+            return self.json_codec.loads(response.raw_bytes)
         else:
             return response.json()
 
+    def _load_spec_with_cache(self, spec_url):
+        """Load a spec, revalidating a cached copy with a conditional request
+        if there is one. The cached copy is used if it is still valid, or if
+        the server can't be reached and the copy is not older than the max age
+        of the cache.
+        """
+        entry = self.spec_cache.get(spec_url)
+        headers = dict(self.request_headers)
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = request(self.http_client, spec_url, headers).result()
+        except HTTPNotModified:
+            self.spec_cache.touch(spec_url)
+            return entry['spec']
+        except FALLBACK_EXCEPTIONS as e:
+            if entry is None or not self.spec_cache.is_usable(entry):
+                raise
+            log.warning('Unable to load spec from %s, using cached copy: %r', spec_url, e)
+            return entry['spec']
+
+        spec_dict = self._parse_spec(spec_url, response)
+        self.spec_cache.set(
+            spec_url,
+            spec_dict,
+            etag=response.headers.get('etag'),
+            last_modified=response.headers.get('last-modified'),
+        )
+        return spec_dict
+
     def load_yaml(self, text):
         """Load a YAML Swagger spec from the given string, transforming
         integer response status codes to strings. This is to keep
@@ -246,6 +246,16 @@ def sleep_api():
     return sec_to_sleep
 
 
+@bottle.get('/slow_drip')
+def slow_drip_api():
+    def drip():
+        # Sends a byte every 0.1 second, so that no single read times out
+        for _ in range(int(float(bottle.request.GET.get('sec', '1')) * 10)):
+            yield b' '
+            time.sleep(0.1)
+    return drip()
+
+
 @bottle.get('/redirect')
 def redirect_test():
     return bottle.HTTPResponse(
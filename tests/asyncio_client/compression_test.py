@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import gzip
+
+import mock
+import pytest
+
+from bravado.asyncio_client import AsyncHttpClient
+from bravado.compression import ACCEPT_ENCODING
+
+
+BODY = b'{"a": 1}' * 100
+
+
+def _read_response(response_bytes):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(response_bytes)
+        reader.feed_eof()
+        status_line = await reader.readline()
+        return await AsyncHttpClient._read_response(reader, status_line, 'GET')
+
+    return asyncio.run(read())[0]
+
+
+def test_content_length_body_is_decompressed():
+    compressed_body = gzip.compress(BODY)
+    response = _read_response(
+        b'HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: ' +
+        str(len(compressed_body)).encode('ascii') + b'\r\n\r\n' + compressed_body,
+    )
+
+    assert response.body == BODY
+
+
+@pytest.mark.parametrize('chunk_size', (1, 10, 1000))
+def test_chunked_body_is_decompressed(chunk_size):
+    compressed_body = gzip.compress(BODY)
+    chunks = b''.join(
+        '{0:x}\r\n'.format(len(compressed_body[i:i + chunk_size])).encode('ascii') +
+        compressed_body[i:i + chunk_size] + b'\r\n'
+        for i in range(0, len(compressed_body), chunk_size)
+    )
+    response = _read_response(
+        b'HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nTransfer-Encoding: chunked\r\n\r\n' + chunks + b'0\r\n\r\n',
+    )
+
+    assert response.body == BODY
+
+
+def test_accept_encoding_is_sent(run_with_server):
+    http_client = AsyncHttpClient()
+    sent_headers = []
+
+    async def check(url, server):
+        original_serialize_request = http_client._serialize_request
+
+        def serialize_request(method, target, headers, body):
+            sent_headers.append(dict(headers))
+            return original_serialize_request(method, target, headers, body)
+
+        with mock.patch.object(http_client, '_serialize_request', side_effect=serialize_request):
+            await http_client.send({'method': 'GET', 'url': url, 'params': {}})
+        await http_client.close()
+
+    run_with_server(check)
+
+    assert sent_headers[0]['Accept-Encoding'] == ACCEPT_ENCODING
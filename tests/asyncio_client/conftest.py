@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+
+RESPONSE = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: application/json\r\n'
+    b'Transfer-Encoding: chunked\r\n\r\n'
+    b'4\r\n{"a"\r\n4\r\n: 1}\r\n0\r\n\r\n'
+)
+
+
+class KeepAliveServer(object):
+    """Minimal HTTP/1.1 server answering every request with the same keep-alive response.
+
+    :ivar response_parts: parts of the response, each sent after waiting ``part_delay`` seconds
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self.response_parts = [RESPONSE]
+        self.part_delay = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            while (await reader.readline()) not in (b'\r\n', b''):
+                pass
+            self.requests.append(request_line)
+            for part in self.response_parts:
+                if self.part_delay:
+                    await asyncio.sleep(self.part_delay)
+                writer.write(part)
+                await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+def run_with_server():
+    """Runs the coroutine function passed as argument with the URL of a KeepAliveServer."""
+    def run(coroutine_function):
+        async def main():
+            server = KeepAliveServer()
+            tcp_server = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+            port = tcp_server.sockets[0].getsockname()[1]
+            try:
+                await coroutine_function('http://127.0.0.1:{}'.format(port), server)
+            finally:
+                tcp_server.close()
+        asyncio.run(main())
+    return run
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import mock
+import pytest
+
+from bravado.asyncio_client import AsyncHttpClient
+
+
+def _add_stale_connection(http_client, url):
+    """Add a pooled connection that looks alive but is closed when the request is sent."""
+    reader = mock.Mock(spec=asyncio.StreamReader)
+    reader.at_eof.return_value = False
+    reader.readline = mock.AsyncMock(return_value=b'')
+    writer = mock.Mock(spec=asyncio.StreamWriter)
+    writer.is_closing.return_value = False
+    writer.drain = mock.AsyncMock()
+    port = int(url.rsplit(':', 1)[1])
+    http_client._get_pool().release(('http', '127.0.0.1', port), (reader, writer))
+    return writer
+
+
+def test_connections_are_reused(run_with_server):
+    http_client = AsyncHttpClient()
+
+    async def check(url, server):
+        for _ in range(3):
+            response = await http_client.send({'method': 'GET', 'url': url + '/json', 'params': {}})
+            assert response.status_code == 200
+            assert response.body == b'{"a": 1}'
+        await http_client.close()
+
+        assert server.connections == 1
+        assert len(server.requests) == 3
+
+    run_with_server(check)
+
+
+def test_idle_connections_are_bounded(run_with_server):
+    http_client = AsyncHttpClient(max_idle_connections_per_host=0)
+
+    async def check(url, server):
+        for _ in range(2):
+            await http_client.send({'method': 'GET', 'url': url, 'params': {}})
+
+        assert server.connections == 2
+
+    run_with_server(check)
+
+
+def test_stale_connection_is_replaced(run_with_server):
+    http_client = AsyncHttpClient()
+
+    async def check(url, server):
+        await http_client.send({'method': 'GET', 'url': url, 'params': {}})
+        # simulate the server closing the idle connection
+        for idle in http_client._get_pool()._idle.values():
+            for reader, _ in idle:
+                reader.feed_eof()
+
+        response = await http_client.send({'method': 'GET', 'url': url, 'params': {}})
+
+        assert response.status_code == 200
+        assert server.connections == 2
+
+    run_with_server(check)
+
+
+def test_request_line_and_query_string(run_with_server):
+    http_client = AsyncHttpClient()
+
+    async def check(url, server):
+        await http_client.send({'method': 'GET', 'url': url + '/echo', 'params': {'message': 'a b'}})
+
+        assert server.requests == [b'GET /echo?message=a+b HTTP/1.1\r\n']
+
+    run_with_server(check)
+
+
+def test_stale_connection_is_replayed_for_idempotent_methods(run_with_server):
+    http_client = AsyncHttpClient()
+
+    async def check(url, server):
+        stale_writer = _add_stale_connection(http_client, url)
+
+        response = await http_client.send({'method': 'PUT', 'url': url, 'params': {}})
+
+        assert response.status_code == 200
+        assert stale_writer.write.call_count == 1
+        assert len(server.requests) == 1
+
+    run_with_server(check)
+
+
+def test_stale_connection_is_not_replayed_for_non_idempotent_methods(run_with_server):
+    http_client = AsyncHttpClient()
+
+    async def check(url, server):
+        _add_stale_connection(http_client, url)
+
+        with pytest.raises(ConnectionResetError):
+            await http_client.send({'method': 'POST', 'url': url, 'params': {}})
+
+        assert server.requests == []
+
+    run_with_server(check)
+
+
+def test_timeout_bounds_the_whole_response(run_with_server):
+    http_client = AsyncHttpClient()
+
+    async def check(url, server):
+        # Each part arrives within the timeout, but not the whole response
+        server.response_parts = [b'HTTP/1.1 200 OK\r\n', b'Content-Length: 2\r\n\r\n', b'{}']
+        server.part_delay = 0.1
+
+        with pytest.raises(asyncio.TimeoutError):
+            await http_client.send({'method': 'GET', 'url': url, 'params': {}, 'timeout': 0.25})
+
+    run_with_server(check)
+
+
+def test_repeated_headers_are_kept(run_with_server):
+    http_client = AsyncHttpClient()
+
+    async def check(url, server):
+        server.response_parts = [
+            b'HTTP/1.1 200 OK\r\n'
+            b'Set-Cookie: a=1\r\n'
+            b'Set-Cookie: b=2\r\n'
+            b'Content-Length: 0\r\n\r\n',
+        ]
+
+        response = await http_client.send({'method': 'GET', 'url': url, 'params': {}})
+
+        assert response.headers.getlist('set-cookie') == ['a=1', 'b=2']
+        assert response.headers['Content-Length'] == '0'
+
+    run_with_server(check)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import io
+
+from bravado.asyncio_client import AsyncHttpClient
+
+
+def test_prepare_request_joins_generator_bodies():
+    def body():
+        yield b'foo'
+        yield u'bar'
+
+    _, _, headers, body_bytes = AsyncHttpClient.prepare_request({
+        'method': 'POST',
+        'url': 'http://localhost/pets',
+        'data': body(),
+    })
+
+    assert body_bytes == b'foobar'
+    assert 'Transfer-Encoding' not in headers
+    assert headers['Content-Length'] == '6'
+
+
+def test_prepare_request_reads_file_bodies():
+    _, _, headers, body_bytes = AsyncHttpClient.prepare_request({
+        'method': 'POST',
+        'url': 'http://localhost/pets',
+        'data': io.BytesIO(b'foobar'),
+    })
+
+    assert body_bytes == b'foobar'
+    assert 'Transfer-Encoding' not in headers
+    assert headers['Content-Length'] == '6'
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import mock
+import pytest
+
+from bravado.asyncio_client import AsyncHttpClient
+from bravado.asyncio_client import AsyncHttpFuture
+from bravado.asyncio_client import AsyncioFutureAdapter
+from bravado.circuit_breaker import circuit_breaker_request
+from bravado.circuit_breaker import CircuitBreaker
+from bravado.circuit_breaker import CircuitBreakers
+from bravado.circuit_breaker import CLOSED
+from bravado.circuit_breaker import HALF_OPEN
+from bravado.circuit_breaker import OPEN
+from bravado.config import bravado_config_from_config_dict
+from bravado.config import RequestConfig
+from bravado.exception import BravadoCircuitOpenError
+from bravado.exception import BravadoRateLimitError
+from bravado.exception import BravadoTimeoutError
+
+
+@pytest.fixture
+def operation():
+    operation = mock.Mock(operation_id='getPetById')
+    operation.swagger_spec.config = {'bravado': bravado_config_from_config_dict({})}
+    return operation
+
+
+def test_opens_after_consecutive_failures(mock_monotonic):
+    breaker = CircuitBreaker(failure_threshold=3)
+
+    for _ in range(2):
+        breaker.allow_request()
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(BravadoCircuitOpenError) as excinfo:
+        breaker.allow_request()
+    assert excinfo.value.retry_after == 30
+
+
+def test_opens_on_error_rate(mock_monotonic):
+    breaker = CircuitBreaker(failure_threshold=100, error_rate_threshold=0.5, min_calls=4)
+
+    for _ in range(4):
+        breaker.record_success()
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_closes_breaker(mock_monotonic):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+
+    mock_monotonic.return_value += 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() == HALF_OPEN
+    # Only one probe at a time
+    with pytest.raises(BravadoCircuitOpenError):
+        breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request() == CLOSED
+
+
+def test_half_open_probe_failure_opens_breaker(mock_monotonic):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    mock_monotonic.return_value += 10
+    breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+
+
+def test_abandoned_probe_expires(mock_monotonic):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    mock_monotonic.return_value += 10
+    breaker.allow_request()
+
+    mock_monotonic.return_value += 10
+
+    assert breaker.allow_request() == HALF_OPEN
+
+
+def test_circuit_breakers_by_host_and_operation():
+    circuit_breakers = CircuitBreakers(failure_threshold=1)
+
+    assert circuit_breakers.get('host', 'getPetById') is circuit_breakers.get('host', 'getPetById')
+    assert circuit_breakers.get('host', 'getPetById') is not circuit_breakers.get('otherhost', 'getPetById')
+    assert circuit_breakers.get('host', 'getPetById').failure_threshold == 1
+
+
+def _circuit_breaker_request(circuit_breakers, send_request, operation):
+    return circuit_breaker_request(
+        circuit_breakers,
+        send_request,
+        {'url': 'http://petstore.swagger.io/v2/pet/42'},
+        operation,
+        RequestConfig({}, also_return_response_default=False),
+    )
+
+
+def test_circuit_breaker_request_records_outcomes(mock_monotonic, operation):
+    circuit_breakers = CircuitBreakers(failure_threshold=2)
+    send_request = mock.Mock()
+    send_request.return_value.rate_limit_wait_time = 0.0
+    send_request.return_value.future.attempts = 2
+    send_request.return_value._get_incoming_response.side_effect = [
+        BravadoTimeoutError(),
+        mock.Mock(status_code=503),
+    ]
+
+    with pytest.raises(BravadoTimeoutError):
+        _circuit_breaker_request(circuit_breakers, send_request, operation).response()
+    with mock.patch('bravado.http_future.unmarshal_response'):
+        response = _circuit_breaker_request(circuit_breakers, send_request, operation).response()
+    assert response.metadata.circuit_breaker_state == CLOSED
+    assert response.metadata.attempts == 2
+
+    http_future = _circuit_breaker_request(circuit_breakers, send_request, operation)
+    response = http_future.response(fallback_result='fallback')
+
+    assert send_request.call_count == 2
+    assert response.result == 'fallback'
+    assert response.metadata.circuit_breaker_state == OPEN
+    assert isinstance(response.metadata.handled_exception_info[1], BravadoCircuitOpenError)
+
+
+def test_circuit_breaker_request_does_not_record_rate_limit_errors(mock_monotonic, operation):
+    circuit_breakers = CircuitBreakers(failure_threshold=1)
+    send_request = mock.Mock()
+    send_request.return_value._get_incoming_response.side_effect = BravadoRateLimitError(1)
+
+    for _ in range(2):
+        with pytest.raises(BravadoRateLimitError):
+            _circuit_breaker_request(circuit_breakers, send_request, operation).response()
+
+    assert send_request.call_count == 2
+    assert circuit_breakers.get('petstore.swagger.io', 'getPetById').state == CLOSED
+
+
+def test_circuit_breaker_request_records_outcomes_of_awaitable_futures(mock_monotonic, operation):
+    operation.swagger_spec.http_client = AsyncHttpClient()
+    circuit_breakers = CircuitBreakers(failure_threshold=1)
+
+    async def wait_for_response():
+        pass  # pragma: no cover
+
+    def send_request():
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(mock.Mock(status_code=503))
+        return mock.Mock(response=wait_for_response, future=AsyncioFutureAdapter(future))
+
+    async def call():
+        http_future = _circuit_breaker_request(circuit_breakers, send_request, operation)
+        # The outcome is recorded by a done callback
+        await asyncio.sleep(0)
+        short_circuited_future = _circuit_breaker_request(circuit_breakers, send_request, operation)
+        assert isinstance(short_circuited_future, AsyncHttpFuture)
+        return http_future, await short_circuited_future.response(fallback_result='fallback')
+
+    http_future, response = asyncio.run(call())
+
+    assert http_future.circuit_breaker_state == CLOSED
+    assert response.result == 'fallback'
+    assert response.metadata.circuit_breaker_state == OPEN
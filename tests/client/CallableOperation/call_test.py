@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import httpretty
+import pytest
+
+from bravado.client import SwaggerClient
+
+
+PET_URL = 'http://petstore.swagger.io/v2/pet/42'
+
+
+@pytest.fixture
+def register_pet():
+    httpretty.enable()
+    httpretty.register_uri(
+        httpretty.GET, PET_URL,
+        body='{"id": 42, "name": "Lulu", "photoUrls": []}',
+        content_type='application/json',
+    )
+    yield
+    httpretty.disable()
+    httpretty.reset()
+
+
+def _requests_count():
+    return len(httpretty.latest_requests())
+
+
+def test_results_are_cached(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(petstore_dict, config={'result_cache_ttls': {'getPetById': 60}})
+
+    pet = client.pet.getPetById(petId=42).response().result
+    response = client.pet.getPetById(petId=42).response()
+
+    assert response.result is pet
+    assert response.metadata.status_code == 200
+    assert _requests_count() == 1
+
+
+def test_results_are_cached_with_extension(petstore_dict, register_pet):
+    petstore_dict = copy.deepcopy(petstore_dict)
+    petstore_dict['paths']['/pet/{petId}']['get']['x-bravado-cache-ttl'] = 60
+    client = SwaggerClient.from_spec(petstore_dict)
+
+    client.pet.getPetById(petId=42).response()
+    client.pet.getPetById(petId=42).response()
+
+    assert _requests_count() == 1
+
+
+def test_results_are_not_cached_without_ttl(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(petstore_dict)
+
+    client.pet.getPetById(petId=42).response()
+    client.pet.getPetById(petId=42).response()
+
+    assert _requests_count() == 2
+
+
+def test_bypass_result_cache(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(petstore_dict, config={'result_cache_ttls': {'getPetById': 60}})
+
+    pet = client.pet.getPetById(petId=42).response().result
+    response = client.pet.getPetById(petId=42, _request_options={'bypass_result_cache': True}).response()
+
+    assert response.result is not pet
+    assert client.pet.getPetById(petId=42).response().result is pet
+    assert _requests_count() == 2
+
+
+def test_concurrent_calls_are_coalesced(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(petstore_dict, config={'coalesce_requests': True})
+
+    futures = [client.pet.getPetById(petId=42) for _ in range(3)]
+    pets = [future.response().result for future in futures]
+
+    assert all(pet is pets[0] for pet in pets)
+    assert _requests_count() == 1
+
+
+def test_concurrent_calls_are_not_coalesced_by_default(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(petstore_dict)
+
+    futures = [client.pet.getPetById(petId=42) for _ in range(2)]
+    for future in futures:
+        future.response()
+
+    assert _requests_count() == 2
+
+
+def test_rate_limited_calls(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        config={'rate_limits': {'operations': {'getPetById': (0.001, 1)}}, 'rate_limit_mode': 'fail_fast'},
+    )
+
+    assert client.pet.getPetById(petId=42).response().metadata.rate_limit_wait_time == 0
+    response = client.pet.getPetById(petId=42).response(fallback_result=None)
+
+    assert response.metadata.is_fallback_result
+    assert _requests_count() == 1
+
+
+def test_failed_calls_are_retried(petstore_dict, register_pet):
+    httpretty.register_uri(
+        httpretty.GET, PET_URL,
+        responses=[
+            httpretty.Response(body='', status=503),
+            httpretty.Response(body='{"id": 42, "name": "Lulu", "photoUrls": []}', content_type='application/json'),
+        ],
+    )
+    client = SwaggerClient.from_spec(petstore_dict, config={'retry_policy': {'backoff_base': 0}})
+
+    response = client.pet.getPetById(petId=42).response()
+
+    assert response.result.name == 'Lulu'
+    assert response.metadata.attempts == 2
+    assert _requests_count() == 2
+
+
+def test_circuit_breaker_short_circuits_calls(petstore_dict, register_pet):
+    httpretty.register_uri(
+        httpretty.GET, PET_URL,
+        responses=[httpretty.Response(body='', status=500) for _ in range(3)],
+    )
+    client = SwaggerClient.from_spec(petstore_dict, config={'circuit_breaker': {'failure_threshold': 2}})
+
+    for _ in range(3):
+        response = client.pet.getPetById(petId=42).response(fallback_result=None)
+        assert response.metadata.is_fallback_result
+
+    assert response.metadata.circuit_breaker_state == 'open'
+    assert _requests_count() == 2
+
+
+def test_fast_calls_are_not_hedged(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(petstore_dict, config={'hedging': {'delay': 5}})
+
+    response = client.pet.getPetById(petId=42).response()
+
+    assert response.result.name == 'Lulu'
+    assert _requests_count() == 1
+
+
+def test_remaining_time_is_sent_in_deadline_header(petstore_dict, register_pet):
+    client = SwaggerClient.from_spec(petstore_dict, config={'deadline_header': 'X-Request-Timeout-Ms'})
+
+    client.pet.getPetById(petId=42, _request_options={'deadline': 10}).response()
+    client.pet.getPetById(petId=42).response()
+
+    first_request, second_request = httpretty.latest_requests()
+    assert 9000 < int(first_request.headers['X-Request-Timeout-Ms']) <= 10000
+    assert 'X-Request-Timeout-Ms' not in second_request.headers
+
+
+def test_calls_are_balanced_across_endpoints(petstore_dict, register_pet):
+    for host in ('10.0.0.1:8080', '10.0.0.2:8080'):
+        httpretty.register_uri(
+            httpretty.GET, 'http://{0}/v2/pet/42'.format(host),
+            body='{"id": 42, "name": "Lulu", "photoUrls": []}',
+            content_type='application/json',
+        )
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        config={'load_balancing': {
+            'endpoints': ['http://10.0.0.1:8080', 'http://10.0.0.2:8080'],
+            'strategy': 'least_outstanding',
+        }},
+    )
+
+    futures = [client.pet.getPetById(petId=42) for _ in range(2)]
+    pets = [future.response().result for future in futures]
+
+    assert [pet.name for pet in pets] == ['Lulu', 'Lulu']
+    assert sorted(request.headers['Host'] for request in httpretty.latest_requests()) == [
+        '10.0.0.1:8080', '10.0.0.2:8080',
+    ]
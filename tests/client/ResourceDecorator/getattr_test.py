@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from bravado.client import CallableOperation
+
+
+def test_operation_wrapper_is_reused(petstore_client):
+    operation = petstore_client.pet.getPetById
+
+    assert type(operation) is CallableOperation
+    assert petstore_client.pet.getPetById is operation
+
+
+def test_operation_not_found(petstore_client):
+    with pytest.raises(AttributeError):
+        petstore_client.pet.foo
@@ -6,7 +6,11 @@ from bravado.client import SwaggerClient
 
 
 def test_resource_exists(petstore_client):
-    assert type(petstore_client.pet) == ResourceDecorator
+    assert type(petstore_client.pet) is ResourceDecorator
+
+
+def test_resource_wrapper_is_reused(petstore_client):
+    assert petstore_client.pet is petstore_client.pet
 
 
 def test_resource_not_found(petstore_client):
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import mock
+import pytest
+from bravado_core.spec import Spec
+
+from bravado.client import build_ref_handlers
+from bravado.client import build_spec
+from bravado.client import SwaggerClient
+from bravado.lazy_spec import LazySpec
+
+
+DOCUMENTS = {
+    'http://localhost/models.json': {
+        'Pet': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+    },
+}
+
+
+@pytest.fixture
+def spec_dict():
+    return {
+        'swagger': '2.0',
+        'info': {'title': 'Petstore', 'version': '1.0'},
+        'host': 'localhost',
+        'paths': {
+            '/pet': {
+                'get': {
+                    'operationId': 'getPet',
+                    'tags': ['pet'],
+                    'responses': {
+                        '200': {'description': 'A pet', 'schema': {'$ref': 'models.json#/Pet'}},
+                    },
+                },
+            },
+        },
+    }
+
+
+def test_build_ref_handlers_serves_documents():
+    http_client = mock.Mock()
+
+    handlers = build_ref_handlers(http_client, DOCUMENTS)
+
+    assert handlers['http']('http://localhost/models.json') is DOCUMENTS['http://localhost/models.json']
+    assert handlers['https']('http://localhost/models.json') is DOCUMENTS['http://localhost/models.json']
+    assert http_client.request.call_count == 0
+
+
+def test_build_ref_handlers_downloads_other_documents():
+    http_client = mock.Mock()
+    response = http_client.request.return_value.result.return_value
+    response.headers = {'content-type': 'application/json'}
+    response.json.return_value = {'Other': {'type': 'string'}}
+
+    handlers = build_ref_handlers(http_client, DOCUMENTS)
+
+    assert handlers['http']('http://localhost/other.json') == {'Other': {'type': 'string'}}
+    assert http_client.request.call_args[0][0]['url'] == 'http://localhost/other.json'
+
+
+@pytest.mark.parametrize('spec_class', (Spec, LazySpec))
+def test_build_spec_resolves_prefetched_refs(spec_dict, spec_class):
+    http_client = mock.Mock()
+    request = http_client.request
+
+    swagger_spec = build_spec(
+        spec_class, spec_dict, 'http://localhost/swagger.json', http_client, {}, DOCUMENTS,
+    )
+
+    assert 'get_ref_handlers' not in swagger_spec.__dict__
+    assert http_client.request is request
+    assert swagger_spec.resources['pet'].operations['getPet'] is not None
+    assert request.call_count == 0
+
+
+def test_prefetched_refs_are_not_kept_by_the_http_client(spec_dict):
+    http_client = mock.Mock()
+    request = http_client.request
+
+    client = SwaggerClient.from_spec(
+        spec_dict,
+        'http://localhost/swagger.json',
+        http_client,
+        {'validate_responses': False},
+        prefetched_refs=DOCUMENTS,
+    )
+
+    # Later requests without an operation are sent, not served from the prefetched documents
+    assert http_client.request is request
+    assert client.pet.getPet is not None
+    assert request.call_count == 0
+
+
+def test_build_ref_handlers_decodes_downloaded_documents_with_json_codec():
+    http_client = mock.Mock()
+    response = http_client.request.return_value.result.return_value
+    response.headers = {'content-type': 'application/json'}
+    response.raw_bytes = b'{"Other": {"type": "string"}}'
+    json_codec = mock.Mock()
+    json_codec.loads.return_value = {'Other': {'type': 'string'}}
+
+    handlers = build_ref_handlers(http_client, DOCUMENTS, json_codec)
+
+    assert handlers['http']('http://localhost/other.json') == {'Other': {'type': 'string'}}
+    json_codec.loads.assert_called_once_with(b'{"Other": {"type": "string"}}')
+    assert response.json.call_count == 0
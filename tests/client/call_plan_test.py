@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from bravado_core.operation import Operation
+
+from bravado.client import get_call_plan
+
+
+def test_call_plan_is_cached(minimal_swagger_spec, getPetById_spec):
+    op = Operation.from_spec(minimal_swagger_spec, '/pet/{petId}', 'get', getPetById_spec)
+
+    assert get_call_plan(op) is get_call_plan(op)
+
+
+def test_call_plan(minimal_swagger_spec, getPetById_spec):
+    op = Operation.from_spec(minimal_swagger_spec, '/pet/{petId}', 'get', getPetById_spec)
+
+    call_plan = get_call_plan(op)
+
+    assert call_plan.method == 'GET'
+    assert call_plan.required_params == {'petId'}
+    # api_key is a header param, so it might be set through the request options
+    assert [name for name, _, _, _, _ in call_plan.implicit_params] == ['petId', 'api_key']
+
+
+def test_call_plan_url_follows_api_url(minimal_swagger_spec, getPetById_spec):
+    op = Operation.from_spec(minimal_swagger_spec, '/pet/{petId}', 'get', getPetById_spec)
+    call_plan = get_call_plan(op)
+
+    assert call_plan.get_url(minimal_swagger_spec.api_url) == 'http://localhost/pet/{petId}'
+    assert call_plan.get_url('http://otherhost/v1/') == 'http://otherhost/v1/pet/{petId}'
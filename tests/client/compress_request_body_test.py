@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import gzip
+import json
+
+import pytest
+
+from bravado.client import compress_request_body
+from bravado.client import construct_request
+from bravado.client import SwaggerClient
+
+
+BODY = {'name': 'Lulu', 'photoUrls': ['http://example.com/lulu.png'] * 100}
+
+
+@pytest.fixture
+def petstore_dict_compressing_add_pet(petstore_dict):
+    petstore_dict['paths']['/pet']['post']['x-bravado-compress-request'] = 'gzip'
+    return petstore_dict
+
+
+def test_compress_request_option(petstore_dict):
+    add_pet_op = SwaggerClient.from_spec(petstore_dict).pet.addPet.operation
+
+    request = construct_request(add_pet_op, {'compress_request': 'gzip'}, body=BODY)
+
+    assert request['headers']['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(request['data']).decode('utf-8')) == BODY
+
+
+def test_compress_request_extension(petstore_dict_compressing_add_pet):
+    add_pet_op = SwaggerClient.from_spec(petstore_dict_compressing_add_pet).pet.addPet.operation
+
+    request = construct_request(add_pet_op, {}, body=BODY)
+
+    assert request['headers']['Content-Encoding'] == 'gzip'
+
+
+def test_compress_request_option_overrides_extension(petstore_dict_compressing_add_pet):
+    add_pet_op = SwaggerClient.from_spec(petstore_dict_compressing_add_pet).pet.addPet.operation
+
+    request = construct_request(add_pet_op, {'compress_request': None}, body=BODY)
+
+    assert 'Content-Encoding' not in request['headers']
+    assert json.loads(request['data']) == BODY
+
+
+@pytest.mark.parametrize(
+    'data',
+    (None, b'small body', {'form': 'data'}),
+)
+def test_body_not_compressed(data):
+    request = {'headers': {}, 'data': data}
+
+    compress_request_body(request, 'gzip')
+
+    assert request == {'headers': {}, 'data': data}
+
+
+def test_unsupported_encoding():
+    with pytest.raises(ValueError):
+        compress_request_body({'headers': {}, 'data': b'x' * 2000}, 'compress')
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import gzip
+import zlib
+
+import pytest
+
+from bravado.compression import ACCEPT_ENCODING
+from bravado.compression import compress
+from bravado.compression import decompress
+from bravado.compression import get_decoder
+
+
+BODY = b'{"name": "Lulu"}' * 1000
+
+
+@pytest.mark.parametrize(
+    'content_encoding, compressed_body',
+    (
+        ('gzip', gzip.compress(BODY)),
+        ('GZIP', gzip.compress(BODY)),
+        ('deflate', zlib.compress(BODY)),
+        # Raw deflate streams, sent by some servers
+        ('deflate', zlib.compress(BODY)[2:-4]),
+        ('deflate, gzip', gzip.compress(zlib.compress(BODY))),
+    ),
+)
+def test_decompress(content_encoding, compressed_body):
+    assert decompress(compressed_body, content_encoding) == BODY
+
+
+@pytest.mark.parametrize('content_encoding', ('gzip', 'deflate'))
+def test_incremental_decoder(content_encoding):
+    compressed_body = compress(BODY, content_encoding)
+    decoder = get_decoder(content_encoding)
+
+    chunks = [decoder.decompress(compressed_body[i:i + 7]) for i in range(0, len(compressed_body), 7)]
+
+    assert b''.join(chunks) + decoder.flush() == BODY
+
+
+@pytest.mark.parametrize('content_encoding', (None, '', 'identity', 'unknown', 'gzip, unknown'))
+def test_not_decompressed(content_encoding):
+    assert get_decoder(content_encoding) is None
+    assert decompress(b'body', content_encoding) == b'body'
+
+
+def test_compress_unsupported_encoding():
+    with pytest.raises(ValueError):
+        compress(BODY, 'compress')
+
+
+def test_accept_encoding():
+    assert ACCEPT_ENCODING.startswith('gzip, deflate')
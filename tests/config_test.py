@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import json
+
 import mock
 import pytest
 
@@ -6,7 +8,9 @@ from bravado.config import _get_response_metadata_class
 from bravado.config import bravado_config_from_config_dict
 from bravado.config import BravadoConfig
 from bravado.config import CONFIG_DEFAULTS
+from bravado.config import get_json_codec
 from bravado.config import RequestConfig
+from bravado.config import resolve_json_codec
 from bravado.response import BravadoResponseMetadata
 
 
@@ -38,6 +42,23 @@ def test_config_overrides_default_config(mock_log):
         'disable_fallback_results': True,
         'response_metadata_class': 'tests.config_test.ResponseMetadata',
         'sensitive_headers': ['Authorization'],
+        'spec_cache_dir': '/tmp/bravado',
+        'spec_cache_max_age': 3600,
+        'lazy_build': True,
+        'include_resources': ['pet'],
+        'include_operation_ids': ['getInventory'],
+        'ref_prefetch_workers': 8,
+        'json_codec': 'json',
+        'result_cache_ttls': {'getPetById': 60},
+        'result_cache_max_entries': 100,
+        'coalesce_requests': True,
+        'rate_limits': {'global': (10, 10)},
+        'rate_limit_mode': 'fail_fast',
+        'retry_policy': {'max_attempts': 2},
+        'circuit_breaker': {'failure_threshold': 3},
+        'hedging': {'delay': 0.05},
+        'deadline_header': 'X-Request-Timeout-Ms',
+        'load_balancing': {'endpoints': ['http://10.0.0.1:8080']},
     }
     expected_config_dict = config_dict.copy()
     expected_config_dict['response_metadata_class'] = ResponseMetadata
@@ -65,6 +86,45 @@ def test_get_response_metadata_class_invalid_class(mock_log):
     assert 'does not extend' in mock_log.warning.call_args[0][0]
 
 
+class JsonCodec(object):
+    loads = staticmethod(json.loads)
+    dumps = staticmethod(json.dumps)
+
+
+@pytest.mark.parametrize(
+    'json_codec, expected_json_codec',
+    (
+        (None, None),
+        ('json', json),
+        ('tests.config_test.JsonCodec', JsonCodec),
+        (JsonCodec, JsonCodec),
+    ),
+)
+def testresolve_json_codec(mock_log, json_codec, expected_json_codec):
+    assert resolve_json_codec(json_codec) is expected_json_codec
+    assert mock_log.warning.call_count == 0
+
+
+def test_resolve_json_codec_invalid_str(mock_log):
+    assert resolve_json_codec('some_invalid_str') is None
+    assert mock_log.warning.call_count == 1
+    assert 'Error while importing' in mock_log.warning.call_args[0][0]
+
+
+def test_get_json_codec_is_resolved_lazily():
+    bravado_config = bravado_config_from_config_dict({'json_codec': 'json'})
+    swagger_spec = mock.Mock(config={'bravado': bravado_config})
+
+    assert bravado_config.json_codec == 'json'
+    assert get_json_codec(swagger_spec) is json
+
+
+def test_resolve_json_codec_invalid_codec(mock_log):
+    assert resolve_json_codec('tests.config_test.IncorrectResponseMetadata') is None
+    assert mock_log.warning.call_count == 1
+    assert 'does not have loads() and dumps()' in mock_log.warning.call_args[0][0]
+
+
 def test_empty_request_config():
     request_config = RequestConfig({}, also_return_response_default=False)
     _assert_request_config_equals(
@@ -76,6 +136,15 @@ def test_empty_request_config():
         headers={},
         use_msgpack=False,
         timeout=None,
+        compress_request=None,
+        stream_result=False,
+        download_to=None,
+        download_ranges=None,
+        rate_limit_mode=None,
+        retry_policy=None,
+        bypass_result_cache=False,
+        deadline=None,
+        deadline_at=None,
         additional_properties={},
     )
 
@@ -89,6 +158,14 @@ def test_request_config_all_values():
         'headers': {'X-Speed-Up': '1'},
         'use_msgpack': True,
         'timeout': 2,
+        'compress_request': 'gzip',
+        'stream_result': True,
+        'download_to': '/tmp/download',
+        'download_ranges': 4,
+        'rate_limit_mode': 'non_blocking',
+        'retry_policy': {'max_attempts': 5},
+        'bypass_result_cache': True,
+        'deadline': 1.5,
         'http_client_option': 'a value',
     }
 
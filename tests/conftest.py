@@ -2,9 +2,12 @@
 import json
 import os
 
+import mock
 import pytest
 
 from bravado.config import BravadoConfig
+from bravado.http_cache import CacheEntry
+from bravado.http_future import HttpFuture
 from bravado.response import BravadoResponseMetadata
 
 
@@ -22,6 +25,23 @@ def processed_default_config(**kwargs):
         'disable_fallback_results': False,
         'response_metadata_class': BravadoResponseMetadata,
         'sensitive_headers': ['Authorization'],
+        'spec_cache_dir': None,
+        'spec_cache_max_age': None,
+        'lazy_build': False,
+        'include_resources': None,
+        'include_operation_ids': None,
+        'ref_prefetch_workers': None,
+        'json_codec': None,
+        'result_cache_ttls': None,
+        'result_cache_max_entries': 1024,
+        'coalesce_requests': False,
+        'rate_limits': None,
+        'rate_limit_mode': 'block',
+        'retry_policy': None,
+        'circuit_breaker': None,
+        'hedging': None,
+        'deadline_header': None,
+        'load_balancing': None,
     }
     config.update(**kwargs)
     return BravadoConfig(**config)  # type: ignore
@@ -32,3 +52,51 @@ def petstore_dict(test_dir):
     fpath = os.path.join(test_dir, '../test-data/2.0/petstore/swagger.json')
     with open(fpath) as f:
         return json.load(f)
+
+
+@pytest.fixture
+def mock_monotonic():
+    # bravado modules call monotonic.monotonic(), patching the module attribute patches all of them
+    with mock.patch('monotonic.monotonic', return_value=1000.0) as _mock_monotonic:
+        yield _mock_monotonic
+
+
+@pytest.fixture
+def mock_sleep(mock_monotonic):
+    """time.sleep() that doesn't sleep, but moves mock_monotonic forward."""
+    with mock.patch('time.sleep') as _mock_sleep:
+        _mock_sleep.side_effect = lambda seconds: setattr(
+            mock_monotonic, 'return_value', mock_monotonic.return_value + seconds,
+        )
+        yield _mock_sleep
+
+
+def make_send_request(*outcomes):
+    """Each outcome is either a status code, an exception raised by the attempt
+    or the HttpFuture returned by the attempt.
+    """
+    http_futures = []
+    for outcome in outcomes:
+        if isinstance(outcome, HttpFuture):
+            http_future = outcome
+        else:
+            http_future = mock.Mock(name='http_future')
+            if isinstance(outcome, int):
+                http_future._get_incoming_response.return_value = mock.Mock(status_code=outcome, headers={})
+            else:
+                http_future._get_incoming_response.side_effect = outcome
+        http_futures.append(http_future)
+    send_request = mock.Mock(side_effect=http_futures)
+    send_request.http_futures = http_futures
+    return send_request
+
+
+def make_entry(body=b'x' * 100):
+    return CacheEntry(
+        status_code=200,
+        reason='OK',
+        headers={'Cache-Control': 'max-age=60', 'ETag': '"v1"'},
+        body=body,
+        response_time=1000.0,
+        vary={'accept-language': 'en'},
+    )
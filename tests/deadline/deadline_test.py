@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import threading
+import typing
+
+import mock
+import monotonic
+import pytest
+
+from bravado.config import RequestConfig
+from bravado.deadline import ambient_deadline
+from bravado.deadline import bound_timeout
+from bravado.deadline import check_deadline
+from bravado.deadline import deadline_header_value
+from bravado.deadline import DeadlineWatchdog
+from bravado.deadline import get_ambient_deadline
+from bravado.deadline import get_call_deadline
+from bravado.exception import BravadoTimeoutError
+from bravado.http_future import HttpFuture
+
+
+def test_ambient_deadline(mock_monotonic):
+    assert get_ambient_deadline() is None
+
+    with ambient_deadline(10) as deadline:
+        assert deadline == get_ambient_deadline() == 1010
+        # Nested deadlines can only shorten it
+        with ambient_deadline(20):
+            assert get_ambient_deadline() == 1010
+        with ambient_deadline(5):
+            assert get_ambient_deadline() == 1005
+        assert get_ambient_deadline() == 1010
+
+    assert get_ambient_deadline() is None
+
+
+def test_ambient_deadline_is_thread_local(mock_monotonic):
+    deadlines = []
+    thread = threading.Thread(target=lambda: deadlines.append(get_ambient_deadline()))
+
+    with ambient_deadline(10):
+        thread.start()
+        thread.join()
+
+    assert deadlines == [None]
+
+
+def test_get_call_deadline(mock_monotonic):
+    assert get_call_deadline() is None
+    assert get_call_deadline(3) == 1003
+
+    with ambient_deadline(10):
+        assert get_call_deadline() == 1010
+        assert get_call_deadline(3) == 1003
+        assert get_call_deadline(30) == 1010
+
+
+def test_request_config_deadline(mock_monotonic):
+    assert RequestConfig({}, also_return_response_default=False).deadline_at is None
+    assert RequestConfig({'deadline': 2}, also_return_response_default=False).deadline_at == 1002
+
+    with ambient_deadline(1):
+        assert RequestConfig({}, also_return_response_default=False).deadline_at == 1001
+        assert RequestConfig({'deadline': 2}, also_return_response_default=False).deadline_at == 1001
+
+
+def test_bound_timeout(mock_monotonic):
+    assert bound_timeout(None, None) is None
+    assert bound_timeout(5, None) == 5
+    assert bound_timeout(None, 1002) == 2
+    assert bound_timeout(5, 1002) == 2
+    assert bound_timeout(1, 1002) == 1
+    timeout = bound_timeout(None, 999)
+    assert timeout is not None and timeout > 0
+
+
+def test_check_deadline(mock_monotonic):
+    check_deadline(None)
+    check_deadline(1001)
+
+    with pytest.raises(BravadoTimeoutError):
+        check_deadline(1000)
+
+
+def test_deadline_header_value(mock_monotonic):
+    assert deadline_header_value(1001.5) == '1500'
+    assert deadline_header_value(999) == '0'
+
+
+def test_watchdog():
+    watchdog = DeadlineWatchdog()
+    called = threading.Event()
+    cancelled_callback = mock.Mock()
+    now = monotonic.monotonic()
+
+    cancel = watchdog.schedule(now + 0.01, cancelled_callback)
+    watchdog.schedule(now + 0.02, called.set)
+    cancel()
+
+    assert called.wait(5)
+    assert cancelled_callback.call_count == 0
+
+
+def test_response_after_deadline(mock_monotonic):
+    with ambient_deadline(1):
+        request_config = RequestConfig({}, also_return_response_default=False)
+    future = mock.Mock()
+    http_future = HttpFuture(  # type: HttpFuture[typing.Any]
+        future,
+        lambda incoming_response: incoming_response,
+        request_config=request_config,
+    )
+
+    mock_monotonic.return_value += 1
+    with pytest.raises(BravadoTimeoutError):
+        http_future.response()
+    assert future.result.call_count == 0
+
+
+def test_response_timeout_is_bounded_by_deadline(mock_monotonic):
+    request_config = RequestConfig({'deadline': 2}, also_return_response_default=False)
+    future = mock.Mock(timeout_errors=(), connection_errors=())
+    future.result.return_value.status_code = 200
+    http_future = HttpFuture(  # type: HttpFuture[typing.Any]
+        future,
+        lambda incoming_response: incoming_response,
+        request_config=request_config,
+    )
+
+    http_future.response(timeout=5)
+
+    future.result.assert_called_once_with(timeout=2)
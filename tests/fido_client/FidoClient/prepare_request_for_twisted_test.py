@@ -70,3 +70,22 @@ def test_prepare_request_for_twisted_timeouts_added():
         'timeout': 15,
         'connect_timeout': 15,
     }
+
+
+def test_prepare_request_for_twisted_multipart_body():
+    request_params = {
+        'url': 'http://example.com/upload',
+        'method': 'POST',
+        'data': {'name': 'foo'},
+        'files': [('upload', ('upload.txt', b'contents'))],
+    }
+    request_for_twisted = FidoClient.prepare_request_for_twisted(request_params)
+
+    content_type = request_for_twisted['headers']['Content-Type']
+    boundary = content_type.split('boundary=')[1]
+    assert content_type.startswith('multipart/form-data; boundary=')
+    assert request_for_twisted['body'] == (
+        '--{0}\r\nContent-Disposition: form-data; name="name"\r\n\r\nfoo\r\n'
+        '--{0}\r\nContent-Disposition: form-data; name="upload"; filename="upload.txt"\r\n\r\ncontents\r\n'
+        '--{0}--\r\n'.format(boundary).encode('utf-8')
+    )
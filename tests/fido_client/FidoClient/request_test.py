@@ -2,6 +2,7 @@
 import mock
 from mock import patch
 
+from bravado.compression import ACCEPT_ENCODING
 from bravado.fido_client import FidoClient
 
 
@@ -12,7 +13,7 @@ def test_request_no_timeouts_passed_to_fido():
         assert fetch.call_args == mock.call(
             url='http://foo.com/',
             body=None,
-            headers={},
+            headers={'Accept-Encoding': ACCEPT_ENCODING},
             method='GET',
         )
 
@@ -24,7 +25,7 @@ def test_request_timeout_passed_to_fido():
         assert fetch.call_args == mock.call(
             url='http://foo.com/',
             body=None,
-            headers={},
+            headers={'Accept-Encoding': ACCEPT_ENCODING},
             method='GET',
             timeout=1,
         )
@@ -37,7 +38,7 @@ def test_request_connect_timeout_passed_to_fido():
         assert fetch.call_args == mock.call(
             url='http://foo.com/',
             body=None,
-            headers={},
+            headers={'Accept-Encoding': ACCEPT_ENCODING},
             method='GET',
             connect_timeout=1,
         )
@@ -51,7 +52,7 @@ def test_request_connect_timeout_and_timeout_passed_to_fido():
         assert fetch.call_args == mock.call(
             url='http://foo.com/',
             body=None,
-            headers={},
+            headers={'Accept-Encoding': ACCEPT_ENCODING},
             method='GET',
             connect_timeout=1,
             timeout=2,
@@ -65,7 +66,7 @@ def test_request_tcp_nodeley_passed_to_fido():
         assert fetch.call_args == mock.call(
             url='http://foo.com/',
             body=None,
-            headers={},
+            headers={'Accept-Encoding': ACCEPT_ENCODING},
             method='GET',
             tcp_nodelay=True
         )
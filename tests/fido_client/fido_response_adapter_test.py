@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import gzip
+
 import mock
 
 from bravado.fido_client import FidoResponseAdapter
@@ -22,3 +24,16 @@ def test_header_conversion():
         'X-WEIRD-ä': 'ümläüt',
         'X-Multiple': 'usethis',
     }
+
+
+def test_body_is_decompressed():
+    fido_response = mock.Mock(
+        name='fido_response',
+        headers={b'Content-Encoding': [b'gzip']},
+        body=gzip.compress(b'{"a": 1}'),
+    )
+
+    response_adapter = FidoResponseAdapter(fido_response)
+    assert response_adapter.raw_bytes == b'{"a": 1}'
+    assert response_adapter.text == '{"a": 1}'
+    assert response_adapter.json() == {'a': 1}
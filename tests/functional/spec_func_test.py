@@ -2,6 +2,8 @@
 """
 Swagger Specification related functional tests
 """
+import json
+
 import httpretty
 import pytest
 from swagger_spec_validator.common import SwaggerValidationError
@@ -67,3 +69,27 @@ def test_correct_route_with_basePath_no_slash(httprettified, swagger_dict):
     register_spec(swagger_dict)
     resource = SwaggerClient.from_url(API_DOCS_URL).api_test
     assert resource.testHTTP(test_param="foo").result() is None
+
+
+def test_remote_refs_are_prefetched_once(httprettified, swagger_dict):
+    swagger_dict['paths'] = {'/test_http': {'$ref': 'paths.json#/test_http'}}
+    swagger_dict['definitions'] = {'Foo': {'$ref': 'http://localhost/models.json#/Foo'}}
+    register_spec(swagger_dict)
+    register_get('http://localhost/paths.json', body=json.dumps({
+        'test_http': {
+            'get': {
+                'operationId': 'testHTTP',
+                'tags': ['api_test'],
+                'responses': {'200': {'description': 'Success', 'schema': {'$ref': 'models.json#/Foo'}}},
+            },
+        },
+    }))
+    register_get('http://localhost/models.json', body=json.dumps({
+        'Foo': {'type': 'object', 'properties': {'bar': {'type': 'string'}}},
+    }))
+
+    client = SwaggerClient.from_url(API_DOCS_URL, config={'ref_prefetch_workers': 4})
+
+    requested_paths = [request.path for request in httpretty.latest_requests()]
+    assert sorted(requested_paths) == ['/api-docs', '/models.json', '/paths.json']
+    assert isinstance(client.api_test, ResourceDecorator)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+import threading
+import typing
+from concurrent.futures import Future
+
+import mock
+import pytest
+
+from bravado.config import bravado_config_from_config_dict
+from bravado.config import RequestConfig
+from bravado.exception import BravadoConnectionError
+from bravado.exception import BravadoTimeoutError
+from bravado.hedging import hedge_request
+from bravado.hedging import HedgedFutureAdapter
+from bravado.hedging import LatencyTracker
+from bravado.hedging import RequestHedger
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+from tests.conftest import make_send_request
+
+
+class SlowFutureAdapter(FutureAdapter):
+    """Future adapter whose response arrives once released. Requests sent in
+    the background also complete a concurrent future then.
+    """
+
+    def __init__(self, outcome, in_background=False):
+        self.outcome = outcome
+        self.released = threading.Event()
+        self.cancel_count = 0
+        self.concurrent_future = Future() if in_background else None  # type: typing.Optional[Future]
+
+    def release(self):
+        self.released.set()
+        if self.concurrent_future is not None:
+            if isinstance(self.outcome, Exception):
+                self.concurrent_future.set_exception(self.outcome)
+            else:
+                self.concurrent_future.set_result(self.outcome)
+
+    def result(self, timeout=None):
+        if not self.released.wait(timeout):
+            raise BravadoTimeoutError()
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+    def cancel(self):
+        self.cancel_count += 1
+
+
+class SlowHttpFuture(HttpFuture):
+    """HttpFuture whose response arrives once release() is called."""
+
+    def __init__(self, outcome, in_background=False):
+        self.slow_future = SlowFutureAdapter(outcome, in_background)
+        super(SlowHttpFuture, self).__init__(self.slow_future, lambda incoming_response: incoming_response)
+
+    @property
+    def outcome(self):
+        return self.slow_future.outcome
+
+    @property
+    def cancel_count(self):
+        return self.slow_future.cancel_count
+
+    def release(self):
+        self.slow_future.release()
+
+
+@pytest.fixture
+def operation():
+    operation = mock.Mock(operation_id='getPetById')
+    operation.swagger_spec.config = {'bravado': bravado_config_from_config_dict({})}
+    return operation
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window_size=100)
+    assert tracker.percentile(95) is None
+
+    for latency in range(200):
+        tracker.record(float(latency))
+
+    assert len(tracker) == 100
+    assert tracker.percentile(95) == 195
+    assert tracker.percentile(100) == 199
+
+
+def test_delay_from_observed_latencies():
+    request_hedger = RequestHedger(min_samples=10, percentile=50)
+    tracker = request_hedger.latency_tracker('getPetById')
+    for latency in range(9):
+        tracker.record(float(latency))
+    assert request_hedger.delay('getPetById') is None
+
+    tracker.record(9.0)
+
+    assert request_hedger.delay('getPetById') == 5
+    assert RequestHedger(delay=0.5).delay('getPetById') == 0.5
+
+
+def _hedged_future_adapter(send_request, request_hedger=None, delay=0.01):
+    request_hedger = request_hedger or RequestHedger(delay=delay)
+    return HedgedFutureAdapter(send_request, request_hedger, delay, request_hedger.latency_tracker('getPetById'))
+
+
+def test_fast_response_is_not_hedged():
+    first = SlowHttpFuture(mock.sentinel.response)
+    first.release()
+    send_request = make_send_request(first)
+    future_adapter = _hedged_future_adapter(send_request)
+
+    assert future_adapter.result() is mock.sentinel.response
+    assert send_request.call_count == 1
+    assert not future_adapter.hedged
+
+
+def test_slow_response_is_hedged_and_cancelled():
+    first = SlowHttpFuture(mock.Mock(name='first_response'))
+    second = SlowHttpFuture(mock.sentinel.response)
+    second.release()
+    send_request = make_send_request(first, second)
+    request_hedger = RequestHedger(delay=0.01)
+    future_adapter = _hedged_future_adapter(send_request, request_hedger)
+
+    assert future_adapter.result(timeout=5) is mock.sentinel.response
+    assert future_adapter.hedged
+    assert first.cancel_count == 1
+    assert second.cancel_count == 0
+
+    # The late response of the cancelled request is closed, and its latency recorded
+    closed = threading.Event()
+    first.outcome.close.side_effect = closed.set
+    first.release()
+    assert closed.wait(5)
+    assert len(request_hedger.latency_tracker('getPetById')) == 2
+
+
+def test_error_of_one_request_is_ignored():
+    first = SlowHttpFuture(BravadoConnectionError())
+    second = SlowHttpFuture(mock.sentinel.response)
+    send_request = make_send_request(first, second)
+    future_adapter = _hedged_future_adapter(send_request)
+    # The first request fails after the second one was sent
+    threading.Timer(0.05, first.release).start()
+    threading.Timer(0.1, second.release).start()
+
+    assert future_adapter.result(timeout=5) is mock.sentinel.response
+    assert future_adapter.hedged
+
+
+def test_error_is_raised_if_both_requests_fail():
+    first = SlowHttpFuture(BravadoConnectionError())
+    second = SlowHttpFuture(BravadoConnectionError())
+    send_request = make_send_request(first, second)
+    future_adapter = _hedged_future_adapter(send_request)
+    threading.Timer(0.05, first.release).start()
+    threading.Timer(0.05, second.release).start()
+
+    with pytest.raises(BravadoConnectionError):
+        future_adapter.result(timeout=5)
+
+
+def test_error_before_delay_is_raised():
+    first = SlowHttpFuture(BravadoConnectionError())
+    first.release()
+    send_request = make_send_request(first)
+    future_adapter = _hedged_future_adapter(send_request, delay=5)
+
+    with pytest.raises(BravadoConnectionError):
+        future_adapter.result()
+    assert send_request.call_count == 1
+
+
+def test_hedging_budget():
+    request_hedger = RequestHedger(delay=0.01, budget_ratio=0, budget_min_hedges=0)
+    first = SlowHttpFuture(mock.sentinel.response)
+    send_request = make_send_request(first)
+    future_adapter = _hedged_future_adapter(send_request, request_hedger)
+    threading.Timer(0.05, first.release).start()
+
+    assert future_adapter.result(timeout=5) is mock.sentinel.response
+    assert send_request.call_count == 1
+    assert not future_adapter.hedged
+
+
+def test_timeout_bounds_both_requests():
+    first = SlowHttpFuture(mock.sentinel.response)
+    second = SlowHttpFuture(mock.sentinel.response)
+    send_request = make_send_request(first, second)
+    future_adapter = _hedged_future_adapter(send_request)
+
+    with pytest.raises(BravadoTimeoutError):
+        future_adapter.result(timeout=0.05)
+    assert first.cancel_count == 1
+    assert second.cancel_count == 1
+
+
+def test_hedge_request_only_hedges_read_methods(operation):
+    request_hedger = RequestHedger(delay=0.01)
+    http_future = SlowHttpFuture(mock.sentinel.response)
+    request_config = RequestConfig({}, also_return_response_default=False)
+
+    post_params = {'method': 'POST', 'url': 'http://localhost/pet'}
+    get_params = {'method': 'GET', 'url': 'http://localhost/pet/42'}
+
+    assert hedge_request(request_hedger, lambda: http_future, post_params, operation, request_config) is http_future
+
+    hedged_http_future = hedge_request(request_hedger, lambda: http_future, get_params, operation, request_config)
+    assert isinstance(hedged_http_future.future, HedgedFutureAdapter)
+
+
+def test_response_in_flight_in_background_is_waited_for_without_threads():
+    first = SlowHttpFuture(mock.sentinel.response, in_background=True)
+    send_request = make_send_request(first)
+    future_adapter = _hedged_future_adapter(send_request, delay=5)
+    threading.Timer(0.05, first.release).start()
+
+    with mock.patch('bravado.hedging.threading.Thread') as mock_thread:
+        assert future_adapter.result(timeout=5) is mock.sentinel.response
+    assert mock_thread.call_count == 0
+
+
+def test_slow_response_in_flight_in_background_is_hedged():
+    first = SlowHttpFuture(mock.Mock(name='first_response'), in_background=True)
+    second = SlowHttpFuture(mock.sentinel.response)
+    second.release()
+    send_request = make_send_request(first, second)
+    future_adapter = _hedged_future_adapter(send_request)
+
+    assert future_adapter.result(timeout=5) is mock.sentinel.response
+    assert future_adapter.hedged
+    assert first.cancel_count == 1
+
+    # The late response of the cancelled request is closed
+    first.release()
+    assert first.outcome.close.call_count == 1
+
+
+def test_latency_is_measured_from_send():
+    first = SlowHttpFuture(mock.sentinel.response, in_background=True)
+    send_request = make_send_request(first)
+    request_hedger = RequestHedger(delay=5)
+    with mock.patch('bravado.hedging.monotonic.monotonic', return_value=1000.0) as mock_monotonic:
+        future_adapter = _hedged_future_adapter(send_request, request_hedger, delay=5)
+        first.release()
+        # The response is waited for a while after the request was sent
+        mock_monotonic.return_value = 1003.0
+        assert future_adapter.result() is mock.sentinel.response
+
+    assert request_hedger.latency_tracker('getPetById').percentile(100) == 0
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+import typing
+
+import mock
+import pytest
+from bravado_core.response import IncomingResponse
+
+from bravado.config import RequestConfig
+from bravado.exception import BravadoTimeoutError
+from bravado.http_cache import CACHE_HIT
+from bravado.http_cache import CACHE_REVALIDATED
+from bravado.http_cache import CachingHttpClient
+from bravado.http_cache import LRUCache
+from bravado.http_client import HttpClient
+from bravado.http_future import FutureAdapter
+from bravado.http_future import HttpFuture
+from bravado.requests_client import RequestsClient
+
+
+URL = 'http://localhost/pets'
+
+
+class FakeResponse(IncomingResponse):
+    def __init__(self, status_code=200, headers=None, body=b'{"name": "Lulu"}'):
+        self.status_code = status_code
+        self.reason = 'OK'
+        self.headers = headers or {}
+        self.raw_bytes = body
+        self.text = body.decode('utf-8')
+
+    def json(self, **kwargs):
+        return {'name': 'Lulu'}
+
+
+class FakeFutureAdapter(FutureAdapter):
+    timeout_errors = (ValueError,)
+
+    def __init__(self, response):
+        self.response = response
+
+    def result(self, timeout=None):
+        return self.response
+
+
+class FakeHttpClient(HttpClient):
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, request_params, operation=None, request_config=None):
+        self.requests.append(request_params)
+        return HttpFuture(FakeFutureAdapter(self.responses.pop(0)), lambda response: response)
+
+
+@pytest.fixture
+def mock_time():
+    with mock.patch('bravado.http_cache.time.time', return_value=1000.0) as _mock_time:
+        yield _mock_time
+
+
+def get(http_client, headers=None, **request_config):
+    request_params = {'method': 'GET', 'url': URL, 'params': {'limit': 10}, 'headers': headers or {}}
+    return http_client.request(
+        request_params,
+        request_config=RequestConfig(request_config, also_return_response_default=False),
+    ).response().metadata
+
+
+def test_fresh_response_is_served_from_cache(mock_time):
+    inner = FakeHttpClient(FakeResponse(headers={'Cache-Control': 'max-age=60'}))
+    http_client = CachingHttpClient(inner)
+
+    assert get(http_client).cache_status is None
+    mock_time.return_value += 59
+    metadata = get(http_client)
+
+    assert metadata.cache_status == CACHE_HIT
+    assert metadata.incoming_response.raw_bytes == b'{"name": "Lulu"}'
+    assert metadata.headers['cache-control'] == 'max-age=60'
+    assert len(inner.requests) == 1
+
+
+def test_stale_response_is_revalidated(mock_time):
+    inner = FakeHttpClient(
+        FakeResponse(headers={'Cache-Control': 'max-age=60', 'ETag': '"v1"'}),
+        FakeResponse(status_code=304, headers={'Cache-Control': 'max-age=120'}, body=b''),
+    )
+    http_client = CachingHttpClient(inner)
+
+    get(http_client)
+    mock_time.return_value += 60
+    metadata = get(http_client)
+
+    assert metadata.cache_status == CACHE_REVALIDATED
+    assert metadata.incoming_response.raw_bytes == b'{"name": "Lulu"}'
+    assert inner.requests[1]['headers'] == {'If-None-Match': '"v1"'}
+
+    # The 304 response updated the freshness of the entry
+    mock_time.return_value += 119
+    assert get(http_client).cache_status == CACHE_HIT
+    assert len(inner.requests) == 2
+
+
+def test_revalidation_replaces_changed_response(mock_time):
+    inner = FakeHttpClient(
+        FakeResponse(headers={'Last-Modified': 'Tue, 15 Nov 1994 12:45:26 GMT'}),
+        FakeResponse(headers={'Cache-Control': 'max-age=60'}, body=b'{"name": "Fido"}'),
+    )
+    http_client = CachingHttpClient(inner)
+
+    get(http_client, headers={'Cache-Control': 'no-cache'})
+    metadata = get(http_client, headers={'Cache-Control': 'no-cache'})
+
+    assert metadata.cache_status is None
+    assert inner.requests[1]['headers']['If-Modified-Since'] == 'Tue, 15 Nov 1994 12:45:26 GMT'
+    assert get(http_client).incoming_response.raw_bytes == b'{"name": "Fido"}'
+
+
+@pytest.mark.parametrize(
+    'headers',
+    (
+        {},
+        {'Cache-Control': 'no-store, max-age=60'},
+        {'Cache-Control': 'max-age=60', 'Vary': '*'},
+    ),
+)
+def test_uncacheable_responses_are_not_stored(mock_time, headers):
+    inner = FakeHttpClient(FakeResponse(headers=headers), FakeResponse(headers=headers))
+    http_client = CachingHttpClient(inner)
+
+    get(http_client)
+    assert get(http_client).cache_status is None
+    assert len(inner.requests) == 2
+
+
+def test_uncacheable_status_code(mock_time):
+    inner = FakeHttpClient(FakeResponse(status_code=500, headers={'Cache-Control': 'max-age=60'}))
+    http_client = CachingHttpClient(inner)
+
+    http_client.request({'method': 'GET', 'url': URL}).future.result()
+
+    assert len(http_client.cache) == 0
+
+
+@pytest.mark.parametrize(
+    'headers, request_config',
+    (
+        ({'Cache-Control': 'no-store'}, {}),
+        ({}, {'stream_result': True}),
+        ({}, {'download_to': '/tmp/pets.json'}),
+    ),
+)
+def test_cache_bypass(mock_time, headers, request_config):
+    response = FakeResponse(headers={'Cache-Control': 'max-age=60'})
+    inner = FakeHttpClient(response, response)
+    http_client = CachingHttpClient(inner)
+
+    get(http_client)
+    future = http_client.request(  # type: HttpFuture[typing.Any]
+        {'method': 'GET', 'url': URL, 'params': {'limit': 10}, 'headers': headers},
+        request_config=RequestConfig(request_config, also_return_response_default=False),
+    )
+
+    assert future.future.result() is response
+    assert len(inner.requests) == 2
+
+
+def test_vary(mock_time):
+    inner = FakeHttpClient(
+        FakeResponse(headers={'Cache-Control': 'max-age=60', 'Vary': 'Accept-Language'}),
+        FakeResponse(headers={'Cache-Control': 'max-age=60', 'Vary': 'Accept-Language'}),
+    )
+    http_client = CachingHttpClient(inner)
+
+    get(http_client, headers={'Accept-Language': 'en'})
+    assert get(http_client, headers={'Accept-Language': 'en'}).cache_status == CACHE_HIT
+    assert get(http_client, headers={'Accept-Language': 'fr'}).cache_status is None
+
+
+def test_responses_are_cached_per_credentials(mock_time):
+    inner = FakeHttpClient(
+        FakeResponse(headers={'Cache-Control': 'max-age=60'}),
+        FakeResponse(headers={'Cache-Control': 'max-age=60'}, body=b'{"name": "Bo"}'),
+    )
+    cache = LRUCache()
+    http_client = CachingHttpClient(inner, cache)
+
+    get(http_client, headers={'Authorization': 'Bearer alice'})
+    metadata = get(http_client, headers={'Authorization': 'Bearer bob'})
+
+    assert metadata.cache_status is None
+    assert metadata.incoming_response.raw_bytes == b'{"name": "Bo"}'
+    assert get(http_client, headers={'Authorization': 'Bearer alice'}).cache_status == CACHE_HIT
+    assert get(http_client, headers={'Authorization': 'Bearer bob'}).cache_status == CACHE_HIT
+    assert not any('alice' in key or 'bob' in key for key in cache._entries)
+
+
+def test_unsafe_request_invalidates_entry(mock_time):
+    inner = FakeHttpClient(
+        FakeResponse(headers={'Cache-Control': 'max-age=60'}),
+        FakeResponse(status_code=204, body=b''),
+        FakeResponse(headers={'Cache-Control': 'max-age=60'}),
+    )
+    http_client = CachingHttpClient(inner)
+
+    get(http_client)
+    http_client.request({'method': 'DELETE', 'url': URL, 'params': {'limit': 10}}).result()
+
+    assert get(http_client).cache_status is None
+    assert len(inner.requests) == 3
+
+
+def test_errors_of_wrapped_client_are_reraised():
+    inner = mock.Mock(spec=HttpClient)
+    inner.request.return_value.future.timeout_errors = (ValueError,)
+    inner.request.return_value.future.connection_errors = ()
+    inner.request.return_value.future.result.side_effect = ValueError
+    http_client = CachingHttpClient(inner, LRUCache())
+
+    with pytest.raises(BravadoTimeoutError):
+        http_client.request({'method': 'GET', 'url': URL}).result()
+
+
+def test_other_attributes_are_the_ones_of_wrapped_client():
+    inner = RequestsClient()
+    http_client = CachingHttpClient(inner)
+
+    http_client.set_api_key('localhost', 'abc123', param_name='api_key')
+
+    assert http_client.authenticator is inner.authenticator
+    assert inner.authenticator.matches(URL)
+    with pytest.raises(AttributeError):
+        http_client.not_an_attribute
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from bravado.http_cache import CacheEntry
+from bravado.http_cache import LRUCache
+from tests.conftest import make_entry
+
+
+def test_get_set_delete():
+    cache = LRUCache()
+    entry = make_entry()
+
+    assert cache.get('a') is None
+    cache.set('a', entry)
+    assert cache.size == len('a') + entry.size
+    assert cache.get('a') is entry
+
+    cache.delete('a')
+    assert cache.get('a') is None
+    assert cache.size == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    entry_size = len('a') + make_entry().size
+    cache = LRUCache(max_size=entry_size * 2)
+
+    cache.set('a', make_entry())
+    cache.set('b', make_entry())
+    cache.get('a')
+    cache.set('c', make_entry())
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+    assert cache.size == entry_size * 2
+
+
+def test_entries_bigger_than_max_size_are_not_stored():
+    cache = LRUCache(max_size=1000)
+    cache.set('a', make_entry(b'x' * 1000))
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_replacing_entry_updates_size():
+    cache = LRUCache()
+    cache.set('a', make_entry(b'x' * 100))
+    cache.set('a', make_entry(b'x' * 10))
+
+    assert cache.size == len('a') + make_entry(b'x' * 10).size
+
+
+@pytest.mark.parametrize(
+    'headers, freshness_lifetime',
+    (
+        ({'Cache-Control': 'max-age=60'}, 60),
+        ({'Cache-Control': 'max-age="60", public'}, 60),
+        ({'Date': 'Tue, 15 Nov 1994 08:12:31 GMT', 'Expires': 'Tue, 15 Nov 1994 08:13:31 GMT'}, 60),
+        ({'Expires': '0'}, 0),
+        ({'Date': 'Tue, 15 Nov 1994 08:12:31 GMT', 'Last-Modified': 'Tue, 15 Nov 1994 08:02:31 GMT'}, 60),
+        ({}, 0),
+    ),
+)
+def test_freshness_lifetime(headers, freshness_lifetime):
+    entry = CacheEntry(200, 'OK', headers, b'', 1000.0, {})
+    assert entry.freshness_lifetime() == freshness_lifetime
+
+
+def test_age_header_is_included_in_current_age():
+    entry = CacheEntry(200, 'OK', {'Cache-Control': 'max-age=60', 'Age': '50'}, b'', 1000.0, {})
+
+    assert entry.is_fresh(1009.0)
+    assert entry.is_stale(1010.0)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+
+import pytest
+
+from bravado.http_cache import SQLiteCache
+from tests.conftest import make_entry
+
+
+@pytest.fixture
+def cache_path(tmpdir):
+    return os.path.join(str(tmpdir), 'cache.sqlite')
+
+
+def test_get_set_delete(cache_path):
+    cache = SQLiteCache(cache_path)
+    entry = make_entry()
+
+    assert cache.get('a') is None
+    cache.set('a', entry)
+    cached_entry = cache.get('a')
+
+    assert cached_entry is not None
+    assert cached_entry.status_code == 200
+    assert cached_entry.headers == entry.headers
+    assert cached_entry.body == entry.body
+    assert cached_entry.response_time == entry.response_time
+    assert cached_entry.vary == entry.vary
+    assert cache.size == len('a') + entry.size
+
+    cache.delete('a')
+    assert cache.get('a') is None
+    assert cache.size == 0
+
+
+def test_entries_are_shared_by_caches_using_the_same_file(cache_path):
+    SQLiteCache(cache_path).set('a', make_entry())
+
+    cached_entry = SQLiteCache(cache_path).get('a')
+
+    assert cached_entry is not None
+    assert cached_entry.body == make_entry().body
+
+
+def test_least_recently_used_entries_are_evicted(cache_path):
+    entry_size = len('a') + make_entry().size
+    cache = SQLiteCache(cache_path, max_size=entry_size * 2)
+
+    cache.set('a', make_entry())
+    cache.set('b', make_entry())
+    cache.get('a')
+    cache.set('c', make_entry())
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+    assert cache.size == entry_size * 2
+    assert len(cache) == 2
+
+
+def test_entries_bigger_than_max_size_are_not_stored(cache_path):
+    cache = SQLiteCache(cache_path, max_size=1000)
+    cache.set('a', make_entry(b'x' * 1000))
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def _set_entries(cache_path, worker):
+    cache = SQLiteCache(cache_path)
+    for i in range(20):
+        cache.set('{0}-{1}'.format(worker, i), make_entry())
+
+
+def test_concurrent_processes(cache_path):
+    SQLiteCache(cache_path)
+    processes = [multiprocessing.Process(target=_set_entries, args=(cache_path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    cache = SQLiteCache(cache_path)
+    assert len(cache) == 80
+    assert cache.size == sum(
+        len('{0}-{1}'.format(worker, i)) + make_entry().size
+        for worker in range(4)
+        for i in range(20)
+    )
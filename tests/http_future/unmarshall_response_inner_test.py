@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import io
+import typing
+
 import mock
 import msgpack
 import pytest
@@ -6,7 +9,9 @@ from bravado_core.content_type import APP_JSON
 from bravado_core.content_type import APP_MSGPACK
 from bravado_core.response import IncomingResponse
 from bravado_core.spec import Spec
+from jsonschema import ValidationError
 
+from bravado.config import RequestConfig
 from bravado.http_future import unmarshal_response_inner
 
 
@@ -62,6 +67,24 @@ def test_json_content(mock_get_response_spec, empty_swagger_spec, response_spec)
     assert 'Monday' == unmarshal_response_inner(response, op)
 
 
+def test_json_content_with_json_codec(mock_get_response_spec, empty_swagger_spec, response_spec):
+    json_codec = mock.Mock()
+    json_codec.loads.return_value = 'Monday'
+    empty_swagger_spec.config['bravado'] = mock.Mock(json_codec=json_codec)
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_JSON},
+        raw_bytes=b'"Monday"',
+    )
+
+    mock_get_response_spec.return_value = response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    assert 'Monday' == unmarshal_response_inner(response, op)
+    json_codec.loads.assert_called_once_with(b'"Monday"')
+    assert response.json.call_count == 0
+
+
 def test_msgpack_content(mock_get_response_spec, empty_swagger_spec, response_spec):
     message = 'Monday'
     response = mock.Mock(
@@ -131,3 +154,141 @@ def test_performs_validation(mock_validate_schema_object, mock_get_response_spec
     op = mock.Mock(swagger_spec=empty_swagger_spec)
     unmarshal_response_inner(response, op)
     assert mock_validate_schema_object.call_count == 1
+
+
+@pytest.fixture
+def array_response_spec():
+    return {
+        'description': 'Days of the week',
+        'schema': {
+            'type': 'array',
+            'items': {'type': 'string', 'format': 'date'},
+        },
+    }
+
+
+@pytest.fixture
+def streamed_response():
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_JSON},
+    )
+    response.iter_content = mock.Mock(return_value=iter([b'["2019-01-0', b'7", "2019-01-08"]']))
+    response.close = mock.Mock()
+    return response
+
+
+def test_stream_array_content(mock_get_response_spec, empty_swagger_spec, array_response_spec, streamed_response):
+    empty_swagger_spec.config['validate_responses'] = True
+    mock_get_response_spec.return_value = array_response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    request_config = RequestConfig({'stream_result': True}, also_return_response_default=False)
+
+    result = unmarshal_response_inner(streamed_response, op, request_config)  # type: typing.Any
+
+    assert streamed_response.iter_content.call_count == 0
+    assert [day.isoformat() for day in result] == ['2019-01-07', '2019-01-08']
+    assert streamed_response.close.call_count == 1
+
+
+def test_stream_array_content_validates_items(
+    mock_get_response_spec, empty_swagger_spec, array_response_spec, streamed_response,
+):
+    empty_swagger_spec.config['validate_responses'] = True
+    array_response_spec['schema']['items'] = {'type': 'integer'}
+    mock_get_response_spec.return_value = array_response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    request_config = RequestConfig({'stream_result': True}, also_return_response_default=False)
+
+    result = unmarshal_response_inner(streamed_response, op, request_config)  # type: typing.Any
+
+    with pytest.raises(ValidationError):
+        next(result)
+    assert streamed_response.close.call_count == 1
+
+
+def test_stream_result_ignored_for_errors(
+    mock_get_response_spec, empty_swagger_spec, array_response_spec, streamed_response,
+):
+    streamed_response.status_code = 404
+    streamed_response.json = mock.Mock(return_value=['2019-01-07'])
+    mock_get_response_spec.return_value = array_response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    request_config = RequestConfig({'stream_result': True}, also_return_response_default=False)
+
+    result = unmarshal_response_inner(streamed_response, op, request_config)  # type: typing.Any
+
+    assert [day.isoformat() for day in result] == ['2019-01-07']
+    assert streamed_response.iter_content.call_count == 0
+
+
+def test_stream_msgpack_array_content(mock_get_response_spec, empty_swagger_spec, array_response_spec):
+    document = msgpack.packb(['2019-01-07', '2019-01-08'])
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_MSGPACK},
+    )
+    response.iter_content = mock.Mock(return_value=iter([document[:5], document[5:]]))
+    response.close = mock.Mock()
+    mock_get_response_spec.return_value = array_response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    request_config = RequestConfig({'stream_result': True}, also_return_response_default=False)
+
+    result = unmarshal_response_inner(response, op, request_config)  # type: typing.Any
+
+    assert [day.isoformat() for day in result] == ['2019-01-07', '2019-01-08']
+    assert response.close.call_count == 1
+
+
+def test_stream_msgpack_object_content(mock_get_response_spec, empty_swagger_spec, response_spec):
+    document = msgpack.packb('Monday')
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_MSGPACK},
+    )
+    response.iter_content = mock.Mock(return_value=iter([document[:3], document[3:]]))
+    response.close = mock.Mock()
+    mock_get_response_spec.return_value = response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    request_config = RequestConfig({'stream_result': True}, also_return_response_default=False)
+
+    assert unmarshal_response_inner(response, op, request_config) == 'Monday'
+    assert response.close.call_count == 1
+
+
+def test_download_binary_content(mock_get_response_spec, empty_swagger_spec):
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': 'image/png'},
+    )
+    response.iter_content = mock.Mock(return_value=iter([b'\x89PNG', b'\x00\x01']))
+    response.close = mock.Mock()
+    mock_get_response_spec.return_value = {'description': 'An image', 'schema': {'type': 'file'}}
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    target = io.BytesIO()
+    request_config = RequestConfig({'download_to': target}, also_return_response_default=False)
+
+    result = unmarshal_response_inner(response, op, request_config)  # type: typing.Any
+
+    assert result.file is target
+    assert result.size == 6
+    assert target.getvalue() == b'\x89PNG\x00\x01'
+    assert response.close.call_count == 1
+
+
+def test_download_to_ignored_for_json_content(mock_get_response_spec, empty_swagger_spec, response_spec):
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_JSON},
+        json=mock.Mock(return_value='Monday'),
+    )
+    mock_get_response_spec.return_value = response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    request_config = RequestConfig({'download_to': io.BytesIO()}, also_return_response_default=False)
+
+    assert unmarshal_response_inner(response, op, request_config) == 'Monday'
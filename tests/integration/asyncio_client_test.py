@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bravado.asyncio_client import AsyncHttpClient
+from bravado.asyncio_client import AsyncHttpFuture
+from bravado.asyncio_client import AsyncioFutureAdapter
+from bravado.client import SwaggerClient
+from bravado.exception import BravadoTimeoutError
+from bravado.result_cache import AsyncCachedResultHttpFuture
+from bravado.testing.integration_test import API_RESPONSE
+from bravado.testing.integration_test import IntegrationTestingServicesAndClient
+from bravado.testing.integration_test import IntegrationTestsBaseClass
+
+
+class TestServerAsyncHttpClient(IntegrationTestsBaseClass):
+    """Runs the common integration tests, which don't use an event loop and
+    therefore exercise the background event loop of the client.
+    """
+
+    http_client_type = AsyncHttpClient
+    http_future_adapter_type = AsyncioFutureAdapter
+    connection_errors_exceptions = {
+        ConnectionAbortedError(),
+        ConnectionRefusedError(),
+        ConnectionResetError(),
+        BrokenPipeError(),
+        socket.gaierror(),
+        asyncio.IncompleteReadError(b'', None),
+    }
+
+
+class TestAwaitableOperations(IntegrationTestingServicesAndClient):
+    """Awaits the operations from the event loop the requests are sent on."""
+
+    @pytest.fixture
+    def async_swagger_client(self, swagger_http_server):
+        return SwaggerClient.from_url(
+            spec_url='{server_address}/swagger.json'.format(server_address=swagger_http_server),
+            http_client=AsyncHttpClient(),
+            config={'use_models': False},
+        )
+
+    def test_awaitable_response(self, async_swagger_client):
+        async def call():
+            future = async_swagger_client.json.get_json()
+            assert isinstance(future, AsyncHttpFuture)
+            return await future.response(timeout=1)
+
+        response = asyncio.run(call())
+
+        assert response.result == API_RESPONSE
+        assert response.metadata.status_code == 200
+
+    def test_concurrent_requests(self, async_swagger_client):
+        async def call():
+            futures = [async_swagger_client.echo.get_echo(message=str(i)) for i in range(5)]
+            return await asyncio.gather(*(future.result(timeout=5) for future in futures))
+
+        results = asyncio.run(call())
+
+        assert results == [{'message': str(i)} for i in range(5)]
+
+    def test_timeout_triggers_fallback_result(self, async_swagger_client):
+        async def call():
+            return await async_swagger_client.sleep.sleep(sec=0.5).response(
+                timeout=0.05,
+                fallback_result=lambda e: e,
+            )
+
+        response = asyncio.run(call())
+
+        assert isinstance(response.result, BravadoTimeoutError)
+        assert response.metadata.is_fallback_result
+
+    def test_unmarshalling_in_executor(self, async_swagger_client):
+        executor = ThreadPoolExecutor(max_workers=1)
+        http_client = async_swagger_client.swagger_spec.http_client
+        http_client.unmarshal_executor = executor
+        http_client.unmarshal_executor_threshold = 0
+
+        async def call():
+            return await async_swagger_client.json.get_json().response(timeout=1)
+
+        try:
+            assert asyncio.run(call()).result == API_RESPONSE
+        finally:
+            executor.shutdown()
+
+    def test_cached_results_are_awaitable(self, swagger_http_server):
+        swagger_client = SwaggerClient.from_url(
+            spec_url='{server_address}/swagger.json'.format(server_address=swagger_http_server),
+            http_client=AsyncHttpClient(),
+            config={'use_models': False, 'result_cache_ttls': {'get_json': 60}},
+        )
+
+        async def call():
+            first_result = await swagger_client.json.get_json().result(timeout=1)
+            cached_future = swagger_client.json.get_json()
+            assert isinstance(cached_future, AsyncCachedResultHttpFuture)
+            return first_result, await cached_future.result(timeout=1)
+
+        assert asyncio.run(call()) == (API_RESPONSE, API_RESPONSE)
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
+import time
 import typing
 
+import mock
 import pytest
 import requests.exceptions
+import urllib3.response
 
+from bravado.config import RequestConfig
 from bravado.exception import BravadoTimeoutError
 from bravado.requests_client import RequestsClient
 from bravado.requests_client import RequestsFutureAdapter
+from bravado.requests_client import RequestsResponseAdapter
 from bravado.testing.integration_test import IntegrationTestsBaseClass
 
 
@@ -28,6 +33,61 @@ class TestServerRequestsClient(IntegrationTestsBaseClass):
                 'params': {},
             }).result(timeout=0.01)
 
+    def test_deadline_bounds_slow_drip_response(self, swagger_http_server):
+        request_config = RequestConfig({'deadline': 0.5}, also_return_response_default=False)
+        start_time = time.time()
+
+        with pytest.raises(BravadoTimeoutError):
+            self.http_client.request(
+                {
+                    'method': 'GET',
+                    'url': '{server_address}/slow_drip?sec=3'.format(server_address=swagger_http_server),
+                    'params': {},
+                    'timeout': 1,
+                },
+                request_config=request_config,
+            ).result()
+
+        assert time.time() - start_time < 1.5
+
+    def test_deadline_bounds_streamed_slow_drip_response(self, swagger_http_server):
+        request_config = RequestConfig({'deadline': 0.5, 'stream_result': True}, also_return_response_default=False)
+        start_time = time.time()
+        http_future = self.http_client.request(
+            {
+                'method': 'GET',
+                'url': '{server_address}/slow_drip?sec=3'.format(server_address=swagger_http_server),
+                'params': {},
+                'timeout': 1,
+            },
+            request_config=request_config,
+        )
+        response = RequestsResponseAdapter(http_future.future.result())
+
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            list(response.iter_content(1))
+
+        assert time.time() - start_time < 1.5
+
+    def test_deadline_bounds_slow_drip_response_with_old_urllib3(self, swagger_http_server):
+        # urllib3 < 2.3 responses don't have a shutdown() method
+        with mock.patch.object(urllib3.response.HTTPResponse, 'shutdown', None, create=True):
+            self.test_deadline_bounds_slow_drip_response(swagger_http_server)
+
+
+class ThreadPoolRequestsClient(RequestsClient):
+    def __init__(self, *args, **kwargs):
+        kwargs['max_workers'] = 4
+        super(ThreadPoolRequestsClient, self).__init__(*args, **kwargs)
+
+
+class TestServerThreadPoolRequestsClient(IntegrationTestsBaseClass):
+    http_client_type = ThreadPoolRequestsClient
+    http_future_adapter_type = RequestsFutureAdapter
+    connection_errors_exceptions = {
+        requests.exceptions.ConnectionError(),
+    }
+
 
 class FakeRequestsFutureAdapter(RequestsFutureAdapter):
     timeout_errors = ()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import pickle
+from copy import deepcopy
+
+import mock
+import pytest
+from bravado_core.model import Model
+
+from bravado.client import SwaggerClient
+from bravado.lazy_spec import LazyResources
+from bravado.lazy_spec import LazySpec
+
+
+@pytest.fixture
+def lazy_client(petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict, config={'lazy_build': True})
+
+
+@pytest.fixture
+def eager_client(petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict)
+
+
+def test_nothing_is_built_upfront(petstore_dict):
+    with mock.patch('bravado.lazy_spec.model_discovery') as mock_model_discovery, \
+            mock.patch('bravado.lazy_spec.Operation') as mock_operation:
+        swagger_client = SwaggerClient.from_spec(petstore_dict, config={'lazy_build': True})
+
+    assert isinstance(swagger_client.swagger_spec, LazySpec)
+    assert mock_model_discovery.call_count == 0
+    assert mock_operation.from_spec.call_count == 0
+    assert sorted(dir(swagger_client)) == ['pet', 'store', 'user']
+
+
+def test_resources_are_built_on_first_access(lazy_client):
+    resources = lazy_client.swagger_spec.resources
+
+    lazy_client.pet.getPetById
+
+    assert sorted(dict.keys(resources)) == ['pet']
+    assert sorted(resources._pending) == ['store', 'user']
+
+
+def test_models_are_discovered_on_first_access(lazy_client):
+    assert lazy_client.swagger_spec._models_discovered is False
+
+    pet = lazy_client.get_model('Pet')
+
+    assert issubclass(pet, Model)
+    assert lazy_client.swagger_spec._models_discovered is True
+
+
+def test_building_a_resource_discovers_models(lazy_client):
+    lazy_client.store
+
+    assert lazy_client.swagger_spec._models_discovered is True
+
+
+def test_unknown_resource(lazy_client):
+    with pytest.raises(AttributeError):
+        lazy_client.foo
+
+
+def test_equal_to_eager_client(lazy_client, eager_client):
+    assert lazy_client.swagger_spec.resources['pet'].is_equal(
+        eager_client.swagger_spec.resources['pet'], ignore_swagger_spec=True,
+    )
+    assert sorted(lazy_client.swagger_spec.definitions) == sorted(eager_client.swagger_spec.definitions)
+
+
+def test_operations_are_shared_between_resources(petstore_dict):
+    petstore_dict['paths']['/pet/{petId}']['get']['tags'].append('store')
+    swagger_client = SwaggerClient.from_spec(petstore_dict, config={'lazy_build': True})
+
+    assert swagger_client.pet.getPetById.operation is swagger_client.store.getPetById.operation
+
+
+def test_get_op_for_request(lazy_client):
+    op = lazy_client.swagger_spec.get_op_for_request('GET', '/v2/pet/{petId}')
+
+    assert op is lazy_client.pet.getPetById.operation
+
+
+def test_copies_are_fully_built(lazy_client):
+    copied_client = deepcopy(lazy_client)
+    unpickled_spec = pickle.loads(pickle.dumps(lazy_client.swagger_spec))
+
+    for swagger_spec in (copied_client.swagger_spec, unpickled_spec):
+        assert not isinstance(swagger_spec.resources, LazyResources)
+        assert sorted(swagger_spec.resources) == ['pet', 'store', 'user']
+        assert 'Pet' in swagger_spec.definitions
+
+
+def test_internally_dereference_refs_builds_eagerly(petstore_dict):
+    swagger_client = SwaggerClient.from_spec(
+        petstore_dict, config={'lazy_build': True, 'internally_dereference_refs': True},
+    )
+
+    assert not isinstance(swagger_client.swagger_spec.resources, LazyResources)
+    assert swagger_client.swagger_spec._models_discovered is True
+    assert 'Pet' in swagger_client.swagger_spec.definitions
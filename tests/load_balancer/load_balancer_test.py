@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+import concurrent.futures
+
+import mock
+import pytest
+
+from bravado.config import RequestConfig
+from bravado.exception import BravadoConnectionError
+from bravado.load_balancer import Endpoint
+from bravado.load_balancer import endpoint_url
+from bravado.load_balancer import get_api_url
+from bravado.load_balancer import LEAST_OUTSTANDING
+from bravado.load_balancer import load_balance_request
+from bravado.load_balancer import LoadBalancer
+from bravado.requests_client import RequestsClient
+
+
+ENDPOINTS = ['http://10.0.0.1:8080', 'http://10.0.0.2:8080', 'http://10.0.0.3:8080']
+
+
+def _pick(load_balancer):
+    endpoint = load_balancer.pick()
+    assert endpoint is not None
+    return endpoint
+
+
+def _fail(load_balancer, endpoint, times):
+    for _ in range(times):
+        load_balancer.pick()
+        load_balancer.release(endpoint, failed=True)
+
+
+def test_invalid_config():
+    with pytest.raises(ValueError):
+        LoadBalancer(ENDPOINTS, strategy='round_robin')
+    with pytest.raises(ValueError):
+        LoadBalancer()
+
+
+def test_endpoint_url():
+    endpoint = Endpoint('https://10.0.0.1:8443', window_size=10)
+
+    assert endpoint_url('http://petstore.swagger.io/v2/pet/42?a=b', endpoint) == 'https://10.0.0.1:8443/v2/pet/42?a=b'
+
+
+def test_power_of_two_choices_picks_less_loaded_endpoint(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS)
+    first, second, third = load_balancer.endpoints
+    first.outstanding = 2
+
+    with mock.patch('bravado.load_balancer.random.choices', side_effect=[[0], [second]]):
+        assert load_balancer.pick() is second
+    with mock.patch('bravado.load_balancer.random.choices', side_effect=[[2], [first]]):
+        assert load_balancer.pick() is third
+
+    assert [endpoint.outstanding for endpoint in load_balancer.endpoints] == [2, 1, 1]
+
+
+def test_power_of_two_choices_compares_distinct_endpoints(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS[:2])
+    first, second = load_balancer.endpoints
+    first.outstanding = 5
+
+    for _ in range(50):
+        assert _pick(load_balancer) is second
+        load_balancer.release(second)
+
+
+def test_least_outstanding(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS, strategy=LEAST_OUTSTANDING)
+
+    picked = [_pick(load_balancer) for _ in range(6)]
+
+    assert sorted(endpoint.url for endpoint in picked) == sorted(ENDPOINTS * 2)
+    load_balancer.release(picked[0])
+    assert load_balancer.pick() is picked[0]
+
+
+def test_ejects_endpoint_with_high_error_rate(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS, strategy=LEAST_OUTSTANDING, min_requests=4, ejection_time=10)
+    first = load_balancer.endpoints[0]
+
+    _fail(load_balancer, first, 3)
+    assert not first.is_ejected(1000)
+    _fail(load_balancer, first, 1)
+    assert first.is_ejected(1000)
+
+    assert first not in [load_balancer.pick() for _ in range(10)]
+
+
+def test_max_ejection_ratio(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS, min_requests=1, max_ejection_ratio=0.5)
+    first, second, _ = load_balancer.endpoints
+
+    _fail(load_balancer, first, 1)
+    _fail(load_balancer, second, 1)
+
+    assert first.is_ejected(1000)
+    assert not second.is_ejected(1000)
+
+
+def test_single_endpoint_is_never_ejected(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS[:1], min_requests=1)
+    endpoint = load_balancer.endpoints[0]
+
+    _fail(load_balancer, endpoint, 5)
+
+    assert load_balancer.pick() is endpoint
+
+
+def test_ejected_endpoint_is_readmitted_gradually(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS, min_requests=1, ejection_time=10, ramp_up_time=20)
+    first = load_balancer.endpoints[0]
+    _fail(load_balancer, first, 1)
+
+    mock_monotonic.return_value += 10
+    assert not first.is_ejected(mock_monotonic.return_value)
+    assert first.weight(mock_monotonic.return_value, 20) == 0.1
+    assert first.weight(mock_monotonic.return_value + 10, 20) == 0.5
+    assert first.weight(mock_monotonic.return_value + 20, 20) == 1
+
+    # Ejected again while coming back: it's ejected for longer
+    _fail(load_balancer, first, 1)
+    assert first.ejected_until == mock_monotonic.return_value + 20
+
+
+def test_ejects_slow_endpoint(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS, min_requests=2, latency_factor=3)
+    first, second, third = load_balancer.endpoints
+    for endpoint, latency in ((second, 0.1), (third, 0.1), (first, 0.2), (first, 1)):
+        for _ in range(2):
+            load_balancer.pick()
+            load_balancer.release(endpoint, failed=False, latency=latency)
+
+    assert first.is_ejected(1000)
+    assert not second.is_ejected(1000)
+
+
+def test_resolver(mock_monotonic):
+    resolver = mock.Mock(return_value=ENDPOINTS[:2])
+    load_balancer = LoadBalancer(resolver=resolver, resolve_interval=30)
+
+    second = load_balancer.endpoints[1]
+    assert [endpoint.url for endpoint in load_balancer.endpoints] == ENDPOINTS[:2]
+
+    mock_monotonic.return_value += 30
+    resolver.return_value = ENDPOINTS[1:]
+    endpoints = load_balancer.endpoints
+    assert [endpoint.url for endpoint in endpoints] == ENDPOINTS[1:]
+    # Endpoints that are still there keep their state
+    assert endpoints[0] is second
+
+    mock_monotonic.return_value += 30
+    resolver.side_effect = IOError
+    assert load_balancer.endpoints == endpoints
+    assert resolver.call_count == 3
+
+
+def _load_balance_request(load_balancer, http_client):
+    return load_balance_request(
+        load_balancer,
+        http_client,
+        {'method': 'GET', 'url': 'http://petstore.swagger.io/v2/pet/42'},
+        mock.Mock(name='operation'),
+        RequestConfig({}, also_return_response_default=False),
+    )
+
+
+def test_load_balance_request(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS[:1], min_requests=1)
+    endpoint = load_balancer.endpoints[0]
+    http_client = mock.Mock()
+    inner_http_future = http_client.request.return_value
+    inner_http_future._get_incoming_response.return_value = mock.Mock(status_code=200)
+
+    http_future = _load_balance_request(load_balancer, http_client)
+
+    assert http_client.request.call_args[0][0]['url'] == 'http://10.0.0.1:8080/v2/pet/42'
+    assert 'auth_url' not in http_client.request.call_args[0][0]
+    assert endpoint.outstanding == 1
+    http_future.future.result()
+    assert endpoint.outstanding == 0
+    assert list(endpoint.outcomes) == [False]
+
+    inner_http_future._get_incoming_response.side_effect = BravadoConnectionError
+    with pytest.raises(BravadoConnectionError):
+        _load_balance_request(load_balancer, http_client).future.result()
+    assert list(endpoint.outcomes) == [False, True]
+
+    _load_balance_request(load_balancer, http_client).cancel()
+    assert endpoint.outstanding == 0
+    assert inner_http_future.cancel.call_count == 1
+
+
+def test_abandoned_request_is_released(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS[:1])
+
+    _load_balance_request(load_balancer, mock.Mock())
+
+    assert load_balancer.endpoints[0].outstanding == 0
+
+
+def test_request_that_fails_to_be_sent_is_released(mock_monotonic):
+    load_balancer = LoadBalancer(ENDPOINTS[:1])
+    http_client = mock.Mock()
+    http_client.request.side_effect = ValueError
+
+    with pytest.raises(ValueError):
+        _load_balance_request(load_balancer, http_client)
+
+    assert load_balancer.endpoints[0].outstanding == 0
+
+
+def test_requests_to_endpoints_are_authenticated_for_the_api_host(mock_monotonic):
+    http_client = RequestsClient()
+    http_client.set_api_key('petstore.swagger.io', 'secret')
+
+    with mock.patch.object(http_client, 'future_adapter_class') as mock_future_adapter_class:
+        _load_balance_request(LoadBalancer(ENDPOINTS[:1]), http_client)
+
+    request = mock_future_adapter_class.call_args[0][1]
+    assert request.url == 'http://10.0.0.1:8080/v2/pet/42'
+    assert request.params == {'api_key': 'secret'}
+    assert get_api_url() is None
+
+
+def test_subclasses_overriding_apply_authentication_still_work(mock_monotonic):
+    class AuthenticatingClient(RequestsClient):
+        def apply_authentication(self, request):
+            request.headers['X-Authenticated-For'] = request.url
+            return request
+
+    http_client = AuthenticatingClient()
+
+    with mock.patch.object(http_client, 'future_adapter_class') as mock_future_adapter_class:
+        _load_balance_request(LoadBalancer(ENDPOINTS[:1]), http_client)
+
+    request = mock_future_adapter_class.call_args[0][1]
+    assert request.url == 'http://10.0.0.1:8080/v2/pet/42'
+    assert request.headers == {'X-Authenticated-For': 'http://petstore.swagger.io/v2/pet/42'}
+
+
+@pytest.mark.parametrize('in_background, latency', ((True, 3), (False, 1)))
+def test_latency_is_measured_from_the_send(mock_monotonic, in_background, latency):
+    load_balancer = LoadBalancer(ENDPOINTS[:1])
+    endpoint = load_balancer.endpoints[0]
+    http_client = mock.Mock()
+    inner_http_future = http_client.request.return_value
+    inner_http_future.future.concurrent_future = concurrent.futures.Future() if in_background else None
+
+    def get_incoming_response(timeout):
+        mock_monotonic.return_value += 1
+        return mock.Mock(status_code=200)
+
+    inner_http_future._get_incoming_response.side_effect = get_incoming_response
+
+    http_future = _load_balance_request(load_balancer, http_client)
+    mock_monotonic.return_value += 2
+    http_future.future.result()
+
+    assert endpoint.latency == latency
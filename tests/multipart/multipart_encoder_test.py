@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import io
+import mmap
+import typing
+
+import pytest
+import requests
+
+from bravado.multipart import encode_multipart
+from bravado.multipart import MultipartEncoder
+
+
+DATA = {'name': 'foo', 'tags': [1, 2], 'comment': u'caf\xe9', 'empty': None}
+
+
+def _files():
+    return [
+        ('upload', ('big.bin', io.BytesIO(b'0123456789' * 20000))),
+        ('raw', ('raw.bin', b'\x00\x01', 'application/octet-stream')),
+        ('text', ('notes.txt', u'some notes')),
+    ]
+
+
+def _requests_body(data, files):
+    request = requests.Request('POST', 'http://foo.com', data=data, files=files).prepare()
+    return request.body, typing.cast(str, request.headers['Content-Type']).split('boundary=')[1]
+
+
+@pytest.mark.parametrize('read_size', (1, 1000, 100000, -1))
+def test_body_is_the_same_as_requests_one(read_size):
+    expected_body, boundary = _requests_body(DATA, _files())
+    encoder = MultipartEncoder(DATA, _files(), boundary=boundary)
+
+    chunks = []
+    while True:
+        chunk = encoder.read(read_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        assert read_size < 0 or len(chunk) <= read_size
+
+    assert b''.join(chunks) == expected_body
+    assert encoder.len == len(expected_body)
+    assert encoder.content_type == 'multipart/form-data; boundary={0}'.format(boundary)
+
+
+def test_files_are_read_lazily():
+    upload = io.BytesIO(b'x' * 1000000)
+    encoder = MultipartEncoder(None, [('upload', ('big.bin', upload))])
+
+    encoder.read(10)
+
+    assert upload.tell() < 1000000
+
+
+def test_file_on_disk(tmpdir):
+    path = tmpdir.join('upload.bin')
+    path.write_binary(b'abc' * 1000)
+
+    with open(str(path), 'rb') as upload:
+        upload.read(3)
+        encoder = MultipartEncoder(None, [('upload', ('upload.bin', upload))])
+        body = encoder.read()
+
+    assert encoder.len == len(body)
+    assert b'abc' * 999 + b'\r\n' in body
+
+
+def test_mmap(tmpdir):
+    path = tmpdir.join('upload.bin')
+    path.write_binary(b'abc' * 1000)
+
+    with open(str(path), 'rb') as f:
+        upload = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        encoder = MultipartEncoder(None, [('upload', ('upload.bin', upload))])
+        body = encoder.read()
+        upload.close()
+
+    assert encoder.len == len(body)
+    assert b'abc' * 1000 + b'\r\n' in body
+
+
+def test_generator_has_unknown_length():
+    def upload():
+        yield b'foo'
+        yield b'bar'
+
+    encoder = MultipartEncoder(None, [('upload', ('upload.bin', upload()))])
+
+    assert encoder.len is None
+    assert b'foobar\r\n' in b''.join(encoder)
+
+
+def test_encode_multipart():
+    request_params = {'method': 'POST', 'headers': {'X-Foo': 'bar'}, 'data': {'a': 'b'}, 'files': _files()}
+
+    encoded_params = encode_multipart(request_params)
+
+    encoder = encoded_params['data']
+    assert isinstance(encoder, MultipartEncoder)
+    assert encoded_params['files'] is None
+    assert encoded_params['headers'] == {'X-Foo': 'bar', 'Content-Type': encoder.content_type}
+    assert request_params['data'] == {'a': 'b'}
+
+
+def test_encode_multipart_without_files():
+    request_params = {'method': 'POST', 'data': {'a': 'b'}, 'files': []}
+
+    assert encode_multipart(request_params) == request_params
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import mock
+import pytest
+
+from bravado.asyncio_client import AsyncHttpClient
+from bravado.asyncio_client import AsyncHttpFuture
+from bravado.asyncio_client import AsyncioFutureAdapter
+from bravado.config import bravado_config_from_config_dict
+from bravado.config import RequestConfig
+from bravado.exception import BravadoRateLimitError
+from bravado.exception import BravadoTimeoutError
+from bravado.rate_limit import RateLimiter
+from bravado.rate_limit import rate_limit_request
+from bravado.rate_limit import TokenBucket
+
+
+@pytest.fixture
+def operation():
+    operation = mock.Mock(operation_id='getPetById')
+    operation.swagger_spec.config = {'bravado': bravado_config_from_config_dict({})}
+    return operation
+
+
+@pytest.fixture
+def request_config():
+    return RequestConfig({}, also_return_response_default=False)
+
+
+def test_token_bucket(mock_monotonic):
+    bucket = TokenBucket(rate=2, burst=2)
+
+    bucket.take(1000.0)
+    bucket.take(1000.0)
+    assert bucket.wait_time(1000.0) == 0.5
+    assert bucket.wait_time(1000.5) == 0
+    # Buckets are refilled up to their burst size
+    assert bucket.wait_time(1100.0) == 0
+    assert bucket.tokens == 2
+
+
+@pytest.mark.parametrize('rate_limit', ((0, 1), (-1, 1), (1, 0)))
+def test_invalid_rate_limit(rate_limit):
+    with pytest.raises(ValueError):
+        RateLimiter.from_config({'operations': {'getPetById': rate_limit}})
+
+
+def test_rate_limiter_applies_all_matching_buckets(mock_monotonic):
+    rate_limiter = RateLimiter(
+        global_limit=(10, 10),
+        hosts={'petstore.swagger.io': (1, 1)},
+        operations={'getPetById': (2, 1)},
+    )
+
+    assert rate_limiter.reserve('petstore.swagger.io', 'getPetById') == 0
+    assert rate_limiter.reserve('petstore.swagger.io', 'findPets') == 1
+    assert rate_limiter.reserve('otherhost', 'getPetById') == 0.5
+    assert rate_limiter.reserve('otherhost', 'findPets') == 0
+
+
+def test_rate_limiter_fail_fast_does_not_take_tokens(mock_monotonic):
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+    rate_limiter.reserve('petstore.swagger.io')
+
+    with pytest.raises(BravadoRateLimitError) as excinfo:
+        rate_limiter.reserve('petstore.swagger.io', fail_fast=True)
+
+    assert excinfo.value.retry_after == 1
+    assert rate_limiter.reserve('petstore.swagger.io') == 1
+
+
+def _rate_limit_request(mode, operation, request_config, send_request, rate_limiter):
+    return rate_limit_request(
+        rate_limiter,
+        send_request,
+        {'url': 'http://petstore.swagger.io/v2/pet/42'},
+        operation,
+        request_config,
+        mode,
+    )
+
+
+def test_block(mock_sleep, operation, request_config):
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+    send_request = mock.Mock()
+
+    _rate_limit_request('block', operation, request_config, send_request, rate_limiter)
+    http_future = _rate_limit_request('block', operation, request_config, send_request, rate_limiter)
+
+    mock_sleep.assert_called_once_with(1)
+    assert send_request.call_count == 2
+    assert http_future.rate_limit_wait_time == 1
+
+
+@pytest.mark.parametrize('mode', ('block', 'non_blocking'))
+def test_request_allowed_after_deadline_is_not_sent(mock_sleep, operation, mode):
+    request_config = RequestConfig({'deadline': 0.5}, also_return_response_default=False)
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+    send_request = mock.Mock()
+
+    _rate_limit_request(mode, operation, request_config, send_request, rate_limiter)
+    http_future = _rate_limit_request(mode, operation, request_config, send_request, rate_limiter)
+
+    assert mock_sleep.call_count == 0
+    with pytest.raises(BravadoTimeoutError):
+        http_future.response()
+    assert send_request.call_count == 1
+    # The tokens of the request that wasn't sent are returned
+    assert rate_limiter.reserve('petstore.swagger.io') == 1
+
+
+def test_non_blocking(mock_sleep, operation, request_config):
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+    incoming_response = mock.Mock(status_code=200)
+    send_request = mock.Mock()
+    send_request.return_value._get_incoming_response.return_value = incoming_response
+
+    _rate_limit_request('non_blocking', operation, request_config, send_request, rate_limiter)
+    http_future = _rate_limit_request('non_blocking', operation, request_config, send_request, rate_limiter)
+
+    assert send_request.call_count == 1
+    assert mock_sleep.call_count == 0
+
+    with mock.patch('bravado.http_future.unmarshal_response'):
+        response = http_future.response()
+
+    mock_sleep.assert_called_once_with(1)
+    assert send_request.call_count == 2
+    assert response.incoming_response is incoming_response
+    assert response.metadata.rate_limit_wait_time == 1
+
+
+def test_non_blocking_timeout(mock_sleep, operation, request_config):
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+    send_request = mock.Mock()
+
+    _rate_limit_request('non_blocking', operation, request_config, send_request, rate_limiter)
+    http_future = _rate_limit_request('non_blocking', operation, request_config, send_request, rate_limiter)
+
+    with pytest.raises(BravadoTimeoutError):
+        http_future.response(timeout=0.5)
+    assert send_request.call_count == 1
+    # The tokens of the request that wasn't sent are returned
+    assert rate_limiter.reserve('petstore.swagger.io') == 0.5
+
+
+def test_non_blocking_cancel_while_waiting(mock_sleep, operation, request_config):
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+    send_request = mock.Mock()
+
+    _rate_limit_request('non_blocking', operation, request_config, send_request, rate_limiter)
+    http_future = _rate_limit_request('non_blocking', operation, request_config, send_request, rate_limiter)
+    # cancel() would block if result() slept while holding the lock of the future
+    mock_sleep.side_effect = lambda seconds: http_future.cancel()
+
+    with pytest.raises(BravadoTimeoutError):
+        http_future.response()
+    assert send_request.call_count == 1
+    # The tokens of the cancelled request are returned
+    assert rate_limiter.reserve('petstore.swagger.io') == 1
+
+
+def test_fail_fast(mock_monotonic, operation, request_config):
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+    send_request = mock.Mock()
+
+    _rate_limit_request('fail_fast', operation, request_config, send_request, rate_limiter)
+    http_future = _rate_limit_request('fail_fast', operation, request_config, send_request, rate_limiter)
+
+    assert send_request.call_count == 1
+    with pytest.raises(BravadoRateLimitError):
+        http_future.response()
+    response = http_future.response(fallback_result='fallback')
+    assert response.result == 'fallback'
+    assert response.metadata.is_fallback_result
+
+
+def test_rate_limiter_release(mock_monotonic):
+    rate_limiter = RateLimiter(global_limit=(1, 2), operations={'getPetById': (1, 1)})
+    rate_limiter.reserve('petstore.swagger.io', 'getPetById')
+    rate_limiter.reserve('petstore.swagger.io', 'getPetById')
+
+    rate_limiter.release('petstore.swagger.io', 'getPetById')
+    rate_limiter.release('petstore.swagger.io', 'getPetById')
+    rate_limiter.release('petstore.swagger.io', 'getPetById')
+
+    # Buckets aren't refilled over their burst size
+    assert rate_limiter.reserve('petstore.swagger.io', 'getPetById') == 0
+    assert rate_limiter.reserve('petstore.swagger.io', 'getPetById') == 1
+
+
+def _send_awaitable_request(raw_response):
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(raw_response)
+    return mock.Mock(future=AsyncioFutureAdapter(future))
+
+
+@pytest.mark.parametrize('mode', ('block', 'non_blocking'))
+def test_awaitable_futures_wait_without_blocking_event_loop(operation, request_config, mode):
+    operation.swagger_spec.http_client = AsyncHttpClient()
+    rate_limiter = RateLimiter(global_limit=(100, 1))
+    raw_response = mock.Mock()
+
+    def send_request():
+        return _send_awaitable_request(raw_response)
+
+    async def call():
+        _rate_limit_request(mode, operation, request_config, send_request, rate_limiter)
+        http_future = _rate_limit_request(mode, operation, request_config, send_request, rate_limiter)
+        assert isinstance(http_future, AsyncHttpFuture)
+        await http_future.future.wait(timeout=1)
+        return http_future
+
+    with mock.patch('bravado.rate_limit.time.sleep') as mock_sleep:
+        http_future = asyncio.run(call())
+
+    assert mock_sleep.call_count == 0
+    assert http_future.future.result() is raw_response
+    assert 0 < http_future.rate_limit_wait_time <= 0.01
+
+
+def test_awaitable_future_timeout_returns_tokens(operation, request_config):
+    operation.swagger_spec.http_client = AsyncHttpClient()
+    rate_limiter = RateLimiter(global_limit=(0.1, 1))
+    send_request = mock.Mock()
+
+    async def call():
+        _rate_limit_request('block', operation, request_config, send_request, rate_limiter)
+        http_future = _rate_limit_request('block', operation, request_config, send_request, rate_limiter)
+        await http_future.future.wait(timeout=0.01)
+        # Let the cancelled request run its cleanup
+        await asyncio.sleep(0)
+
+    asyncio.run(call())
+
+    assert send_request.call_count == 1
+    assert rate_limiter.reserve('petstore.swagger.io') < 15
+
+
+def test_awaitable_fail_fast(operation, request_config):
+    operation.swagger_spec.http_client = AsyncHttpClient()
+    rate_limiter = RateLimiter(global_limit=(1, 1))
+
+    async def call():
+        _rate_limit_request('fail_fast', operation, request_config, mock.Mock(), rate_limiter)
+        http_future = _rate_limit_request('fail_fast', operation, request_config, mock.Mock(), rate_limiter)
+        assert isinstance(http_future, AsyncHttpFuture)
+        return await http_future.response(fallback_result='fallback')
+
+    assert asyncio.run(call()).result == 'fallback'
+
+
+def test_unknown_mode(operation, request_config):
+    with pytest.raises(ValueError):
+        _rate_limit_request('drop', operation, request_config, mock.Mock(), RateLimiter())
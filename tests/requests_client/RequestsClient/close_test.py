@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import mock
+
+from bravado.requests_client import RequestsClient
+
+
+def test_close_shuts_down_executor():
+    client = RequestsClient(max_workers=2)
+    executor = client.executor
+
+    with mock.patch.object(client.session, 'close') as mock_close:
+        client.close()
+
+    assert executor is not None and executor._shutdown
+    assert mock_close.call_count == 1
+
+
+def test_close_without_executor():
+    client = RequestsClient()
+
+    with mock.patch.object(client.session, 'close') as mock_close:
+        client.close()
+
+    assert mock_close.call_count == 1
+
+
+def test_context_manager_closes_client():
+    with mock.patch.object(RequestsClient, 'close') as mock_close:
+        with RequestsClient() as client:
+            assert isinstance(client, RequestsClient)
+            assert mock_close.call_count == 0
+
+    assert mock_close.call_count == 1
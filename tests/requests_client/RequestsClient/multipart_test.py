@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import io
+
+import mock
+
+from bravado.multipart import MultipartEncoder
+from bravado.requests_client import RequestsClient
+
+
+def _send(files):
+    http_client = RequestsClient()
+    with mock.patch.object(http_client.session, 'send') as mock_send:
+        http_client.request(
+            {'method': 'POST', 'url': 'http://foo.com', 'data': {'name': 'foo'}, 'files': files},
+        ).future.result()
+    return mock_send.call_args[0][0]
+
+
+def test_files_are_streamed():
+    prepared_request = _send([('upload', ('upload.bin', io.BytesIO(b'x' * 100000)))])
+
+    assert isinstance(prepared_request.body, MultipartEncoder)
+    assert prepared_request.headers['Content-Type'] == prepared_request.body.content_type
+    assert prepared_request.headers['Content-Length'] == str(prepared_request.body.len)
+
+
+def test_files_of_unknown_size_are_sent_chunked():
+    prepared_request = _send([('upload', ('upload.bin', iter([b'foo', b'bar'])))])
+
+    assert prepared_request.headers['Transfer-Encoding'] == 'chunked'
+    assert 'Content-Length' not in prepared_request.headers
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import mock
+
+from bravado.config import RequestConfig
+from bravado.requests_client import RequestsClient
+
+
+def _send(request_config):
+    http_client = RequestsClient()
+    with mock.patch.object(http_client.session, 'send') as mock_send:
+        http_client.request(
+            {'method': 'GET', 'url': 'http://foo.com'},
+            operation=None,
+            request_config=request_config,
+        ).future.result()
+    return mock_send.call_args[1]
+
+
+def test_responses_are_not_streamed_by_default():
+    assert not _send(RequestConfig({}, also_return_response_default=False)).get('stream')
+
+
+def test_stream_result_streams_response():
+    assert _send(RequestConfig({'stream_result': True}, also_return_response_default=False))['stream'] is True
+
+
+def test_download_to_streams_response():
+    assert _send(RequestConfig({'download_to': '/tmp/download'}, also_return_response_default=False))['stream'] is True
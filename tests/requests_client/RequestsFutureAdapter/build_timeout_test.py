@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import mock
+
 from bravado.requests_client import RequestsFutureAdapter
 
 
@@ -60,3 +62,11 @@ def test_connect_timeout_only(session_mock, request_mock):
     misc_options = dict(connect_timeout=1)
     future = RequestsFutureAdapter(session_mock, request_mock, misc_options)
     assert future.build_timeout(result_timeout=None) == (1, None)
+
+
+def test_timeouts_bounded_by_deadline(session_mock, request_mock):
+    misc_options = dict(connect_timeout=1, timeout=11, deadline=1005)
+    future = RequestsFutureAdapter(session_mock, request_mock, misc_options)
+    with mock.patch('bravado.deadline.monotonic.monotonic', return_value=1000):
+        assert future.build_timeout(result_timeout=None) == (1, 5)
+        assert future.build_timeout(result_timeout=20) == (1, 5)
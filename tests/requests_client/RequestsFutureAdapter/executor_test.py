@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import mock
+import pytest
+import requests.exceptions
+
+from bravado.requests_client import RequestsFutureAdapter
+
+
+@pytest.fixture
+def misc_options():
+    return {
+        'ssl_verify': True,
+        'ssl_cert': None,
+        'follow_redirects': False,
+        'timeout': 5,
+    }
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_request_is_sent_before_result_is_called(session_mock, request_mock, misc_options, executor):
+    request_mock.headers = {}
+    session_mock.merge_environment_settings.return_value = {}
+    sent = threading.Event()
+
+    def send(*args, **kwargs):
+        sent.set()
+        return mock.sentinel.response
+
+    session_mock.send.side_effect = send
+
+    future = RequestsFutureAdapter(session_mock, request_mock, misc_options, executor=executor)
+
+    assert sent.wait(timeout=1)
+    assert future.result(timeout=1) is mock.sentinel.response
+    # the result timeout is not known when the request is submitted
+    assert session_mock.send.call_args[1]['timeout'] == 5
+
+
+def test_result_timeout_raises_read_timeout_and_closes_response(
+    session_mock, request_mock, misc_options, executor,
+):
+    request_mock.headers = {}
+    session_mock.merge_environment_settings.return_value = {}
+    release = threading.Event()
+    response = mock.Mock(name='response')
+    session_mock.send.side_effect = lambda *args, **kwargs: release.wait() and response
+
+    future = RequestsFutureAdapter(session_mock, request_mock, misc_options, executor=executor)
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        future.result(timeout=0.01)
+
+    release.set()
+    executor.shutdown(wait=True)
+    assert response.close.call_count == 1
+
+
+def test_result_after_timeout_raises_read_timeout_again(session_mock, request_mock, misc_options, executor):
+    request_mock.headers = {}
+    session_mock.merge_environment_settings.return_value = {}
+    release = threading.Event()
+    response = mock.Mock(name='response')
+    session_mock.send.side_effect = lambda *args, **kwargs: release.wait() and response
+
+    future = RequestsFutureAdapter(session_mock, request_mock, misc_options, executor=executor)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        future.result(timeout=0.01)
+    release.set()
+    executor.shutdown(wait=True)
+
+    # The response arrived in the meantime, but it's closed
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        future.result(timeout=1)
+
+
+def test_cancel_before_request_is_sent(session_mock, request_mock, misc_options):
+    executor = mock.Mock()
+    future = RequestsFutureAdapter(session_mock, request_mock, misc_options, executor=executor)
+
+    future.cancel()
+
+    assert executor.submit.return_value.cancel.call_count == 1
+    assert executor.submit.return_value.add_done_callback.call_count == 0
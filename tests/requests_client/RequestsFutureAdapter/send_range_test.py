@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import typing
+
+import mock
+import pytest
+import requests
+
+from bravado.http_future import HttpFuture
+from bravado.requests_client import RequestsClient
+from bravado.requests_client import RequestsFutureAdapter
+from bravado.requests_client import RequestsResponseAdapter
+from bravado.streaming import RangeMismatchError
+
+
+@pytest.fixture
+def misc_options():
+    return {
+        'ssl_verify': True,
+        'ssl_cert': None,
+        'follow_redirects': False,
+        'stream': True,
+        'download_ranges': 4,
+    }
+
+
+def _response(status_code=200, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+def _range_response(status_code=206, headers=None):
+    range_response = mock.Mock(status_code=status_code, headers=headers or {'content-range': 'bytes 10-15/100'})
+    range_response.iter_content.return_value = iter([b'foo', b'bar'])
+    return range_response
+
+
+def test_send_range(session_mock, misc_options):
+    session_mock.merge_environment_settings.return_value = {}
+    request = requests.Request('GET', 'http://foo.com/file', headers={'X-Foo': 'bar'})
+    future = RequestsFutureAdapter(session_mock, request, misc_options)
+
+    future.send_range(10, 20, '"v1"')
+
+    range_request = session_mock.prepare_request.call_args[0][0]
+    assert range_request.headers == {
+        'X-Foo': 'bar',
+        'Range': 'bytes=10-19',
+        'If-Range': '"v1"',
+        'Accept-Encoding': 'identity',
+    }
+    assert request.headers == {'X-Foo': 'bar'}
+    assert session_mock.merge_environment_settings.call_args[1]['stream'] is True
+
+
+def test_send_whole_body_again(session_mock, misc_options):
+    session_mock.merge_environment_settings.return_value = {}
+    request = requests.Request('GET', 'http://foo.com/file', headers={'X-Foo': 'bar'})
+    future = RequestsFutureAdapter(session_mock, request, misc_options)
+
+    future.send_range(None, None)
+
+    assert session_mock.prepare_request.call_args[0][0].headers == {'X-Foo': 'bar', 'Accept-Encoding': 'identity'}
+
+
+def test_ranged_download_responses_can_send_ranges():
+    http_future = RequestsClient().request(  # type: HttpFuture[typing.Any]
+        {'method': 'GET', 'url': 'http://foo.com/file'},
+        request_config=mock.Mock(deadline_at=None, stream_result=False, download_to='file', download_ranges=4),
+    )
+
+    response_adapter = http_future.response_adapter(_response(headers={'Accept-Ranges': 'bytes', 'ETag': '"v1"'}))
+
+    assert response_adapter.accepts_ranges is True
+    assert response_adapter._range_sender is http_future.future
+
+
+@pytest.mark.parametrize(
+    'headers, expected',
+    (
+        ({'Accept-Ranges': 'bytes', 'ETag': '"v1"'}, True),
+        ({'Accept-Ranges': 'bytes', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}, True),
+        ({'Accept-Ranges': 'bytes', 'ETag': 'W/"v1"'}, False),
+        ({'Accept-Ranges': 'bytes'}, False),
+        ({'Accept-Ranges': 'none', 'ETag': '"v1"'}, False),
+        ({'ETag': '"v1"'}, False),
+        ({'Accept-Ranges': 'bytes', 'ETag': '"v1"', 'Content-Encoding': 'gzip'}, False),
+    ),
+)
+def test_accepts_ranges(headers, expected):
+    response_adapter = RequestsResponseAdapter(_response(headers=headers), range_sender=mock.Mock())
+
+    assert response_adapter.accepts_ranges is expected
+
+
+def test_accepts_ranges_needs_a_range_sender():
+    response = _response(headers={'Accept-Ranges': 'bytes', 'ETag': '"v1"'})
+
+    assert RequestsResponseAdapter(response).accepts_ranges is False
+
+
+def test_iter_range():
+    range_sender = mock.Mock()
+    range_sender.send_range.return_value = range_response = _range_response()
+    response = _response(headers={'Content-Length': '100', 'ETag': '"v1"'})
+
+    assert list(RequestsResponseAdapter(response, range_sender).iter_range(10, 16, 3)) == [b'foo', b'bar']
+    range_sender.send_range.assert_called_once_with(10, 16, '"v1"')
+    assert range_response.close.call_count == 1
+
+
+def test_iter_range_uses_last_modified_if_etag_is_weak():
+    range_sender = mock.Mock()
+    range_sender.send_range.return_value = _range_response()
+    response = _response(headers={
+        'Content-Length': '100',
+        'ETag': 'W/"v1"',
+        'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+    })
+
+    list(RequestsResponseAdapter(response, range_sender).iter_range(10, 16, 3))
+
+    range_sender.send_range.assert_called_once_with(10, 16, 'Mon, 01 Jan 2024 00:00:00 GMT')
+
+
+@pytest.mark.parametrize(
+    'range_response, error',
+    (
+        # The body changed, or the server ignored the range
+        (_range_response(status_code=200), RangeMismatchError),
+        (_range_response(headers={'content-range': 'bytes 10-15/120'}), RangeMismatchError),
+        (_range_response(headers={'content-range': 'bytes 0-15/100'}), RangeMismatchError),
+        (_range_response(headers={'content-range': 'bytes 10-15/100', 'etag': '"v2"'}), RangeMismatchError),
+        (_range_response(status_code=503), IOError),
+    ),
+)
+def test_iter_range_rejects_other_parts_of_the_body(range_response, error):
+    range_sender = mock.Mock()
+    range_sender.send_range.return_value = range_response
+    response = _response(headers={'Content-Length': '100', 'ETag': '"v1"'})
+
+    with pytest.raises(error):
+        list(RequestsResponseAdapter(response, range_sender).iter_range(10, 16, 3))
+    assert range_response.close.call_count == 1
+
+
+def test_iter_full_body():
+    range_sender = mock.Mock()
+    range_sender.send_range.return_value = full_response = _range_response(status_code=200)
+
+    assert list(RequestsResponseAdapter(_response(), range_sender).iter_full_body(3)) == [b'foo', b'bar']
+    range_sender.send_range.assert_called_once_with(None, None)
+    assert full_response.close.call_count == 1
@@ -25,6 +25,14 @@ def test_equality_of_different_http_clients_with_different_configurations(http_c
     assert http_client != RequestsClient(future_adapter_class=CustomAdapter)
 
 
+def test_equality_of_different_http_clients_with_the_same_thread_pool_size():
+    assert RequestsClient(max_workers=2) == RequestsClient(max_workers=2)
+
+
+def test_equality_of_different_http_clients_with_different_thread_pool_sizes(http_client):
+    assert http_client != RequestsClient(max_workers=2)
+
+
 def test_client_hashability(http_client):
     # The test wants to ensure that the HttpClient instance is hashable.
     # If calling hash does not throw an exception than we've validated the assumption
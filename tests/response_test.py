@@ -18,3 +18,17 @@ def test_response_metadata_times():
 
     assert metadata.elapsed_time == 6
     assert metadata.request_elapsed_time == 5
+
+
+def test_response_metadata_cache_status():
+    incoming_response = mock.Mock(cache_status='hit')
+    metadata = BravadoResponseMetadata(
+        incoming_response=incoming_response,
+        swagger_result=None,
+        start_time=5,
+        request_end_time=10,
+        handled_exception_info=None,
+        request_config=RequestConfig({}, also_return_response_default=False),
+    )  # type: BravadoResponseMetadata[None]
+
+    assert metadata.cache_status == 'hit'
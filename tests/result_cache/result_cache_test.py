@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import mock
+import pytest
+
+from bravado.asyncio_client import AsyncHttpClient
+from bravado.config import bravado_config_from_config_dict
+from bravado.config import RequestConfig
+from bravado.requests_client import RequestsClient
+from bravado.result_cache import AsyncCachedResultHttpFuture
+from bravado.result_cache import cached_result_future
+from bravado.result_cache import CachedResultHttpFuture
+from bravado.result_cache import ResultCache
+from bravado.result_cache import ResultCacheEntry
+from bravado.result_cache import result_cache_key
+
+
+def test_get_set(mock_monotonic):
+    cache = ResultCache()
+    incoming_response = mock.Mock()
+
+    assert cache.get(('GET', 'url')) is None
+    cache.set(('GET', 'url'), incoming_response, 'result', ttl=60)
+    entry = cache.get(('GET', 'url'))
+
+    assert entry is not None
+    assert entry.incoming_response is incoming_response
+    assert entry.swagger_result == 'result'
+
+
+def test_expired_results_are_evicted(mock_monotonic):
+    cache = ResultCache()
+    cache.set(('GET', 'url'), mock.Mock(), 'result', ttl=60)
+
+    mock_monotonic.return_value += 60
+
+    assert cache.get(('GET', 'url')) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_results_are_evicted(mock_monotonic):
+    cache = ResultCache(max_entries=2)
+    cache.set(('a',), mock.Mock(), 'a', ttl=60)
+    cache.set(('b',), mock.Mock(), 'b', ttl=60)
+    cache.get(('a',))
+    cache.set(('c',), mock.Mock(), 'c', ttl=60)
+
+    assert cache.get(('a',)) is not None
+    assert cache.get(('b',)) is None
+    assert cache.get(('c',)) is not None
+
+
+@pytest.mark.parametrize('status_code, is_stored', ((200, True), (404, False)))
+def test_store_callback(mock_monotonic, status_code, is_stored):
+    cache = ResultCache()
+    incoming_response = mock.Mock(status_code=status_code, swagger_result='result')
+
+    cache.store_callback(('GET', 'url'), 60)(incoming_response, mock.Mock())
+
+    assert (cache.get(('GET', 'url')) is not None) is is_stored
+
+
+def test_result_cache_key():
+    request_params = {
+        'method': 'GET',
+        'url': 'http://localhost/pets',
+        'params': {'tags': ['a', 'b'], 'limit': 10},
+        'headers': {'X-Request-Id': 'abc'},
+    }
+
+    assert result_cache_key(request_params) == (
+        'GET',
+        'http://localhost/pets',
+        (('limit', 10), ('tags', ('a', 'b'))),
+        (('X-Request-Id', 'abc'),),
+        None,
+    )
+    assert result_cache_key(dict(request_params, params={'limit': 10, 'tags': ['a', 'b']})) == \
+        result_cache_key(request_params)
+
+
+@pytest.mark.parametrize(
+    'extra_params',
+    (
+        {'files': {'file': b'content'}},
+        {'data': {'name': 'Lulu'}},
+    ),
+)
+def test_result_cache_key_uncacheable_request(extra_params):
+    request_params = dict({'method': 'POST', 'url': 'http://localhost/pets'}, **extra_params)
+    assert result_cache_key(request_params) is None
+
+
+@pytest.fixture
+def mock_operation():
+    return mock.Mock(swagger_spec=mock.Mock(config={'bravado': bravado_config_from_config_dict({})}))
+
+
+def test_cached_result_future(mock_operation):
+    entry = ResultCacheEntry(mock.Mock(status_code=200), 'result', 0)
+
+    http_future = cached_result_future(entry, RequestsClient(), mock_operation, RequestConfig({}, False))
+
+    assert isinstance(http_future, CachedResultHttpFuture)
+    assert http_future.result() == 'result'
+
+
+def test_cached_result_future_of_async_client_is_awaitable(mock_operation):
+    entry = ResultCacheEntry(mock.Mock(status_code=200), 'result', 0)
+
+    async def call():
+        http_future = cached_result_future(entry, AsyncHttpClient(), mock_operation, RequestConfig({}, False))
+        assert isinstance(http_future, AsyncCachedResultHttpFuture)
+        return await http_future.response()
+
+    assert asyncio.run(call()).result == 'result'
+
+
+def test_cached_result_future_of_async_client_outside_event_loop(mock_operation):
+    entry = ResultCacheEntry(mock.Mock(status_code=200), 'result', 0)
+
+    http_future = cached_result_future(entry, AsyncHttpClient(), mock_operation, RequestConfig({}, False))
+
+    assert isinstance(http_future, CachedResultHttpFuture)
+    assert http_future.result() == 'result'
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+import io
+from http.client import RemoteDisconnected
+
+import mock
+import pytest
+import requests
+from urllib3.exceptions import ProtocolError
+
+from bravado.config import bravado_config_from_config_dict
+from bravado.config import RequestConfig
+from bravado.exception import BravadoConnectionError
+from bravado.exception import BravadoRateLimitError
+from bravado.exception import BravadoTimeoutError
+from bravado.retry import is_stale_connection_error
+from bravado.retry import parse_retry_after
+from bravado.retry import retry_request
+from bravado.retry import RetryBudget
+from bravado.retry import RetryingFutureAdapter
+from bravado.retry import RetryPolicy
+from tests.conftest import make_send_request
+
+
+def test_from_options():
+    assert RetryPolicy.from_options(None, None) is None
+
+    policy = RetryPolicy.from_options({'max_attempts': 5, 'backoff_base': 1}, {'max_attempts': 2})
+
+    assert policy is not None
+    assert policy.max_attempts == 2
+    assert policy.backoff_base == 1
+
+
+def test_backoff_has_full_jitter():
+    policy = RetryPolicy(backoff_base=1, backoff_max=3)
+
+    with mock.patch('bravado.retry.random.uniform', side_effect=lambda low, high: (low, high)):
+        assert policy.backoff(2) == (0, 1)
+        assert policy.backoff(3) == (0, 2)
+        assert policy.backoff(5) == (0, 3)
+
+
+def test_retry_budget(mock_monotonic):
+    policy = RetryPolicy(budget_ratio=0.5, budget_min_retries=1)
+    budget = RetryBudget()
+    for _ in range(4):
+        budget.record_request()
+
+    assert [budget.try_retry(policy) for _ in range(4)] == [True, True, True, False]
+
+    # Requests and retries older than the window are forgotten
+    mock_monotonic.return_value += 20
+    assert budget.try_retry(policy) is True
+
+
+def test_is_stale_connection_error():
+    try:
+        try:
+            raise requests.exceptions.ConnectionError(
+                ProtocolError('Connection aborted.', RemoteDisconnected('Remote end closed connection')),
+            )
+        except requests.exceptions.ConnectionError:
+            raise BravadoConnectionError()
+    except BravadoConnectionError as e:
+        assert is_stale_connection_error(e)
+
+    assert not is_stale_connection_error(BravadoConnectionError(requests.exceptions.ConnectionError('refused')))
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    (
+        (None, None),
+        ('3', 3),
+        ('-1', 0),
+        ('Wed, 21 Oct 2015 07:28:00 GMT', 0),
+        ('soon', None),
+    ),
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_retries_errors_and_status_codes(mock_sleep):
+    send_request = make_send_request(BravadoTimeoutError(), 503, 200)
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(max_attempts=3), RetryBudget())
+
+    with mock.patch('bravado.retry.random.uniform', side_effect=lambda low, high: high):
+        assert future_adapter.result().status_code == 200
+
+    assert future_adapter.attempts == 3
+    assert future_adapter.backoff_time == pytest.approx(0.3)
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [0.1, 0.2]
+
+
+def test_gives_up_after_max_attempts(mock_sleep):
+    send_request = make_send_request(503, 503)
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(max_attempts=2), RetryBudget())
+
+    assert future_adapter.result().status_code == 503
+    assert send_request.call_count == 2
+
+
+def test_reraises_error_after_max_attempts(mock_sleep):
+    send_request = make_send_request(BravadoConnectionError(), BravadoConnectionError())
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(max_attempts=2), RetryBudget())
+
+    with pytest.raises(BravadoConnectionError):
+        future_adapter.result()
+    assert send_request.call_count == 2
+
+
+def test_honors_retry_after(mock_sleep):
+    send_request = make_send_request(429, 200)
+    send_request.http_futures[0]._get_incoming_response.return_value.headers = {'Retry-After': '2'}
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(), RetryBudget())
+
+    assert future_adapter.result().status_code == 200
+    mock_sleep.assert_called_once_with(2)
+
+
+def test_does_not_retry_beyond_timeout(mock_sleep):
+    send_request = make_send_request(429, 200)
+    send_request.http_futures[0]._get_incoming_response.return_value.headers = {'Retry-After': '2'}
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(), RetryBudget())
+
+    assert future_adapter.result(timeout=1).status_code == 429
+    assert mock_sleep.call_count == 0
+
+
+def test_does_not_back_off_beyond_timeout(mock_sleep):
+    send_request = make_send_request(BravadoTimeoutError(), 200)
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(), RetryBudget())
+
+    with mock.patch.object(RetryPolicy, 'backoff', return_value=2), pytest.raises(BravadoTimeoutError):
+        future_adapter.result(timeout=1)
+    assert mock_sleep.call_count == 0
+
+
+def test_does_not_retry_rate_limit_errors(mock_sleep):
+    send_request = make_send_request(BravadoRateLimitError(1), 200)
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(), RetryBudget())
+
+    with pytest.raises(BravadoRateLimitError):
+        future_adapter.result()
+
+
+def test_stale_connections_are_retried_right_away(mock_sleep):
+    stale_error = BravadoConnectionError()
+    stale_error.__context__ = ConnectionResetError()
+    send_request = make_send_request(stale_error, 200)
+    future_adapter = RetryingFutureAdapter(send_request, RetryPolicy(max_attempts=1), RetryBudget())
+
+    assert future_adapter.result().status_code == 200
+    assert future_adapter.attempts == 1
+    assert mock_sleep.call_count == 0
+
+
+def _retry_request(send_request, request_params):
+    operation = mock.Mock()
+    operation.swagger_spec.config = {'bravado': bravado_config_from_config_dict({})}
+    return retry_request(
+        RetryPolicy(),
+        RetryBudget(),
+        send_request,
+        dict({'url': 'http://localhost/pets'}, **request_params),
+        operation,
+        RequestConfig({}, also_return_response_default=False),
+    )
+
+
+@pytest.mark.parametrize('method, is_retried', (('GET', True), ('POST', False)))
+def test_retry_request_only_retries_idempotent_methods(method, is_retried):
+    http_future = _retry_request(make_send_request(200), {'method': method})
+
+    assert isinstance(http_future.future, RetryingFutureAdapter) is is_retried
+
+
+@pytest.mark.parametrize(
+    'request_params, is_retried',
+    (
+        ({'data': b'{"name": "Lulu"}'}, True),
+        ({'data': {'name': 'Lulu'}}, True),
+        ({'data': {'name': 'Lulu'}, 'files': [('photo', ('lulu.png', io.BytesIO(b'\x89PNG')))]}, False),
+        ({'data': io.BytesIO(b'{"name": "Lulu"}')}, False),
+        ({'data': iter([b'{"name": ', b'"Lulu"}'])}, False),
+    ),
+)
+def test_retry_request_does_not_retry_consumed_bodies(request_params, is_retried):
+    http_future = _retry_request(make_send_request(200), dict(request_params, method='PUT'))
+
+    assert isinstance(http_future.future, RetryingFutureAdapter) is is_retried
+
+
+def test_retry_request_returns_awaitable_futures():
+    async def response():
+        pass  # pragma: no cover
+
+    http_future = mock.Mock(response=response)
+
+    assert _retry_request(mock.Mock(return_value=http_future), {'method': 'GET'}) is http_future
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import threading
+import typing
+
+import mock
+import pytest
+
+from bravado.config import bravado_config_from_config_dict
+from bravado.config import RequestConfig
+from bravado.exception import BravadoTimeoutError
+from bravado.exception import HTTPInternalServerError
+from bravado.http_future import HttpFuture
+from bravado.singleflight import CoalescedHttpFuture
+from bravado.singleflight import SingleFlight
+
+
+@pytest.fixture
+def request_config():
+    return RequestConfig({}, also_return_response_default=False)
+
+
+@pytest.fixture
+def operation():
+    return mock.Mock(swagger_spec=mock.Mock(config={'bravado': bravado_config_from_config_dict({})}))
+
+
+@pytest.fixture
+def mock_http_future():
+    http_future = mock.Mock(name='http_future')
+    http_future._get_swagger_result.return_value = {'name': 'Lulu'}
+    return http_future
+
+
+def test_identical_calls_share_request(mock_http_future, operation, request_config):
+    single_flight = SingleFlight()
+    send_request = mock.Mock(return_value=mock_http_future)
+
+    futures = [single_flight.request(('GET', 'url'), send_request, operation, request_config) for _ in range(3)]
+    results = [future.response().result for future in futures]
+
+    assert send_request.call_count == 1
+    assert mock_http_future._get_swagger_result.call_count == 1
+    assert all(result is results[0] for result in results)
+    assert len(single_flight) == 0
+
+
+def test_shared_request_metadata(mock_http_future, operation, request_config):
+    mock_http_future.rate_limit_wait_time = 0.5
+    mock_http_future.circuit_breaker_state = 'half_open'
+    single_flight = SingleFlight()
+    send_request = mock.Mock(return_value=mock_http_future)
+
+    futures = [single_flight.request(('GET', 'url'), send_request, operation, request_config) for _ in range(2)]
+
+    for future in futures:
+        metadata = future.response().metadata
+        assert metadata.rate_limit_wait_time == 0.5
+        assert metadata.circuit_breaker_state == 'half_open'
+
+
+def test_calls_after_response_send_new_request(mock_http_future, operation, request_config):
+    single_flight = SingleFlight()
+    send_request = mock.Mock(return_value=mock_http_future)
+
+    single_flight.request(('GET', 'url'), send_request, operation, request_config).response()
+    single_flight.request(('GET', 'url'), send_request, operation, request_config).response()
+
+    assert send_request.call_count == 2
+
+
+def test_errors_are_shared(mock_http_future, operation, request_config):
+    single_flight = SingleFlight()
+    mock_http_future._get_swagger_result.side_effect = HTTPInternalServerError(mock.Mock(status_code=500))
+    send_request = mock.Mock(return_value=mock_http_future)
+
+    futures = [single_flight.request(('GET', 'url'), send_request, operation, request_config) for _ in range(2)]
+    for future in futures:
+        with pytest.raises(HTTPInternalServerError):
+            future.response()
+
+    assert mock_http_future._get_swagger_result.call_count == 1
+
+
+def test_waiting_caller_times_out(mock_http_future, operation, request_config):
+    single_flight = SingleFlight()
+    response_received = threading.Event()
+    mock_http_future._get_incoming_response.side_effect = lambda timeout: response_received.wait()
+    send_request = mock.Mock(return_value=mock_http_future)
+    first_future = single_flight.request(('GET', 'url'), send_request, operation, request_config)
+    second_future = single_flight.request(('GET', 'url'), send_request, operation, request_config)
+
+    assert isinstance(first_future, CoalescedHttpFuture)
+
+    first_caller = threading.Thread(target=first_future.response)
+    first_caller.start()
+    try:
+        while not first_future.coalesced_call._started:
+            pass
+        with pytest.raises(BravadoTimeoutError):
+            second_future.response(timeout=0.01)
+    finally:
+        response_received.set()
+        first_caller.join()
+
+    assert second_future.response().result == {'name': 'Lulu'}
+
+
+def test_requests_are_sent_without_holding_the_lock(mock_http_future, operation, request_config):
+    single_flight = SingleFlight()
+    sending, sent = threading.Event(), threading.Event()
+
+    def send_slow_request():
+        sending.set()
+        sent.wait()
+        return mock_http_future
+
+    first_caller = threading.Thread(
+        target=single_flight.request,
+        args=(('GET', 'slow'), send_slow_request, operation, request_config),
+    )
+    first_caller.start()
+    sending.wait()
+    try:
+        other_future = single_flight.request(('GET', 'other'), lambda: mock_http_future, operation, request_config)
+    finally:
+        sent.set()
+        first_caller.join()
+
+    assert isinstance(other_future, CoalescedHttpFuture)
+
+
+def test_joining_call_waits_for_request_to_be_sent(mock_http_future, operation, request_config):
+    single_flight = SingleFlight()
+    sending, sent = threading.Event(), threading.Event()
+    joined_futures = []  # type: typing.List[HttpFuture[typing.Any]]
+
+    def send_slow_request():
+        sending.set()
+        sent.wait()
+        return mock_http_future
+
+    first_caller = threading.Thread(
+        target=single_flight.request,
+        args=(('GET', 'url'), send_slow_request, operation, request_config),
+    )
+    first_caller.start()
+    sending.wait()
+    send_request = mock.Mock()
+
+    def join_call():
+        joined_futures.append(single_flight.request(('GET', 'url'), send_request, operation, request_config))
+
+    joining_caller = threading.Thread(target=join_call)
+    joining_caller.start()
+    sent.set()
+    first_caller.join()
+    joining_caller.join()
+
+    assert send_request.call_count == 0
+    assert joined_futures[0].response().result == {'name': 'Lulu'}
+
+
+def test_failed_send_is_not_shared(mock_http_future, operation, request_config):
+    single_flight = SingleFlight()
+
+    with pytest.raises(IOError):
+        single_flight.request(('GET', 'url'), mock.Mock(side_effect=IOError), operation, request_config)
+    http_future = single_flight.request(('GET', 'url'), lambda: mock_http_future, operation, request_config)
+
+    assert isinstance(http_future, CoalescedHttpFuture)
+    assert http_future.coalesced_call.http_future is mock_http_future
+
+
+def test_awaitable_futures_are_not_coalesced(operation, request_config):
+    single_flight = SingleFlight()
+
+    async def response():
+        pass  # pragma: no cover
+
+    http_future = mock.Mock(response=response)
+
+    assert single_flight.request(('GET', 'url'), lambda: http_future, operation, request_config) is http_future
+    assert len(single_flight) == 0
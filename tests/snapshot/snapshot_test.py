@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import mock
+import pytest
+
+from bravado.client import SwaggerClient
+from bravado.requests_client import RequestsClient
+from bravado.snapshot import load_snapshot
+from bravado.snapshot import main
+from bravado.snapshot import save_snapshot
+
+
+@pytest.fixture
+def snapshot_path(tmpdir):
+    return str(tmpdir.join('petstore.snapshot'))
+
+
+def test_snapshot_roundtrip(petstore_dict, snapshot_path):
+    swagger_client = SwaggerClient.from_spec(petstore_dict, config={'also_return_response': True})
+    http_client = RequestsClient()
+
+    save_snapshot(swagger_client, snapshot_path)
+    with mock.patch('bravado_core.spec.Spec.build') as mock_build:
+        loaded_client = load_snapshot(snapshot_path, http_client=http_client)
+
+    assert mock_build.call_count == 0
+    assert loaded_client.is_equal(swagger_client)
+    assert loaded_client.swagger_spec.http_client is http_client
+    assert loaded_client.pet.getPetById.operation.swagger_spec is loaded_client.swagger_spec
+    assert loaded_client.get_model('Pet')(name='foo', photoUrls=[]).name == 'foo'
+
+
+def test_snapshot_with_json_codec(petstore_dict, snapshot_path):
+    swagger_client = SwaggerClient.from_spec(petstore_dict, config={'json_codec': 'json'})
+
+    save_snapshot(swagger_client, snapshot_path)
+
+    loaded_client = load_snapshot(snapshot_path)
+    assert loaded_client.swagger_spec.config['bravado'].json_codec == 'json'
+
+
+def test_load_snapshot_rejects_other_files(snapshot_path):
+    with open(snapshot_path, 'wb') as fp:
+        fp.write(b'\x80\x04]\x94.')  # pickled empty list
+
+    with pytest.raises(ValueError):
+        load_snapshot(snapshot_path)
+
+
+def test_save_snapshot_unpicklable_spec(petstore_dict, snapshot_path):
+    swagger_client = SwaggerClient.from_spec(petstore_dict)
+    swagger_client.swagger_spec.config['formats'] = [lambda: None]
+
+    with pytest.raises(ValueError):
+        save_snapshot(swagger_client, snapshot_path)
+
+
+def test_main(test_dir, snapshot_path):
+    spec_url = 'file://{0}/../test-data/2.0/petstore/swagger.json'.format(test_dir)
+
+    main([spec_url, snapshot_path, '--config', '{"use_models": false}'])
+
+    swagger_client = load_snapshot(snapshot_path)
+    assert swagger_client.swagger_spec.config['use_models'] is False
+    assert 'pet' in dir(swagger_client)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from copy import deepcopy
+
+import pytest
+
+from bravado.client import SwaggerClient
+from bravado.spec_subset import subset_spec
+
+
+@pytest.fixture
+def polymorphic_dict():
+    return {
+        'swagger': '2.0',
+        'info': {'title': 'Zoo', 'version': '1.0'},
+        'tags': [{'name': 'animals'}, {'name': 'keepers'}],
+        'paths': {
+            '/animals/{id}': {
+                'parameters': [{'$ref': '#/parameters/id'}],
+                'get': {
+                    'tags': ['animals'],
+                    'operationId': 'getAnimal',
+                    'responses': {'200': {'$ref': '#/responses/animal'}},
+                },
+            },
+            '/keepers': {
+                'get': {
+                    'tags': ['keepers'],
+                    'operationId': 'listKeepers',
+                    'parameters': [{'$ref': '#/parameters/limit'}],
+                    'responses': {
+                        '200': {
+                            'description': 'keepers',
+                            'schema': {'type': 'array', 'items': {'$ref': '#/definitions/Keeper'}},
+                        },
+                    },
+                },
+            },
+        },
+        'parameters': {
+            'id': {'name': 'id', 'in': 'path', 'required': True, 'type': 'string'},
+            'limit': {'name': 'limit', 'in': 'query', 'type': 'integer'},
+        },
+        'responses': {
+            'animal': {'description': 'an animal', 'schema': {'$ref': '#/definitions/Animal'}},
+        },
+        'definitions': {
+            'Animal': {
+                'type': 'object',
+                'discriminator': 'type',
+                'required': ['type'],
+                'properties': {'type': {'type': 'string'}},
+            },
+            'Cat': {
+                'allOf': [
+                    {'$ref': '#/definitions/Animal'},
+                    {'type': 'object', 'properties': {'toy': {'$ref': '#/definitions/Toy'}}},
+                ],
+            },
+            'Toy': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+            'Keeper': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+        },
+    }
+
+
+def test_subset_by_resource(petstore_dict):
+    subset = subset_spec(petstore_dict, resources=['store'])
+
+    assert sorted(subset['paths']) == [
+        '/store/inventory', '/store/order', '/store/order/{orderId}',
+    ]
+    assert sorted(subset['definitions']) == ['Order']
+    assert [tag['name'] for tag in subset['tags']] == ['store']
+    assert subset['securityDefinitions'] == petstore_dict['securityDefinitions']
+
+
+def test_subset_by_operation_id(petstore_dict):
+    subset = subset_spec(petstore_dict, operation_ids=['getPetById'])
+
+    assert subset['paths'] == {'/pet/{petId}': {'get': petstore_dict['paths']['/pet/{petId}']['get']}}
+    assert sorted(subset['definitions']) == ['Category', 'Pet', 'Tag']
+
+
+def test_subset_does_not_modify_the_spec(petstore_dict):
+    original_dict = deepcopy(petstore_dict)
+
+    subset_spec(petstore_dict, resources=['pet'], operation_ids=['loginUser'])
+
+    assert petstore_dict == original_dict
+
+
+def test_subset_unknown_names(petstore_dict):
+    with pytest.raises(ValueError) as excinfo:
+        subset_spec(petstore_dict, resources=['pet', 'foo'], operation_ids=['bar'])
+
+    assert "['foo']" in str(excinfo.value)
+    assert "['bar']" in str(excinfo.value)
+
+
+def test_subset_keeps_referenced_parameters_and_responses(polymorphic_dict):
+    subset = subset_spec(polymorphic_dict, operation_ids=['listKeepers'])
+
+    assert sorted(subset['parameters']) == ['limit']
+    assert subset['responses'] == {}
+    assert sorted(subset['definitions']) == ['Keeper']
+
+
+def test_subset_keeps_subtypes_of_polymorphic_models(polymorphic_dict):
+    subset = subset_spec(polymorphic_dict, resources=['animals'])
+
+    assert subset['paths']['/animals/{id}']['parameters'] == [{'$ref': '#/parameters/id'}]
+    assert sorted(subset['parameters']) == ['id']
+    assert sorted(subset['responses']) == ['animal']
+    assert sorted(subset['definitions']) == ['Animal', 'Cat', 'Toy']
+
+
+def test_client_for_subset(petstore_dict):
+    swagger_client = SwaggerClient.from_spec(
+        petstore_dict,
+        config={'include_resources': ['store'], 'include_operation_ids': ['loginUser']},
+    )
+
+    assert sorted(dir(swagger_client)) == ['store', 'user']
+    assert dir(swagger_client.user) == ['loginUser']
+    assert sorted(swagger_client.swagger_spec.definitions) == ['Order']
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+
+import mock
+import pytest
+
+from bravado.streaming import can_download_ranges
+from bravado.streaming import download_ranges_to_file
+from bravado.streaming import RangeMismatchError
+
+
+BODY = bytes(bytearray(range(256))) * 40
+
+
+class RangedResponse(object):
+
+    accepts_ranges = True
+
+    def __init__(self, body, interruptions=0, new_body=None):
+        self.body = body
+        self.headers = {'content-length': str(len(body))}
+        self.interruptions = interruptions
+        # Body of the resource once it changed, after the first response
+        self.new_body = new_body
+        self.requested_ranges = []
+        self.close = mock.Mock()
+
+    def iter_content(self, chunk_size):
+        return self._iter_chunks(0, len(self.body), chunk_size)
+
+    def iter_range(self, start, end, chunk_size):
+        self.requested_ranges.append((start, end))
+        if self.new_body is not None:
+            raise RangeMismatchError('The body changed')
+        return self._iter_chunks(start, end, chunk_size)
+
+    def iter_full_body(self, chunk_size):
+        self.body = self.new_body
+        return self._iter_chunks(0, len(self.body), chunk_size)
+
+    def _iter_chunks(self, start, end, chunk_size):
+        for offset in range(start, end, chunk_size):
+            if offset > start and self.interruptions:
+                self.interruptions -= 1
+                raise IOError('Connection reset')
+            yield self.body[offset:min(offset + chunk_size, end)]
+
+
+@pytest.mark.parametrize('ranges', (1, 3, 7))
+def test_download_ranges_to_file_object(ranges):
+    response = RangedResponse(BODY)
+    target = io.BytesIO()
+
+    downloaded_file = download_ranges_to_file(response, target, ranges, chunk_size=100)
+
+    assert target.getvalue() == BODY
+    assert downloaded_file.file is target
+    assert downloaded_file.size == len(BODY)
+    assert downloaded_file.sha256 == hashlib.sha256(BODY).hexdigest()
+    assert len(response.requested_ranges) == ranges - 1
+    assert response.close.call_count == 1
+
+
+def test_download_ranges_to_path(tmpdir):
+    path = str(tmpdir.join('download'))
+
+    downloaded_file = download_ranges_to_file(RangedResponse(BODY), path, 4, chunk_size=1000)
+
+    with downloaded_file.file:
+        assert downloaded_file.path == path
+        assert downloaded_file.file.read() == BODY
+
+
+def test_interrupted_ranges_are_resumed():
+    response = RangedResponse(BODY, interruptions=2)
+    target = io.BytesIO()
+
+    download_ranges_to_file(response, target, 2, chunk_size=1000)
+
+    assert target.getvalue() == BODY
+    # The interrupted ranges are requested again from the last byte written
+    resumed_ranges = response.requested_ranges[1:]
+    assert len(resumed_ranges) == 2
+    assert all(start not in (0, len(BODY) // 2) for start, _ in resumed_ranges)
+
+
+def test_changed_body_is_downloaded_again_in_one_request():
+    new_body = b'changed' * 100
+    response = RangedResponse(BODY, new_body=new_body)
+    target = io.BytesIO()
+
+    downloaded_file = download_ranges_to_file(response, target, 3, chunk_size=100)
+
+    assert target.getvalue() == new_body
+    assert downloaded_file.size == len(new_body)
+    assert downloaded_file.sha256 == hashlib.sha256(new_body).hexdigest()
+    assert target.tell() == 0
+
+
+def test_download_fails_after_too_many_interruptions():
+    response = RangedResponse(BODY, interruptions=100)
+
+    with pytest.raises(IOError):
+        download_ranges_to_file(response, io.BytesIO(), 2, chunk_size=1000)
+
+
+@pytest.mark.parametrize(
+    'headers, accepts_ranges, expected',
+    (
+        ({'content-length': str(10 * 1024 * 1024)}, True, True),
+        ({'content-length': str(10 * 1024 * 1024)}, False, False),
+        ({'content-length': '1024'}, True, False),
+        ({}, True, False),
+    ),
+)
+def test_can_download_ranges(headers, accepts_ranges, expected):
+    response = mock.Mock(headers=headers, accepts_ranges=accepts_ranges)
+
+    assert can_download_ranges(response) is expected
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+
+import mock
+import pytest
+
+from bravado.streaming import download_to_file
+
+
+def test_download_to_file_object():
+    target = io.BytesIO()
+
+    downloaded_file = download_to_file([b'foo', b'bar'], target)
+
+    assert downloaded_file.file is target
+    assert downloaded_file.path is None
+    assert target.getvalue() == b'foobar'
+    assert downloaded_file.size == 6
+    assert downloaded_file.sha256 == hashlib.sha256(b'foobar').hexdigest()
+
+
+def test_download_to_path(tmpdir):
+    path = str(tmpdir.join('download'))
+
+    downloaded_file = download_to_file([b'foo', b'bar'], path)
+
+    with downloaded_file.file:
+        assert downloaded_file.path == path
+        assert downloaded_file.size == 6
+        assert downloaded_file.file.read() == b'foobar'
+    with open(path, 'rb') as f:
+        assert f.read() == b'foobar'
+
+
+def test_download_to_path_closes_file_on_error():
+    def chunks():
+        yield b'foo'
+        raise IOError('Connection reset')
+
+    with mock.patch('bravado.streaming.open', create=True) as mock_open:
+        with pytest.raises(IOError):
+            download_to_file(chunks(), '/tmp/download')
+
+    assert mock_open.return_value.close.call_count == 1
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from bravado.streaming import iter_json_array
+
+
+DOCUMENT = [1, 22, 333, -4.5e10, {'a': [1, 2, 'x,]']}, u'caf\xe9', None, True, False, [], {}]
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 3, 7, 1000))
+def test_iter_json_array(chunk_size):
+    document = json.dumps(DOCUMENT, indent=1).encode('utf-8')
+    chunks = [document[i:i + chunk_size] for i in range(0, len(document), chunk_size)]
+
+    assert list(iter_json_array(chunks)) == DOCUMENT
+
+
+def test_empty_array():
+    assert list(iter_json_array([b' [ ', b' ] '])) == []
+
+
+def test_items_are_yielded_as_soon_as_they_are_parsed():
+    def chunks():
+        yield b'[{"a": 1}, '
+        raise AssertionError('The first item should be available already')
+
+    assert next(iter_json_array(chunks())) == {'a': 1}
+
+
+def test_number_split_across_chunks():
+    assert list(iter_json_array([b'[12', b'34]'])) == [1234]
+
+
+@pytest.mark.parametrize(
+    'document',
+    (b'{"a": 1}', b'[1,]', b'[1 2]', b'[1, 2', b'[', b'', b'[{"a": ]'),
+)
+def test_invalid_document(document):
+    with pytest.raises(ValueError):
+        list(iter_json_array([document]))
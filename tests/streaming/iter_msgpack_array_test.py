@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import msgpack
+import pytest
+
+from bravado.streaming import iter_msgpack_array
+from bravado.streaming import unpack_msgpack
+
+
+DOCUMENT = [1, -4.5e10, {'a': [1, 2, 'x']}, u'caf\xe9', b'\x00\x01', None, True, [], {}]
+
+
+def _chunks(document, chunk_size):
+    return [document[i:i + chunk_size] for i in range(0, len(document), chunk_size)]
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 3, 7, 1000))
+def test_iter_msgpack_array(chunk_size):
+    document = msgpack.packb(DOCUMENT, use_bin_type=True)
+
+    assert list(iter_msgpack_array(_chunks(document, chunk_size))) == DOCUMENT
+
+
+def test_empty_array():
+    assert list(iter_msgpack_array([msgpack.packb([])])) == []
+
+
+def test_items_are_yielded_as_soon_as_they_are_unpacked():
+    def chunks():
+        yield msgpack.packb([{'a': 1}, 2])[:-1]
+        raise AssertionError('The first item should be available already')
+
+    assert next(iter_msgpack_array(chunks())) == {'a': 1}
+
+
+@pytest.mark.parametrize(
+    'document',
+    (msgpack.packb({'a': 1}), msgpack.packb([1, 2])[:-1], b''),
+)
+def test_invalid_array(document):
+    with pytest.raises(ValueError):
+        list(iter_msgpack_array([document]))
+
+
+@pytest.mark.parametrize('chunk_size', (1, 3, 1000))
+def test_unpack_msgpack(chunk_size):
+    document = msgpack.packb({'items': DOCUMENT}, use_bin_type=True)
+
+    assert unpack_msgpack(_chunks(document, chunk_size)) == {'items': DOCUMENT}
+
+
+@pytest.mark.parametrize('chunks', ([msgpack.packb({'a': 1})[:-1]], [b'\x92', b'\x01']))
+def test_unpack_incomplete_msgpack(chunks):
+    with pytest.raises(ValueError):
+        unpack_msgpack(chunks)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import mock
+from bravado_core.response import IncomingResponse
+
+from bravado.streaming import close_response
+from bravado.streaming import iter_response_content
+
+
+def test_iter_content():
+    response = mock.Mock()
+    response.iter_content.return_value = iter([b'foo', b'bar'])
+
+    assert list(iter_response_content(response, chunk_size=3)) == [b'foo', b'bar']
+    response.iter_content.assert_called_once_with(3)
+
+
+def test_without_iter_content():
+    response = mock.Mock(spec=IncomingResponse, raw_bytes=b'foobar')
+
+    assert list(iter_response_content(response)) == [b'foobar']
+
+
+def test_close_response():
+    response = mock.Mock()
+
+    close_response(response)
+
+    assert response.close.call_count == 1
+
+
+def test_close_response_without_close():
+    close_response(mock.Mock(spec=IncomingResponse))
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import mock
 import pytest
 
 from bravado.swagger_model import Loader
@@ -42,3 +43,18 @@ def test_load_yaml(yaml_spec):
             },
         },
     }
+
+
+def test_load_spec_with_json_codec():
+    json_codec = mock.Mock()
+    http_client = mock.Mock()
+    response = http_client.request.return_value.result.return_value
+    response.headers = {'content-type': 'application/json'}
+    response.raw_bytes = b'{"swagger": "2.0"}'
+    loader = Loader(http_client, json_codec=json_codec)
+
+    result = loader.load_spec('http://localhost/swagger.json')
+
+    assert result is json_codec.loads.return_value
+    json_codec.loads.assert_called_once_with(b'{"swagger": "2.0"}')
+    assert response.json.call_count == 0
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import mock
+import pytest
+
+from bravado.exception import HTTPNotFound
+from bravado.swagger_model import iter_remote_refs
+from bravado.swagger_model import Loader
+from bravado.swagger_model import ResponseEventual
+
+
+DOCUMENTS = {
+    'http://localhost/a.json': {'A': {'$ref': 'common.json#/Common'}},
+    'http://localhost/b.json': {'B': {'$ref': 'http://localhost/common.json#/Common'}},
+    'http://localhost/common.json': {'Common': {'type': 'object'}},
+}
+
+
+@pytest.fixture
+def spec_dict():
+    return {
+        'definitions': {
+            'A': {'$ref': 'a.json#/A'},
+            'B': {'$ref': 'b.json#/B'},
+            'Local': {'$ref': '#/definitions/A'},
+            'Missing': {'$ref': 'missing.json#/Missing'},
+        },
+    }
+
+
+@pytest.fixture
+def mock_http_client():
+    http_client = mock.Mock()
+    threads = set()
+
+    def request(request_params):
+        threads.add(threading.current_thread())
+        url = request_params['url']
+        response = mock.Mock(headers={'content-type': 'application/json'})
+        if url not in DOCUMENTS:
+            future = mock.Mock()
+            future.result.side_effect = HTTPNotFound(response)
+            return future
+        response.json.return_value = DOCUMENTS[url]
+        return ResponseEventual(response)
+
+    http_client.request.side_effect = request
+    http_client.threads = threads
+    return http_client
+
+
+def test_iter_remote_refs(spec_dict):
+    assert sorted(iter_remote_refs('http://localhost/swagger.json', spec_dict)) == [
+        'http://localhost/a.json',
+        'http://localhost/b.json',
+        'http://localhost/missing.json',
+    ]
+
+
+def test_prefetch_remote_refs(mock_http_client, spec_dict):
+    loader = Loader(mock_http_client, prefetch_workers=2)
+
+    loader.prefetch_remote_refs('http://localhost/swagger.json', spec_dict)
+
+    assert loader.prefetched_refs == DOCUMENTS
+    requested_urls = [call[0][0]['url'] for call in mock_http_client.request.call_args_list]
+    # every document is fetched once, documents that can't be fetched are skipped
+    assert sorted(requested_urls) == sorted(list(DOCUMENTS) + ['http://localhost/missing.json'])
+    assert threading.current_thread() not in mock_http_client.threads
+
+
+def test_prefetch_remote_refs_skips_prefetched_documents(mock_http_client, spec_dict):
+    loader = Loader(mock_http_client, prefetch_workers=2)
+    loader.prefetch_remote_refs('http://localhost/swagger.json', spec_dict)
+    mock_http_client.request.reset_mock()
+
+    loader.prefetch_remote_refs('http://localhost/other.json', {'A': {'$ref': 'a.json#/A'}})
+
+    assert mock_http_client.request.call_count == 0
+
+
+def test_load_spec_without_prefetch_workers(mock_http_client):
+    loader = Loader(mock_http_client)
+
+    with mock.patch.object(loader, 'prefetch_remote_refs') as mock_prefetch_remote_refs:
+        loader.load_spec('http://localhost/a.json')
+
+    assert mock_prefetch_remote_refs.call_count == 0
+    assert loader.prefetched_refs == {}
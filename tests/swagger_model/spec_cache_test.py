@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import os
+
+import mock
+import pytest
+
+from bravado.exception import BravadoConnectionError
+from bravado.exception import HTTPNotModified
+from bravado.swagger_model import Loader
+from bravado.swagger_model import SpecCache
+
+
+SPEC_URL = 'http://localhost/swagger.json'
+SPEC_DICT = {'swagger': '2.0', 'paths': {'/ping': {'get': {'responses': {'200': {'description': 'pong'}}}}}}
+
+
+@pytest.fixture
+def spec_cache(tmpdir):
+    return SpecCache(str(tmpdir.join('specs')), max_age=60)
+
+
+@pytest.fixture
+def mock_http_client():
+    return mock.Mock(name='http_client')
+
+
+def _mock_response(headers):
+    return mock.Mock(headers=headers, json=mock.Mock(return_value=SPEC_DICT))
+
+
+def test_spec_cache_roundtrip(spec_cache):
+    spec_cache.set(SPEC_URL, SPEC_DICT, etag='"v1"')
+
+    entry = spec_cache.get(SPEC_URL)
+
+    assert entry['spec'] == SPEC_DICT
+    assert entry['etag'] == '"v1"'
+    assert entry['last_modified'] is None
+    assert spec_cache.get('http://localhost/other.json') is None
+
+
+def test_spec_cache_ignores_corrupted_entries(spec_cache):
+    spec_cache.set(SPEC_URL, SPEC_DICT)
+    with open(spec_cache._path(SPEC_URL), 'wb') as fp:
+        fp.write(b'\xc1garbage')
+
+    assert spec_cache.get(SPEC_URL) is None
+
+
+def test_spec_cache_max_age(spec_cache):
+    spec_cache.set(SPEC_URL, SPEC_DICT)
+    entry = spec_cache.get(SPEC_URL)
+    assert spec_cache.is_usable(entry)
+
+    entry['validated_at'] -= 61
+    assert not spec_cache.is_usable(entry)
+
+
+def test_loader_stores_spec_in_cache(spec_cache, mock_http_client):
+    mock_http_client.request.return_value.result.return_value = _mock_response({
+        'etag': '"v1"',
+        'last-modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+    })
+
+    assert Loader(mock_http_client, spec_cache=spec_cache).load_spec(SPEC_URL) == SPEC_DICT
+
+    entry = spec_cache.get(SPEC_URL)
+    assert entry['spec'] == SPEC_DICT
+    assert entry['etag'] == '"v1"'
+    assert entry['last_modified'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+
+def test_loader_revalidates_cached_spec(spec_cache, mock_http_client):
+    spec_cache.set(SPEC_URL, SPEC_DICT, etag='"v1"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+    mock_http_client.request.return_value.result.side_effect = HTTPNotModified(mock.Mock(status_code=304))
+
+    loader = Loader(mock_http_client, request_headers={'X-Foo': 'bar'}, spec_cache=spec_cache)
+
+    assert loader.load_spec(SPEC_URL) == SPEC_DICT
+    assert mock_http_client.request.call_args[0][0]['headers'] == {
+        'X-Foo': 'bar',
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+    }
+
+
+def test_loader_refreshes_revalidated_spec_without_rewriting_it(spec_cache, mock_http_client):
+    spec_cache.set(SPEC_URL, SPEC_DICT, etag='"v1"')
+    os.utime(spec_cache._path(SPEC_URL), (0, 0))
+    mock_http_client.request.return_value.result.side_effect = HTTPNotModified(mock.Mock(status_code=304))
+
+    with mock.patch.object(spec_cache, 'set') as mock_set:
+        Loader(mock_http_client, spec_cache=spec_cache).load_spec(SPEC_URL)
+
+    assert not mock_set.called
+    assert spec_cache.get(SPEC_URL)['validated_at'] > 0
+    assert spec_cache.is_usable(spec_cache.get(SPEC_URL))
+
+
+def test_loader_uses_cached_spec_if_server_is_unreachable(spec_cache, mock_http_client):
+    spec_cache.set(SPEC_URL, SPEC_DICT)
+    mock_http_client.request.return_value.result.side_effect = BravadoConnectionError()
+
+    assert Loader(mock_http_client, spec_cache=spec_cache).load_spec(SPEC_URL) == SPEC_DICT
+
+
+def test_loader_does_not_use_expired_spec_if_server_is_unreachable(spec_cache, mock_http_client):
+    spec_cache.max_age = 0
+    spec_cache.set(SPEC_URL, SPEC_DICT)
+    mock_http_client.request.return_value.result.side_effect = BravadoConnectionError()
+
+    with mock.patch('bravado.swagger_model.time.time', return_value=spec_cache.get(SPEC_URL)['validated_at'] + 1):
+        with pytest.raises(BravadoConnectionError):
+            Loader(mock_http_client, spec_cache=spec_cache).load_spec(SPEC_URL)